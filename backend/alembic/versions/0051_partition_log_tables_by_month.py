@@ -0,0 +1,123 @@
+"""partition audit and session log tables by month
+
+Revision ID: 0051_partition_log_tables_by_month
+Revises: 0050_add_main_equipment_drive_to_technological_equipment
+Create Date: 2026-10-16 10:00:00
+"""
+
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0051_partition_log_tables_by_month"
+down_revision = "0050_add_main_equipment_drive_to_technological_equipment"
+branch_labels = None
+depends_on = None
+
+PARTITIONED_TABLES = (
+    ("audit_logs", "created_at"),
+    ("ip_address_audit_logs", "created_at"),
+    ("user_sessions", "started_at"),
+)
+MONTHS_AHEAD = 3
+UNIQUE_INDEXES = {"user_sessions": ["ix_user_sessions_session_token_hash"]}
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _capture_table_objects(bind, table_name: str) -> dict:
+    params = {"table_name": table_name}
+    primary_key = bind.execute(
+        sa.text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:table_name) AND contype = 'p'"),
+        params,
+    ).scalar()
+    indexes = bind.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table_name ORDER BY indexname"
+        ),
+        params,
+    ).all()
+    foreign_keys = bind.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table_name) AND contype = 'f' ORDER BY conname"
+        ),
+        params,
+    ).all()
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table_name, 'id')"), params).scalar()
+    return {
+        "primary_key": primary_key,
+        "indexes": [(name, definition) for name, definition in indexes if name != primary_key],
+        "foreign_keys": list(foreign_keys),
+        "sequence": sequence,
+    }
+
+
+def _rebuild_table(bind, table_name: str, time_column: str, *, partitioned: bool) -> None:
+    objects = _capture_table_objects(bind, table_name)
+    legacy_name = f"{table_name}_legacy"
+    op.execute(f'ALTER TABLE "{table_name}" RENAME TO "{legacy_name}"')
+
+    partition_clause = f' PARTITION BY RANGE ("{time_column}")' if partitioned else ""
+    op.execute(
+        f'CREATE TABLE "{table_name}" (LIKE "{legacy_name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        f"{partition_clause}"
+    )
+
+    if partitioned:
+        oldest = bind.execute(sa.text(f'SELECT min("{time_column}") FROM "{legacy_name}"')).scalar()
+        current_month = date.today().replace(day=1)
+        month = date(oldest.year, oldest.month, 1) if oldest is not None else current_month
+        last_month = _add_months(current_month, MONTHS_AHEAD)
+        while month <= last_month:
+            upper = _add_months(month, 1)
+            op.execute(
+                f'CREATE TABLE "{table_name}_p{month.year:04d}{month.month:02d}" PARTITION OF "{table_name}" '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+        op.execute(f'CREATE TABLE "{table_name}_default" PARTITION OF "{table_name}" DEFAULT')
+
+    op.execute(f'INSERT INTO "{table_name}" SELECT * FROM "{legacy_name}"')
+    if objects["sequence"]:
+        op.execute(f"ALTER SEQUENCE {objects['sequence']} OWNED BY NONE")
+    op.execute(f'DROP TABLE "{legacy_name}"')
+    if objects["sequence"]:
+        op.execute(f'ALTER SEQUENCE {objects["sequence"]} OWNED BY "{table_name}".id')
+
+    primary_key_columns = f'id, "{time_column}"' if partitioned else "id"
+    op.execute(
+        f'ALTER TABLE "{table_name}" ADD CONSTRAINT "{objects["primary_key"] or table_name + "_pkey"}" '
+        f"PRIMARY KEY ({primary_key_columns})"
+    )
+    for name, definition in objects["indexes"]:
+        if partitioned:
+            # Unique indexes on a partitioned table must contain the partition key.
+            definition = definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1)
+        elif name in UNIQUE_INDEXES.get(table_name, []):
+            definition = definition.replace("CREATE INDEX", "CREATE UNIQUE INDEX", 1)
+        op.execute(definition)
+    for name, definition in objects["foreign_keys"]:
+        op.execute(f'ALTER TABLE "{table_name}" ADD CONSTRAINT "{name}" {definition}')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for table_name, time_column in PARTITIONED_TABLES:
+        _rebuild_table(bind, table_name, time_column, partitioned=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for table_name, time_column in PARTITIONED_TABLES:
+        _rebuild_table(bind, table_name, time_column, partitioned=False)
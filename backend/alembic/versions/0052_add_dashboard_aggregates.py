@@ -0,0 +1,33 @@
+"""add dashboard aggregates snapshot table
+
+Revision ID: 0052_add_dashboard_aggregates
+Revises: 0051_partition_log_tables_by_month
+Create Date: 2026-10-16 12:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0052_add_dashboard_aggregates"
+down_revision = "0051_partition_log_tables_by_month"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dashboard_aggregates",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("is_stale", sa.Boolean(), server_default=sa.text("false"), nullable=False),
+        sa.Column("revision", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_aggregates")
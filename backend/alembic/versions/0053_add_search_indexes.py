@@ -0,0 +1,57 @@
+"""add trigram search and initial-letter indexes
+
+Revision ID: 0053_add_search_indexes
+Revises: 0052_add_dashboard_aggregates
+Create Date: 2026-10-16 14:00:00
+"""
+
+from alembic import op
+
+
+revision = "0053_add_search_indexes"
+down_revision = "0052_add_dashboard_aggregates"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ("ix_manufacturers_name_trgm", "manufacturers", ("name",)),
+    ("ix_equipment_categories_name_trgm", "equipment_categories", ("name",)),
+    ("ix_equipment_types_search_trgm", "equipment_types", ("name", "nomenclature_number")),
+    ("ix_warehouses_name_trgm", "warehouses", ("name",)),
+    ("ix_cabinets_name_trgm", "cabinets", ("name",)),
+    ("ix_assemblies_name_trgm", "assemblies", ("name",)),
+    (
+        "ix_personnel_search_trgm",
+        "personnel",
+        ("first_name", "last_name", "middle_name", "position", "personnel_number"),
+    ),
+    ("ix_users_username_trgm", "users", ("username",)),
+    ("ix_audit_logs_search_trgm", "audit_logs", ("entity", "action")),
+)
+INITIAL_LETTER_INDEXES = (
+    ("ix_equipment_types_name_initial", "equipment_types", "name"),
+    ("ix_warehouses_name_initial", "warehouses", "name"),
+    ("ix_cabinets_name_initial", "cabinets", "name"),
+    ("ix_assemblies_name_initial", "assemblies", "name"),
+    ("ix_users_username_initial", "users", "username"),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for index_name, table_name, columns in TRIGRAM_INDEXES:
+            column_list = ", ".join(f"{column} gin_trgm_ops" for column in columns)
+            op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING gin ({column_list})")
+    for index_name, table_name, column in INITIAL_LETTER_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} (substr({column}, 1, 1))")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for index_name, _table_name, _column in reversed(INITIAL_LETTER_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    if bind.dialect.name == "postgresql":
+        for index_name, _table_name, _columns in reversed(TRIGRAM_INDEXES):
+            op.execute(f"DROP INDEX IF EXISTS {index_name}")
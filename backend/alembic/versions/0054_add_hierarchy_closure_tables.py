@@ -0,0 +1,59 @@
+"""add closure tables for location, manufacturer, category and main equipment trees
+
+Revision ID: 0054_add_hierarchy_closure_tables
+Revises: 0053_add_search_indexes
+Create Date: 2026-10-16 15:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0054_add_hierarchy_closure_tables"
+down_revision = "0053_add_search_indexes"
+branch_labels = None
+depends_on = None
+
+CLOSURE_TABLES = (
+    ("location_closure", "locations"),
+    ("manufacturer_closure", "manufacturers"),
+    ("equipment_category_closure", "equipment_categories"),
+    ("main_equipment_closure", "main_equipment"),
+)
+MAX_DEPTH = 64
+
+
+def upgrade() -> None:
+    for closure_table, tree_table in CLOSURE_TABLES:
+        op.create_table(
+            closure_table,
+            sa.Column("ancestor_id", sa.Integer(), nullable=False),
+            sa.Column("descendant_id", sa.Integer(), nullable=False),
+            sa.Column("depth", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["ancestor_id"], [f"{tree_table}.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["descendant_id"], [f"{tree_table}.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+        )
+        op.create_index(f"ix_{closure_table}_descendant_depth", closure_table, ["descendant_id", "depth"])
+        op.execute(
+            sa.text(
+                f"""
+                INSERT INTO {closure_table} (ancestor_id, descendant_id, depth)
+                WITH RECURSIVE paths(ancestor_id, descendant_id, depth) AS (
+                    SELECT id, id, 0 FROM {tree_table}
+                    UNION ALL
+                    SELECT node.parent_id, paths.descendant_id, paths.depth + 1
+                    FROM paths
+                    JOIN {tree_table} AS node ON node.id = paths.ancestor_id
+                    WHERE node.parent_id IS NOT NULL AND paths.depth < {MAX_DEPTH}
+                )
+                SELECT ancestor_id, descendant_id, MIN(depth) FROM paths GROUP BY ancestor_id, descendant_id
+                """
+            )
+        )
+
+
+def downgrade() -> None:
+    for closure_table, _tree_table in reversed(CLOSURE_TABLES):
+        op.drop_index(f"ix_{closure_table}_descendant_depth", table_name=closure_table)
+        op.drop_table(closure_table)
@@ -0,0 +1,45 @@
+"""add per-block occupancy counters for subnets
+
+Revision ID: 0055_add_subnet_address_blocks
+Revises: 0054_add_hierarchy_closure_tables
+Create Date: 2026-10-16 16:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0055_add_subnet_address_blocks"
+down_revision = "0054_add_hierarchy_closure_tables"
+branch_labels = None
+depends_on = None
+
+OCCUPIED_STATUSES = ("used", "reserved", "service", "gateway", "broadcast", "network")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "subnet_address_blocks",
+        sa.Column("subnet_id", sa.Integer(), nullable=False),
+        sa.Column("block_index", sa.Integer(), nullable=False),
+        *[sa.Column(status, sa.Integer(), nullable=False, server_default="0") for status in OCCUPIED_STATUSES],
+        sa.ForeignKeyConstraint(["subnet_id"], ["subnets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("subnet_id", "block_index"),
+    )
+    counters = ", ".join(OCCUPIED_STATUSES)
+    sums = ", ".join(f"SUM(CASE WHEN status = '{status}' THEN 1 ELSE 0 END)" for status in OCCUPIED_STATUSES)
+    op.execute(
+        sa.text(
+            f"""
+            INSERT INTO subnet_address_blocks (subnet_id, block_index, {counters})
+            SELECT subnet_id, ip_offset / 256, {sums}
+            FROM ip_addresses
+            WHERE is_deleted = false
+            GROUP BY subnet_id, ip_offset / 256
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("subnet_address_blocks")
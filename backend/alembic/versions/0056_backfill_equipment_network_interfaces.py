@@ -0,0 +1,61 @@
+"""materialize network interfaces of existing cabinet and assembly items
+
+Interfaces used to be created lazily while listing eligible equipment; that
+read path no longer writes, so rows for items that were never listed are
+created here once.
+
+Revision ID: 0056_backfill_equipment_network_interfaces
+Revises: 0055_add_subnet_address_blocks
+Create Date: 2026-10-16 17:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0056_backfill_equipment_network_interfaces"
+down_revision = "0055_add_subnet_address_blocks"
+branch_labels = None
+depends_on = None
+
+ITEM_TABLES = (
+    ("cabinet", "cabinet_items", "item.id"),
+    ("assembly", "assembly_items", "NULL"),
+)
+
+
+def upgrade() -> None:
+    for source, table, instance_id in ITEM_TABLES:
+        op.execute(
+            sa.text(
+                f"""
+                INSERT INTO equipment_network_interfaces (
+                    equipment_instance_id, equipment_item_source, equipment_item_id, interface_name,
+                    interface_index, interface_type, connector_spec, is_management, is_active
+                )
+                SELECT
+                    {instance_id}, '{source}', item.id,
+                    CASE WHEN ports.count > 1 THEN ports.type || ' Port ' || idx ELSE ports.type END,
+                    idx, ports.type, ports.type, false, true
+                FROM {table} AS item
+                JOIN equipment_types AS et ON et.id = item.equipment_type_id
+                CROSS JOIN LATERAL (
+                    SELECT btrim(port->>'type') AS type, (port->>'count')::int AS count
+                    FROM jsonb_array_elements(
+                        CASE WHEN jsonb_typeof(et.network_ports) = 'array' THEN et.network_ports ELSE '[]'::jsonb END
+                    ) AS port
+                    WHERE jsonb_typeof(port) = 'object'
+                      AND coalesce(btrim(port->>'type'), '') <> ''
+                      AND (port->>'count') ~ '^[0-9]+$'
+                ) AS ports
+                CROSS JOIN LATERAL generate_series(1, ports.count) AS idx
+                WHERE item.is_deleted = false AND et.is_deleted = false
+                ON CONFLICT DO NOTHING
+                """
+            )
+        )
+
+
+def downgrade() -> None:
+    # Backfilled interfaces are indistinguishable from ones created by the app.
+    pass
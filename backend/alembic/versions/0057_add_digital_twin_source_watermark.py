@@ -0,0 +1,27 @@
+"""add source watermark to digital twin documents
+
+Revision ID: 0057_add_digital_twin_source_watermark
+Revises: 0056_backfill_equipment_network_interfaces
+Create Date: 2026-10-16 18:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0057_add_digital_twin_source_watermark"
+down_revision = "0056_backfill_equipment_network_interfaces"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "digital_twin_documents",
+        sa.Column("source_watermark", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("digital_twin_documents", "source_watermark")
@@ -0,0 +1,107 @@
+"""move serial map undo history out of the document
+
+Revision ID: 0058_add_serial_map_history_entries
+Revises: 0057_add_digital_twin_source_watermark
+Create Date: 2026-10-16 19:00:00
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0058_add_serial_map_history_entries"
+down_revision = "0057_add_digital_twin_source_watermark"
+branch_labels = None
+depends_on = None
+
+HISTORY_LIMIT = 100
+BATCH_SIZE = 200
+
+
+def _snapshot(value: dict) -> dict:
+    return {
+        "nodes": value.get("nodes") or [],
+        "edges": value.get("edges") or [],
+        "viewport": value.get("viewport") or {"x": 0, "y": 0, "zoom": 1},
+    }
+
+
+def upgrade() -> None:
+    op.create_table(
+        "serial_map_history_entries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("is_keyframe", sa.Boolean(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_by_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["document_id"], ["serial_map_documents.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+        sa.UniqueConstraint("document_id", "seq", name="uq_serial_map_history_entries_document_seq"),
+    )
+    op.create_index(
+        "ix_serial_map_history_entries_document_id", "serial_map_history_entries", ["document_id"]
+    )
+    op.add_column("serial_map_documents", sa.Column("history_cursor", sa.Integer(), nullable=True))
+
+    # Seed the store from the snapshots embedded in current (version 2)
+    # documents. Every seeded entry is a keyframe; later saves append deltas.
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                """
+                SELECT id, document_json FROM serial_map_documents
+                WHERE id > :last_id
+                  AND document_json ->> 'version' = '2'
+                  AND jsonb_typeof(document_json -> 'history') = 'object'
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        for document_id, document in rows:
+            last_id = document_id
+            history = document.get("history") or {}
+            future = [_snapshot(entry) for entry in history.get("future") or []][: HISTORY_LIMIT - 1]
+            room = HISTORY_LIMIT - 1 - len(future)
+            past = [_snapshot(entry) for entry in history.get("past") or []][-room:] if room else []
+            states = [*past, _snapshot(document), *future]
+            cursor = len(past) + 1
+            bind.execute(
+                sa.text(
+                    """
+                    INSERT INTO serial_map_history_entries (document_id, seq, is_keyframe, payload)
+                    VALUES (:document_id, :seq, true, CAST(:payload AS jsonb))
+                    """
+                ),
+                [
+                    {"document_id": document_id, "seq": seq, "payload": json.dumps(state, ensure_ascii=False)}
+                    for seq, state in enumerate(states, start=1)
+                ],
+            )
+            bind.execute(
+                sa.text(
+                    """
+                    UPDATE serial_map_documents
+                    SET history_cursor = :cursor,
+                        document_json = jsonb_set(document_json, '{history}', '{"past": [], "future": []}'::jsonb)
+                    WHERE id = :document_id
+                    """
+                ),
+                {"cursor": cursor, "document_id": document_id},
+            )
+
+
+def downgrade() -> None:
+    op.drop_column("serial_map_documents", "history_cursor")
+    op.drop_index("ix_serial_map_history_entries_document_id", table_name="serial_map_history_entries")
+    op.drop_table("serial_map_history_entries")
@@ -0,0 +1,186 @@
+"""upgrade legacy serial map documents once and record their schema version
+
+Revision ID: 0059_add_serial_map_schema_version
+Revises: 0058_add_serial_map_history_entries
+Create Date: 2026-10-16 20:00:00
+"""
+
+import json
+import time
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0059_add_serial_map_schema_version"
+down_revision = "0058_add_serial_map_history_entries"
+branch_labels = None
+depends_on = None
+
+SCHEMA_VERSION = 2
+HISTORY_LIMIT = 100
+BATCH_SIZE = 200
+
+
+def _snapshot(value: dict) -> dict:
+    return {
+        "nodes": value.get("nodes") or [],
+        "edges": value.get("edges") or [],
+        "viewport": value.get("viewport") or {"x": 0, "y": 0, "zoom": 1},
+    }
+
+
+def _normalize_scheme(scheme: dict | None) -> dict:
+    scheme = scheme if isinstance(scheme, dict) else {}
+    return {
+        "version": 2,
+        "updatedAt": datetime.utcnow().isoformat(),
+        **_snapshot(scheme),
+        "history": {"past": [], "future": []},
+    }
+
+
+def _history_rows(document_id: int, scheme: dict | None) -> tuple[list[dict], int]:
+    scheme = scheme if isinstance(scheme, dict) else {}
+    history = scheme.get("history") or {}
+    future = [_snapshot(entry) for entry in history.get("future") or []][: HISTORY_LIMIT - 1]
+    room = HISTORY_LIMIT - 1 - len(future)
+    past = [_snapshot(entry) for entry in history.get("past") or []][-room:] if room else []
+    states = [*past, _snapshot(scheme), *future]
+    rows = [
+        {"document_id": document_id, "seq": seq, "payload": json.dumps(state, ensure_ascii=False)}
+        for seq, state in enumerate(states, start=1)
+    ]
+    return rows, len(past) + 1
+
+
+def _store(bind, document_id: int, scheme: dict | None, source_context: dict) -> None:
+    rows, cursor = _history_rows(document_id, scheme)
+    bind.execute(
+        sa.text(
+            """
+            INSERT INTO serial_map_history_entries (document_id, seq, is_keyframe, payload)
+            VALUES (:document_id, :seq, true, CAST(:payload AS jsonb))
+            """
+        ),
+        rows,
+    )
+    bind.execute(
+        sa.text(
+            """
+            UPDATE serial_map_documents
+            SET document_json = CAST(:document AS jsonb),
+                source_context = CAST(:source_context AS jsonb),
+                schema_version = :schema_version,
+                history_cursor = :cursor
+            WHERE id = :document_id
+            """
+        ),
+        {
+            "document": json.dumps(_normalize_scheme(scheme), ensure_ascii=False),
+            "source_context": json.dumps(source_context, ensure_ascii=False),
+            "schema_version": SCHEMA_VERSION,
+            "cursor": cursor,
+            "document_id": document_id,
+        },
+    )
+
+
+def _upgrade_document(bind, row) -> int:
+    document = row.document_json if isinstance(row.document_json, dict) else {}
+    schemes = [scheme for scheme in document.get("schemes") or [] if isinstance(scheme, dict)]
+    active = next((scheme for scheme in schemes if scheme.get("id") == document.get("activeSchemeId")), None)
+    active = active or (schemes[0] if schemes else None)
+    context = {
+        **(row.source_context or {}),
+        "legacy_project_id": document.get("projectId"),
+        **({"legacy_scheme_id": active.get("id")} if len(schemes) > 1 else {}),
+        "migrated_from_multi_scheme": len(schemes) > 1,
+    }
+    _store(bind, row.id, active, context)
+    if len(schemes) <= 1:
+        return 0
+
+    created = 0
+    for index, scheme in enumerate(schemes):
+        if scheme is active:
+            continue
+        clone_id = bind.execute(
+            sa.text(
+                """
+                INSERT INTO serial_map_documents
+                    (name, description, scope, location_id, source_context, document_json,
+                     created_by_id, updated_by_id, schema_version)
+                VALUES
+                    (:name, :description, :scope, :location_id, '{}'::jsonb, '{}'::jsonb,
+                     :created_by_id, :updated_by_id, :schema_version)
+                RETURNING id
+                """
+            ),
+            {
+                "name": f"{row.name} / {scheme.get('name') or f'Схема {index + 1}'}"[:200],
+                "description": scheme.get("description") or row.description,
+                "scope": row.scope,
+                "location_id": row.location_id,
+                "created_by_id": row.created_by_id,
+                "updated_by_id": row.updated_by_id,
+                "schema_version": SCHEMA_VERSION,
+            },
+        ).scalar_one()
+        _store(
+            bind,
+            clone_id,
+            scheme,
+            {
+                **context,
+                "legacy_scheme_id": scheme.get("id"),
+                "migrated_from_document_id": row.id,
+            },
+        )
+        created += 1
+    return created
+
+
+def upgrade() -> None:
+    op.add_column(
+        "serial_map_documents",
+        sa.Column("schema_version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE serial_map_documents
+        SET schema_version = 2
+        WHERE document_json ->> 'version' = '2' AND document_json ? 'nodes' AND document_json ? 'edges'
+        """
+    )
+
+    bind = op.get_bind()
+    batch = 0
+    while True:
+        started = time.perf_counter()
+        rows = bind.execute(
+            sa.text(
+                """
+                SELECT id, name, description, scope, location_id, source_context, document_json,
+                       created_by_id, updated_by_id
+                FROM serial_map_documents
+                WHERE schema_version < :schema_version AND document_json ? 'schemes'
+                ORDER BY id
+                LIMIT :limit
+                """
+            ),
+            {"schema_version": SCHEMA_VERSION, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        created = sum(_upgrade_document(bind, row) for row in rows)
+        batch += 1
+        print(
+            f"serial_map_documents batch {batch}: {len(rows)} upgraded, {created} split off, "
+            f"{time.perf_counter() - started:.3f}s"
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("serial_map_documents", "schema_version")
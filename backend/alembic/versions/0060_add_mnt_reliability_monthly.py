@@ -0,0 +1,72 @@
+"""add monthly per-cabinet reliability rollups
+
+Revision ID: 0060_add_mnt_reliability_monthly
+Revises: 0059_add_serial_map_schema_version
+Create Date: 2026-10-16 21:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0060_add_mnt_reliability_monthly"
+down_revision = "0059_add_serial_map_schema_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mnt_reliability_monthly",
+        sa.Column("cabinet_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("operating_hours", sa.Numeric(12, 2), server_default="0", nullable=False),
+        sa.Column("operating_days", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("incident_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("downtime_hours", sa.Numeric(12, 2), server_default="0", nullable=False),
+        sa.Column("repair_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("repair_seconds", sa.Float(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["cabinet_id"], ["cabinets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("cabinet_id", "month"),
+    )
+    op.create_index("ix_mnt_reliability_monthly_month", "mnt_reliability_monthly", ["month"])
+
+    op.execute(
+        """
+        INSERT INTO mnt_reliability_monthly (
+            cabinet_id, month, operating_hours, operating_days,
+            incident_count, downtime_hours, repair_count, repair_seconds
+        )
+        SELECT cabinet_id, month,
+               SUM(operating_hours), SUM(operating_days),
+               SUM(incident_count), SUM(downtime_hours), SUM(repair_count), SUM(repair_seconds)
+        FROM (
+            SELECT cabinet_id,
+                   date_trunc('month', recorded_date)::date AS month,
+                   operating_hours,
+                   1 AS operating_days,
+                   0 AS incident_count,
+                   0 AS downtime_hours,
+                   0 AS repair_count,
+                   0::float8 AS repair_seconds
+            FROM mnt_operating_time
+            UNION ALL
+            SELECT cabinet_id,
+                   date_trunc('month', occurred_at AT TIME ZONE 'UTC')::date,
+                   0,
+                   0,
+                   1,
+                   COALESCE(downtime_hours, 0),
+                   CASE WHEN repair_started_at IS NOT NULL AND resolved_at IS NOT NULL THEN 1 ELSE 0 END,
+                   COALESCE(EXTRACT(EPOCH FROM resolved_at - repair_started_at), 0)::float8
+            FROM mnt_incidents
+            WHERE is_deleted = false
+        ) AS source
+        GROUP BY cabinet_id, month
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mnt_reliability_monthly_month", table_name="mnt_reliability_monthly")
+    op.drop_table("mnt_reliability_monthly")
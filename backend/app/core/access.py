@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import threading
+import time
+import weakref
+
 from fastapi import Depends, HTTPException, status
 from sqlalchemy import inspect
 from sqlalchemy import select
 
+from app.core.config import get_settings
 from app.core.dependencies import get_current_user, get_db
 from app.models.security import AccessSpace, RoleDefinition, RoleSpacePermission, SpaceKey, User, UserRole
 from app.schemas.users import SpacePermissionOut
@@ -61,7 +66,14 @@ def default_role_permission_map(role: str | UserRole) -> dict[SpaceKey, tuple[bo
     return permissions
 
 
-def ensure_space_permissions_seeded(db) -> None:
+def ensure_space_permissions_seeded(db) -> bool:
+    """
+    Create missing spaces, system roles and default permissions.
+
+    Returns True when something had to be added, so callers can tell a fully
+    seeded database from one that was patched inside the current transaction.
+    """
+    changed = False
     bind = db.get_bind()
     inspector = inspect(bind)
     existing_tables = set(inspector.get_table_names())
@@ -69,16 +81,19 @@ def ensure_space_permissions_seeded(db) -> None:
     if "role_definitions" not in existing_tables:
         RoleDefinition.__table__.create(bind, checkfirst=True)
         existing_tables.add("role_definitions")
+        changed = True
 
     existing_spaces = {space.key: space for space in db.scalars(select(AccessSpace)).all()}
     for key, label, is_admin in DEFAULT_SPACE_CATALOG:
         if key.value not in existing_spaces:
             db.add(AccessSpace(key=key.value, label=label, is_admin_space=is_admin))
+            changed = True
 
     existing_roles = {role.key: role for role in db.scalars(select(RoleDefinition)).all()}
     for key, label, is_system in DEFAULT_ROLE_CATALOG:
         if key not in existing_roles:
             db.add(RoleDefinition(key=key, label=label, is_system=is_system))
+            changed = True
 
     db.flush()
 
@@ -100,7 +115,9 @@ def ensure_space_permissions_seeded(db) -> None:
                     can_admin=can_admin,
                 )
             )
+            changed = True
     db.flush()
+    return changed
 
 
 def get_role_permissions(db, role: str | UserRole) -> list[RoleSpacePermission]:
@@ -111,32 +128,111 @@ def get_role_permissions(db, role: str | UserRole) -> list[RoleSpacePermission]:
     ).all()
 
 
+PermissionFlags = tuple[bool, bool, bool]
+
+
+class PermissionCache:
+    """
+    Process-local role -> space permission map, one snapshot per database engine.
+
+    A snapshot is loaded with a single SELECT on the first miss and then served
+    from memory until `invalidate()` is called (role-permission admin writes) or
+    the TTL expires (writes made by other worker processes). Every invalidation
+    bumps `version`; a load that started before an invalidation is discarded
+    instead of overwriting the fresh state.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._seeded: weakref.WeakSet = weakref.WeakSet()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db) -> dict[str, dict[str, PermissionFlags]]:
+        settings = get_settings()
+        bind = db.get_bind()
+        if settings.permission_cache_enabled:
+            with self._lock:
+                snapshot = self._snapshots.get(bind)
+                if snapshot is not None and snapshot[0] == self.version and snapshot[1] > time.monotonic():
+                    self.hits += 1
+                    return snapshot[2]
+                self.misses += 1
+                version = self.version
+
+        if bind not in self._seeded:
+            if not ensure_space_permissions_seeded(db):
+                self._seeded.add(bind)
+
+        permissions: dict[str, dict[str, PermissionFlags]] = {}
+        for permission in db.scalars(select(RoleSpacePermission)).all():
+            permissions.setdefault(str(permission.role), {})[str(permission.space_key)] = (
+                bool(permission.can_read),
+                bool(permission.can_write),
+                bool(permission.can_admin),
+            )
+
+        if settings.permission_cache_enabled:
+            expires_at = time.monotonic() + settings.permission_cache_ttl_seconds
+            with self._lock:
+                if version == self.version:
+                    self._snapshots[bind] = (version, expires_at, permissions)
+        return permissions
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._snapshots.clear()
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {
+                "enabled": get_settings().permission_cache_enabled,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "snapshots": len(self._snapshots),
+            }
+
+
+permission_cache = PermissionCache()
+
+
+def invalidate_permission_cache() -> None:
+    permission_cache.invalidate()
+
+
+def get_cached_role_permissions(db, role: str | UserRole) -> dict[str, PermissionFlags]:
+    return permission_cache.get(db).get(normalize_role_key(role), {})
+
+
 def build_user_permissions(db, user: User) -> list[SpacePermissionOut]:
+    permissions = get_cached_role_permissions(db, user.role)
     return [
         SpacePermissionOut(
-            space_key=str(permission.space_key),
-            can_read=bool(permission.can_read),
-            can_write=bool(permission.can_write),
-            can_admin=bool(permission.can_admin),
+            space_key=space_key,
+            can_read=can_read,
+            can_write=can_write,
+            can_admin=can_admin,
         )
-        for permission in get_role_permissions(db, user.role)
+        for space_key, (can_read, can_write, can_admin) in sorted(permissions.items())
     ]
 
 
 def has_space_access(db, user: User, space_key: SpaceKey | str, action: str = "read") -> bool:
     normalized_space = SpaceKey(space_key).value if isinstance(space_key, str) else space_key.value
-    permission = next(
-        (entry for entry in get_role_permissions(db, user.role) if entry.space_key == normalized_space),
-        None,
-    )
+    permission = get_cached_role_permissions(db, user.role).get(normalized_space)
     if permission is None:
         return False
+    can_read, can_write, can_admin = permission
     if action == "read":
-        return bool(permission.can_read or permission.can_write or permission.can_admin)
+        return bool(can_read or can_write or can_admin)
     if action == "write":
-        return bool(permission.can_write or permission.can_admin)
+        return bool(can_write or can_admin)
     if action == "admin":
-        return bool(permission.can_admin)
+        return bool(can_admin)
     raise ValueError(f"Unsupported action: {action}")
 
 
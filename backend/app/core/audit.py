@@ -1,11 +1,15 @@
 ﻿from datetime import datetime, date, timedelta
 from typing import Any
 
+from sqlalchemy import event, insert
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Session
 
-from app.core.log_retention import enforce_table_row_limit
+from app.core.config import get_settings
 from app.models.audit import AuditLog
 
+PENDING_AUDIT_LOGS_KEY = "pending_audit_logs"
+
 
 def _json_safe(value: Any):
     """
@@ -65,17 +69,43 @@ def add_audit_log(
 ):
     """
     Create audit log entry.
+
+    In pipeline mode (`audit_pipeline_enabled`) the entry is only queued on the
+    session and written together with the rest of the request's entries by
+    `write_pending_audit_logs` right before commit. Retention is applied out of
+    band by `core.log_retention.run_log_retention`.
     """
-    log = AuditLog(
-        actor_id=actor_id,
-        action=action,
-        entity=entity,
-        entity_id=entity_id,
-        before=_json_safe(before),
-        after=_json_safe(after),
-        meta=_json_safe(meta),
-    )
-
-    db.add(log)
+    values = {
+        "actor_id": actor_id,
+        "action": action,
+        "entity": entity,
+        "entity_id": entity_id,
+        "before": _json_safe(before),
+        "after": _json_safe(after),
+        "meta": _json_safe(meta),
+    }
+    if get_settings().audit_pipeline_enabled:
+        if not db.in_transaction():
+            db.begin()
+        db.info.setdefault(PENDING_AUDIT_LOGS_KEY, []).append(values)
+        return
+
+    db.add(AuditLog(**values))
     db.flush()
-    enforce_table_row_limit(db, AuditLog)
+
+
+@event.listens_for(Session, "before_commit")
+def write_pending_audit_logs(session: Session):
+    """
+    Write queued audit entries with one multi-row INSERT inside the committing
+    transaction, so they become durable exactly when the audited changes do.
+    """
+    pending = session.info.pop(PENDING_AUDIT_LOGS_KEY, None)
+    if pending:
+        session.execute(insert(AuditLog), pending)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def discard_pending_audit_logs(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(PENDING_AUDIT_LOGS_KEY, None)
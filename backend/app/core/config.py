@@ -37,6 +37,10 @@ class Settings(BaseSettings):
     photo_dir: str = "Photo"
     datasheet_dir: str = "Datasheets"
     pid_storage_root: str = "app/pid_storage"
+    pid_diagrams_gzip: bool = True
+    pid_diagram_cache_max_size: int = 32
+    diagnostics_log_index_path: str = "storage/diagnostics/log-index.sqlite3"
+    diagnostics_database_overview_ttl_seconds: int = 300
     public_base_url: str | None = None
     frontend_public_url: str | None = None
     backend_public_url: str | None = None
@@ -60,6 +64,22 @@ class Settings(BaseSettings):
     )
     seed_admin_username: str = "admin"
     seed_admin_password: str = "admin12345"
+    permission_cache_enabled: bool = True
+    permission_cache_ttl_seconds: int = 60
+    principal_cache_enabled: bool = True
+    principal_cache_ttl_seconds: int = 30
+    principal_cache_max_size: int = 4096
+    audit_pipeline_enabled: bool = False
+    audit_logs_retention_days: int | None = 730
+    audit_logs_max_bytes: int | None = None
+    ip_address_audit_logs_retention_days: int | None = 730
+    ip_address_audit_logs_max_bytes: int | None = None
+    user_sessions_retention_days: int | None = 365
+    user_sessions_max_bytes: int | None = None
+    log_retention_fallback_max_rows: int | None = None
+    log_partition_months_ahead: int = 3
+    log_retention_interval_minutes: int = 60
+    dashboard_reconcile_interval_minutes: int = 30
 
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env"),
@@ -106,6 +126,10 @@ class Settings(BaseSettings):
     def resolved_pid_diagrams_dir(self) -> Path:
         return self.resolved_pid_storage_root / "diagrams"
 
+    @property
+    def resolved_diagnostics_log_index_path(self) -> Path:
+        return _resolve_path(BASE_DIR, self.diagnostics_log_index_path)
+
     @property
     def frontend_runtime_base_url(self) -> str:
         return self.frontend_runtime_url or f"http://{self.frontend_runtime_host}:{self.frontend_runtime_port}"
@@ -1,12 +1,18 @@
-﻿from typing import Iterable
+﻿from collections import OrderedDict
+import threading
+import time
+from typing import Iterable
+import weakref
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 
 from app.db.session import SessionLocal
-from app.core.security import decode_token
+from app.core.config import get_settings
+from app.core.security import decode_token, hash_token
 from app.models.security import User, UserRole
-from sqlalchemy import select
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import make_transient_to_detached
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -20,7 +26,97 @@ def get_db():
         db.close()
 
 
+class PrincipalCache:
+    """
+    Short-lived token -> user snapshot cache used by `get_current_user`.
+
+    Entries are keyed by `hash_token(token)` per database engine, bounded by
+    `principal_cache_max_size` (least recently used entries are evicted first)
+    and expire after `principal_cache_ttl_seconds` or at the token's own `exp`,
+    whichever comes first. Each request gets its own
+    detached `User` built from the stored column values, so cached principals
+    are never shared between sessions or threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bind, token_hash: str) -> User | None:
+        with self._lock:
+            entries = self._entries.get(bind)
+            entry = entries.get(token_hash) if entries is not None else None
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del entries[token_hash]
+                self.misses += 1
+                return None
+            entries.move_to_end(token_hash)
+            self.hits += 1
+            values = dict(entry[1])
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, bind, token_hash: str, user: User, token_exp: float | None = None) -> None:
+        settings = get_settings()
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        ttl = float(settings.principal_cache_ttl_seconds)
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            entries = self._entries.get(bind)
+            if entries is None:
+                entries = OrderedDict()
+                self._entries[bind] = entries
+            entries[token_hash] = (expires_at, values)
+            entries.move_to_end(token_hash)
+            while len(entries) > max(settings.principal_cache_max_size, 0):
+                entries.popitem(last=False)
+
+    def invalidate_token(self, token: str) -> None:
+        token_hash = hash_token(token)
+        with self._lock:
+            for entries in self._entries.values():
+                entries.pop(token_hash, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for entries in self._entries.values():
+                for token_hash in [key for key, (_expires_at, values) in entries.items() if values["id"] == user_id]:
+                    del entries[token_hash]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {
+                "enabled": get_settings().principal_cache_enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": sum(len(entries) for entries in self._entries.values()),
+            }
+
+
+principal_cache = PrincipalCache()
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)) -> User:
+    settings = get_settings()
+    token_hash = hash_token(token) if settings.principal_cache_enabled else None
+    if token_hash is not None:
+        cached_user = principal_cache.get(db.get_bind(), token_hash)
+        if cached_user is not None:
+            return cached_user
+
     try:
         payload = decode_token(token)
     except jwt.PyJWTError:
@@ -33,6 +129,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)) ->
     user = db.scalar(select(User).where(User.id == user_id))
     if not user or user.is_deleted:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if token_hash is not None:
+        principal_cache.put(db.get_bind(), token_hash, user, payload.get("exp"))
     return user
 
 
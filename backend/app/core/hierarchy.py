@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import delete, func, select, text
+
+from app.models.hierarchy import CLOSURE_MODELS
+
+PATH_SEPARATOR = " / "
+MAX_REBUILD_DEPTH = 64
+
+
+def _closure(model):
+    try:
+        return CLOSURE_MODELS[model]
+    except KeyError as exc:
+        raise ValueError(f"{model.__name__} has no closure table") from exc
+
+
+def ancestors(db, model, node_id: int, *, include_self: bool = False) -> list:
+    """
+    Ancestors of `node_id`, root first.
+    """
+    closure = _closure(model)
+    query = (
+        select(model)
+        .join(closure, closure.ancestor_id == model.id)
+        .where(closure.descendant_id == node_id)
+        .order_by(closure.depth.desc())
+    )
+    if not include_self:
+        query = query.where(closure.depth > 0)
+    return list(db.scalars(query).all())
+
+
+def descendants(db, model, node_id: int, *, include_self: bool = False, include_deleted: bool = True) -> list:
+    """
+    Descendants of `node_id`, shallowest first.
+    """
+    closure = _closure(model)
+    query = (
+        select(model)
+        .join(closure, closure.descendant_id == model.id)
+        .where(closure.ancestor_id == node_id)
+        .order_by(closure.depth, model.id)
+    )
+    if not include_self:
+        query = query.where(closure.depth > 0)
+    if not include_deleted:
+        query = query.where(model.is_deleted == False)
+    return list(db.scalars(query).all())
+
+
+def subtree_ids(db, model, root_id: int) -> list[int]:
+    """
+    `root_id` and every node below it; empty when `root_id` does not exist.
+    """
+    closure = _closure(model)
+    return list(
+        db.scalars(
+            select(closure.descendant_id).where(closure.ancestor_id == root_id).order_by(closure.depth)
+        ).all()
+    )
+
+
+def node_depth(db, model, node_id: int) -> int:
+    """
+    Number of nodes on the path from the root to `node_id`, both included.
+    """
+    closure = _closure(model)
+    return db.scalar(select(func.count()).select_from(closure).where(closure.descendant_id == node_id)) or 0
+
+
+def is_in_subtree(db, model, node_id: int, root_id: int) -> bool:
+    closure = _closure(model)
+    return (
+        db.scalar(
+            select(closure.depth).where(closure.ancestor_id == root_id, closure.descendant_id == node_id)
+        )
+        is not None
+    )
+
+
+def has_closure(model) -> bool:
+    return model in CLOSURE_MODELS
+
+
+def full_paths(db, model, node_ids: Iterable[int | None] | None = None) -> dict[int, str]:
+    """
+    `"Root / ... / Node"` names for all `node_ids` (the whole tree when None)
+    in a single query.
+    """
+    closure = _closure(model)
+    query = (
+        select(closure.descendant_id, model.name)
+        .join(model, model.id == closure.ancestor_id)
+        .order_by(closure.descendant_id, closure.depth.desc())
+    )
+    if node_ids is not None:
+        ids = {node_id for node_id in node_ids if node_id}
+        if not ids:
+            return {}
+        query = query.where(closure.descendant_id.in_(ids))
+    parts: dict[int, list[str]] = {}
+    for descendant_id, name in db.execute(query).all():
+        parts.setdefault(descendant_id, []).append(name)
+    return {node_id: PATH_SEPARATOR.join(names) for node_id, names in parts.items()}
+
+
+def full_path(db, model, node_id: int | None) -> str | None:
+    if not node_id:
+        return None
+    return full_paths(db, model, [node_id]).get(node_id)
+
+
+def attach_full_paths(db, model, items: Iterable, *, attribute_name: str = "full_path") -> None:
+    """Set `attribute_name` on every node in `items` from one `full_paths` lookup."""
+    items = list(items)
+    paths = full_paths(db, model, [item.id for item in items])
+    for item in items:
+        setattr(item, attribute_name, paths.get(item.id, item.name))
+
+
+def rebuild_closure(db, model) -> int:
+    """
+    Recompute the closure table of `model` from `parent_id`. Used to repair a
+    tree that was edited outside the ORM; returns the number of paths written.
+    """
+    closure = _closure(model)
+    closure_table = closure.__tablename__
+    tree_table = model.__tablename__
+    db.execute(delete(closure))
+    result = db.execute(
+        text(
+            f"""
+            INSERT INTO {closure_table} (ancestor_id, descendant_id, depth)
+            WITH RECURSIVE paths(ancestor_id, descendant_id, depth) AS (
+                SELECT id, id, 0 FROM {tree_table}
+                UNION ALL
+                SELECT node.parent_id, paths.descendant_id, paths.depth + 1
+                FROM paths
+                JOIN {tree_table} AS node ON node.id = paths.ancestor_id
+                WHERE node.parent_id IS NOT NULL AND paths.depth < :max_depth
+            )
+            SELECT ancestor_id, descendant_id, MIN(depth) FROM paths GROUP BY ancestor_id, descendant_id
+            """
+        ),
+        {"max_depth": MAX_REBUILD_DEPTH},
+    )
+    return result.rowcount
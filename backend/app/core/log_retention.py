@@ -1,21 +1,295 @@
 from __future__ import annotations
 
-from sqlalchemy import delete, func, select
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
 
+from sqlalchemy import delete, func, select, table, text
 
-MAX_DB_LOG_ROWS = 1000
+from app.core.config import get_settings
+from app.core.scheduler import start_periodic_job
+from app.models.audit import AuditLog
+from app.models.ipam import IPAddressAuditLog
+from app.models.sessions import UserSession
+from app.schemas.diagnostics import LogPartitionOut, LogRetentionTableOut
 
 
-def enforce_table_row_limit(db, model, *, max_rows: int = MAX_DB_LOG_ROWS) -> None:
-    total = db.scalar(select(func.count()).select_from(model))
-    if total is None or total <= max_rows:
-        return
+PARTITION_NAME_PATTERN = re.compile(r"_p(\d{4})(\d{2})$")
+RETENTION_LOCK_KEY = 7_340_101
 
-    overflow = total - max_rows
-    ids_to_delete = list(
-        db.scalars(select(model.id).order_by(model.id.asc()).limit(overflow))
+LOG_TABLES = {
+    AuditLog.__tablename__: AuditLog.__table__,
+    IPAddressAuditLog.__tablename__: IPAddressAuditLog.__table__,
+    UserSession.__tablename__: UserSession.__table__,
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table_name: str
+    time_column: str
+    max_age_days: int | None
+    max_size_bytes: int | None
+    max_rows: int | None = None
+
+
+@dataclass(frozen=True)
+class PartitionInfo:
+    name: str
+    month: date | None
+    row_estimate: int
+    total_bytes: int
+    is_default: bool = False
+
+
+@dataclass(frozen=True)
+class RetentionResult:
+    table_name: str
+    partitioned: bool
+    created_partitions: list[str]
+    dropped_partitions: list[str]
+    deleted_rows: int
+
+
+def get_retention_policies() -> list[RetentionPolicy]:
+    settings = get_settings()
+    return [
+        RetentionPolicy(
+            table_name="audit_logs",
+            time_column="created_at",
+            max_age_days=settings.audit_logs_retention_days,
+            max_size_bytes=settings.audit_logs_max_bytes,
+            max_rows=settings.log_retention_fallback_max_rows,
+        ),
+        RetentionPolicy(
+            table_name="ip_address_audit_logs",
+            time_column="created_at",
+            max_age_days=settings.ip_address_audit_logs_retention_days,
+            max_size_bytes=settings.ip_address_audit_logs_max_bytes,
+            max_rows=settings.log_retention_fallback_max_rows,
+        ),
+        RetentionPolicy(
+            table_name="user_sessions",
+            time_column="started_at",
+            max_age_days=settings.user_sessions_retention_days,
+            max_size_bytes=settings.user_sessions_max_bytes,
+            max_rows=settings.log_retention_fallback_max_rows,
+        ),
+    ]
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month.year:04d}{month.month:02d}"
+
+
+def _is_postgresql(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def is_partitioned(db, table_name: str) -> bool:
+    if not _is_postgresql(db):
+        return False
+    relkind = db.scalar(
+        text("SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
     )
-    if not ids_to_delete:
-        return
+    return relkind == "p"
+
+
+def list_partitions(db, table_name: str) -> list[PartitionInfo]:
+    rows = db.execute(
+        text(
+            """
+            SELECT child.relname AS name,
+                   GREATEST(child.reltuples, 0)::bigint AS row_estimate,
+                   pg_total_relation_size(child.oid) AS total_bytes,
+                   pg_get_expr(child.relpartbound, child.oid) = 'DEFAULT' AS is_default
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.oid = to_regclass(:table_name)
+            ORDER BY child.relname
+            """
+        ),
+        {"table_name": table_name},
+    ).all()
+    partitions: list[PartitionInfo] = []
+    for row in rows:
+        match = PARTITION_NAME_PATTERN.search(row.name)
+        partitions.append(
+            PartitionInfo(
+                name=row.name,
+                month=date(int(match.group(1)), int(match.group(2)), 1) if match else None,
+                row_estimate=int(row.row_estimate or 0),
+                total_bytes=int(row.total_bytes or 0),
+                is_default=bool(row.is_default),
+            )
+        )
+    return partitions
+
 
-    db.execute(delete(model).where(model.id.in_(ids_to_delete)))
+def ensure_month_partitions(db, table_name: str, *, start: date, months: int) -> list[str]:
+    existing = {partition.name for partition in list_partitions(db, table_name)}
+    created: list[str] = []
+    for offset in range(months):
+        lower = add_months(month_start(start), offset)
+        name = partition_name(table_name, lower)
+        if name in existing:
+            continue
+        db.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table_name}" '
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{add_months(lower, 1).isoformat()}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def _prune_partitioned_table(db, policy: RetentionPolicy, now: datetime) -> list[str]:
+    current_month = month_start(now)
+    monthly = sorted(
+        (partition for partition in list_partitions(db, policy.table_name) if partition.month is not None),
+        key=lambda partition: partition.month,
+    )
+    to_drop: list[PartitionInfo] = []
+    if policy.max_age_days is not None:
+        cutoff = (now - timedelta(days=policy.max_age_days)).date()
+        to_drop.extend(partition for partition in monthly if add_months(partition.month, 1) <= cutoff)
+
+    if policy.max_size_bytes is not None:
+        remaining = [partition for partition in monthly if partition not in to_drop]
+        total_bytes = sum(partition.total_bytes for partition in remaining)
+        for partition in remaining:
+            if total_bytes <= policy.max_size_bytes or partition.month >= current_month:
+                break
+            to_drop.append(partition)
+            total_bytes -= partition.total_bytes
+
+    for partition in to_drop:
+        db.execute(text(f'DROP TABLE IF EXISTS "{partition.name}"'))
+    return [partition.name for partition in to_drop]
+
+
+def _prune_plain_table(db, policy: RetentionPolicy, now: datetime) -> int:
+    table = LOG_TABLES[policy.table_name]
+    deleted = 0
+    if policy.max_age_days is not None:
+        cutoff = now - timedelta(days=policy.max_age_days)
+        result = db.execute(delete(table).where(table.c[policy.time_column] < cutoff))
+        deleted += max(result.rowcount or 0, 0)
+    if policy.max_rows is not None:
+        total = db.scalar(select(func.count()).select_from(table)) or 0
+        overflow = total - policy.max_rows
+        if overflow > 0:
+            ids_to_delete = select(table.c.id).order_by(table.c.id.asc()).limit(overflow).scalar_subquery()
+            result = db.execute(delete(table).where(table.c.id.in_(ids_to_delete)))
+            deleted += max(result.rowcount or 0, 0)
+    return deleted
+
+
+def apply_retention_policy(db, policy: RetentionPolicy, *, now: datetime | None = None) -> RetentionResult:
+    now = now or datetime.now(UTC)
+    if is_partitioned(db, policy.table_name):
+        created = ensure_month_partitions(
+            db,
+            policy.table_name,
+            start=month_start(now),
+            months=get_settings().log_partition_months_ahead + 1,
+        )
+        dropped = _prune_partitioned_table(db, policy, now)
+        return RetentionResult(policy.table_name, True, created, dropped, 0)
+    deleted = _prune_plain_table(db, policy, now)
+    return RetentionResult(policy.table_name, False, [], [], deleted)
+
+
+def run_log_retention(db, *, now: datetime | None = None) -> list[RetentionResult]:
+    """
+    Create upcoming monthly partitions and prune every log table by its policy.
+
+    Partitioned tables lose whole months via DROP TABLE; plain tables (SQLite,
+    databases that were never migrated) fall back to age- and row-based DELETEs.
+    On PostgreSQL an advisory lock keeps concurrent workers from racing.
+    """
+    if _is_postgresql(db) and not db.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RETENTION_LOCK_KEY}
+    ):
+        return []
+    return [apply_retention_policy(db, policy, now=now) for policy in get_retention_policies()]
+
+
+def _count_rows(db, table_name: str) -> int:
+    target = LOG_TABLES.get(table_name)
+    return int(db.scalar(select(func.count()).select_from(target if target is not None else table(table_name))) or 0)
+
+
+def collect_retention_overview(db, *, exact: bool = False) -> list[LogRetentionTableOut]:
+    """
+    Describe every log table with its policy; partitioned tables are broken
+    down per month using planner row estimates unless `exact` is requested.
+    """
+    postgresql = _is_postgresql(db)
+    overview: list[LogRetentionTableOut] = []
+    for policy in get_retention_policies():
+        partitioned = is_partitioned(db, policy.table_name)
+        partitions = [
+            LogPartitionOut(
+                name=partition.name,
+                month=partition.month,
+                row_count=_count_rows(db, partition.name) if exact else partition.row_estimate,
+                row_count_is_estimate=not exact,
+                total_bytes=partition.total_bytes,
+                is_default=partition.is_default,
+            )
+            for partition in (list_partitions(db, policy.table_name) if partitioned else [])
+        ]
+        if partitioned:
+            total_rows = sum(partition.row_count for partition in partitions)
+            total_bytes = sum(partition.total_bytes for partition in partitions)
+        else:
+            total_rows = _count_rows(db, policy.table_name)
+            total_bytes = (
+                db.scalar(text("SELECT pg_total_relation_size(to_regclass(:t))"), {"t": policy.table_name})
+                if postgresql
+                else None
+            )
+        overview.append(
+            LogRetentionTableOut(
+                table_name=policy.table_name,
+                time_column=policy.time_column,
+                partitioned=partitioned,
+                max_age_days=policy.max_age_days,
+                max_size_bytes=policy.max_size_bytes,
+                total_rows=total_rows,
+                total_bytes=total_bytes,
+                partitions=partitions,
+            )
+        )
+    return overview
+
+
+def _scheduled_log_retention(db) -> None:
+    for result in run_log_retention(db):
+        if result.created_partitions or result.dropped_partitions or result.deleted_rows:
+            logger.info("Log retention applied: %s", result)
+
+
+def start_log_retention_scheduler() -> threading.Event | None:
+    return start_periodic_job(
+        "log-retention",
+        get_settings().log_retention_interval_minutes,
+        _scheduled_log_retention,
+    )
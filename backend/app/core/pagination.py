@@ -1,4 +1,15 @@
-﻿from sqlalchemy import select, func
+﻿import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Literal
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select, func
+
+PagingMode = Literal["offset", "cursor"]
+TotalMode = Literal["exact", "estimate"]
 
 
 def paginate(query, db, page: int, page_size: int):
@@ -7,3 +18,156 @@ def paginate(query, db, page: int, page_size: int):
         query.offset((page - 1) * page_size).limit(page_size)
     ).all()
     return total, items
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: list
+    next_cursor: str | None
+    prev_cursor: str | None
+    total: int | None
+    total_is_estimate: bool
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    if hasattr(value, "value") and not isinstance(value, (str, int, float, bool)):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+    return value
+
+
+def encode_cursor(sort_key: str, sort_value: Any, row_id: int, direction: str) -> str:
+    payload = {"s": sort_key, "v": _encode_value(sort_value), "id": row_id, "d": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> tuple[Any, int, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["s"] != sort_key or payload["d"] not in {"next", "prev"}:
+            raise ValueError
+        return _decode_value(payload["v"]), int(payload["id"]), payload["d"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def estimate_row_count(query, db) -> int | None:
+    """
+    Planner row estimate for `query` (PostgreSQL only); None elsewhere.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.order_by(None).compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _keyset_condition(sort_column, id_column, sort_value, row_id: int, *, greater: bool, after_cursor: bool):
+    """
+    Rows strictly after (or before) the cursor in display order `sort, id`,
+    where NULL sort values are always displayed last.
+    """
+    beyond = (lambda column, value: column > value) if greater else (lambda column, value: column < value)
+    if sort_column is id_column:
+        return beyond(id_column, row_id)
+    if sort_value is None:
+        tail = and_(sort_column.is_(None), beyond(id_column, row_id))
+        return tail if after_cursor else or_(sort_column.is_not(None), tail)
+    condition = or_(beyond(sort_column, sort_value), and_(sort_column == sort_value, beyond(id_column, row_id)))
+    return or_(condition, sort_column.is_(None)) if after_cursor else condition
+
+
+def paginate_keyset(
+    query,
+    db,
+    *,
+    sort_column,
+    id_column,
+    descending: bool,
+    page_size: int,
+    cursor: str | None = None,
+    total_mode: TotalMode | None = None,
+    scalars: bool = True,
+    entity: Callable[[Any], Any] = lambda item: item,
+) -> KeysetPage:
+    """
+    Cursor pagination over `sort_column, id_column` without OFFSET or COUNT.
+
+    `query` must not be ordered yet. Cursors are opaque tokens bound to the sort
+    key; `total` is only computed when `total_mode` asks for it, either exactly
+    or as a planner estimate.
+    """
+    sort_key = f"{'-' if descending else ''}{sort_column.key}"
+    direction = "next"
+    base_query = query
+    if cursor:
+        sort_value, row_id, direction = decode_cursor(cursor, sort_key)
+        after_cursor = direction == "next"
+        query = query.where(
+            _keyset_condition(
+                sort_column,
+                id_column,
+                sort_value,
+                row_id,
+                greater=after_cursor != descending,
+                after_cursor=after_cursor,
+            )
+        )
+
+    backwards = direction == "prev"
+    ascending_sort = descending == backwards
+    ordering = [sort_column.asc() if ascending_sort else sort_column.desc()]
+    if sort_column is not id_column:
+        ordering = [ordering[0].nulls_first() if backwards else ordering[0].nulls_last()]
+        ordering.append(id_column.asc() if ascending_sort else id_column.desc())
+    query = query.order_by(*ordering).limit(page_size + 1)
+
+    rows = list(db.scalars(query).all() if scalars else db.execute(query).all())
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    def cursor_for(item, item_direction: str) -> str:
+        target = entity(item)
+        return encode_cursor(sort_key, getattr(target, sort_column.key), getattr(target, id_column.key), item_direction)
+
+    has_next = has_more if not backwards else True
+    has_prev = bool(cursor) if not backwards else has_more
+    total = None
+    if total_mode == "exact":
+        total = db.scalar(select(func.count()).select_from(base_query.order_by(None).subquery()))
+    elif total_mode == "estimate":
+        total = estimate_row_count(base_query, db)
+        if total is None:
+            total = db.scalar(select(func.count()).select_from(base_query.order_by(None).subquery()))
+            total_mode = "exact"
+
+    return KeysetPage(
+        items=rows,
+        next_cursor=cursor_for(rows[-1], "next") if rows and has_next else None,
+        prev_cursor=cursor_for(rows[0], "prev") if rows and has_prev else None,
+        total=total,
+        total_is_estimate=total_mode == "estimate",
+    )
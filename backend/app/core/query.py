@@ -2,11 +2,18 @@ from datetime import datetime
 from fastapi import HTTPException
 from sqlalchemy import or_
 
+from app.db.search_index import initial_letter
+
 RU_ALPHABET = list("АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯабвгдеёжзийклмнопрстуфхцчшщъыьэюя")
 EN_ALPHABET = list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
 
 
 def apply_search(query, q: str | None, columns):
+    """
+    Substring match of `q` across `columns`. On PostgreSQL each `ILIKE` is
+    served by the model's `trigram_index`, so keep the bare column on the
+    left-hand side (no `lower()`/casts) or the index will not be used.
+    """
     if not q:
         return query
     pattern = f"%{q}%"
@@ -14,14 +21,23 @@ def apply_search(query, q: str | None, columns):
     return query.where(or_(*conditions))
 
 
-def apply_sort(query, model, sort: str | None):
-    if not sort:
-        return query
+def resolve_sort(model, sort: str | None, default: str = "id"):
+    """
+    Return the `(column, descending)` pair that `apply_sort` would order by.
+    """
+    sort = sort or default
     field = sort.lstrip("-")
     column = getattr(model, field, None)
     if column is None:
         raise HTTPException(status_code=400, detail=f"Invalid sort field: {field}")
-    return query.order_by(column.desc() if sort.startswith("-") else column.asc())
+    return column, sort.startswith("-")
+
+
+def apply_sort(query, model, sort: str | None):
+    if not sort:
+        return query
+    column, descending = resolve_sort(model, sort)
+    return query.order_by(column.desc() if descending else column.asc())
 
 
 def apply_date_filters(query, model, created_from: datetime | None, created_to: datetime | None,
@@ -57,4 +73,4 @@ def apply_alphabet_filter(query, column, alphabet: str | None):
     if not letters:
         return query
 
-    return query.where(or_(*[column.like(f"{letter}%") for letter in letters]))
+    return query.where(initial_letter(column).in_(letters))
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def _job_loop(name: str, job: Callable, stop_event: threading.Event, interval_seconds: float) -> None:
+    from app.db.session import SessionLocal
+
+    while True:
+        db = SessionLocal()
+        try:
+            job(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Scheduled job %s failed", name)
+        finally:
+            db.close()
+        if stop_event.wait(interval_seconds):
+            return
+
+
+def start_periodic_job(name: str, interval_minutes: int, job: Callable) -> threading.Event | None:
+    """
+    Run `job(db)` in a daemon thread every `interval_minutes`, committing after
+    each run. Returns the event that stops the loop, or None when disabled.
+    """
+    if interval_minutes <= 0:
+        return None
+    stop_event = threading.Event()
+    threading.Thread(
+        target=_job_loop,
+        args=(name, job, stop_event, interval_minutes * 60),
+        name=name,
+        daemon=True,
+    ).start()
+    return stop_event
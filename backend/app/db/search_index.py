@@ -0,0 +1,29 @@
+from sqlalchemy import Index, func
+
+
+def trigram_index(name: str, *columns) -> Index:
+    """
+    GIN `gin_trgm_ops` index serving `ILIKE '%q%'` on the given columns.
+
+    PostgreSQL only (needs the pg_trgm extension); other dialects keep the
+    plain LIKE scan, which is fine for the SQLite test databases.
+    """
+    index = Index(
+        name,
+        *columns,
+        postgresql_using="gin",
+        postgresql_ops={column.key: "gin_trgm_ops" for column in columns},
+    )
+    return index.ddl_if(dialect="postgresql")
+
+
+def initial_letter(column):
+    """
+    First character of `column`; `apply_alphabet_filter` matches on this
+    expression so that `initial_letter_index` can serve it.
+    """
+    return func.substr(column, 1, 1)
+
+
+def initial_letter_index(name: str, column) -> Index:
+    return Index(name, initial_letter(column))
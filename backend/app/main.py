@@ -1,9 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import get_settings
+from app.core.log_retention import start_log_retention_scheduler
 from app.core.versioning import read_version
+from app.services.dashboard_aggregates import start_dashboard_reconcile_scheduler
 from app.routers import (
     assemblies,
     assembly_items,
@@ -50,7 +54,17 @@ from app.routers import (
 
 settings = get_settings()
 
-app = FastAPI(title="EQM API", version=read_version())
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    stop_events = [start_log_retention_scheduler(), start_dashboard_reconcile_scheduler()]
+    yield
+    for stop_event in stop_events:
+        if stop_event is not None:
+            stop_event.set()
+
+
+app = FastAPI(title="EQM API", version=read_version(), lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
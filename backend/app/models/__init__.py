@@ -19,6 +19,12 @@ from app.models.core import (
     PersonnelYearlyScheduleAssignment,
     PersonnelYearlyScheduleEvent,
 )
+from app.models.hierarchy import (
+    EquipmentCategoryClosure,
+    LocationClosure,
+    MainEquipmentClosure,
+    ManufacturerClosure,
+)
 from app.models.assemblies import Assembly
 from app.models.operations import WarehouseItem, CabinetItem, AssemblyItem
 from app.models.io import IOSignal, SignalType
@@ -27,10 +33,11 @@ from app.models.audit import AuditLog
 from app.models.attachments import Attachment
 from app.models.cabinet_files import CabinetFile
 from app.models.pid import PidProcess
-from app.models.ipam import Vlan, Subnet, EquipmentNetworkInterface, IPAddress, IPAddressAuditLog
+from app.models.ipam import Vlan, Subnet, EquipmentNetworkInterface, IPAddress, IPAddressAuditLog, SubnetAddressBlock
 from app.models.network_topology import NetworkTopologyDocument
 from app.models.digital_twins import DigitalTwinDocument
-from app.models.serial_map import SerialMapDocument
+from app.models.serial_map import SerialMapDocument, SerialMapHistoryEntry
+from app.models.dashboard import DashboardAggregate
 from app.models.maintenance import (
     MntFailureMode,
     MntFailureMechanism,
@@ -43,6 +50,7 @@ from app.models.maintenance import (
     MntWorkOrderItem,
     MntPlan,
     MntOperatingTime,
+    MntReliabilityMonthly,
 )
 
 __all__ = [
@@ -64,6 +72,10 @@ __all__ = [
     "EquipmentType",
     "Warehouse",
     "Cabinet",
+    "LocationClosure",
+    "ManufacturerClosure",
+    "EquipmentCategoryClosure",
+    "MainEquipmentClosure",
     "Assembly",
     "WarehouseItem",
     "CabinetItem",
@@ -87,9 +99,12 @@ __all__ = [
     "EquipmentNetworkInterface",
     "IPAddress",
     "IPAddressAuditLog",
+    "SubnetAddressBlock",
     "NetworkTopologyDocument",
     "SerialMapDocument",
+    "SerialMapHistoryEntry",
     "DigitalTwinDocument",
+    "DashboardAggregate",
     "MntFailureMode",
     "MntFailureMechanism",
     "MntFailureCause",
@@ -101,4 +116,5 @@ __all__ = [
     "MntWorkOrderItem",
     "MntPlan",
     "MntOperatingTime",
+    "MntReliabilityMonthly",
 ]
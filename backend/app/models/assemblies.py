@@ -3,6 +3,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin, SoftDeleteMixin, VersionMixin
+from app.db.search_index import initial_letter_index, trigram_index
 from app.models.core import Location
 
 
@@ -27,3 +28,6 @@ Index(
     unique=True,
     postgresql_where=(Assembly.is_deleted == False),
 )
+
+trigram_index("ix_assemblies_name_trgm", Assembly.name)
+initial_letter_index("ix_assemblies_name_initial", Assembly.name)
@@ -3,6 +3,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base, TimestampMixin
+from app.db.search_index import trigram_index
 
 
 class AuditLog(Base, TimestampMixin):
@@ -18,3 +19,4 @@ class AuditLog(Base, TimestampMixin):
     meta: Mapped[dict | None] = mapped_column(JSONB)
 
 
+trigram_index("ix_audit_logs_search_trgm", AuditLog.entity, AuditLog.action)
@@ -4,6 +4,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin, SoftDeleteMixin, VersionMixin
+from app.db.search_index import initial_letter_index, trigram_index
 from app.models.security import User
 
 
@@ -25,17 +26,6 @@ class Manufacturer(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
         remote_side="Manufacturer.id", backref="children"
     )
 
-    @property
-    def full_path(self) -> str:
-        parts: list[str] = []
-        current: Manufacturer | None = self
-        seen: set[int] = set()
-        while current and current.id not in seen:
-            parts.append(current.name)
-            seen.add(current.id)
-            current = current.parent
-        return " / ".join(reversed(parts))
-
 
 Index(
     "ix_manufacturers_parent_name_active_unique",
@@ -45,6 +35,8 @@ Index(
     postgresql_where=(Manufacturer.is_deleted == False),
 )
 
+trigram_index("ix_manufacturers_name_trgm", Manufacturer.name)
+
 
 class EquipmentCategory(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "equipment_categories"
@@ -62,17 +54,6 @@ class EquipmentCategory(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
         back_populates="equipment_category"
     )
 
-    @property
-    def full_path(self) -> str:
-        parts: list[str] = []
-        current: EquipmentCategory | None = self
-        seen: set[int] = set()
-        while current and current.id not in seen:
-            parts.append(current.name)
-            seen.add(current.id)
-            current = current.parent
-        return " / ".join(reversed(parts))
-
 
 Index(
     "ix_equipment_categories_parent_name_active_unique",
@@ -82,6 +63,8 @@ Index(
     postgresql_where=(EquipmentCategory.is_deleted == False),
 )
 
+trigram_index("ix_equipment_categories_name_trgm", EquipmentCategory.name)
+
 
 class Location(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "locations"
@@ -95,16 +78,6 @@ class Location(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
         remote_side="Location.id", backref="children"
     )
 
-    def full_path(self) -> str:
-        parts: list[str] = []
-        current: Location | None = self
-        seen: set[int] = set()
-        while current and current.id not in seen:
-            parts.append(current.name)
-            seen.add(current.id)
-            current = current.parent
-        return " / ".join(reversed(parts))
-
 
 class MainEquipment(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "main_equipment"
@@ -121,16 +94,6 @@ class MainEquipment(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
         remote_side="MainEquipment.id", backref="children"
     )
 
-    def full_path(self) -> str:
-        parts: list[str] = []
-        current: MainEquipment | None = self
-        seen: set[int] = set()
-        while current and current.id not in seen:
-            parts.append(current.name)
-            seen.add(current.id)
-            current = current.parent
-        return " / ".join(reversed(parts))
-
 
 class TechnologicalEquipment(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "technological_equipment"
@@ -163,10 +126,6 @@ class TechnologicalEquipment(Base, TimestampMixin, SoftDeleteMixin, VersionMixin
     def location_name(self) -> str | None:
         return self.location.name if self.location else None
 
-    @property
-    def location_path(self) -> str | None:
-        return self.location.full_path() if self.location else None
-
 
 Index(
     "ix_main_equipment_code_active_unique",
@@ -373,6 +332,9 @@ Index(
     postgresql_where=(EquipmentType.is_deleted == False),
 )
 
+trigram_index("ix_equipment_types_search_trgm", EquipmentType.name, EquipmentType.nomenclature_number)
+initial_letter_index("ix_equipment_types_name_initial", EquipmentType.name)
+
 
 class Warehouse(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "warehouses"
@@ -387,6 +349,10 @@ class Warehouse(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     location: Mapped[Location | None] = relationship()
 
 
+trigram_index("ix_warehouses_name_trgm", Warehouse.name)
+initial_letter_index("ix_warehouses_name_initial", Warehouse.name)
+
+
 class Cabinet(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "cabinets"
 
@@ -423,6 +389,10 @@ class Cabinet(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
         return self.datasheet_original_name
 
 
+trigram_index("ix_cabinets_name_trgm", Cabinet.name)
+initial_letter_index("ix_cabinets_name_initial", Cabinet.name)
+
+
 class PersonnelScheduleTemplate(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "personnel_schedule_templates"
 
@@ -503,6 +473,15 @@ Index(
     postgresql_where=(Personnel.is_deleted == False),
 )
 
+trigram_index(
+    "ix_personnel_search_trgm",
+    Personnel.first_name,
+    Personnel.last_name,
+    Personnel.middle_name,
+    Personnel.position,
+    Personnel.personnel_number,
+)
+
 
 class PersonnelCompetency(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "personnel_competencies"
@@ -0,0 +1,16 @@
+from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DashboardAggregate(Base):
+    __tablename__ = "dashboard_aggregates"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    is_stale: Mapped[bool] = mapped_column(Boolean, server_default="false", nullable=False)
+    revision: Mapped[int] = mapped_column(Integer, server_default="1", nullable=False)
+    computed_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+    reconciled_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -13,6 +13,7 @@ class DigitalTwinDocument(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     source_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
     source_context: Mapped[dict | None] = mapped_column(JSONB)
     document_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    source_watermark: Mapped[dict | None] = mapped_column(JSONB)
     created_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), index=True)
     updated_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), index=True)
 
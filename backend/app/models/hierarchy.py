@@ -0,0 +1,154 @@
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import ForeignKey, Index, Integer, delete, event, insert, inspect, literal, or_, select, true
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.core import EquipmentCategory, Location, MainEquipment, Manufacturer
+
+
+class LocationClosure(Base):
+    __tablename__ = "location_closure"
+
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+Index("ix_location_closure_descendant_depth", LocationClosure.descendant_id, LocationClosure.depth)
+
+
+class ManufacturerClosure(Base):
+    __tablename__ = "manufacturer_closure"
+
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("manufacturers.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("manufacturers.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+Index("ix_manufacturer_closure_descendant_depth", ManufacturerClosure.descendant_id, ManufacturerClosure.depth)
+
+
+class EquipmentCategoryClosure(Base):
+    __tablename__ = "equipment_category_closure"
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("equipment_categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("equipment_categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+Index(
+    "ix_equipment_category_closure_descendant_depth",
+    EquipmentCategoryClosure.descendant_id,
+    EquipmentCategoryClosure.depth,
+)
+
+
+class MainEquipmentClosure(Base):
+    __tablename__ = "main_equipment_closure"
+
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("main_equipment.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("main_equipment.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+Index("ix_main_equipment_closure_descendant_depth", MainEquipmentClosure.descendant_id, MainEquipmentClosure.depth)
+
+
+CLOSURE_MODELS = {
+    Location: LocationClosure,
+    Manufacturer: ManufacturerClosure,
+    EquipmentCategory: EquipmentCategoryClosure,
+    MainEquipment: MainEquipmentClosure,
+}
+
+_closure_tables: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def _has_closure_table(connection, closure) -> bool:
+    known = _closure_tables.setdefault(connection.engine, {})
+    if closure.__tablename__ not in known:
+        known[closure.__tablename__] = inspect(connection).has_table(closure.__tablename__)
+    return known[closure.__tablename__]
+
+
+def link_node(connection, closure, node_id: int, parent_id: int | None) -> None:
+    table = closure.__table__
+    connection.execute(insert(table).values(ancestor_id=node_id, descendant_id=node_id, depth=0))
+    if parent_id is None:
+        return
+    connection.execute(
+        insert(table).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(table.c.ancestor_id, literal(node_id), table.c.depth + 1).where(table.c.descendant_id == parent_id),
+        )
+    )
+
+
+def unlink_subtree(connection, closure, node_id: int, *, include_root: bool = True) -> None:
+    """
+    Cut the subtree rooted at `node_id` loose from the node's strict
+    ancestors. With `include_root=False` the node's descendants are cut loose
+    from the node as well, which is what `ON DELETE SET NULL` does to them.
+    """
+    table = closure.__table__
+    descendants = select(table.c.descendant_id).where(table.c.ancestor_id == node_id)
+    ancestors = select(table.c.ancestor_id).where(table.c.descendant_id == node_id)
+    if include_root:
+        ancestors = ancestors.where(table.c.ancestor_id != node_id)
+    else:
+        descendants = descendants.where(table.c.descendant_id != node_id)
+    connection.execute(
+        delete(table).where(table.c.descendant_id.in_(descendants), table.c.ancestor_id.in_(ancestors))
+    )
+
+
+def move_subtree(connection, closure, node_id: int, parent_id: int | None) -> None:
+    unlink_subtree(connection, closure, node_id)
+    if parent_id is None:
+        return
+    table = closure.__table__
+    above = table.alias("above")
+    below = table.alias("below")
+    connection.execute(
+        insert(table).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+            .select_from(above.join(below, true()))
+            .where(above.c.descendant_id == parent_id, below.c.ancestor_id == node_id),
+        )
+    )
+
+
+def _link_inserted_node(mapper, connection, target) -> None:
+    closure = CLOSURE_MODELS[mapper.class_]
+    if _has_closure_table(connection, closure):
+        link_node(connection, closure, target.id, target.parent_id)
+
+
+def _move_updated_node(mapper, connection, target) -> None:
+    closure = CLOSURE_MODELS[mapper.class_]
+    state = inspect(target)
+    if not (state.attrs.parent_id.history.has_changes() or state.attrs.parent.history.has_changes()):
+        return
+    if _has_closure_table(connection, closure):
+        move_subtree(connection, closure, target.id, target.parent_id)
+
+
+def _unlink_deleted_node(mapper, connection, target) -> None:
+    closure = CLOSURE_MODELS[mapper.class_]
+    if not _has_closure_table(connection, closure):
+        return
+    unlink_subtree(connection, closure, target.id, include_root=False)
+    table = closure.__table__
+    connection.execute(delete(table).where(or_(table.c.ancestor_id == target.id, table.c.descendant_id == target.id)))
+
+
+for _model in CLOSURE_MODELS:
+    event.listen(_model, "after_insert", _link_inserted_node)
+    event.listen(_model, "after_update", _move_updated_node)
+    event.listen(_model, "after_delete", _unlink_deleted_node)
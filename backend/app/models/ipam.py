@@ -1,4 +1,5 @@
 from datetime import datetime
+from weakref import WeakKeyDictionary
 
 from sqlalchemy import (
     Boolean,
@@ -9,7 +10,13 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    case,
+    event,
+    func,
+    inspect,
+    select,
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -113,7 +120,7 @@ class IPAddress(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     subnet_id: Mapped[int] = mapped_column(ForeignKey("subnets.id", ondelete="CASCADE"), index=True, nullable=False)
     ip_address: Mapped[str] = mapped_column(String(64), nullable=False)
     ip_offset: Mapped[int] = mapped_column(Integer, nullable=False)
-    status: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(32), nullable=False, index=True, active_history=True)
     hostname: Mapped[str | None] = mapped_column(String(255), index=True)
     dns_name: Mapped[str | None] = mapped_column(String(255))
     mac_address: Mapped[str | None] = mapped_column(String(100))
@@ -151,6 +158,167 @@ Index(
 )
 
 
+ADDRESS_BLOCK_SIZE = 256
+OCCUPIED_STATUSES = ("used", "reserved", "service", "gateway", "broadcast", "network")
+
+
+class SubnetAddressBlock(Base):
+    """
+    Occupancy counters of one 256-address block (`ip_offset // 256`) of a
+    subnet. Kept in step with `ip_addresses` by the listeners below; an offset
+    without an occupied, non-deleted record is free.
+    """
+
+    __tablename__ = "subnet_address_blocks"
+
+    subnet_id: Mapped[int] = mapped_column(ForeignKey("subnets.id", ondelete="CASCADE"), primary_key=True)
+    block_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    used: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    reserved: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    service: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    gateway: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    broadcast: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    network: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    @property
+    def occupied(self) -> int:
+        return sum(getattr(self, status) or 0 for status in OCCUPIED_STATUSES)
+
+
+_address_block_tables: WeakKeyDictionary = WeakKeyDictionary()
+_UNKNOWN = object()
+
+
+def _has_address_block_table(connection) -> bool:
+    engine = connection.engine
+    if engine not in _address_block_tables:
+        _address_block_tables[engine] = inspect(connection).has_table(SubnetAddressBlock.__tablename__)
+    return _address_block_tables[engine]
+
+
+def _upsert(connection):
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    return dialect.insert(SubnetAddressBlock.__table__)
+
+
+def add_to_address_block(connection, subnet_id: int, offset: int, status: str, delta: int) -> None:
+    table = SubnetAddressBlock.__table__
+    statement = _upsert(connection).values(subnet_id=subnet_id, block_index=offset // ADDRESS_BLOCK_SIZE, **{status: delta})
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.subnet_id, table.c.block_index],
+            set_={status: table.c[status] + statement.excluded[status]},
+        )
+    )
+
+
+def lock_address_blocks(connection, subnet_id: int) -> None:
+    """
+    Serialize writers that pick offsets from the counters: a no-op increment
+    of block 0, which row-locks it on PostgreSQL and opens the write
+    transaction on SQLite, so the following reads see every earlier claim.
+    """
+    add_to_address_block(connection, subnet_id, 0, "reserved", 0)
+
+
+def recount_address_block(connection, subnet_id: int, block_index: int) -> None:
+    """
+    Recompute one block's counters from `ip_addresses`; the fallback for
+    changes whose previous state is unknown, and the repair path.
+    """
+    addresses = IPAddress.__table__
+    block_start = block_index * ADDRESS_BLOCK_SIZE
+    row = connection.execute(
+        select(
+            *[
+                func.coalesce(func.sum(case((addresses.c.status == status, 1), else_=0)), 0).label(status)
+                for status in OCCUPIED_STATUSES
+            ]
+        ).where(
+            addresses.c.subnet_id == subnet_id,
+            addresses.c.is_deleted == False,
+            addresses.c.ip_offset >= block_start,
+            addresses.c.ip_offset < block_start + ADDRESS_BLOCK_SIZE,
+        )
+    ).one()
+    counts = dict(row._mapping)
+    statement = _upsert(connection).values(subnet_id=subnet_id, block_index=block_index, **counts)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[SubnetAddressBlock.__table__.c.subnet_id, SubnetAddressBlock.__table__.c.block_index],
+            set_=counts,
+        )
+    )
+
+
+def _occupancy(subnet_id, offset, status, is_deleted) -> tuple | None:
+    if is_deleted or status not in OCCUPIED_STATUSES:
+        return None
+    return subnet_id, offset, status
+
+
+def _previous_value(state, name: str):
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return _UNKNOWN
+
+
+def _default_not_deleted(mapper, connection, target) -> None:
+    # Write the flag explicitly so the counters below never see an unloaded
+    # server default on later updates.
+    if target.is_deleted is None:
+        target.is_deleted = False
+
+
+def _count_inserted_address(mapper, connection, target) -> None:
+    current = _occupancy(target.subnet_id, target.ip_offset, target.status, target.is_deleted)
+    if current is not None and _has_address_block_table(connection):
+        add_to_address_block(connection, *current, 1)
+
+
+def _count_updated_address(mapper, connection, target) -> None:
+    state = inspect(target)
+    names = ("subnet_id", "ip_offset", "status", "is_deleted")
+    if not any(state.attrs[name].history.has_changes() for name in names):
+        return
+    if not _has_address_block_table(connection):
+        return
+    previous = [_previous_value(state, name) for name in names]
+    if _UNKNOWN in previous:
+        recount_address_block(connection, target.subnet_id, target.ip_offset // ADDRESS_BLOCK_SIZE)
+        return
+    old = _occupancy(*previous)
+    new = _occupancy(target.subnet_id, target.ip_offset, target.status, target.is_deleted)
+    if old == new:
+        return
+    if old is not None:
+        add_to_address_block(connection, *old, -1)
+    if new is not None:
+        add_to_address_block(connection, *new, 1)
+
+
+def _count_deleted_address(mapper, connection, target) -> None:
+    state = inspect(target)
+    previous = [_previous_value(state, name) for name in ("subnet_id", "ip_offset", "status", "is_deleted")]
+    if not _has_address_block_table(connection):
+        return
+    if _UNKNOWN in previous:
+        recount_address_block(connection, target.subnet_id, target.ip_offset // ADDRESS_BLOCK_SIZE)
+        return
+    old = _occupancy(*previous)
+    if old is not None:
+        add_to_address_block(connection, *old, -1)
+
+
+event.listen(IPAddress, "before_insert", _default_not_deleted)
+event.listen(IPAddress, "after_insert", _count_inserted_address)
+event.listen(IPAddress, "after_update", _count_updated_address)
+event.listen(IPAddress, "after_delete", _count_deleted_address)
+
+
 class IPAddressAuditLog(Base, TimestampMixin):
     __tablename__ = "ip_address_audit_logs"
 
@@ -1,6 +1,10 @@
+from datetime import UTC, date, datetime
+from weakref import WeakKeyDictionary
+
 from sqlalchemy import (
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -8,7 +12,12 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    event,
+    func,
+    inspect,
+    select,
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, SoftDeleteMixin, TimestampMixin, VersionMixin
@@ -83,8 +92,10 @@ class MntIncident(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     incident_number: Mapped[str | None] = mapped_column(String(50), unique=True)
+    # active_history: the reliability rollup listeners need the previous
+    # cabinet and month even when the row was expired before the change.
     cabinet_id: Mapped[int] = mapped_column(
-        ForeignKey("cabinets.id"), index=True, nullable=False
+        ForeignKey("cabinets.id"), index=True, nullable=False, active_history=True
     )
     location_id: Mapped[int | None] = mapped_column(
         ForeignKey("locations.id"), index=True
@@ -103,7 +114,7 @@ class MntIncident(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
         ForeignKey("mnt_failure_causes.id", ondelete="SET NULL")
     )
     status: Mapped[str] = mapped_column(String(20), server_default="open", nullable=False)
-    occurred_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+    occurred_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False, active_history=True)
     detected_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
     repair_started_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
     resolved_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
@@ -260,9 +271,9 @@ class MntOperatingTime(Base, TimestampMixin):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     cabinet_id: Mapped[int] = mapped_column(
-        ForeignKey("cabinets.id"), index=True, nullable=False
+        ForeignKey("cabinets.id"), index=True, nullable=False, active_history=True
     )
-    recorded_date: Mapped[Date] = mapped_column(Date, nullable=False)
+    recorded_date: Mapped[Date] = mapped_column(Date, nullable=False, active_history=True)
     operating_hours: Mapped[float] = mapped_column(Numeric(8, 2), nullable=False, server_default="0")
     standby_hours: Mapped[float] = mapped_column(Numeric(8, 2), nullable=False, server_default="0")
     downtime_hours: Mapped[float] = mapped_column(Numeric(8, 2), nullable=False, server_default="0")
@@ -278,6 +289,185 @@ class MntOperatingTime(Base, TimestampMixin):
     )
 
 
+# ---------------------------------------------------------------------------
+# Reliability rollups
+# ---------------------------------------------------------------------------
+
+class MntReliabilityMonthly(Base):
+    """
+    Reliability inputs of one cabinet for one calendar month (UTC): operating
+    hours from `mnt_operating_time`, and failure count, downtime and repair
+    durations of the non-deleted incidents that occurred in the month. Kept in
+    step with both tables by the listeners below; a cabinet-month without
+    rows has no bucket.
+    """
+
+    __tablename__ = "mnt_reliability_monthly"
+
+    cabinet_id: Mapped[int] = mapped_column(ForeignKey("cabinets.id", ondelete="CASCADE"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    operating_hours: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, server_default="0")
+    operating_days: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    incident_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    downtime_hours: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, server_default="0")
+    repair_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    repair_seconds: Mapped[float] = mapped_column(Float, nullable=False, server_default="0")
+
+    __table_args__ = (Index("ix_mnt_reliability_monthly_month", "month"),)
+
+
+_reliability_tables: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def _has_reliability_table(connection) -> bool:
+    engine = connection.engine
+    if engine not in _reliability_tables:
+        _reliability_tables[engine] = inspect(connection).has_table(MntReliabilityMonthly.__tablename__)
+    return _reliability_tables[engine]
+
+
+def month_of(value: date | datetime) -> date:
+    """First day of the UTC calendar month containing `value`."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return date(value.year, value.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=UTC)
+    end_month = next_month(month)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=UTC)
+
+
+def incident_reliability_filter(start: datetime, end: datetime):
+    """Non-deleted incidents that occurred in [start, end)."""
+    return (
+        MntIncident.is_deleted == False,
+        MntIncident.occurred_at >= start,
+        MntIncident.occurred_at < end,
+    )
+
+
+def repair_seconds(repair_started_at, resolved_at) -> float | None:
+    if repair_started_at is None or resolved_at is None:
+        return None
+    return (resolved_at - repair_started_at).total_seconds()
+
+
+def _reliability_upsert(connection):
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    return dialect.insert(MntReliabilityMonthly.__table__)
+
+
+def lock_reliability_month(connection, cabinet_id: int, month: date) -> None:
+    """
+    Serialize writers of one bucket: a no-op upsert that row-locks it on
+    PostgreSQL (creating it if needed) and opens the write transaction on
+    SQLite. A concurrent writer of the same cabinet-month waits here until
+    this transaction commits, and its recount then sees the committed rows.
+    """
+    table = MntReliabilityMonthly.__table__
+    connection.execute(
+        _reliability_upsert(connection)
+        .values(cabinet_id=cabinet_id, month=month)
+        .on_conflict_do_update(
+            index_elements=[table.c.cabinet_id, table.c.month],
+            set_={"incident_count": table.c.incident_count},
+        )
+    )
+
+
+def recount_reliability_month(connection, cabinet_id: int, month: date) -> None:
+    """
+    Recompute one cabinet-month bucket from the base tables under the bucket
+    lock. Only the rows of that month are read, so keeping the rollup
+    current costs one small indexed query per changed record.
+    """
+    lock_reliability_month(connection, cabinet_id, month)
+    start, end = month_bounds(month)
+    incidents = connection.execute(
+        select(MntIncident.repair_started_at, MntIncident.resolved_at, MntIncident.downtime_hours).where(
+            MntIncident.cabinet_id == cabinet_id, *incident_reliability_filter(start, end)
+        )
+    ).all()
+    operating = connection.execute(
+        select(func.count(MntOperatingTime.id), func.coalesce(func.sum(MntOperatingTime.operating_hours), 0)).where(
+            MntOperatingTime.cabinet_id == cabinet_id,
+            MntOperatingTime.recorded_date >= month,
+            MntOperatingTime.recorded_date < next_month(month),
+        )
+    ).one()
+    table = MntReliabilityMonthly.__table__
+    if not incidents and not operating[0]:
+        connection.execute(table.delete().where(table.c.cabinet_id == cabinet_id, table.c.month == month))
+        return
+    repairs = [seconds for row in incidents if (seconds := repair_seconds(row.repair_started_at, row.resolved_at)) is not None]
+    values = {
+        "operating_hours": operating[1],
+        "operating_days": operating[0],
+        "incident_count": len(incidents),
+        "downtime_hours": sum(float(row.downtime_hours or 0) for row in incidents),
+        "repair_count": len(repairs),
+        "repair_seconds": sum(repairs),
+    }
+    statement = _reliability_upsert(connection).values(cabinet_id=cabinet_id, month=month, **values)
+    connection.execute(
+        statement.on_conflict_do_update(index_elements=[table.c.cabinet_id, table.c.month], set_=values)
+    )
+
+
+def _reliability_buckets(target, names: tuple[str, str], *, previous: bool) -> set[tuple[int, date]]:
+    cabinet_name, moment_name = names
+    buckets: set[tuple[int, date]] = set()
+    cabinet_id, moment = getattr(target, cabinet_name), getattr(target, moment_name)
+    if cabinet_id is not None and moment is not None:
+        buckets.add((cabinet_id, month_of(moment)))
+    if previous:
+        state = inspect(target)
+        old_cabinet = state.attrs[cabinet_name].history.deleted
+        old_moment = state.attrs[moment_name].history.deleted
+        cabinet_id = old_cabinet[0] if old_cabinet else cabinet_id
+        moment = old_moment[0] if old_moment else moment
+        if cabinet_id is not None and moment is not None:
+            buckets.add((cabinet_id, month_of(moment)))
+    return buckets
+
+
+def _reliability_listener(names: tuple[str, str], tracked: tuple[str, ...] | None, *, previous: bool):
+    def recount(mapper, connection, target) -> None:
+        if tracked and not any(inspect(target).attrs[name].history.has_changes() for name in tracked):
+            return
+        if not _has_reliability_table(connection):
+            return
+        for cabinet_id, month in sorted(_reliability_buckets(target, names, previous=previous)):
+            recount_reliability_month(connection, cabinet_id, month)
+
+    return recount
+
+
+INCIDENT_RELIABILITY_ATTRIBUTES = (
+    "cabinet_id",
+    "occurred_at",
+    "is_deleted",
+    "repair_started_at",
+    "resolved_at",
+    "downtime_hours",
+)
+OPERATING_TIME_RELIABILITY_ATTRIBUTES = ("cabinet_id", "recorded_date", "operating_hours")
+
+for _model, _names, _tracked in (
+    (MntIncident, ("cabinet_id", "occurred_at"), INCIDENT_RELIABILITY_ATTRIBUTES),
+    (MntOperatingTime, ("cabinet_id", "recorded_date"), OPERATING_TIME_RELIABILITY_ATTRIBUTES),
+):
+    event.listen(_model, "after_insert", _reliability_listener(_names, None, previous=False))
+    event.listen(_model, "after_update", _reliability_listener(_names, _tracked, previous=True))
+    event.listen(_model, "after_delete", _reliability_listener(_names, None, previous=True))
+
+
 # Avoid circular imports — these are only used for relationship type hints
 from app.models.core import Cabinet  # noqa: E402
 from app.models.operations import CabinetItem  # noqa: E402
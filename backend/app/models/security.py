@@ -4,6 +4,7 @@ from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, UniqueConst
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base, SoftDeleteMixin, TimestampMixin, VersionMixin
+from app.db.search_index import initial_letter_index, trigram_index
 
 
 class UserRole(str, enum.Enum):
@@ -73,3 +74,6 @@ Index(
     unique=True,
     postgresql_where=(User.is_deleted == False),
 )
+
+trigram_index("ix_users_username_trgm", User.username)
+initial_letter_index("ix_users_username_initial", User.username)
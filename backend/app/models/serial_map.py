@@ -1,9 +1,14 @@
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base, SoftDeleteMixin, TimestampMixin, VersionMixin
 
+# Layout of `document_json`: 1 = legacy multi-scheme project, 2 = single map.
+# The column defaults to 1 so rows inserted by older instances stay marked as
+# stragglers; current writers set the version explicitly.
+SERIAL_MAP_SCHEMA_VERSION = 2
+
 
 class SerialMapDocument(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     __tablename__ = "serial_map_documents"
@@ -15,5 +20,29 @@ class SerialMapDocument(Base, TimestampMixin, SoftDeleteMixin, VersionMixin):
     location_id: Mapped[int | None] = mapped_column(ForeignKey("locations.id"), index=True)
     source_context: Mapped[dict | None] = mapped_column(JSONB)
     document_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    schema_version: Mapped[int] = mapped_column(Integer, server_default="1", nullable=False)
+    history_cursor: Mapped[int | None] = mapped_column(Integer)
     created_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), index=True)
     updated_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), index=True)
+
+
+class SerialMapHistoryEntry(Base):
+    """
+    One saved state of a serial map. Keyframes hold a full snapshot (nodes,
+    edges, viewport); the entries in between hold a keyed delta against the
+    previous entry. `SerialMapDocument.history_cursor` points at the entry
+    matching the stored document.
+    """
+
+    __tablename__ = "serial_map_history_entries"
+    __table_args__ = (UniqueConstraint("document_id", "seq", name="uq_serial_map_history_entries_document_seq"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    document_id: Mapped[int] = mapped_column(
+        ForeignKey("serial_map_documents.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_keyframe: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"))
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -9,7 +9,7 @@ class UserSession(Base, TimestampMixin):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True, nullable=False)
-    session_token_hash: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+    session_token_hash: Mapped[str] = mapped_column(String(255), index=True, nullable=False)
     started_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -17,6 +17,7 @@ from app.services.equipment_uniqueness import (
     is_unique_equipment,
     normalize_operation_quantity,
 )
+from app.services.ipam import sync_network_interfaces_for_items
 from app.services.location_paths import attach_location_full_path
 
 router = APIRouter()
@@ -152,6 +153,8 @@ def create_assembly_item(
         )
         db.add(item)
     db.flush()
+    if equipment.network_ports:
+        sync_network_interfaces_for_items(db, "assembly", [item.id])
 
     add_audit_log(
         db,
@@ -1,24 +1,29 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy import func, or_, select
 
 from app.core.access import require_space_access
 from app.core.dependencies import get_db
 from app.core.identity import build_full_name, build_personnel_identity_subquery, make_identity
+from app.core.pagination import PagingMode, TotalMode, paginate_keyset
+from app.core.query import resolve_sort
 from app.models.audit import AuditLog
 from app.models.security import SpaceKey, User
 from app.models.security import User as SecurityUser
 from app.schemas.audit_logs import AuditLogOut
-from app.schemas.common import Pagination
+from app.schemas.common import CursorPagination, Pagination
 
 router = APIRouter()
 
 
-@router.get("/", response_model=Pagination[AuditLogOut])
+@router.get("/", response_model=Pagination[AuditLogOut] | CursorPagination[AuditLogOut])
 def list_audit_logs(
     page: int = 1,
     page_size: int = 50,
+    paging: PagingMode = "offset",
+    cursor: str | None = None,
+    total_mode: TotalMode | None = None,
     q: str | None = None,
     sort: str | None = None,
     actor_id: int | None = None,
@@ -69,14 +74,36 @@ def list_audit_logs(
             )
         )
 
-    sort_field = sort.lstrip("-") if sort else "id"
-    sort_column = getattr(AuditLog, sort_field, None)
-    if sort and sort_column is None:
-        raise HTTPException(status_code=400, detail=f"Invalid sort field: {sort_field}")
-    query = query.order_by(sort_column.desc() if sort and sort.startswith("-") else sort_column.asc()) if sort else query.order_by(AuditLog.id.desc())
+    sort_column, descending = resolve_sort(AuditLog, sort, default="-id")
+    if paging == "cursor" or cursor:
+        keyset = paginate_keyset(
+            query,
+            db,
+            sort_column=sort_column,
+            id_column=AuditLog.id,
+            descending=descending,
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total_mode,
+            scalars=False,
+            entity=lambda row: row[0],
+        )
+        return CursorPagination(
+            items=_build_audit_log_items(keyset.items),
+            page_size=page_size,
+            next_cursor=keyset.next_cursor,
+            prev_cursor=keyset.prev_cursor,
+            total=keyset.total,
+            total_is_estimate=keyset.total_is_estimate,
+        )
 
+    query = query.order_by(sort_column.desc() if descending else sort_column.asc())
     total = db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
     rows = db.execute(query.offset((page - 1) * page_size).limit(page_size)).all()
+    return Pagination(items=_build_audit_log_items(rows), page=page, page_size=page_size, total=total)
+
+
+def _build_audit_log_items(rows) -> list[AuditLogOut]:
     items = []
     for audit_log, username, system_role, first_name, last_name, middle_name, personnel_role in rows:
         personnel_full_name = build_full_name(last_name, first_name, middle_name)
@@ -100,4 +127,4 @@ def list_audit_logs(
                 created_at=audit_log.created_at,
             )
         )
-    return Pagination(items=items, page=page, page_size=page_size, total=total)
+    return items
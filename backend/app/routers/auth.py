@@ -5,9 +5,8 @@ from sqlalchemy import select
 
 from app.core.access import build_user_permissions
 from app.core.audit import add_audit_log, model_to_dict
-from app.core.dependencies import get_current_user, get_db, oauth2_scheme
+from app.core.dependencies import get_current_user, get_db, oauth2_scheme, principal_cache
 from app.core.identity import user_out_with_permissions
-from app.core.log_retention import enforce_table_row_limit
 from app.core.security import create_access_token, decode_token, hash_token, verify_password
 from app.models.security import User
 from app.models.sessions import UserSession
@@ -38,7 +37,6 @@ def login(payload: LoginIn, request: Request, db=Depends(get_db)):
     session.session_token_hash = hash_token(token)
     user.last_login_at = datetime.utcnow()
     db.flush()
-    enforce_table_row_limit(db, UserSession)
 
     add_audit_log(
         db,
@@ -85,6 +83,7 @@ def logout(
         after=None,
     )
     db.commit()
+    principal_cache.invalidate_token(token)
     return {"status": "ok"}
 
 
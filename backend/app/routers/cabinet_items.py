@@ -17,7 +17,7 @@ from app.services.equipment_uniqueness import (
     normalize_operation_quantity,
 )
 from app.services.io_signals import ensure_io_signals_for_equipment_in_operation
-from app.services.ipam import build_cabinet_item_ipam_summary
+from app.services.ipam import build_cabinet_item_ipam_summary, sync_network_interfaces_for_items
 from app.schemas.ipam import CabinetItemIPAMSummaryOut
 from app.services.location_paths import attach_location_full_path
 
@@ -119,9 +119,7 @@ def get_cabinet_item_ipam_summary(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    summary = build_cabinet_item_ipam_summary(db, item_id)
-    db.commit()
-    return summary
+    return build_cabinet_item_ipam_summary(db, item_id)
 
 
 @router.post("/", response_model=CabinetItemOut)
@@ -165,6 +163,8 @@ def create_cabinet_item(
     db.flush()
     if equipment.is_channel_forming:
         ensure_io_signals_for_equipment_in_operation(db, item.id)
+    if equipment.network_ports:
+        sync_network_interfaces_for_items(db, "cabinet", [item.id])
 
     add_audit_log(
         db,
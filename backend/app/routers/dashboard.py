@@ -1,46 +1,30 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy import Float, and_, cast, func, or_, select, union_all
+from sqlalchemy import func, or_, select
 
 from app.core.access import require_space_access
 from app.core.dependencies import get_db
 from app.core.identity import build_full_name, build_personnel_identity_subquery, make_identity
 from app.models.audit import AuditLog
-from app.models.core import Cabinet, EquipmentCategory, EquipmentType, Warehouse
+from app.models.core import Cabinet, EquipmentType, Warehouse
 from app.models.io import IOSignal
-from app.models.operations import AssemblyItem, CabinetItem, WarehouseItem
+from app.models.operations import CabinetItem, WarehouseItem
 from app.models.security import SpaceKey, User
 from app.models.security import User as SecurityUser
 from app.models.sessions import UserSession
 from app.schemas.dashboard import (
-    DashboardDonutsOut,
-    DashboardKpisOut,
     DashboardOut,
     DashboardOverviewOut,
-    DonutQtyItem,
-    DonutValueItem,
     EquipmentByTypeItem,
     EquipmentByWarehouseItem,
     MetricsOut,
     RecentEquipmentActionOut,
     RecentLoginOut,
 )
+from app.services.dashboard_aggregates import load_dashboard_overview
 
 router = APIRouter()
 
 
-def build_root_category_map(categories: list[EquipmentCategory]) -> dict[int, str]:
-    categories_by_id = {category.id: category for category in categories}
-    roots: dict[int, str] = {}
-    for category in categories:
-        current = category
-        seen: set[int] = set()
-        while current.parent_id and current.parent_id in categories_by_id and current.parent_id not in seen:
-            seen.add(current.id)
-            current = categories_by_id[current.parent_id]
-        roots[category.id] = current.name
-    return roots
-
-
 @router.get("/", response_model=DashboardOut)
 def get_dashboard(db=Depends(get_db), user: User = Depends(require_space_access(SpaceKey.overview, "read"))):
     cabinets_total = db.scalar(
@@ -142,204 +126,7 @@ def get_dashboard(db=Depends(get_db), user: User = Depends(require_space_access(
 
 @router.get("/overview", response_model=DashboardOverviewOut)
 def get_dashboard_overview(db=Depends(get_db), user: User = Depends(require_space_access(SpaceKey.overview, "read"))):
-    price_expr = func.coalesce(
-        cast(EquipmentType.meta_data["unit_price_rub"].astext, Float), 0.0
-    )
-
-    total_cabinets = db.scalar(
-        select(func.count()).select_from(Cabinet).where(Cabinet.is_deleted == False)
-    ) or 0
-
-    total_plc_in_cabinets = db.scalar(
-        select(func.coalesce(func.sum(CabinetItem.quantity), 0))
-        .join(EquipmentType, CabinetItem.equipment_type_id == EquipmentType.id)
-        .where(
-            CabinetItem.is_deleted == False,
-            EquipmentType.is_deleted == False,
-            EquipmentType.is_channel_forming == True,
-        )
-    ) or 0
-
-    total_plc_in_warehouses = db.scalar(
-        select(func.coalesce(func.sum(WarehouseItem.quantity), 0))
-        .join(EquipmentType, WarehouseItem.equipment_type_id == EquipmentType.id)
-        .where(
-            WarehouseItem.is_deleted == False,
-            EquipmentType.is_deleted == False,
-            EquipmentType.is_channel_forming == True,
-        )
-    ) or 0
-
-    operation_qty = union_all(
-        select(
-            CabinetItem.equipment_type_id.label("equipment_type_id"),
-            CabinetItem.quantity.label("quantity"),
-        ).where(CabinetItem.is_deleted == False),
-        select(
-            AssemblyItem.equipment_type_id.label("equipment_type_id"),
-            AssemblyItem.quantity.label("quantity"),
-        ).where(AssemblyItem.is_deleted == False),
-    ).subquery()
-
-    channel_totals = db.execute(
-        select(
-            func.coalesce(func.sum(operation_qty.c.quantity * EquipmentType.ai_count), 0).label("ai_total"),
-            func.coalesce(func.sum(operation_qty.c.quantity * EquipmentType.di_count), 0).label("di_total"),
-            func.coalesce(func.sum(operation_qty.c.quantity * EquipmentType.ao_count), 0).label("ao_total"),
-            func.coalesce(func.sum(operation_qty.c.quantity * EquipmentType.do_count), 0).label("do_total"),
-        )
-        .select_from(operation_qty)
-        .join(EquipmentType, operation_qty.c.equipment_type_id == EquipmentType.id)
-        .where(
-            EquipmentType.is_deleted == False,
-            EquipmentType.is_channel_forming == True,
-        )
-    ).one()
-
-    ai_total = int(channel_totals.ai_total or 0)
-    di_total = int(channel_totals.di_total or 0)
-    ao_total = int(channel_totals.ao_total or 0)
-    do_total = int(channel_totals.do_total or 0)
-    total_channels = ai_total + di_total + ao_total + do_total
-
-    total_warehouse_value_rub = db.scalar(
-        select(func.coalesce(func.sum(WarehouseItem.quantity * price_expr), 0))
-        .join(EquipmentType, WarehouseItem.equipment_type_id == EquipmentType.id)
-        .where(
-            WarehouseItem.is_deleted == False,
-            EquipmentType.is_deleted == False,
-        )
-    ) or 0.0
-
-    active_categories = db.scalars(
-        select(EquipmentCategory).where(EquipmentCategory.is_deleted == False)
-    ).all()
-    root_category_map = build_root_category_map(active_categories)
-
-    by_category_rows = db.execute(
-        select(
-            EquipmentType.equipment_category_id,
-            func.coalesce(func.sum(WarehouseItem.quantity), 0).label("qty"),
-        )
-        .join(EquipmentType, WarehouseItem.equipment_type_id == EquipmentType.id)
-        .outerjoin(EquipmentCategory, EquipmentType.equipment_category_id == EquipmentCategory.id)
-        .where(
-            WarehouseItem.is_deleted == False,
-            EquipmentType.is_deleted == False,
-            or_(
-                EquipmentType.equipment_category_id.is_(None),
-                EquipmentCategory.is_deleted == False,
-            ),
-        )
-        .group_by(EquipmentType.equipment_category_id)
-    ).all()
-
-    category_totals: dict[str, int] = {}
-    for row in by_category_rows:
-        qty = int(row.qty or 0)
-        if qty <= 0:
-            continue
-        category_name = root_category_map.get(row.equipment_category_id) if row.equipment_category_id else None
-        bucket_name = category_name or "Без категории"
-        category_totals[bucket_name] = category_totals.get(bucket_name, 0) + qty
-
-    by_category = [
-        DonutQtyItem(name=name, qty=qty)
-        for name, qty in sorted(category_totals.items(), key=lambda item: item[0])
-    ]
-
-    by_warehouse_qty_rows = db.execute(
-        select(
-            Warehouse.name,
-            func.coalesce(func.sum(WarehouseItem.quantity), 0).label("qty"),
-        )
-        .select_from(Warehouse)
-        .join(
-            WarehouseItem,
-            and_(
-                WarehouseItem.warehouse_id == Warehouse.id,
-                WarehouseItem.is_deleted == False,
-            ),
-            isouter=True,
-        )
-        .where(Warehouse.is_deleted == False)
-        .group_by(Warehouse.name)
-        .order_by(Warehouse.name)
-    ).all()
-
-    by_warehouse_qty = [
-        DonutQtyItem(name=row.name, qty=row.qty or 0) for row in by_warehouse_qty_rows
-    ]
-
-    accounted_rows = db.execute(
-        select(
-            WarehouseItem.is_accounted,
-            func.coalesce(func.sum(WarehouseItem.quantity), 0).label("qty"),
-        )
-        .where(WarehouseItem.is_deleted == False)
-        .group_by(WarehouseItem.is_accounted)
-    ).all()
-
-    accounted_map = {bool(row.is_accounted): row.qty or 0 for row in accounted_rows}
-    accounted_vs_not = [
-        DonutQtyItem(name="Учтено", qty=accounted_map.get(True, 0)),
-        DonutQtyItem(name="Не учтено", qty=accounted_map.get(False, 0)),
-    ]
-
-    by_warehouse_value_rows = db.execute(
-        select(
-            Warehouse.name,
-            func.coalesce(func.sum(WarehouseItem.quantity * price_expr), 0).label(
-                "value_rub"
-            ),
-        )
-        .select_from(Warehouse)
-        .join(
-            WarehouseItem,
-            and_(
-                WarehouseItem.warehouse_id == Warehouse.id,
-                WarehouseItem.is_deleted == False,
-            ),
-            isouter=True,
-        )
-        .join(
-            EquipmentType,
-            EquipmentType.id == WarehouseItem.equipment_type_id,
-            isouter=True,
-        )
-        .where(
-            Warehouse.is_deleted == False,
-            or_(EquipmentType.is_deleted == False, EquipmentType.id == None),
-        )
-        .group_by(Warehouse.name)
-        .order_by(Warehouse.name)
-    ).all()
-
-    by_warehouse_value = [
-        DonutValueItem(name=row.name, value_rub=float(row.value_rub or 0))
-        for row in by_warehouse_value_rows
-    ]
-
-    kpis = DashboardKpisOut(
-        total_cabinets=total_cabinets,
-        total_plc_in_cabinets=total_plc_in_cabinets,
-        total_plc_in_warehouses=total_plc_in_warehouses,
-        ai_total=ai_total,
-        di_total=di_total,
-        ao_total=ao_total,
-        do_total=do_total,
-        total_channels=total_channels,
-        total_warehouse_value_rub=float(total_warehouse_value_rub or 0),
-    )
-
-    donuts = DashboardDonutsOut(
-        by_category=by_category,
-        by_warehouse_qty=by_warehouse_qty,
-        accounted_vs_not=accounted_vs_not,
-        by_warehouse_value=by_warehouse_value,
-    )
-
-    return DashboardOverviewOut(kpis=kpis, donuts=donuts)
+    return load_dashboard_overview(db)
 
 
 @router.get("/recent-equipment-actions", response_model=list[RecentEquipmentActionOut])
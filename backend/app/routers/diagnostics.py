@@ -1,34 +1,57 @@
+import asyncio
 from datetime import UTC, date, datetime, time
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from starlette.concurrency import run_in_threadpool
 
-from app.core.dependencies import require_admin
+from app.core.dependencies import get_db, require_admin
+from app.core.log_retention import collect_retention_overview, run_log_retention
 from app.schemas.diagnostics import (
+    DiagnosticsDatabaseOverviewOut,
+    DiagnosticsDatabaseTableCountOut,
     DiagnosticsDeleteLogsIn,
     DiagnosticsDeleteLogsOut,
     DiagnosticsLogsPageOut,
+    DiagnosticsLogTailOut,
     DiagnosticsPortOut,
     DiagnosticsProcessKillOut,
     DiagnosticsProcessOut,
     DiagnosticsSummaryOut,
+    LogRetentionRunOut,
+    LogRetentionTableOut,
 )
 from app.services.diagnostics import (
+    count_database_table_rows,
     delete_diagnostics_logs,
+    get_database_overview,
     get_diagnostics_logs,
     get_diagnostics_ports,
     get_diagnostics_processes,
     get_diagnostics_summary,
     kill_diagnostics_process,
+    tail_diagnostics_logs,
 )
 
 router = APIRouter()
 
+TAIL_POLL_SECONDS = 1.0
+
 
 @router.get("/summary", response_model=DiagnosticsSummaryOut)
 def diagnostics_summary(_user=Depends(require_admin())):
     return get_diagnostics_summary()
 
 
+@router.get("/database", response_model=DiagnosticsDatabaseOverviewOut)
+def diagnostics_database(refresh: bool = False, _user=Depends(require_admin())):
+    return get_database_overview(refresh=refresh)
+
+
+@router.get("/database/tables/{table_name}/count", response_model=DiagnosticsDatabaseTableCountOut)
+def diagnostics_database_table_count(table_name: str, _user=Depends(require_admin())):
+    return count_database_table_rows(table_name)
+
+
 @router.get("/ports", response_model=list[DiagnosticsPortOut])
 def diagnostics_ports(_user=Depends(require_admin())):
     return get_diagnostics_ports()
@@ -63,6 +86,37 @@ def diagnostics_logs(
     )
 
 
+@router.get("/logs/tail", response_model=DiagnosticsLogTailOut)
+async def diagnostics_logs_tail(
+    request: Request,
+    after: int | None = Query(default=None, ge=0),
+    source: str | None = None,
+    severity: str | None = None,
+    include_low_signal: bool = False,
+    wait_seconds: float = Query(default=25, ge=0, le=60),
+    _user=Depends(require_admin()),
+):
+    """
+    Long-poll for log entries appended after cursor `after`: answers as soon
+    as there is something new or after `wait_seconds` with an empty batch.
+    """
+    deadline = asyncio.get_running_loop().time() + wait_seconds
+    while True:
+        result = await run_in_threadpool(
+            tail_diagnostics_logs,
+            after=after,
+            source=source,
+            severity=severity,
+            include_low_signal=include_low_signal,
+        )
+        if after is None or result.items or asyncio.get_running_loop().time() >= deadline:
+            return result
+        if await request.is_disconnected():
+            return result
+        after = result.cursor
+        await asyncio.sleep(TAIL_POLL_SECONDS)
+
+
 @router.post("/logs/delete", response_model=DiagnosticsDeleteLogsOut)
 def diagnostics_delete_logs(payload: DiagnosticsDeleteLogsIn, _user=Depends(require_admin())):
     return delete_diagnostics_logs(payload.entry_ids)
@@ -71,3 +125,15 @@ def diagnostics_delete_logs(payload: DiagnosticsDeleteLogsIn, _user=Depends(requ
 @router.post("/processes/{pid}/kill", response_model=DiagnosticsProcessKillOut)
 def diagnostics_kill_process(pid: int, _user=Depends(require_admin())):
     return kill_diagnostics_process(pid)
+
+
+@router.get("/log-retention", response_model=list[LogRetentionTableOut])
+def diagnostics_log_retention(exact: bool = False, db=Depends(get_db), _user=Depends(require_admin())):
+    return collect_retention_overview(db, exact=exact)
+
+
+@router.post("/log-retention/run", response_model=list[LogRetentionRunOut])
+def diagnostics_run_log_retention(db=Depends(get_db), _user=Depends(require_admin())):
+    results = run_log_retention(db)
+    db.commit()
+    return [LogRetentionRunOut(**vars(result)) for result in results]
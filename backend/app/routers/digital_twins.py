@@ -7,8 +7,15 @@ from app.core.audit import add_audit_log, model_to_dict
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.models.digital_twins import DigitalTwinDocument as DigitalTwinDocumentModel
 from app.models.security import User
-from app.schemas.digital_twins import DigitalTwinDocumentOut, DigitalTwinDocumentUpdate, DigitalTwinScope
+from app.schemas.common import DocumentPatch, DocumentPatchOut
+from app.schemas.digital_twins import (
+    DigitalTwinDocument,
+    DigitalTwinDocumentOut,
+    DigitalTwinDocumentUpdate,
+    DigitalTwinScope,
+)
 from app.services.digital_twins import ensure_digital_twin, ensure_document_integrity, get_digital_twin_or_404
+from app.services.json_patch import patch_document_row
 
 router = APIRouter()
 
@@ -22,6 +29,7 @@ def _to_out(item: DigitalTwinDocumentModel) -> DigitalTwinDocumentOut:
         document=item.document_json,
         created_by_id=item.created_by_id,
         updated_by_id=item.updated_by_id,
+        row_version=item.row_version,
         created_at=item.created_at,
         updated_at=item.updated_at,
         is_deleted=item.is_deleted,
@@ -81,6 +89,8 @@ def update_digital_twin(
     if "document" in data and payload.document is not None:
         normalized = ensure_document_integrity(payload.document)
         item.document_json = normalized.model_dump(by_alias=True)
+        # The client may have sent a document built before the last sync.
+        item.source_watermark = None
     if "source_context" in data:
         item.source_context = data["source_context"]
     item.updated_by_id = current_user.id
@@ -98,3 +108,28 @@ def update_digital_twin(
     db.commit()
     db.refresh(item)
     return _to_out(item)
+
+
+@router.patch("/{digital_twin_id}/document", response_model=DocumentPatchOut)
+def patch_digital_twin_document(
+    digital_twin_id: int,
+    payload: DocumentPatch,
+    db=Depends(get_db),
+    current_user: User = Depends(require_write_access()),
+):
+    item = db.scalar(select(DigitalTwinDocumentModel).where(DigitalTwinDocumentModel.id == digital_twin_id))
+    if not item or item.is_deleted:
+        raise HTTPException(status_code=404, detail="Digital twin not found")
+    # Cross-item integrity (walls, rails, power graph) is restored by the
+    # next sync, which the cleared watermark forces.
+    result = patch_document_row(
+        db,
+        item,
+        payload,
+        DigitalTwinDocument,
+        actor_id=current_user.id,
+        entity="digital_twin_documents",
+        extra_values={"source_watermark": None},
+    )
+    db.commit()
+    return result
@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy import case, or_, select
 from sqlalchemy.orm import selectinload
 
+from app.core import hierarchy
 from app.core.access import require_space_access
 from app.core.dependencies import get_db, require_admin, require_read_access, require_write_access
 from app.core.query import apply_alphabet_filter, apply_search, apply_sort, apply_text_filter
@@ -34,7 +35,6 @@ from app.models.operations import CabinetItem, WarehouseItem
 from app.models.security import SpaceKey, User
 from app.routers import (
     assemblies as assemblies_router,
-    cabinet_items as cabinet_items_router,
     cabinets as cabinets_router,
     data_types as data_types_router,
     equipment_categories as equipment_categories_router,
@@ -47,11 +47,9 @@ from app.routers import (
     personnel as personnel_router,
     signal_types as signal_types_router,
     users as users_router,
-    warehouse_items as warehouse_items_router,
     warehouses as warehouses_router,
 )
 from app.schemas.assemblies import AssemblyCreate
-from app.schemas.cabinet_items import CabinetItemCreate
 from app.schemas.cabinets import CabinetCreate
 from app.schemas.data_types import DataTypeCreate
 from app.schemas.equipment_categories import EquipmentCategoryCreate
@@ -65,8 +63,11 @@ from app.schemas.measurement_units import MeasurementUnitCreate
 from app.schemas.personnel import PersonnelCompetencyCreate, PersonnelCreate, PersonnelTrainingCreate
 from app.schemas.signal_types import SignalTypeCreate
 from app.schemas.users import UserCreate
-from app.schemas.warehouse_items import WarehouseItemCreate
 from app.schemas.warehouses import WarehouseCreate
+from app.services.bulk_import import ImportChunk, run_bulk_import
+from app.services.equipment_uniqueness import is_unique_equipment, normalize_operation_quantity
+from app.services.io_signals import ensure_io_signals_for_equipment_in_operation
+from app.services.ipam import sync_network_interfaces_for_items
 from app.services.tabular_import_export import (
     as_optional_bool,
     as_optional_date,
@@ -79,10 +80,13 @@ from app.services.tabular_import_export import (
     is_blank_row,
     read_tabular_rows,
     row_to_mapping,
+    stream_export_rows,
 )
 
 router = APIRouter()
 
+RESTORED_VALUES = {"is_deleted": False, "deleted_at": None, "deleted_by_id": None}
+
 
 def _normalized(value: Any) -> str:
     return " ".join(str(value or "").split()).strip().casefold()
@@ -141,25 +145,25 @@ def _ensure_headers(headers: Sequence[str], required: Sequence[str]) -> None:
             raise HTTPException(status_code=400, detail=f"Missing '{name}' column")
 
 
-def _build_tree_lookup(items: Sequence[Any]) -> dict[str, Any]:
-    return {_normalized(_path_value(item)): item for item in items if not item.is_deleted}
+def _build_tree_lookup(db, model, items: Sequence[Any]) -> dict[str, Any]:
+    paths = _tree_paths(db, model, items)
+    return {_normalized(paths.get(item.id, item.name)): item for item in items if not item.is_deleted}
 
 
 def _build_location_lookup(db) -> tuple[dict[str, Location], dict[int, str]]:
-    items = db.scalars(select(Location).options(selectinload(Location.parent))).all()
-    by_path = {_normalized(item.full_path()): item for item in items if not item.is_deleted}
-    by_id = {item.id: item.full_path() for item in items}
+    items = db.scalars(select(Location)).all()
+    paths = hierarchy.full_paths(db, Location)
+    by_id = {item.id: paths.get(item.id, item.name) for item in items}
+    by_path = {_normalized(by_id[item.id]): item for item in items if not item.is_deleted}
     return by_path, by_id
 
 
 def _build_manufacturer_lookup(db) -> dict[str, Manufacturer]:
-    items = db.scalars(select(Manufacturer).options(selectinload(Manufacturer.parent))).all()
-    return _build_tree_lookup(items)
+    return _build_tree_lookup(db, Manufacturer, db.scalars(select(Manufacturer)).all())
 
 
 def _build_equipment_category_lookup(db) -> dict[str, EquipmentCategory]:
-    items = db.scalars(select(EquipmentCategory).options(selectinload(EquipmentCategory.parent))).all()
-    return _build_tree_lookup(items)
+    return _build_tree_lookup(db, EquipmentCategory, db.scalars(select(EquipmentCategory)).all())
 
 
 def _build_equipment_type_lookup(db) -> dict[str, EquipmentType]:
@@ -181,6 +185,30 @@ def _build_schedule_template_lookup(db) -> dict[str, PersonnelScheduleTemplate]:
     return {_normalized(item.label): item for item in items if not item.is_deleted}
 
 
+def _existing_item_rows(db, model, parent_column, keys: Sequence[tuple[int, int]]) -> dict[tuple[int, int], Any]:
+    """
+    Existing rows (soft-deleted included) for a chunk's `(parent id,
+    equipment type id)` keys, fetched with one query instead of one per row.
+    """
+    if not keys:
+        return {}
+    wanted = set(keys)
+    rows = db.execute(
+        select(model.id, parent_column, model.equipment_type_id, model.is_deleted)
+        .where(
+            parent_column.in_({key[0] for key in wanted}),
+            model.equipment_type_id.in_({key[1] for key in wanted}),
+        )
+        .order_by(model.is_deleted, model.id)
+    ).all()
+    existing: dict[tuple[int, int], Any] = {}
+    for row in rows:
+        key = (row[1], row.equipment_type_id)
+        if key in wanted:
+            existing.setdefault(key, row)
+    return existing
+
+
 def _require_lookup_id(
     lookup: dict[str, Any],
     value: Any,
@@ -199,17 +227,33 @@ def _require_lookup_id(
     return int(item.id)
 
 
+def _tree_paths(db, model, items: Sequence[Any]) -> dict[int, str]:
+    """
+    Full paths of `items`: one closure-table lookup for trees that have one,
+    the per-node `full_path` walk for the small dictionaries that do not.
+    """
+    if hierarchy.has_closure(model):
+        return hierarchy.full_paths(db, model, [item.id for item in items])
+    return {item.id: _path_value(item) for item in items}
+
+
 def _tree_export_rows(
+    db,
+    model,
     items: Sequence[Any],
     *,
     extra_getters: Sequence[Callable[[Any], Any]] | None = None,
 ) -> list[list[Any]]:
+    if hierarchy.has_closure(model):
+        parent_paths = hierarchy.full_paths(db, model, [item.parent_id for item in items])
+    else:
+        parent_paths = {item.parent_id: _path_value(item.parent) for item in items if item.parent is not None}
     rows: list[list[Any]] = []
     for item in items:
         rows.append(
             [
                 item.name,
-                _path_value(item.parent) if getattr(item, "parent", None) else "",
+                parent_paths.get(item.parent_id, "") if item.parent_id else "",
                 *([getter(item) for getter in extra_getters] if extra_getters else []),
             ]
         )
@@ -223,6 +267,7 @@ def _tree_import(
     dry_run: bool,
     db,
     current_user: User,
+    model,
     items_query,
     create_schema: type,
     create_callback: Callable[[Any, Any, User], Any],
@@ -233,7 +278,7 @@ def _tree_import(
     _ensure_headers(headers, required_headers)
     report = _report()
     items = db.scalars(items_query).all()
-    path_lookup = _build_tree_lookup(items)
+    path_lookup = _build_tree_lookup(db, model, items)
     seen_paths: set[str] = set()
     pending: list[dict[str, Any]] = []
 
@@ -284,7 +329,7 @@ def export_locations(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(Location).options(selectinload(Location.parent))
+    query = select(Location)
     if not include_deleted:
         query = query.where(Location.is_deleted == False)
     items = db.scalars(query.order_by(Location.parent_id, Location.name, Location.id)).all()
@@ -294,7 +339,7 @@ def export_locations(
         filename_prefix="locations",
         file_format=format,
         headers=["name", "parent_full_path"],
-        rows=_tree_export_rows(items),
+        rows=_tree_export_rows(db, Location, items),
     )
 
 
@@ -325,7 +370,8 @@ def import_locations(
         dry_run=dry_run,
         db=db,
         current_user=current_user,
-        items_query=select(Location).options(selectinload(Location.parent)),
+        model=Location,
+        items_query=select(Location),
         create_schema=LocationCreate,
         create_callback=locations_router.create_location,
         required_headers=["name"],
@@ -354,7 +400,7 @@ def export_data_types(
         filename_prefix="data-types",
         file_format=format,
         headers=["name", "parent_full_path", "tooltip"],
-        rows=_tree_export_rows(items, extra_getters=[lambda item: item.tooltip]),
+        rows=_tree_export_rows(db, DataType, items, extra_getters=[lambda item: item.tooltip]),
     )
 
 
@@ -385,6 +431,7 @@ def import_data_types(
         dry_run=dry_run,
         db=db,
         current_user=current_user,
+        model=DataType,
         items_query=select(DataType).options(selectinload(DataType.parent)),
         create_schema=DataTypeCreate,
         create_callback=data_types_router.create_data_type,
@@ -415,7 +462,7 @@ def export_measurement_units(
         filename_prefix="measurement-units",
         file_format=format,
         headers=["name", "parent_full_path", "sort_order"],
-        rows=_tree_export_rows(items, extra_getters=[lambda item: item.sort_order]),
+        rows=_tree_export_rows(db, MeasurementUnit, items, extra_getters=[lambda item: item.sort_order]),
     )
 
 
@@ -446,6 +493,7 @@ def import_measurement_units(
         dry_run=dry_run,
         db=db,
         current_user=current_user,
+        model=MeasurementUnit,
         items_query=select(MeasurementUnit).options(selectinload(MeasurementUnit.parent)),
         create_schema=MeasurementUnitCreate,
         create_callback=measurement_units_router.create_measurement_unit,
@@ -476,7 +524,7 @@ def export_signal_types(
         filename_prefix="signal-types",
         file_format=format,
         headers=["name", "parent_full_path", "sort_order"],
-        rows=_tree_export_rows(items, extra_getters=[lambda item: item.sort_order]),
+        rows=_tree_export_rows(db, SignalTypeDictionary, items, extra_getters=[lambda item: item.sort_order]),
     )
 
 
@@ -507,6 +555,7 @@ def import_signal_types(
         dry_run=dry_run,
         db=db,
         current_user=current_user,
+        model=SignalTypeDictionary,
         items_query=select(SignalTypeDictionary).options(selectinload(SignalTypeDictionary.parent)),
         create_schema=SignalTypeCreate,
         create_callback=signal_types_router.create_signal_type,
@@ -527,7 +576,7 @@ def export_equipment_categories(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(EquipmentCategory).options(selectinload(EquipmentCategory.parent))
+    query = select(EquipmentCategory)
     if not include_deleted:
         query = query.where(EquipmentCategory.is_deleted == False)
     items = db.scalars(query.order_by(EquipmentCategory.parent_id, EquipmentCategory.name, EquipmentCategory.id)).all()
@@ -537,7 +586,7 @@ def export_equipment_categories(
         filename_prefix="equipment-categories",
         file_format=format,
         headers=["name", "parent_full_path"],
-        rows=_tree_export_rows(items),
+        rows=_tree_export_rows(db, EquipmentCategory, items),
     )
 
 
@@ -568,7 +617,8 @@ def import_equipment_categories(
         dry_run=dry_run,
         db=db,
         current_user=current_user,
-        items_query=select(EquipmentCategory).options(selectinload(EquipmentCategory.parent)),
+        model=EquipmentCategory,
+        items_query=select(EquipmentCategory),
         create_schema=EquipmentCategoryCreate,
         create_callback=equipment_categories_router.create_equipment_category,
         required_headers=["name"],
@@ -703,16 +753,16 @@ def export_warehouses(
     query = apply_alphabet_filter(query, Warehouse.name, name_alphabet)
     query = apply_search(query, q, [Warehouse.name])
     query = apply_sort(query, Warehouse, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
     return build_export_response(
         filename_prefix="warehouses",
         file_format=format,
         headers=["name", "location_full_path", "meta_data_json"],
-        rows=[
+        rows=(
             [item.name, location_by_id.get(item.location_id, ""), json.dumps(item.meta_data or {}, ensure_ascii=False) if item.meta_data else ""]
             for item in items
-        ],
+        ),
     )
 
 
@@ -808,13 +858,13 @@ def export_cabinets(
     query = apply_text_filter(query, Cabinet.nomenclature_number, nomenclature_number)
     query = apply_search(query, q, [Cabinet.name])
     query = apply_sort(query, Cabinet, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
     return build_export_response(
         filename_prefix="cabinets",
         file_format=format,
         headers=["name", "factory_number", "nomenclature_number", "location_full_path", "meta_data_json"],
-        rows=[
+        rows=(
             [
                 item.name,
                 item.factory_number,
@@ -823,7 +873,7 @@ def export_cabinets(
                 json.dumps(item.meta_data or {}, ensure_ascii=False) if item.meta_data else "",
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -937,13 +987,13 @@ def export_assemblies(
     query = apply_text_filter(query, Assembly.nomenclature_number, nomenclature_number)
     query = apply_search(query, q, [Assembly.name])
     query = apply_sort(query, Assembly, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
     return build_export_response(
         filename_prefix="assemblies",
         file_format=format,
         headers=["name", "factory_number", "nomenclature_number", "location_full_path", "meta_data_json"],
-        rows=[
+        rows=(
             [
                 item.name,
                 item.factory_number,
@@ -952,7 +1002,7 @@ def export_assemblies(
                 json.dumps(item.meta_data or {}, ensure_ascii=False) if item.meta_data else "",
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -1051,17 +1101,16 @@ def export_equipment_types(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(EquipmentType).options(
-        selectinload(EquipmentType.manufacturer).selectinload(Manufacturer.parent),
-        selectinload(EquipmentType.equipment_category).selectinload(EquipmentCategory.parent),
-    )
+    query = select(EquipmentType)
     if not include_deleted:
         query = query.where(EquipmentType.is_deleted == False)
     if manufacturer_id is not None:
         query = query.where(EquipmentType.manufacturer_id == manufacturer_id)
     query = apply_search(query, q, [EquipmentType.name, EquipmentType.nomenclature_number])
     query = apply_sort(query, EquipmentType, sort)
-    items = db.scalars(query).all()
+    manufacturer_paths = hierarchy.full_paths(db, Manufacturer)
+    category_paths = hierarchy.full_paths(db, EquipmentCategory)
+    items = stream_export_rows(db, query)
     return build_export_response(
         filename_prefix="equipment-types",
         file_format=format,
@@ -1098,13 +1147,13 @@ def export_equipment_types(
             "unit_price_rub",
             "meta_data_json",
         ],
-        rows=[
+        rows=(
             [
                 item.name,
                 item.article,
                 item.nomenclature_number,
-                item.manufacturer.full_path if item.manufacturer else "",
-                item.equipment_category.full_path if item.equipment_category else "",
+                manufacturer_paths.get(item.manufacturer_id, ""),
+                category_paths.get(item.equipment_category_id, ""),
                 item.role_in_power_chain,
                 item.current_type,
                 item.supply_voltage,
@@ -1133,7 +1182,7 @@ def export_equipment_types(
                 json.dumps(item.meta_data or {}, ensure_ascii=False) if item.meta_data else "",
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -1283,12 +1332,12 @@ def export_users(
     query = apply_alphabet_filter(query, User.username, username_alphabet)
     query = apply_search(query, q, [User.username])
     query = apply_sort(query, User, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     return build_export_response(
         filename_prefix="users",
         file_format=format,
         headers=["username", "role", "password"],
-        rows=[[item.username, item.role, ""] for item in items],
+        rows=([item.username, item.role, ""] for item in items),
     )
 
 
@@ -1386,7 +1435,7 @@ def export_personnel(
         [Personnel.first_name, Personnel.last_name, Personnel.middle_name, Personnel.position, Personnel.personnel_number],
     )
     query = apply_sort(query, Personnel, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     return build_export_response(
         filename_prefix="personnel",
         file_format=format,
@@ -1410,7 +1459,7 @@ def export_personnel(
             "phone",
             "notes",
         ],
-        rows=[
+        rows=(
             [
                 item.user.username if item.user else "",
                 item.schedule_template.label if item.schedule_template else "",
@@ -1432,7 +1481,7 @@ def export_personnel(
                 item.notes,
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -1553,12 +1602,12 @@ def export_personnel_competencies(
     query = select(PersonnelCompetency).where(PersonnelCompetency.personnel_id == person_id)
     if not include_deleted:
         query = query.where(PersonnelCompetency.is_deleted == False)
-    items = db.scalars(query.order_by(PersonnelCompetency.id)).all()
+    items = stream_export_rows(db, query.order_by(PersonnelCompetency.id))
     return build_export_response(
         filename_prefix=f"personnel-{person_id}-competencies",
         file_format=format,
         headers=["name", "organisation", "city", "completion_date"],
-        rows=[[item.name, item.organisation, item.city, item.completion_date] for item in items],
+        rows=([item.name, item.organisation, item.city, item.completion_date] for item in items),
     )
 
 
@@ -1641,12 +1690,12 @@ def export_personnel_trainings(
     query = select(PersonnelTraining).where(PersonnelTraining.personnel_id == person_id)
     if not include_deleted:
         query = query.where(PersonnelTraining.is_deleted == False)
-    items = db.scalars(query.order_by(PersonnelTraining.id)).all()
+    items = stream_export_rows(db, query.order_by(PersonnelTraining.id))
     return build_export_response(
         filename_prefix=f"personnel-{person_id}-trainings",
         file_format=format,
         headers=["name", "completion_date", "next_due_date", "reminder_offset_days"],
-        rows=[[item.name, item.completion_date, item.next_due_date, item.reminder_offset_days] for item in items],
+        rows=([item.name, item.completion_date, item.next_due_date, item.reminder_offset_days] for item in items),
     )
 
 
@@ -1746,16 +1795,16 @@ def export_vlans(
         query = query.order_by(column.desc() if sort.startswith("-") else column.asc())
     else:
         query = query.order_by(Vlan.vlan_number.asc())
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
     return build_export_response(
         filename_prefix="ipam-vlans",
         file_format=format,
         headers=["vlan_number", "name", "purpose", "description", "location_full_path", "is_active"],
-        rows=[
+        rows=(
             [item.vlan_number, item.name, item.purpose, item.description, location_by_id.get(item.location_id, ""), item.is_active]
             for item in items
-        ],
+        ),
     )
 
 
@@ -1854,14 +1903,14 @@ def export_subnets(
         query = query.order_by(column.desc() if sort.startswith("-") else column.asc())
     else:
         query = query.order_by(Subnet.network_address.asc())
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
     vlan_by_id = {item.id: item for item in db.scalars(select(Vlan)).all()}
     return build_export_response(
         filename_prefix="ipam-subnets",
         file_format=format,
         headers=["cidr", "vlan_number", "gateway_ip", "name", "description", "location_full_path", "vrf", "is_active"],
-        rows=[
+        rows=(
             [
                 item.cidr,
                 vlan_by_id[item.vlan_id].vlan_number if item.vlan_id and item.vlan_id in vlan_by_id else "",
@@ -1873,7 +1922,7 @@ def export_subnets(
                 item.is_active,
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -1976,7 +2025,7 @@ def export_warehouse_items(
         .outerjoin(Manufacturer, EquipmentType.manufacturer_id == Manufacturer.id)
         .outerjoin(EquipmentCategory, EquipmentType.equipment_category_id == EquipmentCategory.id)
         .options(
-            selectinload(WarehouseItem.equipment_type).selectinload(EquipmentType.manufacturer),
+            selectinload(WarehouseItem.equipment_type),
             selectinload(WarehouseItem.warehouse),
         )
     )
@@ -2001,8 +2050,9 @@ def export_warehouse_items(
             query = apply_search(query, q, [EquipmentType.name, Manufacturer.name, EquipmentCategory.name])
     if sort:
         query = apply_sort(query, WarehouseItem, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
+    manufacturer_paths = hierarchy.full_paths(db, Manufacturer)
     return build_export_response(
         filename_prefix="warehouse-items",
         file_format=format,
@@ -2015,18 +2065,18 @@ def export_warehouse_items(
             "quantity",
             "is_accounted",
         ],
-        rows=[
+        rows=(
             [
                 item.warehouse.name if item.warehouse else "",
                 location_by_id.get(item.warehouse.location_id if item.warehouse else None, ""),
                 item.equipment_type.nomenclature_number if item.equipment_type else "",
                 item.equipment_type.name if item.equipment_type else "",
-                item.equipment_type.manufacturer.full_path if item.equipment_type and item.equipment_type.manufacturer else "",
+                manufacturer_paths.get(item.equipment_type.manufacturer_id, "") if item.equipment_type else "",
                 item.quantity,
                 item.is_accounted,
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -2051,9 +2101,6 @@ def import_warehouse_items(
     db=Depends(get_db),
     current_user: User = Depends(require_write_access()),
 ):
-    headers, rows = _read_headers(file, format)
-    _ensure_headers(headers, ["warehouse_name", "equipment_type_nomenclature_number", "quantity"])
-    report = _report()
     _location_lookup, location_by_id = _build_location_lookup(db)
     equipment_type_lookup = _build_equipment_type_lookup(db)
     warehouse_lookup = {
@@ -2061,50 +2108,66 @@ def import_warehouse_items(
         for item in db.scalars(select(Warehouse)).all()
         if not item.is_deleted
     }
-    existing = {f"{item.warehouse_id}|{item.equipment_type_id}" for item in db.scalars(select(WarehouseItem)).all() if not item.is_deleted}
-    seen: set[str] = set()
-    pending: list[dict[str, Any]] = []
-
-    for row_index, row in enumerate(rows, start=2):
-        if is_blank_row(row):
-            continue
-        report.total_rows += 1
-        values = row_to_mapping(headers, row)
-        try:
-            warehouse_name_value = as_required_str(values.get("warehouse_name"), field="warehouse_name")
-            warehouse_key = f"{_normalized(warehouse_name_value)}|{_normalized(as_optional_str(values.get('warehouse_location_full_path')))}"
-            warehouse = warehouse_lookup.get(warehouse_key)
-            if warehouse is None:
-                raise ValueError("Warehouse not found")
-            equipment_type_value = equipment_type_lookup.get(_normalized(as_required_str(values.get("equipment_type_nomenclature_number"), field="equipment_type_nomenclature_number")))
-            if equipment_type_value is None:
-                raise ValueError("Equipment type not found")
-            key = f"{warehouse.id}|{equipment_type_value.id}"
-            if key in existing or key in seen:
+    seen: set[tuple[int, int]] = set()
+
+    def parse_chunk(db, chunk, report: ImportReport) -> ImportChunk:
+        parsed: list[tuple[int, tuple[int, int], dict[str, Any]]] = []
+        for row_index, values in chunk:
+            try:
+                warehouse_name_value = as_required_str(values.get("warehouse_name"), field="warehouse_name")
+                warehouse_key = f"{_normalized(warehouse_name_value)}|{_normalized(as_optional_str(values.get('warehouse_location_full_path')))}"
+                warehouse = warehouse_lookup.get(warehouse_key)
+                if warehouse is None:
+                    raise ValueError("Warehouse not found")
+                equipment_type_value = equipment_type_lookup.get(_normalized(as_required_str(values.get("equipment_type_nomenclature_number"), field="equipment_type_nomenclature_number")))
+                if equipment_type_value is None:
+                    raise ValueError("Equipment type not found")
+                parsed_is_accounted = as_optional_bool(values.get("is_accounted"))
+                quantity = as_optional_int(values.get("quantity")) or 0
+                if quantity < 0:
+                    raise ValueError("quantity must be >= 0")
+                parsed.append(
+                    (
+                        row_index,
+                        (warehouse.id, equipment_type_value.id),
+                        {
+                            "warehouse_id": warehouse.id,
+                            "equipment_type_id": equipment_type_value.id,
+                            "quantity": quantity,
+                            "is_accounted": True if parsed_is_accounted is None else bool(parsed_is_accounted),
+                        },
+                    )
+                )
+            except ValueError as exc:
+                _append_error(report, row=row_index, field=None, message=str(exc))
+
+        existing = _existing_item_rows(db, WarehouseItem, WarehouseItem.warehouse_id, [key for _row, key, _payload in parsed])
+        writes = ImportChunk()
+        for row_index, key, payload in parsed:
+            current = existing.get(key)
+            if key in seen or (current is not None and not current.is_deleted):
                 report.skipped_duplicates += 1
                 _append_warning(report, row=row_index, field="equipment_type_nomenclature_number", message="Duplicate warehouse item skipped")
                 continue
             seen.add(key)
-            parsed_is_accounted = as_optional_bool(values.get("is_accounted"))
-            pending.append(
-                {
-                    "warehouse_id": warehouse.id,
-                    "equipment_type_id": equipment_type_value.id,
-                    "quantity": as_optional_int(values.get("quantity")) or 0,
-                    "is_accounted": True if parsed_is_accounted is None else bool(parsed_is_accounted),
-                }
-            )
-        except ValueError as exc:
-            _append_error(report, row=row_index, field=None, message=str(exc))
-
-    report.created = len(pending)
-    if dry_run:
-        return report
-
-    for payload in pending:
-        warehouse_items_router.create_warehouse_item(WarehouseItemCreate(**payload), db, current_user)
-
-    return report
+            if current is not None:
+                writes.updates.append({"id": current.id, **payload, **RESTORED_VALUES})
+            else:
+                writes.inserts.append({**payload, "is_deleted": False})
+        return writes
+
+    return run_bulk_import(
+        db,
+        file=file,
+        file_format=format,
+        required_headers=["warehouse_name", "equipment_type_nomenclature_number", "quantity"],
+        model=WarehouseItem,
+        entity="warehouse_items",
+        actor_id=current_user.id,
+        parse_chunk=parse_chunk,
+        report=_report(),
+        dry_run=dry_run,
+    )
 
 
 @router.get("/cabinet-items/export")
@@ -2124,7 +2187,7 @@ def export_cabinet_items(
         .join(EquipmentType, CabinetItem.equipment_type_id == EquipmentType.id)
         .outerjoin(Manufacturer, EquipmentType.manufacturer_id == Manufacturer.id)
         .options(
-            selectinload(CabinetItem.equipment_type).selectinload(EquipmentType.manufacturer),
+            selectinload(CabinetItem.equipment_type),
             selectinload(CabinetItem.cabinet),
         )
     )
@@ -2143,8 +2206,9 @@ def export_cabinet_items(
             query = apply_search(query, q, [EquipmentType.name, Manufacturer.name])
     if sort:
         query = apply_sort(query, CabinetItem, sort)
-    items = db.scalars(query).all()
+    items = stream_export_rows(db, query)
     _location_lookup, location_by_id = _build_location_lookup(db)
+    manufacturer_paths = hierarchy.full_paths(db, Manufacturer)
     return build_export_response(
         filename_prefix="cabinet-items",
         file_format=format,
@@ -2157,18 +2221,18 @@ def export_cabinet_items(
             "manufacturer_full_path",
             "quantity",
         ],
-        rows=[
+        rows=(
             [
                 item.cabinet.name if item.cabinet else "",
                 item.cabinet.factory_number if item.cabinet else "",
                 location_by_id.get(item.cabinet.location_id if item.cabinet else None, ""),
                 item.equipment_type.nomenclature_number if item.equipment_type else "",
                 item.equipment_type.name if item.equipment_type else "",
-                item.equipment_type.manufacturer.full_path if item.equipment_type and item.equipment_type.manufacturer else "",
+                manufacturer_paths.get(item.equipment_type.manufacturer_id, "") if item.equipment_type else "",
                 item.quantity,
             ]
             for item in items
-        ],
+        ),
     )
 
 
@@ -2193,62 +2257,93 @@ def import_cabinet_items(
     db=Depends(get_db),
     current_user: User = Depends(require_write_access()),
 ):
-    headers, rows = _read_headers(file, format)
-    _ensure_headers(headers, ["cabinet_name", "equipment_type_nomenclature_number", "quantity"])
-    report = _report()
     _location_lookup, location_by_id = _build_location_lookup(db)
     equipment_type_lookup = _build_equipment_type_lookup(db)
+    equipment_type_by_id = {item.id: item for item in equipment_type_lookup.values()}
     cabinet_lookup = {
         "|".join([_normalized(item.name), _normalized(item.factory_number), _normalized(location_by_id.get(item.location_id, ""))]): item
         for item in db.scalars(select(Cabinet)).all()
         if not item.is_deleted
     }
-    existing = {f"{item.cabinet_id}|{item.equipment_type_id}" for item in db.scalars(select(CabinetItem)).all() if not item.is_deleted}
-    seen: set[str] = set()
-    pending: list[dict[str, Any]] = []
-
-    for row_index, row in enumerate(rows, start=2):
-        if is_blank_row(row):
-            continue
-        report.total_rows += 1
-        values = row_to_mapping(headers, row)
-        try:
-            cabinet_name_value = as_required_str(values.get("cabinet_name"), field="cabinet_name")
-            cabinet_key = "|".join([
-                _normalized(cabinet_name_value),
-                _normalized(as_optional_str(values.get("cabinet_factory_number"))),
-                _normalized(as_optional_str(values.get("cabinet_location_full_path"))),
-            ])
-            cabinet = cabinet_lookup.get(cabinet_key)
-            if cabinet is None:
-                raise ValueError("Cabinet not found")
-            equipment_type_value = equipment_type_lookup.get(_normalized(as_required_str(values.get("equipment_type_nomenclature_number"), field="equipment_type_nomenclature_number")))
-            if equipment_type_value is None:
-                raise ValueError("Equipment type not found")
-            key = f"{cabinet.id}|{equipment_type_value.id}"
-            if key in existing or key in seen:
+    seen: set[tuple[int, int]] = set()
+
+    def parse_chunk(db, chunk, report: ImportReport) -> ImportChunk:
+        parsed: list[tuple[int, tuple[int, int], dict[str, Any]]] = []
+        for row_index, values in chunk:
+            try:
+                cabinet_name_value = as_required_str(values.get("cabinet_name"), field="cabinet_name")
+                cabinet_key = "|".join([
+                    _normalized(cabinet_name_value),
+                    _normalized(as_optional_str(values.get("cabinet_factory_number"))),
+                    _normalized(as_optional_str(values.get("cabinet_location_full_path"))),
+                ])
+                cabinet = cabinet_lookup.get(cabinet_key)
+                if cabinet is None:
+                    raise ValueError("Cabinet not found")
+                equipment_type_value = equipment_type_lookup.get(_normalized(as_required_str(values.get("equipment_type_nomenclature_number"), field="equipment_type_nomenclature_number")))
+                if equipment_type_value is None:
+                    raise ValueError("Equipment type not found")
+                quantity = as_optional_int(values.get("quantity")) or 0
+                if quantity < 0:
+                    raise ValueError("quantity must be >= 0")
+                parsed.append(
+                    (
+                        row_index,
+                        (cabinet.id, equipment_type_value.id),
+                        {
+                            "cabinet_id": cabinet.id,
+                            "equipment_type_id": equipment_type_value.id,
+                            "quantity": normalize_operation_quantity(equipment_type_value, quantity),
+                        },
+                    )
+                )
+            except ValueError as exc:
+                _append_error(report, row=row_index, field=None, message=str(exc))
+
+        existing = _existing_item_rows(db, CabinetItem, CabinetItem.cabinet_id, [key for _row, key, _payload in parsed])
+        writes = ImportChunk()
+        for row_index, key, payload in parsed:
+            current = existing.get(key)
+            if key in seen or (current is not None and not current.is_deleted):
                 report.skipped_duplicates += 1
                 _append_warning(report, row=row_index, field="equipment_type_nomenclature_number", message="Duplicate cabinet item skipped")
                 continue
             seen.add(key)
-            pending.append(
-                {
-                    "cabinet_id": cabinet.id,
-                    "equipment_type_id": equipment_type_value.id,
-                    "quantity": as_optional_int(values.get("quantity")) or 0,
-                }
-            )
-        except ValueError as exc:
-            _append_error(report, row=row_index, field=None, message=str(exc))
-
-    report.created = len(pending)
-    if dry_run:
-        return report
-
-    for payload in pending:
-        cabinet_items_router.create_cabinet_item(CabinetItemCreate(**payload), db, current_user)
-
-    return report
+            if current is not None and not is_unique_equipment(equipment_type_by_id[key[1]]):
+                writes.updates.append({"id": current.id, **payload, **RESTORED_VALUES})
+            else:
+                writes.inserts.append({**payload, "is_deleted": False})
+        return writes
+
+    def materialize_item_children(db, writes: ImportChunk) -> None:
+        """IO signals of the rows just inserted, network interfaces of every row written."""
+        networked = [
+            row["id"] for row in writes.updates if equipment_type_by_id[row["equipment_type_id"]].network_ports
+        ]
+        if writes.inserted_ids:
+            for item_id, equipment_type_id in db.execute(
+                select(CabinetItem.id, CabinetItem.equipment_type_id).where(CabinetItem.id.in_(writes.inserted_ids))
+            ).all():
+                equipment_type = equipment_type_by_id[equipment_type_id]
+                if equipment_type.is_channel_forming:
+                    ensure_io_signals_for_equipment_in_operation(db, item_id)
+                if equipment_type.network_ports:
+                    networked.append(item_id)
+        sync_network_interfaces_for_items(db, "cabinet", networked)
+
+    return run_bulk_import(
+        db,
+        file=file,
+        file_format=format,
+        required_headers=["cabinet_name", "equipment_type_nomenclature_number", "quantity"],
+        model=CabinetItem,
+        entity="cabinet_items",
+        actor_id=current_user.id,
+        parse_chunk=parse_chunk,
+        report=_report(),
+        dry_run=dry_run,
+        after_write=materialize_item_children,
+    )
 
 
 
@@ -2368,10 +2463,10 @@ def import_io_signals(
         f"{_normalized(item.signal_type.value if hasattr(item.signal_type, 'value') else item.signal_type)}|{item.channel_index}": item
         for item in signals
     }
-    data_type_lookup = _build_tree_lookup(db.scalars(select(DataType).options(selectinload(DataType.parent))).all())
-    signal_kind_lookup = _build_tree_lookup(db.scalars(select(SignalTypeDictionary).options(selectinload(SignalTypeDictionary.parent))).all())
-    equipment_category_lookup = _build_tree_lookup(db.scalars(select(EquipmentCategory).options(selectinload(EquipmentCategory.parent))).all())
-    measurement_lookup = _build_tree_lookup(db.scalars(select(MeasurementUnit).options(selectinload(MeasurementUnit.parent))).all())
+    data_type_lookup = _build_tree_lookup(db, DataType, db.scalars(select(DataType).options(selectinload(DataType.parent))).all())
+    signal_kind_lookup = _build_tree_lookup(db, SignalTypeDictionary, db.scalars(select(SignalTypeDictionary).options(selectinload(SignalTypeDictionary.parent))).all())
+    equipment_category_lookup = _build_tree_lookup(db, EquipmentCategory, db.scalars(select(EquipmentCategory)).all())
+    measurement_lookup = _build_tree_lookup(db, MeasurementUnit, db.scalars(select(MeasurementUnit).options(selectinload(MeasurementUnit.parent))).all())
     seen: set[str] = set()
     pending: list[tuple[IOSignal, dict[str, Any]]] = []
 
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.core.audit import add_audit_log, model_to_dict
+from app.core import hierarchy
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.pagination import paginate
 from app.core.query import apply_date_filters, apply_search, apply_sort
@@ -24,13 +25,14 @@ router = APIRouter()
 MAX_DEPTH = 3
 
 
-def build_tree(items: list[EquipmentCategory]) -> list[EquipmentCategoryTreeNode]:
+def build_tree(db, items: list[EquipmentCategory]) -> list[EquipmentCategoryTreeNode]:
+    paths = hierarchy.full_paths(db, EquipmentCategory, [item.id for item in items])
     nodes = {
         item.id: EquipmentCategoryTreeNode(
             id=item.id,
             name=item.name,
             parent_id=item.parent_id,
-            full_path=item.full_path,
+            full_path=paths.get(item.id, item.name),
             is_deleted=item.is_deleted,
             children=[],
         )
@@ -57,17 +59,10 @@ def ensure_unique_name(db, name: str, parent_id: int | None, exclude_id: int | N
         raise HTTPException(status_code=400, detail="Equipment category already exists")
 
 
-def compute_depth(parent: EquipmentCategory | None) -> int:
-    depth = 1
-    current = parent
-    seen: set[int] = set()
-    while current is not None:
-        if current.id in seen:
-            raise HTTPException(status_code=400, detail="Parent cycle detected")
-        seen.add(current.id)
-        current = current.parent
-        depth += 1
-    return depth
+def compute_depth(db, parent: EquipmentCategory | None) -> int:
+    if parent is None:
+        return 1
+    return hierarchy.node_depth(db, EquipmentCategory, parent.id) + 1
 
 
 def resolve_parent(db, parent_id: int | None, node_id: int | None = None) -> EquipmentCategory | None:
@@ -83,45 +78,25 @@ def resolve_parent(db, parent_id: int | None, node_id: int | None = None) -> Equ
     if node_id is not None and parent.id == node_id:
         raise HTTPException(status_code=400, detail="Node cannot be its own parent")
 
-    current = parent
-    seen: set[int] = set()
-    while current is not None:
-        if current.id in seen or (node_id is not None and current.id == node_id):
-            raise HTTPException(status_code=400, detail="Parent cycle detected")
-        seen.add(current.id)
-        current = current.parent
+    if node_id is not None and hierarchy.is_in_subtree(db, EquipmentCategory, parent.id, node_id):
+        raise HTTPException(status_code=400, detail="Parent cycle detected")
 
-    if compute_depth(parent) > MAX_DEPTH:
+    if compute_depth(db, parent) > MAX_DEPTH:
         raise HTTPException(status_code=400, detail="Equipment category depth exceeds limit")
     return parent
 
 
-def collect_subtree_ids(db, root_id: int) -> list[int]:
-    items = db.scalars(select(EquipmentCategory)).all()
-    children_map: dict[int | None, list[int]] = {}
-    for item in items:
-        children_map.setdefault(item.parent_id, []).append(item.id)
-
-    result: list[int] = []
-    stack = [root_id]
-    while stack:
-        current = stack.pop()
-        result.append(current)
-        stack.extend(children_map.get(current, []))
-    return result
-
-
 @router.get("/tree", response_model=list[EquipmentCategoryTreeNode])
 def get_equipment_categories_tree(
     include_deleted: bool = False,
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(EquipmentCategory).options(selectinload(EquipmentCategory.parent))
+    query = select(EquipmentCategory)
     if not include_deleted:
         query = query.where(EquipmentCategory.is_deleted == False)
     items = db.scalars(query.order_by(EquipmentCategory.parent_id, EquipmentCategory.name, EquipmentCategory.id)).all()
-    return build_tree(items)
+    return build_tree(db, items)
 
 
 @router.get("/", response_model=Pagination[EquipmentCategoryOut])
@@ -140,7 +115,7 @@ def list_equipment_categories(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(EquipmentCategory).options(selectinload(EquipmentCategory.parent))
+    query = select(EquipmentCategory)
     if is_deleted is None:
         if not include_deleted:
             query = query.where(EquipmentCategory.is_deleted == False)
@@ -154,6 +129,7 @@ def list_equipment_categories(
     query = apply_sort(query, EquipmentCategory, sort)
 
     total, items = paginate(query, db, page, page_size)
+    hierarchy.attach_full_paths(db, EquipmentCategory, items)
     return Pagination(items=items, page=page, page_size=page_size, total=total)
 
 
@@ -174,6 +150,7 @@ def get_equipment_category(
     category = db.scalar(query)
     if not category:
         raise HTTPException(status_code=404, detail="Equipment category not found")
+    hierarchy.attach_full_paths(db, EquipmentCategory, [category])
     return category
 
 
@@ -184,7 +161,7 @@ def create_equipment_category(
     current_user: User = Depends(require_write_access()),
 ):
     parent = resolve_parent(db, payload.parent_id)
-    if parent is not None and compute_depth(parent) + 1 > MAX_DEPTH:
+    if parent is not None and compute_depth(db, parent) + 1 > MAX_DEPTH:
         raise HTTPException(status_code=400, detail="Equipment category depth exceeds limit")
     ensure_unique_name(db, payload.name, payload.parent_id)
 
@@ -204,6 +181,7 @@ def create_equipment_category(
 
     db.commit()
     db.refresh(category)
+    hierarchy.attach_full_paths(db, EquipmentCategory, [category])
     return category
 
 
@@ -226,7 +204,7 @@ def update_equipment_category(
     target_parent_id = category.parent_id
     if "parent_id" in data:
         parent = resolve_parent(db, data["parent_id"], node_id=category_id)
-        if parent is not None and compute_depth(parent) + 1 > MAX_DEPTH:
+        if parent is not None and compute_depth(db, parent) + 1 > MAX_DEPTH:
             raise HTTPException(status_code=400, detail="Equipment category depth exceeds limit")
         target_parent_id = data["parent_id"]
 
@@ -250,6 +228,7 @@ def update_equipment_category(
 
     db.commit()
     db.refresh(category)
+    hierarchy.attach_full_paths(db, EquipmentCategory, [category])
     return category
 
 
@@ -273,8 +252,7 @@ def delete_equipment_category(
     if not category:
         raise HTTPException(status_code=404, detail="Equipment category not found")
 
-    subtree_ids = collect_subtree_ids(db, category_id)
-    items = db.scalars(select(EquipmentCategory).where(EquipmentCategory.id.in_(subtree_ids))).all()
+    items = hierarchy.descendants(db, EquipmentCategory, category_id, include_self=True)
     before = model_to_dict(category)
     for item in items:
         item.is_deleted = True
@@ -308,19 +286,12 @@ def restore_equipment_category(
         raise HTTPException(status_code=404, detail="Equipment category not found")
 
     before = model_to_dict(category)
-    ancestors: list[EquipmentCategory] = []
-    current = category.parent
-    while current is not None:
-        ancestors.append(current)
-        current = current.parent
-
-    for item in reversed(ancestors):
+    for item in hierarchy.ancestors(db, EquipmentCategory, category.id):
         item.is_deleted = False
         item.deleted_at = None
         item.deleted_by_id = None
 
-    subtree_ids = collect_subtree_ids(db, category_id)
-    items = db.scalars(select(EquipmentCategory).where(EquipmentCategory.id.in_(subtree_ids))).all()
+    items = hierarchy.descendants(db, EquipmentCategory, category_id, include_self=True)
     for item in items:
         item.is_deleted = False
         item.deleted_at = None
@@ -338,4 +309,5 @@ def restore_equipment_category(
 
     db.commit()
     db.refresh(category)
+    hierarchy.attach_full_paths(db, EquipmentCategory, [category])
     return category
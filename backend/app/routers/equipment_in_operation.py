@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select, func, union_all, literal, or_, not_
 
 from app.core.dependencies import get_db, require_read_access
+from app.core.hierarchy import subtree_ids
 from app.models.operations import CabinetItem, AssemblyItem
 from app.models.core import Cabinet, EquipmentType, Manufacturer, Location
 from app.models.assemblies import Assembly
@@ -19,22 +20,10 @@ from app.services.location_paths import LocationContext, load_location_context
 router = APIRouter()
 
 
-def get_location_scope_ids(location_id: int | None, context: LocationContext) -> list[int] | None:
-    if not location_id or location_id not in context.locations_map:
+def get_location_scope_ids(db, location_id: int | None) -> list[int] | None:
+    if not location_id:
         return None
-
-    scope_ids: list[int] = []
-    stack = [location_id]
-    seen: set[int] = set()
-    while stack:
-        current_id = stack.pop()
-        if current_id in seen:
-            continue
-        seen.add(current_id)
-        scope_ids.append(current_id)
-        stack.extend(context.children_by_parent.get(current_id, []))
-
-    return scope_ids
+    return subtree_ids(db, Location, location_id) or None
 
 
 def build_cabinet_items_query(
@@ -397,7 +386,7 @@ def build_container_rows(
     updated_at_from: datetime | None,
     updated_at_to: datetime | None,
 ) -> list[dict]:
-    location_scope_ids = get_location_scope_ids(location_id, context)
+    location_scope_ids = get_location_scope_ids(db, location_id)
 
     cabinet_rows = db.execute(
         build_cabinet_items_query(
@@ -660,8 +649,7 @@ def list_equipment_in_operation(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    context = load_location_context(db)
-    location_scope_ids = get_location_scope_ids(location_id, context)
+    location_scope_ids = get_location_scope_ids(db, location_id)
 
     cabinet_query = build_cabinet_items_query(
         q=q,
@@ -711,6 +699,7 @@ def list_equipment_in_operation(
     query = query.offset((page - 1) * page_size).limit(page_size)
 
     rows = db.execute(query).all()
+    context = load_location_context(db, [row._mapping.get("location_id") for row in rows])
     items = serialize_item_rows(rows, context)
 
     return Pagination(items=items, page=page, page_size=page_size, total=total)
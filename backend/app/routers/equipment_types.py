@@ -18,6 +18,7 @@ from app.schemas.equipment_types import (
     NETWORK_PORT_TYPES,
     NETWORK_PORT_TYPES_WITH_LEGACY,
 )
+from app.services.ipam import sync_network_interfaces_for_equipment_type
 
 router = APIRouter()
 POWER_ROLES = {"source", "consumer", "converter", "passive"}
@@ -503,6 +504,9 @@ def update_equipment_type(
     if meta_data_provided or unit_price_provided:
         base_meta = payload.meta_data if meta_data_provided else equipment.meta_data
         equipment.meta_data = merge_unit_price(base_meta, payload.unit_price_rub, fields_set)
+    if equipment.network_ports != before.get("network_ports"):
+        db.flush()
+        sync_network_interfaces_for_equipment_type(db, equipment.id)
 
     add_audit_log(
         db,
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, case
 
+from app.core import hierarchy
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.audit import add_audit_log, model_to_dict
 from app.models.io import IOSignal, SignalType
@@ -43,37 +44,20 @@ def build_data_type_full_path(item_id: int | None, items_map: dict[int, DataType
     return " / ".join(reversed(parts))
 
 
-def build_equipment_category_full_path(
-    item_id: int | None, items_map: dict[int, EquipmentCategory]
-) -> str | None:
-    if not item_id or item_id not in items_map:
-        return None
-    parts: list[str] = []
-    current_id: int | None = item_id
-    seen: set[int] = set()
-    while current_id and current_id in items_map and current_id not in seen:
-        item = items_map[current_id]
-        parts.append(item.name)
-        seen.add(current_id)
-        current_id = item.parent_id
-    return " / ".join(reversed(parts))
-
-
 def attach_lookup_paths(items: list[IOSignal], db) -> None:
     units = db.scalars(select(MeasurementUnit)).all()
     units_map = {unit.id: unit for unit in units}
     data_types = db.scalars(select(DataType)).all()
     data_types_map = {item.id: item for item in data_types}
-    equipment_categories = db.scalars(select(EquipmentCategory)).all()
-    equipment_categories_map = {item.id: item for item in equipment_categories}
+    equipment_category_paths = hierarchy.full_paths(
+        db, EquipmentCategory, [item.equipment_category_id for item in items]
+    )
     for item in items:
         item.measurement_unit_full_path = build_measurement_unit_full_path(
             item.measurement_unit_id, units_map
         )
         item.data_type_full_path = build_data_type_full_path(item.data_type_id, data_types_map)
-        item.equipment_category_full_path = build_equipment_category_full_path(
-            item.equipment_category_id, equipment_categories_map
-        )
+        item.equipment_category_full_path = equipment_category_paths.get(item.equipment_category_id)
 
 
 @router.post("/rebuild")
@@ -2,18 +2,21 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
 from app.core.audit import add_audit_log, model_to_dict
 from app.core.dependencies import get_db, require_admin, require_read_access, require_write_access
-from app.core.pagination import paginate
+from app.core.pagination import PagingMode, TotalMode, paginate, paginate_keyset
 from app.models.ipam import IPAddressAuditLog, Subnet, Vlan
 from app.models.security import User
-from app.schemas.common import Pagination
+from app.schemas.common import CursorPagination, Pagination
 from app.schemas.ipam import (
+    AddressAllocationOut,
+    AddressAllocationRequest,
     AddressGridResponse,
     EligibleEquipmentOut,
     HostEquipmentTreeNode,
@@ -31,16 +34,19 @@ from app.schemas.ipam import (
     VlanUpdate,
 )
 from app.services.ipam import (
+    AddressClaimConflict,
+    allocate_addresses,
     apply_assignment_to_record,
     build_host_equipment_tree,
     build_address_grid_response,
     create_subnet_from_calculator_payload,
     ensure_service_address_records,
     export_subnet_csv,
+    get_address_details_out,
     get_ip_record_for_offset,
     get_subnet_or_404,
-    list_eligible_equipment,
     release_ip_record,
+    search_eligible_equipment,
     subnet_to_out,
     validate_ip_in_subnet,
     validate_subnet_cidr,
@@ -48,6 +54,8 @@ from app.services.ipam import (
 
 router = APIRouter()
 
+ALLOCATION_ATTEMPTS = 5
+
 
 @router.get("/vlans", response_model=Pagination[VlanOut])
 def list_vlans(
@@ -300,21 +308,29 @@ def get_subnet_addresses(
     page: int = 1,
     page_size: int = 100,
     sort: str | None = None,
+    window_start: int = Query(default=0, ge=0),
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
     subnet = get_subnet_or_404(db, subnet_id)
-    return build_address_grid_response(db, subnet, q=q, status=status, mode=mode, include_service=include_service, page=page, page_size=page_size, sort=sort)
+    return build_address_grid_response(
+        db,
+        subnet,
+        q=q,
+        status=status,
+        mode=mode,
+        include_service=include_service,
+        page=page,
+        page_size=page_size,
+        sort=sort,
+        window_start=window_start,
+    )
 
 
 @router.get("/subnets/{subnet_id}/addresses/{offset}", response_model=IPAddressDetailsOut)
 def get_address_details(subnet_id: int, offset: int, db=Depends(get_db), user: User = Depends(require_read_access())):
     subnet = get_subnet_or_404(db, subnet_id)
-    response = build_address_grid_response(db, subnet, mode="grid", include_service=True)
-    for item in response.items:
-        if item.ip_offset == offset:
-            return item
-    raise HTTPException(status_code=404, detail="Address not found")
+    return get_address_details_out(db, subnet, offset)
 
 
 @router.patch("/subnets/{subnet_id}/addresses/{offset}", response_model=IPAddressDetailsOut)
@@ -402,6 +418,34 @@ def release_address(subnet_id: int, offset: int, db=Depends(get_db), current_use
     return get_address_details(subnet_id, offset, db, current_user)
 
 
+@router.post("/subnets/{subnet_id}/allocate", response_model=AddressAllocationOut)
+def allocate_subnet_addresses(
+    subnet_id: int,
+    payload: AddressAllocationRequest,
+    db=Depends(get_db),
+    current_user: User = Depends(require_write_access()),
+):
+    for _ in range(ALLOCATION_ATTEMPTS):
+        subnet = get_subnet_or_404(db, subnet_id)
+        try:
+            items = allocate_addresses(
+                db,
+                subnet,
+                payload.count,
+                actor_user_id=current_user.id,
+                contiguous=payload.contiguous,
+                reserve=payload.reserve,
+                hostname=payload.hostname,
+                comment=payload.comment,
+            )
+            db.commit()
+        except (IntegrityError, AddressClaimConflict):
+            db.rollback()
+            continue
+        return AddressAllocationOut(subnet_id=subnet_id, reserved=payload.reserve, items=items)
+    raise HTTPException(status_code=409, detail="Addresses were claimed concurrently, retry the allocation")
+
+
 @router.get("/subnets/{subnet_id}/export.csv")
 def export_subnet(subnet_id: int, db=Depends(get_db), user: User = Depends(require_read_access())):
     subnet = get_subnet_or_404(db, subnet_id)
@@ -409,10 +453,13 @@ def export_subnet(subnet_id: int, db=Depends(get_db), user: User = Depends(requi
     return StreamingResponse(buffer, media_type="text/csv", headers={"Content-Disposition": f'attachment; filename="subnet-{subnet.id}.csv"'})
 
 
-@router.get("/audit-logs", response_model=Pagination[IPAddressAuditLogOut])
+@router.get("/audit-logs", response_model=Pagination[IPAddressAuditLogOut] | CursorPagination[IPAddressAuditLogOut])
 def list_ipam_audit_logs(
     page: int = 1,
     page_size: int = 50,
+    paging: PagingMode = "offset",
+    cursor: str | None = None,
+    total_mode: TotalMode | None = None,
     subnet_id: int | None = None,
     ip_address: str | None = None,
     action: str | None = None,
@@ -435,6 +482,25 @@ def list_ipam_audit_logs(
         query = query.where(IPAddressAuditLog.created_at >= date_from)
     if date_to:
         query = query.where(IPAddressAuditLog.created_at <= date_to)
+    if paging == "cursor" or cursor:
+        keyset = paginate_keyset(
+            query,
+            db,
+            sort_column=IPAddressAuditLog.id,
+            id_column=IPAddressAuditLog.id,
+            descending=True,
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total_mode,
+        )
+        return CursorPagination(
+            items=keyset.items,
+            page_size=page_size,
+            next_cursor=keyset.next_cursor,
+            prev_cursor=keyset.prev_cursor,
+            total=keyset.total,
+            total_is_estimate=keyset.total_is_estimate,
+        )
     query = query.order_by(IPAddressAuditLog.id.desc())
     total, items = paginate(query, db, page, page_size)
     return Pagination(items=items, page=page, page_size=page_size, total=total)
@@ -442,6 +508,7 @@ def list_ipam_audit_logs(
 
 @router.get("/equipment/eligible", response_model=list[EligibleEquipmentOut])
 def get_eligible_equipment(
+    response: Response,
     q: str | None = None,
     cabinet_id: int | None = None,
     manufacturer_id: int | None = None,
@@ -449,10 +516,12 @@ def get_eligible_equipment(
     location_id: int | None = None,
     has_network_interfaces: bool = True,
     installed_only: bool = True,
+    page: int | None = Query(default=None, ge=1),
+    page_size: int = Query(default=100, ge=1, le=1000),
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    items = list_eligible_equipment(
+    total, items = search_eligible_equipment(
         db,
         q=q,
         cabinet_id=cabinet_id,
@@ -461,15 +530,19 @@ def get_eligible_equipment(
         location_id=location_id,
         has_network_interfaces=has_network_interfaces,
         installed_only=installed_only,
+        page=page,
+        page_size=page_size,
     )
-    db.commit()
+    response.headers["X-Total-Count"] = str(total)
     return items
 
 
 @router.get("/equipment/host-tree", response_model=list[HostEquipmentTreeNode])
 def get_host_equipment_tree(
     q: str | None = None,
+    parent_id: int | None = None,
+    lazy: bool = False,
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    return build_host_equipment_tree(db, q=q)
+    return build_host_equipment_tree(db, q=q, parent_id=parent_id, lazy=lazy or parent_id is not None)
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 
+from app.core import hierarchy
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.pagination import paginate
 from app.core.query import apply_search, apply_sort, apply_date_filters
@@ -126,6 +127,9 @@ def update_location(
     before = model_to_dict(location)
     data = payload.model_dump(exclude_unset=True)
 
+    if data.get("parent_id") is not None and hierarchy.is_in_subtree(db, Location, data["parent_id"], location_id):
+        raise HTTPException(status_code=400, detail="Parent cycle detected")
+
     if payload.name is not None:
         location.name = payload.name
     if "parent_id" in data:
@@ -5,6 +5,7 @@ from pathlib import Path
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy import select
 
+from app.core import hierarchy
 from app.core.audit import add_audit_log, model_to_dict
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.pagination import paginate
@@ -87,17 +88,8 @@ def resolve_parent(db, parent_id: int | None, node_id: int | None = None) -> Mai
     if node_id is not None and parent.id == node_id:
         raise HTTPException(status_code=400, detail="Node cannot be its own parent")
 
-    seen: set[int] = set()
-    current = parent
-    while current is not None:
-        if current.id in seen:
-            raise HTTPException(status_code=400, detail="Parent cycle detected")
-        seen.add(current.id)
-        if node_id is not None and current.id == node_id:
-            raise HTTPException(status_code=400, detail="Parent cycle detected")
-        if current.parent_id is None:
-            break
-        current = db.scalar(select(MainEquipment).where(MainEquipment.id == current.parent_id))
+    if node_id is not None and hierarchy.is_in_subtree(db, MainEquipment, parent.id, node_id):
+        raise HTTPException(status_code=400, detail="Parent cycle detected")
 
     return parent
 
@@ -238,13 +230,6 @@ def hydrate_main_equipment_symbol(item: MainEquipment) -> MainEquipment:
     return item
 
 
-def build_children_map(items: list[MainEquipment]) -> dict[int | None, list[MainEquipment]]:
-    children: dict[int | None, list[MainEquipment]] = {}
-    for item in items:
-        children.setdefault(item.parent_id, []).append(item)
-    return children
-
-
 def relevel_and_recode_subtree(
     db,
     node: MainEquipment,
@@ -254,16 +239,10 @@ def relevel_and_recode_subtree(
     new_code: str,
 ) -> None:
     level_delta = new_level - old_level
-    all_items = db.scalars(select(MainEquipment)).all()
-    children_map = build_children_map(all_items)
-
-    stack = list(children_map.get(node.id, []))
-    while stack:
-        child = stack.pop()
+    for child in hierarchy.descendants(db, MainEquipment, node.id):
         if child.code and child.code.startswith(f"{old_code}."):
             child.code = f"{new_code}{child.code[len(old_code):]}"
         child.level = child.level + level_delta
-        stack.extend(children_map.get(child.id, []))
 
 
 @router.get("/tree", response_model=list[MainEquipmentTreeNode])
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.core.audit import add_audit_log, model_to_dict
+from app.core import hierarchy
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.pagination import paginate
 from app.core.query import apply_date_filters, apply_search, apply_sort
@@ -39,14 +40,15 @@ def _normalize_name(value: str) -> str:
     return " ".join(value.split()).strip().casefold()
 
 
-def build_tree(items: list[Manufacturer]) -> list[ManufacturerTreeNode]:
+def build_tree(db, items: list[Manufacturer]) -> list[ManufacturerTreeNode]:
+    paths = hierarchy.full_paths(db, Manufacturer, [item.id for item in items])
     nodes = {
         item.id: ManufacturerTreeNode(
             id=item.id,
             name=item.name,
             country=item.country,
             parent_id=item.parent_id,
-            full_path=item.full_path,
+            full_path=paths.get(item.id, item.name),
             flag=item.flag,
             founded_year=item.founded_year,
             segment=item.segment,
@@ -78,17 +80,10 @@ def ensure_unique_name(db, name: str, parent_id: int | None, exclude_id: int | N
         raise HTTPException(status_code=400, detail="Manufacturer already exists")
 
 
-def compute_depth(parent: Manufacturer | None) -> int:
-    depth = 1
-    current = parent
-    seen: set[int] = set()
-    while current is not None:
-        if current.id in seen:
-            raise HTTPException(status_code=400, detail="Parent cycle detected")
-        seen.add(current.id)
-        current = current.parent
-        depth += 1
-    return depth
+def compute_depth(db, parent: Manufacturer | None) -> int:
+    if parent is None:
+        return 1
+    return hierarchy.node_depth(db, Manufacturer, parent.id) + 1
 
 
 def resolve_parent(db, parent_id: int | None, node_id: int | None = None) -> Manufacturer | None:
@@ -106,15 +101,10 @@ def resolve_parent(db, parent_id: int | None, node_id: int | None = None) -> Man
     if parent.parent_id is not None:
         raise HTTPException(status_code=400, detail="Manufacturers support only country -> brand hierarchy")
 
-    current = parent
-    seen: set[int] = set()
-    while current is not None:
-        if current.id in seen or (node_id is not None and current.id == node_id):
-            raise HTTPException(status_code=400, detail="Parent cycle detected")
-        seen.add(current.id)
-        current = current.parent
+    if node_id is not None and hierarchy.is_in_subtree(db, Manufacturer, parent.id, node_id):
+        raise HTTPException(status_code=400, detail="Parent cycle detected")
 
-    if compute_depth(parent) > MAX_DEPTH:
+    if compute_depth(db, parent) > MAX_DEPTH:
         raise HTTPException(status_code=400, detail="Manufacturer depth exceeds limit")
     return parent
 
@@ -150,32 +140,17 @@ def get_or_create_country_root(db, country_name: str) -> Manufacturer:
     return root
 
 
-def collect_subtree_ids(db, root_id: int) -> list[int]:
-    items = db.scalars(select(Manufacturer)).all()
-    children_map: dict[int | None, list[int]] = {}
-    for item in items:
-        children_map.setdefault(item.parent_id, []).append(item.id)
-
-    result: list[int] = []
-    stack = [root_id]
-    while stack:
-        current = stack.pop()
-        result.append(current)
-        stack.extend(children_map.get(current, []))
-    return result
-
-
 @router.get("/tree", response_model=list[ManufacturerTreeNode])
 def get_manufacturers_tree(
     include_deleted: bool = False,
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(Manufacturer).options(selectinload(Manufacturer.parent))
+    query = select(Manufacturer)
     if not include_deleted:
         query = query.where(Manufacturer.is_deleted == False)
     items = db.scalars(query.order_by(Manufacturer.parent_id, Manufacturer.country, Manufacturer.name, Manufacturer.id)).all()
-    return build_tree(items)
+    return build_tree(db, items)
 
 
 @router.get("/", response_model=Pagination[ManufacturerOut])
@@ -194,7 +169,7 @@ def list_manufacturers(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(Manufacturer).options(selectinload(Manufacturer.parent))
+    query = select(Manufacturer)
     if is_deleted is None:
         if not include_deleted:
             query = query.where(Manufacturer.is_deleted == False)
@@ -212,6 +187,7 @@ def list_manufacturers(
     query = apply_sort(query, Manufacturer, sort)
 
     total, items = paginate(query, db, page, page_size)
+    hierarchy.attach_full_paths(db, Manufacturer, items)
     return Pagination(items=items, page=page, page_size=page_size, total=total)
 
 
@@ -223,13 +199,14 @@ def export_manufacturers(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    query = select(Manufacturer).options(selectinload(Manufacturer.parent))
+    query = select(Manufacturer)
     if is_deleted is None:
         if not include_deleted:
             query = query.where(Manufacturer.is_deleted == False)
     else:
         query = query.where(Manufacturer.is_deleted == is_deleted)
     items = db.scalars(query.order_by(Manufacturer.parent_id, Manufacturer.country, Manufacturer.name)).all()
+    parent_paths = hierarchy.full_paths(db, Manufacturer, [item.parent_id for item in items])
     return build_export_response(
         filename_prefix="manufacturers",
         file_format=format,
@@ -247,7 +224,7 @@ def export_manufacturers(
             [
                 item.name,
                 item.country,
-                item.parent.full_path if item.parent else "",
+                parent_paths.get(item.parent_id, "") if item.parent_id else "",
                 item.flag,
                 item.founded_year,
                 item.segment,
@@ -304,8 +281,11 @@ def import_manufacturers(
         raise HTTPException(status_code=400, detail="Missing 'country' column")
 
     report = ImportReport(total_rows=0, created=0, updated=0, skipped_duplicates=0, errors=[], warnings=[])
-    existing_items = db.scalars(select(Manufacturer).options(selectinload(Manufacturer.parent))).all()
-    active_paths = {_normalize_name(item.full_path): item for item in existing_items if not item.is_deleted}
+    existing_items = db.scalars(select(Manufacturer)).all()
+    existing_paths = hierarchy.full_paths(db, Manufacturer)
+    active_paths = {
+        _normalize_name(existing_paths.get(item.id, item.name)): item for item in existing_items if not item.is_deleted
+    }
     seen_paths: set[str] = set()
     to_create: list[dict[str, object | None]] = []
 
@@ -335,7 +315,7 @@ def import_manufacturers(
                     ImportIssue(row=row_index, field="parent_full_path", message="Parent must be a country root")
                 )
                 continue
-            full_path = f"{parent.full_path} / {name}"
+            full_path = f"{parent.name} / {name}"
         else:
             full_path = name
 
@@ -351,6 +331,7 @@ def import_manufacturers(
                 "name": name,
                 "country": country,
                 "parent_full_path": parent_full_path,
+                "full_path": full_path,
                 "flag": as_optional_str(values.get("flag")),
                 "founded_year": as_optional_int(values.get("founded_year")),
                 "segment": as_optional_str(values.get("segment")),
@@ -386,7 +367,7 @@ def import_manufacturers(
                 ensure_unique_name(db, manufacturer.name, manufacturer.parent_id)
             db.add(manufacturer)
             db.flush()
-            active_paths[_normalize_name(manufacturer.full_path)] = manufacturer
+            active_paths[_normalize_name(str(item_data["full_path"]))] = manufacturer
             add_audit_log(
                 db,
                 actor_id=current_user.id,
@@ -418,6 +399,7 @@ def get_manufacturer(
     manufacturer = db.scalar(query)
     if not manufacturer:
         raise HTTPException(status_code=404, detail="Manufacturer not found")
+    hierarchy.attach_full_paths(db, Manufacturer, [manufacturer])
     return manufacturer
 
 
@@ -476,6 +458,7 @@ def create_manufacturer(
 
     db.commit()
     db.refresh(manufacturer)
+    hierarchy.attach_full_paths(db, Manufacturer, [manufacturer])
     return manufacturer
 
 
@@ -548,6 +531,7 @@ def update_manufacturer(
 
     db.commit()
     db.refresh(manufacturer)
+    hierarchy.attach_full_paths(db, Manufacturer, [manufacturer])
     return manufacturer
 
 
@@ -571,8 +555,7 @@ def delete_manufacturer(
     if not manufacturer:
         raise HTTPException(status_code=404, detail="Manufacturer not found")
 
-    subtree_ids = collect_subtree_ids(db, manufacturer_id)
-    items = db.scalars(select(Manufacturer).where(Manufacturer.id.in_(subtree_ids))).all()
+    items = hierarchy.descendants(db, Manufacturer, manufacturer_id, include_self=True)
     before = model_to_dict(manufacturer)
     for item in items:
         item.is_deleted = True
@@ -606,19 +589,12 @@ def restore_manufacturer(
         raise HTTPException(status_code=404, detail="Manufacturer not found")
 
     before = model_to_dict(manufacturer)
-    ancestors: list[Manufacturer] = []
-    current = manufacturer.parent
-    while current is not None:
-        ancestors.append(current)
-        current = current.parent
-
-    for item in reversed(ancestors):
+    for item in hierarchy.ancestors(db, Manufacturer, manufacturer.id):
         item.is_deleted = False
         item.deleted_at = None
         item.deleted_by_id = None
 
-    subtree_ids = collect_subtree_ids(db, manufacturer_id)
-    items = db.scalars(select(Manufacturer).where(Manufacturer.id.in_(subtree_ids))).all()
+    items = hierarchy.descendants(db, Manufacturer, manufacturer_id, include_self=True)
     for item in items:
         item.is_deleted = False
         item.deleted_at = None
@@ -636,4 +612,5 @@ def restore_manufacturer(
 
     db.commit()
     db.refresh(manufacturer)
+    hierarchy.attach_full_paths(db, Manufacturer, [manufacturer])
     return manufacturer
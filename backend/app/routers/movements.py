@@ -1,27 +1,33 @@
 ﻿from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import Integer, bindparam, column, insert, select, update, values
 
 from app.core.dependencies import get_db, require_read_access, require_write_access
-from app.core.pagination import paginate
-from app.core.query import apply_sort, apply_text_filter
+from app.core.pagination import PagingMode, TotalMode, paginate, paginate_keyset
+from app.core.query import apply_sort, apply_text_filter, resolve_sort
 from app.core.audit import add_audit_log, model_to_dict
 from app.models.movements import EquipmentMovement, MovementType
 from app.models.operations import WarehouseItem, CabinetItem, AssemblyItem
 from app.models.core import EquipmentType, Warehouse, Cabinet
 from app.models.assemblies import Assembly
 from app.models.security import User
-from app.schemas.common import Pagination
+from app.schemas.common import CursorPagination, Pagination
 from app.schemas.movements import (
     MovementBatchCreate,
     MovementCreate,
     MovementOut,
 )
+from app.services.dashboard_aggregates import record_item_delta
 from app.services.equipment_uniqueness import is_unique_equipment
-from app.services.io_signals import ensure_io_signals_for_equipment_in_operation
+from app.services.io_signals import create_io_signals_for_new_items
+from app.services.ipam import create_network_interfaces_for_new_items
 
 router = APIRouter()
 
+ITEM_SOURCES = {CabinetItem: "cabinet", AssemblyItem: "assembly"}
+
 
 def get_or_create_warehouse_item(db, warehouse_id: int, equipment_type_id: int, for_update: bool):
     query = select(WarehouseItem).where(
@@ -119,34 +125,37 @@ def list_unique_assembly_items_for_update(db, assembly_id: int, equipment_type_i
     return items
 
 
-def create_unique_cabinet_items(db, cabinet_id: int, equipment: EquipmentType, quantity: int):
-    items: list[CabinetItem] = []
-    for _ in range(quantity):
-        item = CabinetItem(
-            cabinet_id=cabinet_id,
-            equipment_type_id=equipment.id,
-            quantity=1,
+def insert_unique_items(db, model, parent_field: str, parent_id: int, equipment: EquipmentType, quantity: int) -> list[int]:
+    """
+    Create `quantity` single-unit rows of a unique equipment type with one
+    multi-row INSERT ... RETURNING, then generate the IO signals and network
+    interfaces of all of them in one INSERT each. Returns the new ids in
+    creation order.
+    """
+    table = model.__table__
+    item_ids = list(
+        db.scalars(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            [
+                {parent_field: parent_id, "equipment_type_id": equipment.id, "quantity": 1, "is_deleted": False}
+                for _ in range(quantity)
+            ],
         )
-        db.add(item)
-        db.flush()
-        if equipment.is_channel_forming:
-            ensure_io_signals_for_equipment_in_operation(db, item.id)
-        items.append(item)
-    return items
+    )
+    source = ITEM_SOURCES[model]
+    if model is CabinetItem and equipment.is_channel_forming:
+        create_io_signals_for_new_items(db, equipment, item_ids)
+    create_network_interfaces_for_new_items(db, equipment, source, item_ids)
+    record_item_delta(db, source, equipment.id, quantity)
+    return item_ids
 
 
-def create_unique_assembly_items(db, assembly_id: int, equipment: EquipmentType, quantity: int):
-    items: list[AssemblyItem] = []
-    for _ in range(quantity):
-        item = AssemblyItem(
-            assembly_id=assembly_id,
-            equipment_type_id=equipment.id,
-            quantity=1,
-        )
-        db.add(item)
-        db.flush()
-        items.append(item)
-    return items
+def create_unique_cabinet_items(db, cabinet_id: int, equipment: EquipmentType, quantity: int) -> list[int]:
+    return insert_unique_items(db, CabinetItem, "cabinet_id", cabinet_id, equipment, quantity)
+
+
+def create_unique_assembly_items(db, assembly_id: int, equipment: EquipmentType, quantity: int) -> list[int]:
+    return insert_unique_items(db, AssemblyItem, "assembly_id", assembly_id, equipment, quantity)
 
 
 def remove_unique_cabinet_items(
@@ -217,14 +226,72 @@ def resolve_movement_dependencies(db, payload: MovementCreate):
     return equipment_type, is_unique_equipment(equipment_type)
 
 
-def apply_movement_changes(
-    db,
-    payload: MovementCreate,
-    current_user: User,
-    equipment_type: EquipmentType,
-    equipment_is_unique: bool,
-):
-    movement = EquipmentMovement(
+WAREHOUSE = "warehouse"
+CABINET = "cabinet"
+ASSEMBLY = "assembly"
+
+# Stock tables in the order their rows are locked by batches.
+STOCK_TARGETS = {
+    WAREHOUSE: (WarehouseItem, WarehouseItem.warehouse_id),
+    CABINET: (CabinetItem, CabinetItem.cabinet_id),
+    ASSEMBLY: (AssemblyItem, AssemblyItem.assembly_id),
+}
+STOCK_LOCK_ORDER = {kind: index for index, kind in enumerate(STOCK_TARGETS)}
+
+
+def movement_deltas(payload: MovementCreate) -> list[tuple[str, int, int]]:
+    """
+    Stock changes made by `payload` as `(target kind, target id, signed
+    quantity)`, in the order the single-movement path applies them.
+    """
+    movement_type = MovementType(payload.movement_type)
+    quantity = payload.quantity
+    if movement_type in (MovementType.inbound, MovementType.to_warehouse):
+        return [(WAREHOUSE, payload.to_warehouse_id, quantity)]
+    if movement_type == MovementType.transfer:
+        return [(WAREHOUSE, payload.from_warehouse_id, -quantity), (WAREHOUSE, payload.to_warehouse_id, quantity)]
+    if movement_type == MovementType.to_cabinet:
+        return [(WAREHOUSE, payload.from_warehouse_id, -quantity), (CABINET, payload.to_cabinet_id, quantity)]
+    if movement_type == MovementType.from_cabinet:
+        return [(CABINET, payload.from_cabinet_id, -quantity), (WAREHOUSE, payload.to_warehouse_id, quantity)]
+    if movement_type == MovementType.direct_to_cabinet:
+        return [(CABINET, payload.to_cabinet_id, quantity)]
+    if movement_type == MovementType.to_assembly:
+        return [(WAREHOUSE, payload.from_warehouse_id, -quantity), (ASSEMBLY, payload.to_assembly_id, quantity)]
+    if movement_type == MovementType.direct_to_assembly:
+        return [(ASSEMBLY, payload.to_assembly_id, quantity)]
+    if movement_type == MovementType.writeoff:
+        if payload.from_warehouse_id and payload.from_cabinet_id:
+            raise HTTPException(status_code=400, detail="Choose warehouse or cabinet for writeoff")
+        if payload.from_warehouse_id:
+            return [(WAREHOUSE, payload.from_warehouse_id, -quantity)]
+        return [(CABINET, payload.from_cabinet_id, -quantity)]
+    if movement_type == MovementType.adjustment:
+        targets = [
+            (WAREHOUSE, payload.from_warehouse_id, -quantity),
+            (CABINET, payload.from_cabinet_id, -quantity),
+            (WAREHOUSE, payload.to_warehouse_id, quantity),
+            (CABINET, payload.to_cabinet_id, quantity),
+            (ASSEMBLY, payload.to_assembly_id, quantity),
+        ]
+        deltas = [target for target in targets if target[1] is not None]
+        if len(deltas) != 1:
+            raise HTTPException(status_code=400, detail="Adjustment requires exactly one target")
+        return deltas
+    return []
+
+
+GET_OR_CREATE_ITEM = {
+    WAREHOUSE: get_or_create_warehouse_item,
+    CABINET: get_or_create_cabinet_item,
+    ASSEMBLY: get_or_create_assembly_item,
+}
+CREATE_UNIQUE_ITEMS = {CABINET: create_unique_cabinet_items, ASSEMBLY: create_unique_assembly_items}
+REMOVE_UNIQUE_ITEMS = {CABINET: remove_unique_cabinet_items, ASSEMBLY: remove_unique_assembly_items}
+
+
+def build_movement(payload: MovementCreate, current_user: User) -> EquipmentMovement:
+    return EquipmentMovement(
         movement_type=MovementType(payload.movement_type),
         equipment_type_id=payload.equipment_type_id,
         quantity=payload.quantity,
@@ -238,119 +305,27 @@ def apply_movement_changes(
         performed_by_id=current_user.id,
     )
 
-    if movement.movement_type == MovementType.inbound:
-        to_item = get_or_create_warehouse_item(db, payload.to_warehouse_id, payload.equipment_type_id, True)
-        change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.to_warehouse:
-        to_item = get_or_create_warehouse_item(db, payload.to_warehouse_id, payload.equipment_type_id, True)
-        if payload.is_accounted is not None:
-            to_item.is_accounted = payload.is_accounted
-        change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.transfer:
-        from_item = get_or_create_warehouse_item(db, payload.from_warehouse_id, payload.equipment_type_id, True)
-        to_item = get_or_create_warehouse_item(db, payload.to_warehouse_id, payload.equipment_type_id, True)
-        change_quantity(from_item, -payload.quantity)
-        change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.to_cabinet:
-        from_item = get_or_create_warehouse_item(db, payload.from_warehouse_id, payload.equipment_type_id, True)
-        change_quantity(from_item, -payload.quantity)
-        if equipment_is_unique:
-            create_unique_cabinet_items(db, payload.to_cabinet_id, equipment_type, payload.quantity)
-        else:
-            to_item = get_or_create_cabinet_item(db, payload.to_cabinet_id, payload.equipment_type_id, True)
-            change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.from_cabinet:
-        to_item = get_or_create_warehouse_item(db, payload.to_warehouse_id, payload.equipment_type_id, True)
-        if equipment_is_unique:
-            remove_unique_cabinet_items(
-                db,
-                payload.from_cabinet_id,
-                payload.equipment_type_id,
-                payload.quantity,
-                current_user.id,
-            )
-        else:
-            from_item = get_or_create_cabinet_item(db, payload.from_cabinet_id, payload.equipment_type_id, True)
-            change_quantity(from_item, -payload.quantity)
-        change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.direct_to_cabinet:
-        if equipment_is_unique:
-            create_unique_cabinet_items(db, payload.to_cabinet_id, equipment_type, payload.quantity)
-        else:
-            to_item = get_or_create_cabinet_item(db, payload.to_cabinet_id, payload.equipment_type_id, True)
-            change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.to_assembly:
-        from_item = get_or_create_warehouse_item(db, payload.from_warehouse_id, payload.equipment_type_id, True)
-        change_quantity(from_item, -payload.quantity)
-        if equipment_is_unique:
-            create_unique_assembly_items(db, payload.to_assembly_id, equipment_type, payload.quantity)
-        else:
-            to_item = get_or_create_assembly_item(db, payload.to_assembly_id, payload.equipment_type_id, True)
-            change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.direct_to_assembly:
-        if equipment_is_unique:
-            create_unique_assembly_items(db, payload.to_assembly_id, equipment_type, payload.quantity)
-        else:
-            to_item = get_or_create_assembly_item(db, payload.to_assembly_id, payload.equipment_type_id, True)
-            change_quantity(to_item, payload.quantity)
-    elif movement.movement_type == MovementType.writeoff:
-        if payload.from_warehouse_id and payload.from_cabinet_id:
-            raise HTTPException(status_code=400, detail="Choose warehouse or cabinet for writeoff")
-        if payload.from_warehouse_id:
-            from_item = get_or_create_warehouse_item(db, payload.from_warehouse_id, payload.equipment_type_id, True)
-            change_quantity(from_item, -payload.quantity)
-        if payload.from_cabinet_id:
-            if equipment_is_unique:
-                remove_unique_cabinet_items(
-                    db,
-                    payload.from_cabinet_id,
-                    payload.equipment_type_id,
-                    payload.quantity,
-                    current_user.id,
-                )
-            else:
-                from_item = get_or_create_cabinet_item(db, payload.from_cabinet_id, payload.equipment_type_id, True)
-                change_quantity(from_item, -payload.quantity)
-    elif movement.movement_type == MovementType.adjustment:
-        ids = [
-            payload.from_warehouse_id,
-            payload.from_cabinet_id,
-            payload.to_warehouse_id,
-            payload.to_cabinet_id,
-            payload.to_assembly_id,
-        ]
-        if len([val for val in ids if val is not None]) != 1:
-            raise HTTPException(status_code=400, detail="Adjustment requires exactly one target")
-        if payload.from_warehouse_id:
-            from_item = get_or_create_warehouse_item(db, payload.from_warehouse_id, payload.equipment_type_id, True)
-            change_quantity(from_item, -payload.quantity)
-        if payload.from_cabinet_id:
-            if equipment_is_unique:
-                remove_unique_cabinet_items(
-                    db,
-                    payload.from_cabinet_id,
-                    payload.equipment_type_id,
-                    payload.quantity,
-                    current_user.id,
-                )
-            else:
-                from_item = get_or_create_cabinet_item(db, payload.from_cabinet_id, payload.equipment_type_id, True)
-                change_quantity(from_item, -payload.quantity)
-        if payload.to_warehouse_id:
-            to_item = get_or_create_warehouse_item(db, payload.to_warehouse_id, payload.equipment_type_id, True)
-            change_quantity(to_item, payload.quantity)
-        if payload.to_cabinet_id:
-            if equipment_is_unique:
-                create_unique_cabinet_items(db, payload.to_cabinet_id, equipment_type, payload.quantity)
-            else:
-                to_item = get_or_create_cabinet_item(db, payload.to_cabinet_id, payload.equipment_type_id, True)
-                change_quantity(to_item, payload.quantity)
-        if payload.to_assembly_id:
-            if equipment_is_unique:
-                create_unique_assembly_items(db, payload.to_assembly_id, equipment_type, payload.quantity)
+
+def apply_movement_changes(
+    db,
+    payload: MovementCreate,
+    current_user: User,
+    equipment_type: EquipmentType,
+    equipment_is_unique: bool,
+):
+    movement = build_movement(payload, current_user)
+
+    for kind, target_id, delta in movement_deltas(payload):
+        if kind != WAREHOUSE and equipment_is_unique:
+            if delta > 0:
+                CREATE_UNIQUE_ITEMS[kind](db, target_id, equipment_type, delta)
             else:
-                to_item = get_or_create_assembly_item(db, payload.to_assembly_id, payload.equipment_type_id, True)
-                change_quantity(to_item, payload.quantity)
+                REMOVE_UNIQUE_ITEMS[kind](db, target_id, payload.equipment_type_id, -delta, current_user.id)
+            continue
+        item = GET_OR_CREATE_ITEM[kind](db, target_id, payload.equipment_type_id, True)
+        if movement.movement_type == MovementType.to_warehouse and payload.is_accounted is not None:
+            item.is_accounted = payload.is_accounted
+        change_quantity(item, delta)
 
     db.add(movement)
     db.flush()
@@ -367,10 +342,229 @@ def apply_movement_changes(
     return movement
 
 
-@router.get("/", response_model=Pagination[MovementOut])
+def resolve_batch_dependencies(db, payload: MovementBatchCreate) -> dict[int, EquipmentType]:
+    """
+    Batch counterpart of `resolve_movement_dependencies`: one query per
+    referenced table instead of one per line and target.
+    """
+    equipment_type_ids = {item.equipment_type_id for item in payload.items}
+    equipment_types = {
+        item.id: item
+        for item in db.scalars(
+            select(EquipmentType).where(EquipmentType.id.in_(equipment_type_ids), EquipmentType.is_deleted == False)
+        ).all()
+    }
+    if len(equipment_types) != len(equipment_type_ids):
+        raise HTTPException(status_code=404, detail="Equipment type not found")
+
+    targets = (
+        (Warehouse, payload.from_warehouse_id, "Source warehouse not found"),
+        (Warehouse, payload.to_warehouse_id, "Destination warehouse not found"),
+        (Cabinet, payload.from_cabinet_id, "Source cabinet not found"),
+        (Cabinet, payload.to_cabinet_id, "Destination cabinet not found"),
+        (Assembly, payload.to_assembly_id, "Destination assembly not found"),
+    )
+    for model in (Warehouse, Cabinet, Assembly):
+        ids = {target_id for target_model, target_id, _detail in targets if target_model is model and target_id}
+        if not ids:
+            continue
+        found = set(db.scalars(select(model.id).where(model.id.in_(ids), model.is_deleted == False)).all())
+        for target_model, target_id, detail in targets:
+            if target_model is model and target_id and target_id not in found:
+                raise HTTPException(status_code=404, detail=detail)
+    return equipment_types
+
+
+def _add_quantities(db, model, rows: list[dict]) -> None:
+    """
+    `quantity += delta` for `[{"id": ..., "delta": ...}]`: a single
+    UPDATE ... FROM (VALUES ...) on PostgreSQL, an executemany elsewhere.
+    Bypasses the ORM, so `row_version` is bumped here.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    touched = {"row_version": table.c.row_version + 1}
+    if "last_updated" in table.c:
+        touched["last_updated"] = datetime.utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        deltas = values(column("id", Integer), column("delta", Integer), name="deltas").data(
+            [(row["id"], row["delta"]) for row in rows]
+        )
+        db.execute(
+            update(table)
+            .where(table.c.id == deltas.c.id)
+            .values(quantity=table.c.quantity + deltas.c.delta, **touched)
+        )
+    else:
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("item_id"))
+            .values(quantity=table.c.quantity + bindparam("delta"), **touched),
+            [{"item_id": row["id"], "delta": row["delta"]} for row in rows],
+        )
+
+
+def apply_stock_deltas(
+    db,
+    kind: str,
+    deltas: dict[tuple[int, int], int],
+    *,
+    accounted: dict[tuple[int, int], bool] | None = None,
+    lowest: dict[tuple[int, int], int] | None = None,
+) -> None:
+    """
+    Upsert the net `(target id, equipment type id) -> delta` changes of one
+    stock table. Existing rows are locked in key order, every resulting
+    quantity is checked before anything is written, then the table gets one
+    UPDATE for existing rows and one multi-row INSERT for new ones.
+
+    `lowest` holds the lowest running total of a key while its lines were
+    folded in order, so a row that would have gone negative part-way (e.g. a
+    transfer into the warehouse it leaves) is rejected like it is when the
+    lines are applied one by one.
+    """
+    if not deltas:
+        return
+    model, parent_column = STOCK_TARGETS[kind]
+    accounted = accounted or {}
+    lowest = lowest or {}
+    keys = sorted(deltas)
+    columns = [model.id, parent_column, model.equipment_type_id, model.quantity]
+    if kind == WAREHOUSE:
+        columns.append(model.is_accounted)
+    rows = db.execute(
+        select(*columns)
+        .where(
+            parent_column.in_({key[0] for key in keys}),
+            model.equipment_type_id.in_({key[1] for key in keys}),
+            model.is_deleted == False,
+        )
+        .order_by(parent_column, model.equipment_type_id, model.id)
+        .with_for_update()
+    ).all()
+    existing = {}
+    for row in rows:
+        existing.setdefault((row[1], row.equipment_type_id), row)
+
+    updates: list[dict] = []
+    inserts: list[dict] = []
+    for key in keys:
+        delta = deltas[key]
+        current = existing.get(key)
+        old_quantity = current.quantity if current is not None else 0
+        if old_quantity + min(delta, lowest.get(key, delta)) < 0:
+            raise HTTPException(status_code=409, detail="Insufficient quantity")
+        old_accounted = current.is_accounted if kind == WAREHOUSE and current is not None else True
+        new_accounted = accounted.get(key, old_accounted)
+        warehouse_id = key[0] if kind == WAREHOUSE else None
+        record_item_delta(db, kind, key[1], -old_quantity, warehouse_id=warehouse_id, is_accounted=old_accounted)
+        record_item_delta(db, kind, key[1], old_quantity + delta, warehouse_id=warehouse_id, is_accounted=new_accounted)
+        if current is not None:
+            updates.append({"id": current.id, "delta": delta})
+        else:
+            row = {parent_column.key: key[0], "equipment_type_id": key[1], "quantity": delta, "is_deleted": False}
+            if kind == WAREHOUSE:
+                row["is_accounted"] = new_accounted
+            inserts.append(row)
+
+    _add_quantities(db, model, updates)
+    if inserts:
+        db.execute(insert(model.__table__).values(inserts))
+    changed_flags = [
+        {"item_id": existing[key].id, "is_accounted": flag}
+        for key, flag in accounted.items()
+        if key in existing and existing[key].is_accounted != flag
+    ]
+    if changed_flags:
+        db.execute(
+            update(model.__table__)
+            .where(model.__table__.c.id == bindparam("item_id"))
+            .values(is_accounted=bindparam("is_accounted"), row_version=model.__table__.c.row_version + 1),
+            changed_flags,
+        )
+
+
+def apply_movement_batch(
+    db,
+    payload: MovementBatchCreate,
+    current_user: User,
+) -> list[EquipmentMovement]:
+    """
+    Set-based counterpart of running `apply_movement_changes` per line: lines
+    are folded into net deltas per stock row, stock tables are locked and
+    written in `STOCK_TARGETS` order, movements are inserted in one flush and
+    the batch gets a single audit entry.
+    """
+    equipment_types = resolve_batch_dependencies(db, payload)
+    lines = [
+        MovementCreate(
+            movement_type=payload.movement_type,
+            equipment_type_id=item.equipment_type_id,
+            quantity=item.quantity,
+            from_warehouse_id=payload.from_warehouse_id,
+            to_warehouse_id=payload.to_warehouse_id,
+            from_cabinet_id=payload.from_cabinet_id,
+            to_cabinet_id=payload.to_cabinet_id,
+            to_assembly_id=payload.to_assembly_id,
+            reference=item.reference,
+            comment=item.comment,
+            is_accounted=payload.is_accounted,
+        )
+        for item in payload.items
+    ]
+
+    stock: dict[str, dict[tuple[int, int], int]] = {kind: {} for kind in STOCK_TARGETS}
+    lowest: dict[str, dict[tuple[int, int], int]] = {kind: {} for kind in STOCK_TARGETS}
+    instances: dict[tuple[str, int, int], int] = {}
+    accounted: dict[tuple[int, int], bool] = {}
+    for line in lines:
+        equipment_is_unique = is_unique_equipment(equipment_types[line.equipment_type_id])
+        for kind, target_id, delta in movement_deltas(line):
+            key = (target_id, line.equipment_type_id)
+            if kind != WAREHOUSE and equipment_is_unique:
+                instances[(kind, *key)] = instances.get((kind, *key), 0) + delta
+                continue
+            stock[kind][key] = stock[kind].get(key, 0) + delta
+            lowest[kind][key] = min(lowest[kind].get(key, 0), stock[kind][key])
+            if kind == WAREHOUSE and MovementType(line.movement_type) == MovementType.to_warehouse and line.is_accounted is not None:
+                accounted[key] = line.is_accounted
+
+    for kind, deltas in stock.items():
+        apply_stock_deltas(db, kind, deltas, accounted=accounted if kind == WAREHOUSE else None, lowest=lowest[kind])
+    for kind, target_id, equipment_type_id in sorted(instances, key=lambda key: (STOCK_LOCK_ORDER[key[0]], *key[1:])):
+        delta = instances[(kind, target_id, equipment_type_id)]
+        if delta > 0:
+            CREATE_UNIQUE_ITEMS[kind](db, target_id, equipment_types[equipment_type_id], delta)
+        elif delta < 0:
+            REMOVE_UNIQUE_ITEMS[kind](db, target_id, equipment_type_id, -delta, current_user.id)
+
+    movements = [build_movement(line, current_user) for line in lines]
+    db.add_all(movements)
+    db.flush()
+
+    add_audit_log(
+        db,
+        actor_id=current_user.id,
+        action=MovementType(payload.movement_type).value.upper(),
+        entity="equipment_movements",
+        meta={
+            "batch": True,
+            "lines": len(movements),
+            "movement_ids": [movement.id for movement in movements],
+            "targets": payload.model_dump(exclude={"items"}, mode="json"),
+        },
+    )
+    return movements
+
+
+@router.get("/", response_model=Pagination[MovementOut] | CursorPagination[MovementOut])
 def list_movements(
     page: int = 1,
     page_size: int = 50,
+    paging: PagingMode = "offset",
+    cursor: str | None = None,
+    total_mode: TotalMode | None = None,
     q: str | None = None,
     sort: str | None = None,
     movement_type: MovementType | None = None,
@@ -414,6 +608,27 @@ def list_movements(
             | (EquipmentMovement.comment.ilike(f"%{q}%"))
         )
 
+    if paging == "cursor" or cursor:
+        sort_column, descending = resolve_sort(EquipmentMovement, sort, default="-id")
+        keyset = paginate_keyset(
+            query,
+            db,
+            sort_column=sort_column,
+            id_column=EquipmentMovement.id,
+            descending=descending,
+            page_size=page_size,
+            cursor=cursor,
+            total_mode=total_mode,
+        )
+        return CursorPagination(
+            items=keyset.items,
+            page_size=page_size,
+            next_cursor=keyset.next_cursor,
+            prev_cursor=keyset.prev_cursor,
+            total=keyset.total,
+            total_is_estimate=keyset.total_is_estimate,
+        )
+
     query = apply_sort(query, EquipmentMovement, sort) if sort else query.order_by(EquipmentMovement.id.desc())
 
     total, items = paginate(query, db, page, page_size)
@@ -436,34 +651,26 @@ def create_movement(
 @router.post("/batch", response_model=list[MovementOut])
 def create_movement_batch(
     payload: MovementBatchCreate,
+    response: Response,
     db=Depends(get_db),
     current_user: User = Depends(require_write_access()),
 ):
-    created_movements: list[EquipmentMovement] = []
+    started = time.perf_counter()
     try:
-        for item in payload.items:
-            movement_payload = MovementCreate(
-                movement_type=payload.movement_type,
-                equipment_type_id=item.equipment_type_id,
-                quantity=item.quantity,
-                to_cabinet_id=payload.to_cabinet_id,
-                reference=item.reference,
-                comment=item.comment,
-            )
-            equipment_type, equipment_is_unique = resolve_movement_dependencies(db, movement_payload)
-            movement = apply_movement_changes(
-                db,
-                movement_payload,
-                current_user,
-                equipment_type,
-                equipment_is_unique,
-            )
-            created_movements.append(movement)
+        movements = apply_movement_batch(db, payload, current_user)
         db.commit()
     except Exception:
         db.rollback()
         raise
 
-    for movement in created_movements:
-        db.refresh(movement)
+    movement_ids = [movement.id for movement in movements]
+    created_movements = db.scalars(
+        select(EquipmentMovement)
+        .where(EquipmentMovement.id.in_(movement_ids))
+        .order_by(EquipmentMovement.id)
+        .execution_options(populate_existing=True)
+    ).all()
+    elapsed = time.perf_counter() - started
+    if elapsed > 0:
+        response.headers["X-Lines-Per-Second"] = f"{len(movement_ids) / elapsed:.1f}"
     return created_movements
@@ -2,16 +2,15 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_, select
 
 from app.core.audit import add_audit_log, model_to_dict
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.pagination import paginate
-from app.models.ipam import IPAddress
 from app.models.network_topology import NetworkTopologyDocument
 from app.models.security import User
-from app.schemas.common import Pagination
+from app.schemas.common import DocumentPatch, DocumentPatchOut, Pagination
 from app.schemas.network_topology import (
     NetworkTopologyDocumentCreate,
     NetworkTopologyDocumentOut,
@@ -20,7 +19,8 @@ from app.schemas.network_topology import (
     NetworkTopologyEligibleEquipmentOut,
     TopologyDocument,
 )
-from app.services.ipam import list_eligible_equipment
+from app.services.ipam import search_eligible_equipment
+from app.services.json_patch import patch_document_row
 
 router = APIRouter()
 
@@ -36,6 +36,7 @@ def _to_out(item: NetworkTopologyDocument) -> NetworkTopologyDocumentOut:
         document=TopologyDocument.model_validate(item.document_json or {}),
         created_by_id=item.created_by_id,
         updated_by_id=item.updated_by_id,
+        row_version=item.row_version,
         created_at=item.created_at,
         updated_at=item.updated_at,
         is_deleted=item.is_deleted,
@@ -151,6 +152,26 @@ def update_network_topology(
     return _to_out(item)
 
 
+@router.patch("/{topology_id}/document", response_model=DocumentPatchOut)
+def patch_network_topology_document(
+    topology_id: int,
+    payload: DocumentPatch,
+    db=Depends(get_db),
+    current_user: User = Depends(require_write_access()),
+):
+    item = _get_or_404(db, topology_id)
+    result = patch_document_row(
+        db,
+        item,
+        payload,
+        TopologyDocument,
+        actor_id=current_user.id,
+        entity="network_topologies",
+    )
+    db.commit()
+    return result
+
+
 @router.delete("/{topology_id}")
 def delete_network_topology(
     topology_id: int,
@@ -212,14 +233,17 @@ def duplicate_network_topology(
 
 @router.get("/eligible-equipment/list", response_model=list[NetworkTopologyEligibleEquipmentOut])
 def list_network_topology_eligible_equipment(
+    response: Response,
     q: str | None = None,
     location_id: int | None = None,
     manufacturer_id: int | None = None,
     equipment_type_id: int | None = None,
+    page: int | None = Query(default=None, ge=1),
+    page_size: int = Query(default=100, ge=1, le=1000),
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    items = list_eligible_equipment(
+    total, items = search_eligible_equipment(
         db,
         q=q,
         location_id=location_id,
@@ -227,25 +251,14 @@ def list_network_topology_eligible_equipment(
         equipment_type_id=equipment_type_id,
         has_network_interfaces=True,
         installed_only=True,
+        page=page,
+        page_size=page_size,
     )
-    result: list[NetworkTopologyEligibleEquipmentOut] = []
-    for item in items:
-        ip_rows = db.scalars(
-            select(IPAddress.ip_address)
-            .where(
-                IPAddress.equipment_item_source == item["equipment_source"],
-                IPAddress.equipment_item_id == item["equipment_item_id"],
-                IPAddress.is_deleted == False,
-                IPAddress.status == "used",
-            )
-            .order_by(IPAddress.is_primary.desc(), IPAddress.created_at.asc())
-        ).all()
-        linked_ip_addresses = [ip for ip in ip_rows if ip]
-        result.append(
-            NetworkTopologyEligibleEquipmentOut(
-                **item,
-                linked_ip_addresses=linked_ip_addresses,
-                primary_ip=linked_ip_addresses[0] if linked_ip_addresses else None,
-            )
+    response.headers["X-Total-Count"] = str(total)
+    return [
+        NetworkTopologyEligibleEquipmentOut(
+            **item,
+            primary_ip=item["linked_ip_addresses"][0] if item["linked_ip_addresses"] else None,
         )
-    return result
+        for item in items
+    ]
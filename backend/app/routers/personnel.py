@@ -1,5 +1,5 @@
 from calendar import monthrange
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from pathlib import Path
 from uuid import uuid4
 
@@ -42,12 +42,19 @@ from app.schemas.personnel import (
     PersonnelYearlyScheduleEventOut,
     PersonnelYearlyScheduleResponse,
     SCHEDULE_STATUSES,
+    TeamMonthFillYearlyScheduleRequest,
     UpdateYearlyScheduleStatusesRequest,
     UpsertYearlyScheduleEventRequest,
     YearlyScheduleEmployeeOut,
     YearlyScheduleEmployeeSummary,
     YearlyScheduleSummaryResponse,
 )
+from app.services.yearly_schedule import (
+    ScheduleRange,
+    apply_schedule_ranges,
+    ensure_active_personnel,
+    schedule_ranges_meta,
+)
 
 router = APIRouter()
 
@@ -212,78 +219,54 @@ def get_yearly_schedule_summary(
     return YearlyScheduleSummaryResponse.model_validate({"global": global_summary, "employees": employees})
 
 
+def schedule_assignments_out(statuses: dict[tuple[int, date], str]) -> list[PersonnelYearlyScheduleAssignmentOut]:
+    return [
+        PersonnelYearlyScheduleAssignmentOut(personnel_id=personnel_id, iso_date=work_date, status=status_code)
+        for (personnel_id, work_date), status_code in statuses.items()
+    ]
+
+
+def write_schedule_ranges(db, year: int, ranges: list[ScheduleRange], actor_id: int):
+    statuses = apply_schedule_ranges(db, year, ranges)
+    add_audit_log(
+        db,
+        actor_id=actor_id,
+        action="UPDATE",
+        entity="personnel_yearly_schedule_assignments",
+        meta=schedule_ranges_meta(year, ranges, statuses),
+    )
+    db.commit()
+    return schedule_assignments_out(statuses)
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    day_count = monthrange(year, month + 1)[1]
+    return date(year, month + 1, 1), date(year, month + 1, day_count)
+
+
 @router.patch("/schedules/yearly/statuses", response_model=list[PersonnelYearlyScheduleAssignmentOut])
 def update_yearly_schedule_statuses(
     payload: UpdateYearlyScheduleStatusesRequest,
     db=Depends(get_db),
     current_user: User = Depends(require_space_access(SpaceKey.personnel, "write")),
 ):
-    updated_records: list[PersonnelYearlyScheduleAssignment] = []
-
+    ranges: list[ScheduleRange] = []
     for operation in payload.operations:
         validate_schedule_status(operation.status)
-        ensure_personnel(db, operation.personnel_id)
         if operation.to_date < operation.from_date:
             raise HTTPException(status_code=422, detail="to_date must be greater than or equal to from_date")
         ensure_year_matches(operation.from_date, payload.year)
-        clipped_to_date = min(operation.to_date, date(payload.year, 12, 31))
-
-        current_date = operation.from_date
-        while current_date <= clipped_to_date:
-            existing = db.scalar(
-                select(PersonnelYearlyScheduleAssignment).where(
-                    PersonnelYearlyScheduleAssignment.personnel_id == operation.personnel_id,
-                    PersonnelYearlyScheduleAssignment.work_date == current_date,
-                )
+        ranges.append(
+            ScheduleRange(
+                personnel_id=operation.personnel_id,
+                from_date=operation.from_date,
+                to_date=min(operation.to_date, date(payload.year, 12, 31)),
+                status=operation.status,
             )
-            if existing:
-                before = model_to_dict(existing)
-                existing.year = payload.year
-                existing.status = operation.status
-                existing.is_deleted = False
-                existing.deleted_at = None
-                existing.deleted_by_id = None
-                updated_records.append(existing)
-                add_audit_log(
-                    db,
-                    actor_id=current_user.id,
-                    action="UPDATE",
-                    entity="personnel_yearly_schedule_assignments",
-                    entity_id=existing.id,
-                    before=before,
-                    after=model_to_dict(existing),
-                )
-            else:
-                assignment = PersonnelYearlyScheduleAssignment(
-                    personnel_id=operation.personnel_id,
-                    year=payload.year,
-                    work_date=current_date,
-                    status=operation.status,
-                    is_deleted=False,
-                )
-                db.add(assignment)
-                db.flush()
-                updated_records.append(assignment)
-                add_audit_log(
-                    db,
-                    actor_id=current_user.id,
-                    action="CREATE",
-                    entity="personnel_yearly_schedule_assignments",
-                    entity_id=assignment.id,
-                    before=None,
-                    after=model_to_dict(assignment),
-                )
-            current_date += timedelta(days=1)
-
-    db.commit()
-    return [
-        PersonnelYearlyScheduleAssignmentOut(
-            personnel_id=item.personnel_id,
-            iso_date=item.work_date,
-            status=item.status,
         )
-        for item in updated_records
-    ]
+    ensure_active_personnel(db, (item.personnel_id for item in ranges))
+
+    return write_schedule_ranges(db, payload.year, ranges, current_user.id)
 
 
 @router.patch("/schedules/yearly/month-fill", response_model=list[PersonnelYearlyScheduleAssignmentOut])
@@ -294,23 +277,30 @@ def fill_yearly_schedule_month(
 ):
     validate_schedule_status(payload.status)
     ensure_personnel(db, payload.personnel_id)
-    day_count = monthrange(payload.year, payload.month + 1)[1]
-    start_date = date(payload.year, payload.month + 1, 1)
-    end_date = date(payload.year, payload.month + 1, day_count)
-    return update_yearly_schedule_statuses(
-        UpdateYearlyScheduleStatusesRequest(
-            year=payload.year,
-            operations=[
-                {
-                    "personnel_id": payload.personnel_id,
-                    "from_date": start_date,
-                    "to_date": end_date,
-                    "status": payload.status,
-                }
-            ],
-        ),
+    start_date, end_date = month_range(payload.year, payload.month)
+    return write_schedule_ranges(
+        db,
+        payload.year,
+        [ScheduleRange(payload.personnel_id, start_date, end_date, payload.status)],
+        current_user.id,
+    )
+
+
+@router.patch("/schedules/yearly/month-fill/team", response_model=list[PersonnelYearlyScheduleAssignmentOut])
+def fill_yearly_schedule_month_for_team(
+    payload: TeamMonthFillYearlyScheduleRequest,
+    db=Depends(get_db),
+    current_user: User = Depends(require_space_access(SpaceKey.personnel, "write")),
+):
+    validate_schedule_status(payload.status)
+    personnel_ids = list(dict.fromkeys(payload.personnel_ids))
+    ensure_active_personnel(db, personnel_ids)
+    start_date, end_date = month_range(payload.year, payload.month)
+    return write_schedule_ranges(
         db,
-        current_user,
+        payload.year,
+        [ScheduleRange(personnel_id, start_date, end_date, payload.status) for personnel_id in personnel_ids],
+        current_user.id,
     )
 
 
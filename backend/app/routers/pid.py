@@ -1,6 +1,6 @@
 from datetime import datetime, UTC
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
@@ -16,7 +16,7 @@ from app.schemas.pid import (
     PidProcessOut,
     PidProcessUpdate,
 )
-from app.services.pid_storage import load_diagram, save_diagram_atomic, save_image
+from app.services.pid_storage import StoredDiagram, load_diagram_entry, save_diagram_atomic, save_image
 
 router = APIRouter()
 
@@ -174,15 +174,49 @@ def restore_process(
     return item
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in [value.removeprefix("W/") for value in candidates]
+
+
+def _accepts_gzip(accept_encoding: str | None) -> bool:
+    for value in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in value.split(";")]
+        if coding.lower() in {"gzip", "*"}:
+            quality = next((param[2:] for param in params if param.lower().startswith("q=")), "1")
+            try:
+                return float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _diagram_response(request: Request, stored: StoredDiagram) -> Response:
+    headers = {"ETag": stored.etag, "Cache-Control": "no-cache"}
+    if stored.gzip_body is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if _etag_matches(request.headers.get("if-none-match"), stored.etag):
+        return Response(status_code=304, headers=headers)
+    if stored.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding")):
+        return Response(stored.gzip_body, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(stored.body, media_type="application/json", headers=headers)
+
+
 @router.get("/diagram/{process_id}", response_model=PidDiagramOut)
 def get_diagram(
     process_id: int,
+    request: Request,
     db=Depends(get_db),
     _user: User = Depends(require_read_access()),
 ):
     item = _get_process(db, process_id)
-    loaded = load_diagram(process_id)
-    if loaded is None:
+    try:
+        stored = load_diagram_entry(process_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=500, detail=f"Invalid diagram data: {exc}")
+    if stored is None:
         return PidDiagramOut(
             processId=item.id,
             version=1,
@@ -191,16 +225,15 @@ def get_diagram(
             nodes=[],
             edges=[],
         )
-    try:
-        return PidDiagramOut(**loaded)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Invalid diagram data: {exc}")
+    # Served straight from the cached bytes; a matching If-None-Match gets 304.
+    return _diagram_response(request, stored)
 
 
 @router.put("/diagram/{process_id}", response_model=PidDiagramOut)
 def save_diagram(
     process_id: int,
     payload: PidDiagramPayload,
+    response: Response,
     db=Depends(get_db),
     current_user: User = Depends(require_write_access()),
 ):
@@ -208,6 +241,9 @@ def save_diagram(
     if payload.processId != item.id:
         raise HTTPException(status_code=400, detail="processId mismatch")
     save_diagram_atomic(process_id, payload)
+    stored = load_diagram_entry(process_id)
+    if stored is not None:
+        response.headers["ETag"] = stored.etag
     add_audit_log(
         db,
         actor_id=current_user.id,
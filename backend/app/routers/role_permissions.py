@@ -3,11 +3,18 @@ import re
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 
-from app.core.access import ensure_space_permissions_seeded, normalize_permission_flags, require_space_access
+from app.core.access import (
+    ensure_space_permissions_seeded,
+    invalidate_permission_cache,
+    normalize_permission_flags,
+    permission_cache,
+    require_space_access,
+)
 from app.core.dependencies import get_db
 from app.models.security import AccessSpace, RoleDefinition, RoleSpacePermission, SpaceKey, User
 from app.schemas.role_permissions import (
     AccessSpaceOut,
+    PermissionCacheStatsOut,
     RoleDefinitionCreate,
     RoleDefinitionOut,
     RolePermissionsMatrixOut,
@@ -93,6 +100,7 @@ def create_role(
         )
 
     db.commit()
+    invalidate_permission_cache()
     return RoleDefinitionOut(key=role.key, label=role.label, is_system=role.is_system)
 
 
@@ -127,4 +135,20 @@ def update_role_permissions_matrix(
         permission.can_admin = can_admin
 
     db.commit()
+    invalidate_permission_cache()
     return get_role_permissions_matrix(db, current_user)
+
+
+@router.get("/cache", response_model=PermissionCacheStatsOut)
+def get_permission_cache_stats(
+    current_user: User = Depends(require_space_access(SpaceKey.admin_users, "admin")),
+):
+    return PermissionCacheStatsOut(**permission_cache.stats())
+
+
+@router.post("/cache/invalidate", response_model=PermissionCacheStatsOut)
+def reset_permission_cache(
+    current_user: User = Depends(require_space_access(SpaceKey.admin_users, "admin")),
+):
+    invalidate_permission_cache()
+    return PermissionCacheStatsOut(**permission_cache.stats())
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import or_, select
 from sqlalchemy.orm import selectinload
 
+from app.core import hierarchy
 from app.core.audit import add_audit_log, model_to_dict
 from app.core.dependencies import get_db, require_read_access, require_write_access
 from app.core.pagination import paginate
@@ -13,56 +14,25 @@ from app.models.assemblies import Assembly
 from app.models.core import EquipmentType, Location, Manufacturer
 from app.models.operations import AssemblyItem, CabinetItem
 from app.models.security import User
-from app.models.serial_map import SerialMapDocument
-from app.schemas.common import Pagination
+from app.models.serial_map import SERIAL_MAP_SCHEMA_VERSION, SerialMapDocument
+from app.schemas.common import DocumentPatch, DocumentPatchOut, Pagination
 from app.schemas.serial_map import (
-    LegacySerialMapProjectDocument,
     SerialMapDocumentCreate,
     SerialMapDocumentData,
     SerialMapDocumentOut,
     SerialMapDocumentUpdate,
     SerialMapDuplicatePayload,
     SerialMapEligibleEquipmentOut,
+    SerialMapHistory,
     SerialPortDescriptor,
 )
-from app.services.ipam import build_location_full_path
+from app.services.json_patch import patch_document_row
+from app.services.serial_map_history import build_history, empty_history, record_history_entry, step_history
+from app.services.serial_map_migration import document_from_json, ensure_current_document
 
 router = APIRouter()
 
 
-def _empty_document() -> dict:
-    return {
-        "version": 2,
-        "updatedAt": datetime.utcnow().isoformat(),
-        "viewport": {"x": 0, "y": 0, "zoom": 1},
-        "nodes": [],
-        "edges": [],
-        "history": {"past": [], "future": []},
-    }
-
-
-def _normalize_legacy_scheme(raw_scheme: dict | None) -> dict:
-    if not isinstance(raw_scheme, dict):
-        return _empty_document()
-    return {
-        "version": 2,
-        "updatedAt": datetime.utcnow().isoformat(),
-        "viewport": raw_scheme.get("viewport") or {"x": 0, "y": 0, "zoom": 1},
-        "nodes": raw_scheme.get("nodes") or [],
-        "edges": raw_scheme.get("edges") or [],
-        "history": raw_scheme.get("history") or {"past": [], "future": []},
-    }
-
-
-def _document_from_json(value: dict | None) -> SerialMapDocumentData:
-    raw = value or {}
-    if isinstance(raw, dict) and raw.get("version") == 2 and "nodes" in raw and "edges" in raw:
-        return SerialMapDocumentData.model_validate(raw)
-    legacy = LegacySerialMapProjectDocument.model_validate(raw)
-    active_scheme = next((scheme for scheme in legacy.schemes if scheme.id == legacy.activeSchemeId), legacy.schemes[0] if legacy.schemes else None)
-    return SerialMapDocumentData.model_validate(_normalize_legacy_scheme(active_scheme.model_dump() if active_scheme else None))
-
-
 def _parse_serial_ports(value: list[dict] | None) -> list[SerialPortDescriptor]:
     ports: list[SerialPortDescriptor] = []
     if not isinstance(value, list):
@@ -77,7 +47,10 @@ def _parse_serial_ports(value: list[dict] | None) -> list[SerialPortDescriptor]:
     return ports
 
 
-def _to_out(item: SerialMapDocument) -> SerialMapDocumentOut:
+def _to_out(item: SerialMapDocument, history: dict | None = None) -> SerialMapDocumentOut:
+    document = document_from_json(item.document_json or {})
+    # Undo history lives in serial_map_history_entries; it is only sent on request.
+    document.history = SerialMapHistory.model_validate(history or empty_history())
     return SerialMapDocumentOut(
         id=item.id,
         name=item.name,
@@ -85,9 +58,10 @@ def _to_out(item: SerialMapDocument) -> SerialMapDocumentOut:
         scope=item.scope,
         location_id=item.location_id,
         source_context=item.source_context,
-        document=_document_from_json(item.document_json or {}),
+        document=document,
         created_by_id=item.created_by_id,
         updated_by_id=item.updated_by_id,
+        row_version=item.row_version,
         created_at=item.created_at,
         updated_at=item.updated_at,
         is_deleted=item.is_deleted,
@@ -95,56 +69,32 @@ def _to_out(item: SerialMapDocument) -> SerialMapDocumentOut:
     )
 
 
-def _migrate_legacy_document(db, item: SerialMapDocument) -> SerialMapDocument:
-    raw = item.document_json or {}
-    if not isinstance(raw, dict) or "schemes" not in raw:
-        return item
-    legacy = LegacySerialMapProjectDocument.model_validate(raw)
-    schemes = legacy.schemes or []
-    if len(schemes) <= 1:
-        active_scheme = next((scheme for scheme in schemes if scheme.id == legacy.activeSchemeId), schemes[0] if schemes else None)
-        item.document_json = _normalize_legacy_scheme(active_scheme.model_dump() if active_scheme else None)
-        item.source_context = {
-            **(item.source_context or {}),
-            "legacy_project_id": legacy.projectId,
-            "migrated_from_multi_scheme": False,
-        }
-        db.flush()
-        return item
-
-    active_scheme = next((scheme for scheme in schemes if scheme.id == legacy.activeSchemeId), schemes[0])
-    item.document_json = _normalize_legacy_scheme(active_scheme.model_dump())
-    item.source_context = {
-        **(item.source_context or {}),
-        "legacy_project_id": legacy.projectId,
-        "legacy_scheme_id": active_scheme.id,
-        "migrated_from_multi_scheme": True,
-    }
-    for index, scheme in enumerate(schemes):
-        if scheme.id == active_scheme.id:
-            continue
-        clone = SerialMapDocument(
-            name=f"{item.name} / {scheme.name or f'Схема {index + 1}'}",
-            description=scheme.description or item.description,
-            scope=item.scope,
-            location_id=item.location_id,
-            source_context={
-                **(item.source_context or {}),
-                "legacy_project_id": legacy.projectId,
-                "legacy_scheme_id": scheme.id,
-                "migrated_from_document_id": item.id,
-            },
-            document_json=_normalize_legacy_scheme(scheme.model_dump()),
-            created_by_id=item.created_by_id,
-            updated_by_id=item.updated_by_id,
-        )
-        db.add(clone)
-    db.flush()
-    return item
+def _store_document(db, item: SerialMapDocument, document: dict, actor_id: int, *, previous: dict | None) -> dict:
+    """
+    Record `document` in the history store and return the column values to
+    write: the document without embedded history plus the new cursor.
+    """
+    document = {**document, "history": empty_history()}
+    cursor = record_history_entry(db, item.id, item.history_cursor, previous, document, actor_id)
+    return {"document_json": document, "history_cursor": cursor}
 
 
-def _get_or_404(db, document_id: int) -> SerialMapDocument:
-    item = db.scalar(select(SerialMapDocument).where(SerialMapDocument.id == document_id))
+def _apply_values(item: SerialMapDocument, values: dict) -> None:
+    for field, value in values.items():
+        setattr(item, field, value)
+
+
+def _get_or_404(db, document_id: int, for_update: bool = False) -> SerialMapDocument:
+    """
+    With `for_update` the row stays locked until commit. Writers that record
+    history take it first, so concurrent saves of one document queue up and
+    never pick the same history seq; a stale `row_version` then turns into
+    409 in the guarded UPDATE.
+    """
+    query = select(SerialMapDocument).where(SerialMapDocument.id == document_id)
+    if for_update:
+        query = query.with_for_update()
+    item = db.scalar(query)
     if not item or item.is_deleted:
         raise HTTPException(status_code=404, detail="Serial map document not found")
     return item
@@ -182,13 +132,8 @@ def list_serial_map_documents(
     else:
         query = query.order_by(SerialMapDocument.updated_at.desc())
     total, items = paginate(query, db, page, page_size)
-    mutated = False
-    for item in items:
-        before = item.document_json
-        _migrate_legacy_document(db, item)
-        if before != item.document_json:
-            mutated = True
-    if mutated:
+    upgraded = [ensure_current_document(db, item) for item in items]
+    if any(upgraded):
         db.commit()
     return Pagination(items=[_to_out(item) for item in items], page=page, page_size=page_size, total=total)
 
@@ -206,11 +151,13 @@ def create_serial_map_document(
         location_id=payload.location_id,
         source_context=payload.source_context,
         document_json=payload.document.model_dump(),
+        schema_version=SERIAL_MAP_SCHEMA_VERSION,
         created_by_id=current_user.id,
         updated_by_id=current_user.id,
     )
     db.add(item)
     db.flush()
+    _apply_values(item, _store_document(db, item, item.document_json, current_user.id, previous=None))
     add_audit_log(
         db,
         actor_id=current_user.id,
@@ -233,9 +180,6 @@ def list_serial_map_eligible_equipment(
     db=Depends(get_db),
     user: User = Depends(require_read_access()),
 ):
-    locations = db.scalars(select(Location)).all()
-    locations_map = {loc.id: loc for loc in locations}
-
     cabinet_query = (
         select(CabinetItem)
         .join(CabinetItem.cabinet)
@@ -284,9 +228,17 @@ def list_serial_map_eligible_equipment(
             )
         )
 
+    cabinet_items = db.scalars(cabinet_query.order_by(CabinetItem.id.desc())).all()
+    assembly_items = db.scalars(assembly_query.order_by(AssemblyItem.id.desc())).all()
+    location_paths = hierarchy.full_paths(
+        db,
+        Location,
+        [item.cabinet.location_id for item in cabinet_items if item.cabinet]
+        + [item.assembly.location_id for item in assembly_items if item.assembly],
+    )
     items: list[SerialMapEligibleEquipmentOut] = []
 
-    for item in db.scalars(cabinet_query.order_by(CabinetItem.id.desc())).all():
+    for item in cabinet_items:
         ports = _parse_serial_ports(item.equipment_type.serial_ports if item.equipment_type else None)
         if not ports:
             continue
@@ -302,11 +254,11 @@ def list_serial_map_eligible_equipment(
                 manufacturerName=item.manufacturer_name,
                 displayName=item.equipment_type_name or (item.equipment_type.name if item.equipment_type else f"Equipment #{item.id}"),
                 serialPorts=ports,
-                locationFullPath=build_location_full_path(item.cabinet.location_id if item.cabinet else None, locations_map),
+                locationFullPath=location_paths.get(item.cabinet.location_id) if item.cabinet else None,
             )
         )
 
-    for item in db.scalars(assembly_query.order_by(AssemblyItem.id.desc())).all():
+    for item in assembly_items:
         ports = _parse_serial_ports(item.equipment_type.serial_ports if item.equipment_type else None)
         if not ports:
             continue
@@ -322,7 +274,7 @@ def list_serial_map_eligible_equipment(
                 manufacturerName=item.manufacturer_name,
                 displayName=item.equipment_type_name or (item.equipment_type.name if item.equipment_type else f"Equipment #{item.id}"),
                 serialPorts=ports,
-                locationFullPath=build_location_full_path(item.assembly.location_id if item.assembly else None, locations_map),
+                locationFullPath=location_paths.get(item.assembly.location_id) if item.assembly else None,
             )
         )
 
@@ -331,14 +283,17 @@ def list_serial_map_eligible_equipment(
 
 
 @router.get("/{document_id}", response_model=SerialMapDocumentOut)
-def get_serial_map_document(document_id: int, db=Depends(get_db), user: User = Depends(require_read_access())):
+def get_serial_map_document(
+    document_id: int,
+    include_history: bool = Query(default=False),
+    db=Depends(get_db),
+    user: User = Depends(require_read_access()),
+):
     item = _get_or_404(db, document_id)
-    before = item.document_json
-    item = _migrate_legacy_document(db, item)
-    if before != item.document_json:
+    if ensure_current_document(db, item):
         db.commit()
         db.refresh(item)
-    return _to_out(item)
+    return _to_out(item, build_history(db, item) if include_history else None)
 
 
 @router.patch("/{document_id}", response_model=SerialMapDocumentOut)
@@ -348,12 +303,15 @@ def update_serial_map_document(
     db=Depends(get_db),
     current_user: User = Depends(require_write_access()),
 ):
-    item = _get_or_404(db, document_id)
-    item = _migrate_legacy_document(db, item)
+    item = _get_or_404(db, document_id, for_update=True)
+    ensure_current_document(db, item)
     before = model_to_dict(item)
     data = payload.model_dump(exclude_unset=True)
     if "document" in data:
-        item.document_json = payload.document.model_dump() if payload.document else item.document_json
+        if payload.document:
+            _apply_values(
+                item, _store_document(db, item, payload.document.model_dump(), current_user.id, previous=item.document_json)
+            )
         data.pop("document", None)
     for field, value in data.items():
         setattr(item, field, value)
@@ -372,6 +330,68 @@ def update_serial_map_document(
     return _to_out(item)
 
 
+@router.patch("/{document_id}/document", response_model=DocumentPatchOut)
+def patch_serial_map_document(
+    document_id: int,
+    payload: DocumentPatch,
+    db=Depends(get_db),
+    current_user: User = Depends(require_write_access()),
+):
+    item = _get_or_404(db, document_id, for_update=True)
+    ensure_current_document(db, item)
+    result = patch_document_row(
+        db,
+        item,
+        payload,
+        SerialMapDocumentData,
+        actor_id=current_user.id,
+        entity="serial_map_documents",
+        prepare_values=lambda document: _store_document(
+            db, item, document, current_user.id, previous=item.document_json
+        ),
+    )
+    db.commit()
+    return result
+
+
+def _step_serial_map_history(db, document_id: int, step: int, actor_id: int, include_history: bool) -> SerialMapDocumentOut:
+    item = _get_or_404(db, document_id, for_update=True)
+    before_version = item.row_version
+    step_history(db, item, step)
+    item.updated_by_id = actor_id
+    add_audit_log(
+        db,
+        actor_id=actor_id,
+        action="UPDATE",
+        entity="serial_map_documents",
+        entity_id=item.id,
+        meta={"history_step": step, "history_cursor": item.history_cursor, "row_version": before_version + 1},
+    )
+    db.commit()
+    db.refresh(item)
+    return _to_out(item, build_history(db, item) if include_history else None)
+
+
+@router.post("/{document_id}/history/undo", response_model=SerialMapDocumentOut)
+def undo_serial_map_document(
+    document_id: int,
+    include_history: bool = Query(default=False),
+    db=Depends(get_db),
+    current_user: User = Depends(require_write_access()),
+):
+    return _step_serial_map_history(db, document_id, -1, current_user.id, include_history)
+
+
+@router.post("/{document_id}/history/redo", response_model=SerialMapDocumentOut)
+def redo_serial_map_document(
+    document_id: int,
+    include_history: bool = Query(default=False),
+    db=Depends(get_db),
+    current_user: User = Depends(require_write_access()),
+):
+    return _step_serial_map_history(db, document_id, 1, current_user.id, include_history)
+
+
 @router.delete("/{document_id}")
 def delete_serial_map_document(
     document_id: int,
@@ -379,7 +399,7 @@ def delete_serial_map_document(
     current_user: User = Depends(require_write_access()),
 ):
     item = _get_or_404(db, document_id)
-    item = _migrate_legacy_document(db, item)
+    ensure_current_document(db, item)
     before = model_to_dict(item)
     item.is_deleted = True
     item.deleted_at = datetime.utcnow()
@@ -405,7 +425,8 @@ def duplicate_serial_map_document(
     db=Depends(get_db),
     current_user: User = Depends(require_write_access()),
 ):
-    source = _migrate_legacy_document(db, _get_or_404(db, document_id))
+    source = _get_or_404(db, document_id)
+    ensure_current_document(db, source)
     clone = SerialMapDocument(
         name=payload.name or f"{source.name} Copy",
         description=source.description,
@@ -413,11 +434,13 @@ def duplicate_serial_map_document(
         location_id=source.location_id,
         source_context=source.source_context,
         document_json=source.document_json,
+        schema_version=SERIAL_MAP_SCHEMA_VERSION,
         created_by_id=current_user.id,
         updated_by_id=current_user.id,
     )
     db.add(clone)
     db.flush()
+    _apply_values(clone, _store_document(db, clone, clone.document_json, current_user.id, previous=None))
     add_audit_log(
         db,
         actor_id=current_user.id,
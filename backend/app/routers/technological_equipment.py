@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.core import hierarchy
 from app.core.access import require_space_access
 from app.core.audit import add_audit_log, model_to_dict
 from app.core.dependencies import get_db
@@ -26,8 +27,9 @@ VALVE_DRIVE_BRANCH_NAME = "По типу привода"
 
 
 class MainEquipmentValidationContext:
-    def __init__(self, items: list[MainEquipment]):
+    def __init__(self, items: list[MainEquipment], full_paths: dict[int, str]):
         self.items_by_id = {item.id: item for item in items}
+        self.full_paths = full_paths
         self.children_by_parent_id: dict[int | None, list[MainEquipment]] = {}
         for item in items:
             self.children_by_parent_id.setdefault(item.parent_id, []).append(item)
@@ -71,10 +73,9 @@ class MainEquipmentValidationContext:
         return False
 
     def full_path(self, item_id: int | None) -> str | None:
-        item = self.get(item_id)
-        if not item:
+        if not self.get(item_id):
             return None
-        return item.full_path()
+        return self.full_paths.get(item_id)
 
 
 def _base_query():
@@ -96,7 +97,7 @@ def _load_main_equipment_context(db) -> MainEquipmentValidationContext:
     items = db.scalars(
         select(MainEquipment).where(MainEquipment.is_deleted == False)
     ).all()
-    return MainEquipmentValidationContext(items)
+    return MainEquipmentValidationContext(items, hierarchy.full_paths(db, MainEquipment))
 
 
 def _validate_main_equipment_selection(
@@ -206,9 +207,19 @@ def _build_type_display(
     return context.full_path(main_equipment.id)
 
 
+def _serialize_items(
+    db,
+    items: list[TechnologicalEquipment],
+    context: MainEquipmentValidationContext,
+) -> list[dict]:
+    location_paths = hierarchy.full_paths(db, Location, [item.location_id for item in items])
+    return [_serialize_item(item, context, location_paths) for item in items]
+
+
 def _serialize_item(
     item: TechnologicalEquipment,
     context: MainEquipmentValidationContext,
+    location_paths: dict[int, str],
 ) -> dict:
     return {
         "id": item.id,
@@ -230,7 +241,7 @@ def _serialize_item(
         "tag": item.tag,
         "location_id": item.location_id,
         "location_name": item.location.name if item.location else None,
-        "location_path": item.location.full_path() if item.location else None,
+        "location_path": location_paths.get(item.location_id) if item.location else None,
         "description": item.description,
     }
 
@@ -285,7 +296,7 @@ def list_technological_equipment(
 
     total, items = paginate(query, db, page, page_size)
     return Pagination(
-        items=[_serialize_item(item, context) for item in items],
+        items=_serialize_items(db, items, context),
         page=page,
         page_size=page_size,
         total=total,
@@ -305,7 +316,7 @@ def get_technological_equipment(
     item = db.scalar(query)
     if not item:
         raise HTTPException(status_code=404, detail="Technological equipment not found")
-    return _serialize_item(item, _load_main_equipment_context(db))
+    return _serialize_items(db, [item], _load_main_equipment_context(db))[0]
 
 
 @router.post("/", response_model=TechnologicalEquipmentOut)
@@ -345,7 +356,7 @@ def create_technological_equipment(
 
     db.commit()
     item = db.scalar(_base_query().where(TechnologicalEquipment.id == item.id))
-    return _serialize_item(item, context)
+    return _serialize_items(db, [item], context)[0]
 
 
 @router.patch("/{item_id}", response_model=TechnologicalEquipmentOut)
@@ -400,7 +411,7 @@ def update_technological_equipment(
 
     db.commit()
     item = db.scalar(_base_query().where(TechnologicalEquipment.id == item.id))
-    return _serialize_item(item, context)
+    return _serialize_items(db, [item], context)[0]
 
 
 @router.put("/{item_id}", response_model=TechnologicalEquipmentOut)
@@ -469,4 +480,4 @@ def restore_technological_equipment(
 
     db.commit()
     item = db.scalar(_base_query().where(TechnologicalEquipment.id == item.id))
-    return _serialize_item(item, _load_main_equipment_context(db))
+    return _serialize_items(db, [item], _load_main_equipment_context(db))[0]
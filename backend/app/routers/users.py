@@ -5,7 +5,7 @@ from sqlalchemy import select
 
 from app.core.access import build_user_permissions, ensure_space_permissions_seeded, require_space_access
 from app.core.audit import add_audit_log, model_to_dict
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, principal_cache
 from app.core.identity import user_out_with_permissions
 from app.core.pagination import paginate
 from app.core.query import apply_alphabet_filter, apply_date_filters, apply_search, apply_sort, apply_text_filter
@@ -143,6 +143,7 @@ def update_user(
     )
 
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user_out_with_permissions(user, build_user_permissions(db, user))
 
@@ -173,6 +174,7 @@ def delete_user(
     )
 
     db.commit()
+    principal_cache.invalidate_user(user.id)
     return {"status": "ok"}
 
 
@@ -202,6 +204,7 @@ def restore_user(
     )
 
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user_out_with_permissions(user, build_user_permissions(db, user))
 
@@ -1,5 +1,5 @@
 ﻿from pydantic import BaseModel, Field
-from typing import Generic, TypeVar, List, Optional
+from typing import Any, Generic, Literal, TypeVar, List, Optional
 from datetime import datetime
 
 T = TypeVar("T")
@@ -12,6 +12,15 @@ class Pagination(BaseModel, Generic[T]):
     total: int = Field(ge=0)
 
 
+class CursorPagination(BaseModel, Generic[T]):
+    items: List[T]
+    page_size: int = Field(ge=1, le=200)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = Field(default=None, ge=0)
+    total_is_estimate: bool = False
+
+
 class EntityBase(BaseModel):
     id: int
     created_at: datetime
@@ -21,3 +30,23 @@ class EntityBase(BaseModel):
 class SoftDeleteFields(BaseModel):
     is_deleted: bool
     deleted_at: Optional[datetime] = None
+
+
+class JsonPatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str = Field(max_length=1000)
+    value: Any = None
+    from_: Optional[str] = Field(default=None, alias="from", max_length=1000)
+
+    model_config = {"populate_by_name": True}
+
+
+class DocumentPatch(BaseModel):
+    row_version: int = Field(ge=1)
+    operations: List[JsonPatchOperation] = Field(min_length=1, max_length=5000)
+
+
+class DocumentPatchOut(BaseModel):
+    id: int
+    row_version: int
+    updated_at: datetime
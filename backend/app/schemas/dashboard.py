@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List
 
 from pydantic import BaseModel
@@ -64,6 +65,7 @@ class DashboardDonutsOut(BaseModel):
 class DashboardOverviewOut(BaseModel):
     kpis: DashboardKpisOut
     donuts: DashboardDonutsOut
+    computed_at: datetime | None = None
 
 
 class RecentEquipmentActionOut(BaseModel):
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -80,9 +80,16 @@ class DiagnosticsServiceOut(BaseModel):
 class DiagnosticsDatabaseTableOut(BaseModel):
     table_name: str
     row_count: int = 0
+    row_count_is_estimate: bool = False
     table_bytes: int = 0
     index_bytes: int = 0
     total_bytes: int = 0
+    dead_rows: int | None = None
+    seq_scans: int | None = None
+    index_scans: int | None = None
+    unused_indexes: list[str] = Field(default_factory=list)
+    last_autovacuum: datetime | None = None
+    last_autoanalyze: datetime | None = None
 
 
 class DiagnosticsDatabaseOverviewOut(BaseModel):
@@ -95,6 +102,13 @@ class DiagnosticsDatabaseOverviewOut(BaseModel):
     total_rows: int = 0
     tables: list[DiagnosticsDatabaseTableOut] = Field(default_factory=list)
     issues: list[str] = Field(default_factory=list)
+    collected_at: datetime | None = None
+
+
+class DiagnosticsDatabaseTableCountOut(BaseModel):
+    table_name: str
+    row_count: int
+    counted_at: datetime
 
 
 class DiagnosticsRuntimeNodeOut(BaseModel):
@@ -166,7 +180,12 @@ class DiagnosticsLogEntryOut(BaseModel):
 
 
 class DiagnosticsLogsPageOut(Pagination[DiagnosticsLogEntryOut]):
-    pass
+    cursor: int | None = None
+
+
+class DiagnosticsLogTailOut(BaseModel):
+    cursor: int
+    items: list[DiagnosticsLogEntryOut] = Field(default_factory=list)
 
 
 class DiagnosticsDeleteLogsIn(BaseModel):
@@ -182,3 +201,31 @@ class DiagnosticsProcessKillOut(BaseModel):
     pid: int
     killed: bool
     message: str
+
+
+class LogPartitionOut(BaseModel):
+    name: str
+    month: date | None = None
+    row_count: int = 0
+    row_count_is_estimate: bool = True
+    total_bytes: int = 0
+    is_default: bool = False
+
+
+class LogRetentionTableOut(BaseModel):
+    table_name: str
+    time_column: str
+    partitioned: bool = False
+    max_age_days: int | None = None
+    max_size_bytes: int | None = None
+    total_rows: int = 0
+    total_bytes: int | None = None
+    partitions: list[LogPartitionOut] = Field(default_factory=list)
+
+
+class LogRetentionRunOut(BaseModel):
+    table_name: str
+    partitioned: bool
+    created_partitions: list[str] = Field(default_factory=list)
+    dropped_partitions: list[str] = Field(default_factory=list)
+    deleted_rows: int = 0
@@ -138,3 +138,4 @@ class DigitalTwinDocumentOut(EntityBase, SoftDeleteFields):
     document: DigitalTwinDocument
     created_by_id: int | None = None
     updated_by_id: int | None = None
+    row_version: int
@@ -14,3 +14,5 @@ class ImportReport(BaseModel):
     skipped_duplicates: int
     errors: list[ImportIssue]
     warnings: list[ImportIssue]
+    elapsed_seconds: float | None = None
+    rows_per_second: float | None = None
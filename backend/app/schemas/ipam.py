@@ -177,6 +177,14 @@ class IPReservePayload(BaseModel):
     comment: str | None = None
 
 
+class AddressAllocationRequest(BaseModel):
+    count: int = Field(default=1, ge=1, le=256)
+    contiguous: bool = False
+    reserve: bool = False
+    hostname: str | None = None
+    comment: str | None = None
+
+
 class AddressSummaryOut(BaseModel):
     total: int
     free: int
@@ -210,6 +218,12 @@ class AddressGridResponse(BaseModel):
     pagination: Pagination[Any] | None = None
 
 
+class AddressAllocationOut(BaseModel):
+    subnet_id: int
+    reserved: bool
+    items: list[IPAddressDetailsOut] = Field(default_factory=list)
+
+
 class IPAddressAuditLogOut(BaseModel):
     id: int
     ip_address_id: int | None = None
@@ -251,6 +265,7 @@ class HostEquipmentTreeLeaf(BaseModel):
 class HostEquipmentTreeNode(BaseModel):
     value: str
     label: str
+    has_children: bool = False
     children: list["HostEquipmentTreeNode"] = Field(default_factory=list)
     equipment: list[HostEquipmentTreeLeaf] = Field(default_factory=list)
 
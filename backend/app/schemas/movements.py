@@ -17,61 +17,67 @@ class MovementType(str, Enum):
     adjustment = "adjustment"
 
 
-class MovementCreate(BaseModel):
-    movement_type: MovementType
-    equipment_type_id: int
-    quantity: int = Field(ge=1)
+def validate_movement_targets(payload):
+    mt = payload.movement_type
+    if mt == MovementType.inbound:
+        if not payload.to_warehouse_id:
+            raise ValueError("to_warehouse_id is required for inbound")
+    if mt == MovementType.transfer:
+        if not payload.from_warehouse_id or not payload.to_warehouse_id:
+            raise ValueError("from_warehouse_id and to_warehouse_id are required for transfer")
+    if mt == MovementType.to_cabinet:
+        if not payload.from_warehouse_id or not payload.to_cabinet_id:
+            raise ValueError("from_warehouse_id and to_cabinet_id are required for to_cabinet")
+    if mt == MovementType.from_cabinet:
+        if not payload.from_cabinet_id or not payload.to_warehouse_id:
+            raise ValueError("from_cabinet_id and to_warehouse_id are required for from_cabinet")
+    if mt == MovementType.direct_to_cabinet:
+        if not payload.to_cabinet_id:
+            raise ValueError("to_cabinet_id is required for direct_to_cabinet")
+    if mt == MovementType.to_assembly:
+        if not payload.from_warehouse_id or not payload.to_assembly_id:
+            raise ValueError("from_warehouse_id and to_assembly_id are required for to_assembly")
+    if mt == MovementType.direct_to_assembly:
+        if not payload.to_assembly_id:
+            raise ValueError("to_assembly_id is required for direct_to_assembly")
+    if mt == MovementType.to_warehouse:
+        if not payload.to_warehouse_id:
+            raise ValueError("to_warehouse_id is required for to_warehouse")
+    if mt == MovementType.writeoff:
+        if not (payload.from_warehouse_id or payload.from_cabinet_id):
+            raise ValueError("from_warehouse_id or from_cabinet_id is required for writeoff")
+    if mt == MovementType.adjustment:
+        if not (
+            payload.from_warehouse_id
+            or payload.from_cabinet_id
+            or payload.to_warehouse_id
+            or payload.to_cabinet_id
+            or payload.to_assembly_id
+        ):
+            raise ValueError("from_* or to_* is required for adjustment")
+    return payload
+
 
+class MovementTargets(BaseModel):
     from_warehouse_id: Optional[int] = None
     to_warehouse_id: Optional[int] = None
     from_cabinet_id: Optional[int] = None
     to_cabinet_id: Optional[int] = None
     to_assembly_id: Optional[int] = None
+    is_accounted: Optional[bool] = None
+
+
+class MovementCreate(MovementTargets):
+    movement_type: MovementType
+    equipment_type_id: int
+    quantity: int = Field(ge=1)
 
     reference: Optional[str] = Field(default=None, max_length=200)
     comment: Optional[str] = Field(default=None, max_length=1000)
-    is_accounted: Optional[bool] = None
 
     @model_validator(mode="after")
     def validate_targets(self):
-        mt = self.movement_type
-        if mt == MovementType.inbound:
-            if not self.to_warehouse_id:
-                raise ValueError("to_warehouse_id is required for inbound")
-        if mt == MovementType.transfer:
-            if not self.from_warehouse_id or not self.to_warehouse_id:
-                raise ValueError("from_warehouse_id and to_warehouse_id are required for transfer")
-        if mt == MovementType.to_cabinet:
-            if not self.from_warehouse_id or not self.to_cabinet_id:
-                raise ValueError("from_warehouse_id and to_cabinet_id are required for to_cabinet")
-        if mt == MovementType.from_cabinet:
-            if not self.from_cabinet_id or not self.to_warehouse_id:
-                raise ValueError("from_cabinet_id and to_warehouse_id are required for from_cabinet")
-        if mt == MovementType.direct_to_cabinet:
-            if not self.to_cabinet_id:
-                raise ValueError("to_cabinet_id is required for direct_to_cabinet")
-        if mt == MovementType.to_assembly:
-            if not self.from_warehouse_id or not self.to_assembly_id:
-                raise ValueError("from_warehouse_id and to_assembly_id are required for to_assembly")
-        if mt == MovementType.direct_to_assembly:
-            if not self.to_assembly_id:
-                raise ValueError("to_assembly_id is required for direct_to_assembly")
-        if mt == MovementType.to_warehouse:
-            if not self.to_warehouse_id:
-                raise ValueError("to_warehouse_id is required for to_warehouse")
-        if mt == MovementType.writeoff:
-            if not (self.from_warehouse_id or self.from_cabinet_id):
-                raise ValueError("from_warehouse_id or from_cabinet_id is required for writeoff")
-        if mt == MovementType.adjustment:
-            if not (
-                self.from_warehouse_id
-                or self.from_cabinet_id
-                or self.to_warehouse_id
-                or self.to_cabinet_id
-                or self.to_assembly_id
-            ):
-                raise ValueError("from_* or to_* is required for adjustment")
-        return self
+        return validate_movement_targets(self)
 
 
 class MovementBatchItemCreate(BaseModel):
@@ -81,18 +87,18 @@ class MovementBatchItemCreate(BaseModel):
     comment: Optional[str] = Field(default=None, max_length=1000)
 
 
-class MovementBatchCreate(BaseModel):
+class MovementBatchCreate(MovementTargets):
+    """
+    Lines of one document (goods receipt, cabinet fit-out, ...) sharing the
+    movement type and the source/destination targets.
+    """
+
     movement_type: MovementType
-    to_cabinet_id: Optional[int] = None
-    items: list[MovementBatchItemCreate] = Field(min_length=1)
+    items: list[MovementBatchItemCreate] = Field(min_length=1, max_length=5000)
 
     @model_validator(mode="after")
     def validate_batch(self):
-        if self.movement_type != MovementType.direct_to_cabinet:
-            raise ValueError("Only direct_to_cabinet is supported for batch")
-        if not self.to_cabinet_id:
-            raise ValueError("to_cabinet_id is required for direct_to_cabinet batch")
-        return self
+        return validate_movement_targets(self)
 
 
 class MovementOut(EntityBase):
@@ -131,6 +131,7 @@ class NetworkTopologyDocumentOut(EntityBase, SoftDeleteFields):
     document: TopologyDocument
     created_by_id: int | None = None
     updated_by_id: int | None = None
+    row_version: int
 
 
 class NetworkTopologyEligibleEquipmentOut(BaseModel):
@@ -194,6 +194,13 @@ class MonthFillYearlyScheduleRequest(BaseModel):
     status: str
 
 
+class TeamMonthFillYearlyScheduleRequest(BaseModel):
+    year: int
+    personnel_ids: list[int] = Field(min_length=1)
+    month: int = Field(ge=0, le=11)
+    status: str
+
+
 class UpsertYearlyScheduleEventRequest(BaseModel):
     year: int
     personnel_id: int
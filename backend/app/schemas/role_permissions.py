@@ -41,3 +41,11 @@ class RolePermissionsMatrixUpdate(BaseModel):
 class RoleDefinitionCreate(BaseModel):
     key: str
     label: str
+
+
+class PermissionCacheStatsOut(BaseModel):
+    enabled: bool
+    version: int
+    hits: int
+    misses: int
+    snapshots: int
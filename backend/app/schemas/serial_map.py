@@ -156,6 +156,7 @@ class SerialMapDocumentOut(EntityBase, SoftDeleteFields):
     document: SerialMapDocumentData
     created_by_id: int | None = None
     updated_by_id: int | None = None
+    row_version: int
 
 
 class SerialMapDuplicatePayload(BaseModel):
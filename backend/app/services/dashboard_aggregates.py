@@ -0,0 +1,554 @@
+from __future__ import annotations
+
+import copy
+from datetime import UTC, datetime
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Float, Numeric, Text, cast, event, func, inspect, literal, or_, select, union_all, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.scheduler import start_periodic_job
+from app.models.core import Cabinet, EquipmentCategory, EquipmentType, Warehouse
+from app.models.dashboard import DashboardAggregate
+from app.models.operations import AssemblyItem, CabinetItem, WarehouseItem
+from app.schemas.dashboard import (
+    DashboardDonutsOut,
+    DashboardKpisOut,
+    DashboardOverviewOut,
+    DonutQtyItem,
+    DonutValueItem,
+)
+
+
+OVERVIEW_KEY = "overview"
+PENDING_DASHBOARD_CHANGES_KEY = "pending_dashboard_changes"
+UNCATEGORIZED_NAME = "Без категории"
+CHANNEL_KEYS = ("ai", "di", "ao", "do")
+
+ITEM_LOCATIONS = {WarehouseItem: "warehouse", CabinetItem: "cabinet", AssemblyItem: "assembly"}
+ITEM_ATTRIBUTES = {
+    "warehouse": ("quantity", "is_deleted", "equipment_type_id", "warehouse_id", "is_accounted"),
+    "cabinet": ("quantity", "is_deleted", "equipment_type_id"),
+    "assembly": ("quantity", "is_deleted", "equipment_type_id"),
+}
+EQUIPMENT_TYPE_STRUCTURE_ATTRIBUTES = (
+    "is_deleted",
+    "is_channel_forming",
+    "ai_count",
+    "di_count",
+    "ao_count",
+    "do_count",
+    "equipment_category_id",
+)
+WAREHOUSE_ATTRIBUTES = ("name", "is_deleted")
+CATEGORY_ATTRIBUTES = ("name", "parent_id", "is_deleted")
+
+_UNKNOWN = object()
+_aggregate_tables: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def build_root_category_map(categories: list[EquipmentCategory]) -> dict[int, str]:
+    categories_by_id = {category.id: category for category in categories}
+    roots: dict[int, str] = {}
+    for category in categories:
+        current = category
+        seen: set[int] = set()
+        while current.parent_id and current.parent_id in categories_by_id and current.parent_id not in seen:
+            seen.add(current.id)
+            current = categories_by_id[current.parent_id]
+        roots[category.id] = current.name
+    return roots
+
+
+def parse_unit_price(meta_data: dict | None) -> float:
+    value = (meta_data or {}).get("unit_price_rub")
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def compute_dashboard_payload(db) -> dict:
+    """
+    Full recomputation of the overview aggregates. Warehouses are keyed by id so
+    later deltas can be applied without re-reading the catalog.
+    """
+    price_expr = func.coalesce(cast(EquipmentType.meta_data["unit_price_rub"].astext, Float), 0.0)
+    active_type = EquipmentType.is_deleted == False
+
+    total_cabinets = db.scalar(
+        select(func.count()).select_from(Cabinet).where(Cabinet.is_deleted == False)
+    ) or 0
+
+    def channel_forming_qty(model) -> int:
+        return int(
+            db.scalar(
+                select(func.coalesce(func.sum(model.quantity), 0))
+                .join(EquipmentType, model.equipment_type_id == EquipmentType.id)
+                .where(model.is_deleted == False, active_type, EquipmentType.is_channel_forming == True)
+            )
+            or 0
+        )
+
+    operation_qty = union_all(
+        select(
+            CabinetItem.equipment_type_id.label("equipment_type_id"),
+            CabinetItem.quantity.label("quantity"),
+        ).where(CabinetItem.is_deleted == False),
+        select(
+            AssemblyItem.equipment_type_id.label("equipment_type_id"),
+            AssemblyItem.quantity.label("quantity"),
+        ).where(AssemblyItem.is_deleted == False),
+    ).subquery()
+    channel_totals = db.execute(
+        select(
+            *(
+                func.coalesce(func.sum(operation_qty.c.quantity * getattr(EquipmentType, f"{key}_count")), 0).label(key)
+                for key in CHANNEL_KEYS
+            )
+        )
+        .select_from(operation_qty)
+        .join(EquipmentType, operation_qty.c.equipment_type_id == EquipmentType.id)
+        .where(active_type, EquipmentType.is_channel_forming == True)
+    ).one()
+
+    warehouses = {
+        str(row.id): {"name": row.name, "qty": int(row.qty or 0), "value_rub": 0.0}
+        for row in db.execute(
+            select(Warehouse.id, Warehouse.name, func.coalesce(func.sum(WarehouseItem.quantity), 0).label("qty"))
+            .select_from(Warehouse)
+            .outerjoin(
+                WarehouseItem,
+                (WarehouseItem.warehouse_id == Warehouse.id) & (WarehouseItem.is_deleted == False),
+            )
+            .where(Warehouse.is_deleted == False)
+            .group_by(Warehouse.id, Warehouse.name)
+        ).all()
+    }
+    value_rows = db.execute(
+        select(WarehouseItem.warehouse_id, func.coalesce(func.sum(WarehouseItem.quantity * price_expr), 0).label("value_rub"))
+        .join(EquipmentType, WarehouseItem.equipment_type_id == EquipmentType.id)
+        .where(WarehouseItem.is_deleted == False, active_type)
+        .group_by(WarehouseItem.warehouse_id)
+    ).all()
+    warehouse_value_rub = 0.0
+    for row in value_rows:
+        value = float(row.value_rub or 0)
+        warehouse_value_rub += value
+        if str(row.warehouse_id) in warehouses:
+            warehouses[str(row.warehouse_id)]["value_rub"] = value
+
+    root_category_map = build_root_category_map(
+        db.scalars(select(EquipmentCategory).where(EquipmentCategory.is_deleted == False)).all()
+    )
+    by_category: dict[str, int] = {}
+    for row in db.execute(
+        select(EquipmentType.equipment_category_id, func.coalesce(func.sum(WarehouseItem.quantity), 0).label("qty"))
+        .join(EquipmentType, WarehouseItem.equipment_type_id == EquipmentType.id)
+        .outerjoin(EquipmentCategory, EquipmentType.equipment_category_id == EquipmentCategory.id)
+        .where(
+            WarehouseItem.is_deleted == False,
+            active_type,
+            or_(EquipmentType.equipment_category_id.is_(None), EquipmentCategory.is_deleted == False),
+        )
+        .group_by(EquipmentType.equipment_category_id)
+    ).all():
+        category_name = root_category_map.get(row.equipment_category_id) if row.equipment_category_id else None
+        bucket_name = category_name or UNCATEGORIZED_NAME
+        by_category[bucket_name] = by_category.get(bucket_name, 0) + int(row.qty or 0)
+
+    accounted = {"true": 0, "false": 0}
+    for row in db.execute(
+        select(WarehouseItem.is_accounted, func.coalesce(func.sum(WarehouseItem.quantity), 0).label("qty"))
+        .where(WarehouseItem.is_deleted == False)
+        .group_by(WarehouseItem.is_accounted)
+    ).all():
+        accounted["true" if row.is_accounted else "false"] += int(row.qty or 0)
+
+    return {
+        "total_cabinets": int(total_cabinets),
+        "plc_in_cabinets": channel_forming_qty(CabinetItem),
+        "plc_in_warehouses": channel_forming_qty(WarehouseItem),
+        "channels": {key: int(getattr(channel_totals, key) or 0) for key in CHANNEL_KEYS},
+        "warehouse_value_rub": warehouse_value_rub,
+        "by_category": by_category,
+        "warehouses": warehouses,
+        "accounted": accounted,
+    }
+
+
+def render_dashboard_overview(snapshot: DashboardAggregate) -> DashboardOverviewOut:
+    payload = snapshot.payload
+    channels = payload["channels"]
+    warehouse_qty: dict[str, int] = {}
+    warehouse_value: dict[str, float] = {}
+    for warehouse in payload["warehouses"].values():
+        warehouse_qty[warehouse["name"]] = warehouse_qty.get(warehouse["name"], 0) + warehouse["qty"]
+        warehouse_value[warehouse["name"]] = warehouse_value.get(warehouse["name"], 0.0) + warehouse["value_rub"]
+
+    kpis = DashboardKpisOut(
+        total_cabinets=payload["total_cabinets"],
+        total_plc_in_cabinets=payload["plc_in_cabinets"],
+        total_plc_in_warehouses=payload["plc_in_warehouses"],
+        ai_total=channels["ai"],
+        di_total=channels["di"],
+        ao_total=channels["ao"],
+        do_total=channels["do"],
+        total_channels=sum(channels.values()),
+        total_warehouse_value_rub=payload["warehouse_value_rub"],
+    )
+    donuts = DashboardDonutsOut(
+        by_category=[
+            DonutQtyItem(name=name, qty=qty)
+            for name, qty in sorted(payload["by_category"].items())
+            if qty > 0
+        ],
+        by_warehouse_qty=[DonutQtyItem(name=name, qty=qty) for name, qty in sorted(warehouse_qty.items())],
+        accounted_vs_not=[
+            DonutQtyItem(name="Учтено", qty=payload["accounted"]["true"]),
+            DonutQtyItem(name="Не учтено", qty=payload["accounted"]["false"]),
+        ],
+        by_warehouse_value=[
+            DonutValueItem(name=name, value_rub=value) for name, value in sorted(warehouse_value.items())
+        ],
+    )
+    return DashboardOverviewOut(kpis=kpis, donuts=donuts, computed_at=snapshot.computed_at)
+
+
+def refresh_dashboard_aggregates(db) -> DashboardAggregate:
+    """
+    Recompute the snapshot from the base tables. The row is locked first so
+    transactions committing deltas meanwhile queue behind the reconcile and
+    apply on top of its result instead of being overwritten by it.
+    """
+    now = datetime.now(UTC)
+    snapshot = db.get(DashboardAggregate, OVERVIEW_KEY, with_for_update=True, populate_existing=True)
+    payload = compute_dashboard_payload(db)
+    if snapshot is None:
+        snapshot = DashboardAggregate(key=OVERVIEW_KEY, revision=1)
+        db.add(snapshot)
+    else:
+        snapshot.revision += 1
+    snapshot.payload = payload
+    snapshot.is_stale = False
+    snapshot.computed_at = now
+    snapshot.reconciled_at = now
+    db.flush()
+    return snapshot
+
+
+def load_dashboard_overview(db) -> DashboardOverviewOut:
+    snapshot = db.get(DashboardAggregate, OVERVIEW_KEY, populate_existing=True)
+    if snapshot is None or snapshot.is_stale:
+        try:
+            snapshot = refresh_dashboard_aggregates(db)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            snapshot = db.get(DashboardAggregate, OVERVIEW_KEY, populate_existing=True)
+    return render_dashboard_overview(snapshot)
+
+
+def _pending_changes(session: Session) -> dict:
+    return session.info.setdefault(
+        PENDING_DASHBOARD_CHANGES_KEY,
+        {"items": [], "prices": {}, "cabinets": 0, "stale": False},
+    )
+
+
+def mark_dashboard_stale(session: Session) -> None:
+    """
+    Flag the snapshot for a full recompute on commit. For writes that bypass
+    the unit of work (bulk inserts/updates), which the flush hooks never see.
+    """
+    _pending_changes(session)["stale"] = True
+
+
+def record_item_delta(
+    session: Session,
+    location: str,
+    equipment_type_id: int,
+    quantity: int,
+    *,
+    warehouse_id: int | None = None,
+    is_accounted: bool = True,
+) -> None:
+    """
+    Queue a signed stock delta for an item row written with Core statements,
+    so the snapshot can still be patched in place instead of recomputed.
+    """
+    if quantity:
+        _pending_changes(session)["items"].append((location, equipment_type_id, warehouse_id, is_accounted, quantity))
+
+
+def _attribute_change(obj, name: str):
+    attribute = inspect(obj).attrs[name]
+    history = attribute.history
+    if not history.added:
+        return attribute.value, attribute.value
+    if history.deleted:
+        return history.deleted[0], history.added[0]
+    return _UNKNOWN, history.added[0]
+
+
+def _item_contribution(location: str, values: dict) -> tuple | None:
+    if values["is_deleted"] or not values["quantity"]:
+        return None
+    return (
+        location,
+        values["equipment_type_id"],
+        values.get("warehouse_id"),
+        values.get("is_accounted") is not False,
+        values["quantity"],
+    )
+
+
+def _collect_item_change(changes: dict, obj, location: str, *, new: bool = False, deleted: bool = False) -> None:
+    before: dict = {}
+    after: dict = {}
+    for name in ITEM_ATTRIBUTES[location]:
+        old_value, new_value = (_UNKNOWN, getattr(obj, name)) if new else _attribute_change(obj, name)
+        if old_value is _UNKNOWN and not new:
+            changes["stale"] = True
+            return
+        before[name] = old_value
+        after[name] = new_value
+    if not new and not deleted and before == after:
+        return
+    old = None if new else _item_contribution(location, before)
+    current = None if deleted else _item_contribution(location, after)
+    if old is not None:
+        changes["items"].append((*old[:4], -old[4]))
+    if current is not None:
+        changes["items"].append(current)
+
+
+def _has_changes(obj, names) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Session, "before_flush")
+def collect_dashboard_changes(session: Session, flush_context, instances):
+    """
+    Translate pending ORM changes into dashboard deltas. Anything that would
+    reshape the aggregates rather than shift a counter marks the snapshot stale.
+    """
+    for obj in session.new:
+        location = ITEM_LOCATIONS.get(type(obj))
+        if location:
+            _collect_item_change(_pending_changes(session), obj, location, new=True)
+        elif isinstance(obj, Cabinet) and not obj.is_deleted:
+            _pending_changes(session)["cabinets"] += 1
+        elif isinstance(obj, (Warehouse, EquipmentCategory)):
+            _pending_changes(session)["stale"] = True
+
+    for obj in session.dirty:
+        location = ITEM_LOCATIONS.get(type(obj))
+        if location:
+            _collect_item_change(_pending_changes(session), obj, location)
+        elif isinstance(obj, Cabinet):
+            was_deleted, is_deleted = _attribute_change(obj, "is_deleted")
+            if was_deleted is _UNKNOWN:
+                _pending_changes(session)["stale"] = True
+            elif bool(was_deleted) != bool(is_deleted):
+                _pending_changes(session)["cabinets"] += -1 if is_deleted else 1
+        elif isinstance(obj, EquipmentType):
+            if _has_changes(obj, EQUIPMENT_TYPE_STRUCTURE_ATTRIBUTES):
+                _pending_changes(session)["stale"] = True
+            elif _has_changes(obj, ("meta_data",)):
+                old_meta, new_meta = _attribute_change(obj, "meta_data")
+                if old_meta is _UNKNOWN:
+                    _pending_changes(session)["stale"] = True
+                elif parse_unit_price(old_meta) != parse_unit_price(new_meta):
+                    _pending_changes(session)["prices"].setdefault(obj.id, parse_unit_price(old_meta))
+        elif isinstance(obj, Warehouse) and _has_changes(obj, WAREHOUSE_ATTRIBUTES):
+            _pending_changes(session)["stale"] = True
+        elif isinstance(obj, EquipmentCategory) and _has_changes(obj, CATEGORY_ATTRIBUTES):
+            _pending_changes(session)["stale"] = True
+
+    for obj in session.deleted:
+        location = ITEM_LOCATIONS.get(type(obj))
+        if location:
+            _collect_item_change(_pending_changes(session), obj, location, deleted=True)
+        elif isinstance(obj, Cabinet) and not obj.is_deleted:
+            _pending_changes(session)["cabinets"] -= 1
+        elif isinstance(obj, (Warehouse, EquipmentCategory, EquipmentType)):
+            _pending_changes(session)["stale"] = True
+
+
+def _has_aggregates_table(session: Session) -> bool:
+    bind = session.get_bind()
+    if bind not in _aggregate_tables:
+        _aggregate_tables[bind] = inspect(session.connection()).has_table(DashboardAggregate.__tablename__)
+    return _aggregate_tables[bind]
+
+
+def _root_category_name(session: Session, equipment: EquipmentType) -> str | None:
+    if equipment.equipment_category_id is None:
+        return UNCATEGORIZED_NAME
+    category = session.get(EquipmentCategory, equipment.equipment_category_id)
+    if category is None or category.is_deleted:
+        return None
+    seen: set[int] = set()
+    while category.parent_id and category.parent_id not in seen:
+        parent = session.get(EquipmentCategory, category.parent_id)
+        if parent is None or parent.is_deleted:
+            break
+        seen.add(category.id)
+        category = parent
+    return category.name
+
+
+def _add_delta(deltas: dict, path: tuple[str, ...], amount: float) -> None:
+    if amount:
+        deltas[path] = deltas.get(path, 0) + amount
+
+
+def _collect_item_delta(session: Session, deltas: dict, delta: tuple) -> None:
+    location, equipment_type_id, warehouse_id, is_accounted, quantity = delta
+    equipment = session.get(EquipmentType, equipment_type_id)
+    active = equipment is not None and not equipment.is_deleted
+    channel_forming = active and equipment.is_channel_forming
+
+    if location != "warehouse":
+        if channel_forming:
+            if location == "cabinet":
+                _add_delta(deltas, ("plc_in_cabinets",), quantity)
+            for key in CHANNEL_KEYS:
+                _add_delta(deltas, ("channels", key), quantity * (getattr(equipment, f"{key}_count") or 0))
+        return
+
+    warehouse_path = ("warehouses", str(warehouse_id)) if warehouse_id is not None else None
+    if warehouse_path:
+        _add_delta(deltas, (*warehouse_path, "qty"), quantity)
+    _add_delta(deltas, ("accounted", "true" if is_accounted else "false"), quantity)
+    if not active:
+        return
+    value = quantity * parse_unit_price(equipment.meta_data)
+    _add_delta(deltas, ("warehouse_value_rub",), value)
+    if warehouse_path:
+        _add_delta(deltas, (*warehouse_path, "value_rub"), value)
+    if channel_forming:
+        _add_delta(deltas, ("plc_in_warehouses",), quantity)
+    category_name = _root_category_name(session, equipment)
+    if category_name is not None:
+        _add_delta(deltas, ("by_category", category_name), quantity)
+
+
+def _collect_price_delta(session: Session, deltas: dict, equipment_type_id: int, old_price: float) -> None:
+    equipment = session.get(EquipmentType, equipment_type_id)
+    if equipment is None or equipment.is_deleted:
+        return
+    difference = parse_unit_price(equipment.meta_data) - old_price
+    for row in session.execute(
+        select(WarehouseItem.warehouse_id, func.sum(WarehouseItem.quantity).label("qty"))
+        .where(WarehouseItem.equipment_type_id == equipment_type_id, WarehouseItem.is_deleted == False)
+        .group_by(WarehouseItem.warehouse_id)
+    ).all():
+        value = difference * int(row.qty or 0)
+        _add_delta(deltas, ("warehouse_value_rub",), value)
+        _add_delta(deltas, ("warehouses", str(row.warehouse_id), "value_rub"), value)
+
+
+def _add_at_path(payload: dict, path: tuple[str, ...], amount: float) -> None:
+    parent = payload
+    for key in path[:-1]:
+        parent = parent.get(key) if isinstance(parent, dict) else None
+        if parent is None:
+            return
+    parent[path[-1]] = (parent.get(path[-1]) or 0) + amount
+
+
+def _payload_with_deltas(connection, table, deltas: dict):
+    """
+    The new `payload` value for the additive UPDATE. On PostgreSQL it is a
+    nested `jsonb_set(payload, path, (payload #>> path)::numeric + delta)`,
+    so concurrent writers add onto whatever the row holds once they get it;
+    like jsonb_set, a counter whose parent object is missing (a warehouse
+    the snapshot does not know) is skipped. Elsewhere the payload is read
+    and patched in Python; SQLite serializes writers anyway.
+    """
+    if connection.dialect.name == "postgresql":
+        payload = table.c.payload
+        for path, amount in deltas.items():
+            current = func.coalesce(cast(table.c.payload[path].astext, Numeric), 0)
+            payload = func.jsonb_set(
+                payload,
+                literal(list(path), postgresql.ARRAY(Text)),
+                func.to_jsonb(current + literal(amount, Numeric)),
+                type_=JSONB,
+            )
+        return payload
+    payload = connection.scalar(
+        select(table.c.payload).where(table.c.key == OVERVIEW_KEY, table.c.is_stale == False)
+    )
+    if payload is None:
+        return table.c.payload
+    payload = copy.deepcopy(payload)
+    for path, amount in deltas.items():
+        _add_at_path(payload, path, amount)
+    return payload
+
+
+@event.listens_for(Session, "before_commit")
+def apply_pending_dashboard_changes(session: Session):
+    """
+    Fold the committing transaction's deltas into the snapshot with one
+    additive UPDATE at the end of the transaction. Nothing is read under a
+    lock first: the row lock is only taken by the UPDATE itself, and the
+    change is atomic with the item writes.
+    """
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    changes = session.info.pop(PENDING_DASHBOARD_CHANGES_KEY, None)
+    if not changes or not _has_aggregates_table(session):
+        return
+    table = DashboardAggregate.__table__
+    current = update(table).where(table.c.key == OVERVIEW_KEY, table.c.is_stale == False)
+
+    repriced = set(changes["prices"])
+    if changes["stale"] or any(
+        delta[0] == "warehouse" and delta[1] in repriced for delta in changes["items"]
+    ):
+        session.execute(current.values(is_stale=True))
+        return
+
+    deltas: dict[tuple[str, ...], float] = {}
+    _add_delta(deltas, ("total_cabinets",), changes["cabinets"])
+    for delta in changes["items"]:
+        _collect_item_delta(session, deltas, delta)
+    for equipment_type_id, old_price in changes["prices"].items():
+        _collect_price_delta(session, deltas, equipment_type_id, old_price)
+    if not deltas:
+        return
+    session.execute(
+        current.values(
+            payload=_payload_with_deltas(session.connection(), table, deltas),
+            revision=table.c.revision + 1,
+            computed_at=datetime.now(UTC),
+        )
+    )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def discard_pending_dashboard_changes(session: Session, transaction):
+    if transaction.parent is None:
+        session.info.pop(PENDING_DASHBOARD_CHANGES_KEY, None)
+
+
+def _scheduled_dashboard_reconcile(db) -> None:
+    if _has_aggregates_table(db):
+        refresh_dashboard_aggregates(db)
+
+
+def start_dashboard_reconcile_scheduler():
+    return start_periodic_job(
+        "dashboard-reconcile",
+        get_settings().dashboard_reconcile_interval_minutes,
+        _scheduled_dashboard_reconcile,
+    )
@@ -5,8 +5,11 @@ import os
 import re
 import socket
 import subprocess
+import threading
+import time
 from collections import defaultdict
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 from urllib.parse import urlparse
@@ -15,7 +18,8 @@ from urllib.request import urlopen
 
 import psutil
 from fastapi import HTTPException, status
-from sqlalchemy import text
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import BASE_DIR, get_settings
 from app.core.versioning import read_version
@@ -23,10 +27,12 @@ from app.db.session import engine
 from app.schemas.diagnostics import (
     DiagnosticsCommandGroupOut,
     DiagnosticsDatabaseOverviewOut,
+    DiagnosticsDatabaseTableCountOut,
     DiagnosticsDatabaseTableOut,
     DiagnosticsDeleteLogsOut,
     DiagnosticsLogEntryOut,
     DiagnosticsLogsPageOut,
+    DiagnosticsLogTailOut,
     DiagnosticsPortOut,
     DiagnosticsProcessKillOut,
     DiagnosticsProcessOut,
@@ -35,6 +41,7 @@ from app.schemas.diagnostics import (
     DiagnosticsServiceOut,
     DiagnosticsSummaryOut,
 )
+from app.services.diagnostics_log_index import DiagnosticsLogIndex, LogEntryFilter
 
 PROJECT_ROOT = BASE_DIR.parent
 RUNTIME_LOGS_DIR = PROJECT_ROOT / "runtime-logs"
@@ -43,7 +50,10 @@ RETENTION_HOURS = 24
 REFRESH_SECONDS = 3600
 MAX_STORED_LOG_LINES = 300
 MAX_LINES_PER_FILE = 1200
+LOG_SOURCES = ("server", "postgres", "backend", "frontend")
 settings = get_settings()
+# (max_lines, mtime_ns, size) of files already known to fit their limit.
+_CHECKED_LOG_FILES: dict[Path, tuple[int, int, int]] = {}
 
 def get_service_definitions() -> dict[str, dict[str, object]]:
     frontend_runtime_url = settings.frontend_runtime_base_url.rstrip("/")
@@ -264,18 +274,25 @@ def utc_now() -> datetime:
 
 
 def trim_log_file(path: Path, max_lines: int = MAX_STORED_LOG_LINES) -> None:
-    if max_lines <= 0 or not path.exists() or not path.is_file():
+    if max_lines <= 0 or not path.is_file():
         return
     try:
-        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines(keepends=True)
+        stat = path.stat()
     except OSError:
         return
-    if len(lines) <= max_lines:
+    if _CHECKED_LOG_FILES.get(path) == (max_lines, stat.st_mtime_ns, stat.st_size):
         return
     try:
-        path.write_text("".join(lines[-max_lines:]), encoding="utf-8")
+        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines(keepends=True)
     except OSError:
         return
+    if len(lines) > max_lines:
+        try:
+            path.write_text("".join(lines[-max_lines:]), encoding="utf-8")
+            stat = path.stat()
+        except OSError:
+            return
+    _CHECKED_LOG_FILES[path] = (max_lines, stat.st_mtime_ns, stat.st_size)
 
 
 def ensure_runtime_log_retention(base_dir: Path = RUNTIME_LOGS_DIR, retention_hours: int = RETENTION_HOURS, now: datetime | None = None) -> None:
@@ -294,6 +311,7 @@ def ensure_runtime_log_retention(base_dir: Path = RUNTIME_LOGS_DIR, retention_ho
                 path.unlink(missing_ok=True)
             except OSError:
                 pass
+            _CHECKED_LOG_FILES.pop(path, None)
             continue
         trim_log_file(path)
 
@@ -514,42 +532,149 @@ def build_database_dsn() -> str:
     return f"postgresql://{settings.db_user}@{settings.db_host}:{settings.db_port}/{settings.db_name}"
 
 
-def collect_database_overview() -> DiagnosticsDatabaseOverviewOut:
+# One row per top-level table. Partitioned parents (relkind 'p') hold no data
+# themselves, so sizes, row estimates and scan counters are summed over every
+# relation in their partition tree; the partitions are not listed separately.
+POSTGRES_TABLE_STATS_SQL = """
+SELECT c.relname AS table_name,
+       SUM(
+           CASE WHEN p.relkind = 'r'
+                THEN GREATEST(CASE WHEN p.reltuples >= 0 THEN p.reltuples ELSE COALESCE(s.n_live_tup, 0) END, 0)
+                ELSE 0
+           END
+       )::bigint AS row_estimate,
+       SUM(pg_relation_size(p.oid))::bigint AS table_bytes,
+       SUM(pg_indexes_size(p.oid))::bigint AS index_bytes,
+       SUM(pg_total_relation_size(p.oid))::bigint AS total_bytes,
+       SUM(s.n_dead_tup)::bigint AS dead_rows,
+       SUM(s.seq_scan)::bigint AS seq_scans,
+       SUM(s.idx_scan)::bigint AS index_scans,
+       MAX(s.last_autovacuum) AS last_autovacuum,
+       MAX(s.last_autoanalyze) AS last_autoanalyze
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN LATERAL pg_partition_tree(c.oid) t ON true
+JOIN pg_class p ON p.oid = COALESCE(t.relid, c.oid)
+LEFT JOIN pg_stat_user_tables s ON s.relid = p.oid
+WHERE n.nspname = 'public'
+  AND c.relkind IN ('r', 'p')
+  AND NOT c.relispartition
+  AND c.relname <> 'alembic_version'
+GROUP BY c.oid, c.relname
+"""
+# Indexes on partitions are reported once, under their partitioned parent
+# index, and only when no partition used them.
+POSTGRES_UNUSED_INDEXES_SQL = """
+SELECT tc.relname AS table_name, ic.relname AS index_name
+FROM pg_stat_user_indexes s
+JOIN pg_index i ON i.indexrelid = s.indexrelid
+JOIN pg_class tc ON tc.oid = COALESCE(pg_partition_root(s.relid), s.relid)
+JOIN pg_class ic ON ic.oid = COALESCE(pg_partition_root(s.indexrelid), s.indexrelid)
+WHERE s.schemaname = 'public'
+  AND NOT i.indisunique
+  AND NOT i.indisprimary
+GROUP BY tc.relname, ic.relname
+HAVING SUM(s.idx_scan) = 0
+ORDER BY ic.relname
+"""
+DEAD_ROWS_WARNING_MIN = 10_000
+DEAD_ROWS_WARNING_RATIO = 0.2
+
+
+def _collect_postgres_tables(connection) -> tuple[int, list[DiagnosticsDatabaseTableOut]]:
+    database_bytes = int(connection.execute(text("SELECT pg_database_size(current_database())")).scalar_one())
+    unused_indexes: dict[str, list[str]] = defaultdict(list)
+    for row in connection.execute(text(POSTGRES_UNUSED_INDEXES_SQL)).mappings():
+        unused_indexes[str(row["table_name"])].append(str(row["index_name"]))
+    tables = [
+        DiagnosticsDatabaseTableOut(
+            table_name=str(row["table_name"]),
+            row_count=int(row["row_estimate"] or 0),
+            row_count_is_estimate=True,
+            table_bytes=int(row["table_bytes"] or 0),
+            index_bytes=int(row["index_bytes"] or 0),
+            total_bytes=int(row["total_bytes"] or 0),
+            dead_rows=row["dead_rows"],
+            seq_scans=row["seq_scans"],
+            index_scans=row["index_scans"],
+            unused_indexes=unused_indexes.get(str(row["table_name"]), []),
+            last_autovacuum=row["last_autovacuum"],
+            last_autoanalyze=row["last_autoanalyze"],
+        )
+        for row in connection.execute(text(POSTGRES_TABLE_STATS_SQL)).mappings()
+    ]
+    return database_bytes, tables
+
+
+def _collect_sqlite_tables(connection) -> tuple[int, list[DiagnosticsDatabaseTableOut]]:
+    """
+    SQLite has no planner statistics catalog: row counts come from
+    `sqlite_stat1` when ANALYZE has run (exact COUNT(*) otherwise, these
+    databases are small) and sizes from the `dbstat` table when compiled in.
+    """
+    page_size = int(connection.exec_driver_sql("PRAGMA page_size").scalar_one())
+    database_bytes = page_size * int(connection.exec_driver_sql("PRAGMA page_count").scalar_one())
+    table_names = [name for name in inspect(connection).get_table_names() if name != "alembic_version"]
+    index_owner = {
+        str(row[0]): str(row[1])
+        for row in connection.exec_driver_sql("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")
+    }
+    estimates: dict[str, int] = {}
+    if connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").first():
+        for table_name, stat in connection.exec_driver_sql("SELECT tbl, stat FROM sqlite_stat1"):
+            if stat:
+                estimates[str(table_name)] = int(str(stat).split()[0])
+    table_bytes: dict[str, int] = defaultdict(int)
+    index_bytes: dict[str, int] = defaultdict(int)
+    try:
+        for name, size in connection.exec_driver_sql("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+            if name in index_owner:
+                index_bytes[index_owner[name]] += int(size or 0)
+            else:
+                table_bytes[str(name)] += int(size or 0)
+    except SQLAlchemyError:
+        pass
+    tables: list[DiagnosticsDatabaseTableOut] = []
+    for table_name in table_names:
+        quoted_table = table_name.replace('"', '""')
+        estimated = table_name in estimates
+        tables.append(
+            DiagnosticsDatabaseTableOut(
+                table_name=table_name,
+                row_count=estimates[table_name] if estimated else int(connection.exec_driver_sql(f'SELECT COUNT(*) FROM "{quoted_table}"').scalar_one()),
+                row_count_is_estimate=estimated,
+                table_bytes=table_bytes[table_name],
+                index_bytes=index_bytes[table_name],
+                total_bytes=table_bytes[table_name] + index_bytes[table_name],
+            )
+        )
+    return database_bytes, tables
+
+
+def _database_table_issues(tables: list[DiagnosticsDatabaseTableOut]) -> list[str]:
+    issues: list[str] = []
+    for table in tables:
+        if table.dead_rows and table.dead_rows >= DEAD_ROWS_WARNING_MIN and table.dead_rows > table.row_count * DEAD_ROWS_WARNING_RATIO:
+            issues.append(f"Таблица {table.table_name}: {table.dead_rows} мертвых строк, autovacuum не успевает.")
+    return issues
+
+
+def collect_database_overview(bind=None) -> DiagnosticsDatabaseOverviewOut:
+    """
+    Database size and per-table statistics read from the catalog (planner row
+    estimates, relation sizes, dead tuples, scan counters) without scanning
+    any table. Exact counts are available per table via `count_database_table_rows`.
+    """
+    bind = bind if bind is not None else engine
     issues: list[str] = []
     tables: list[DiagnosticsDatabaseTableOut] = []
     database_bytes = 0
     try:
-        with engine.connect() as connection:
-            database_bytes = int(connection.execute(text("SELECT pg_database_size(current_database())")).scalar_one())
-            table_rows = connection.execute(
-                text(
-                    """
-                    SELECT c.relname AS table_name,
-                           pg_relation_size(c.oid) AS table_bytes,
-                           pg_indexes_size(c.oid) AS index_bytes,
-                           pg_total_relation_size(c.oid) AS total_bytes
-                    FROM pg_class c
-                    JOIN pg_namespace n ON n.oid = c.relnamespace
-                    WHERE n.nspname = 'public'
-                      AND c.relkind = 'r'
-                      AND c.relname <> 'alembic_version'
-                    ORDER BY pg_total_relation_size(c.oid) DESC, c.relname
-                    """
-                )
-            ).mappings().all()
-            for row in table_rows:
-                table_name = str(row["table_name"])
-                quoted_table = table_name.replace('"', '""')
-                row_count = int(connection.execute(text(f'SELECT COUNT(*) FROM public."{quoted_table}"')).scalar_one())
-                tables.append(
-                    DiagnosticsDatabaseTableOut(
-                        table_name=table_name,
-                        row_count=row_count,
-                        table_bytes=int(row["table_bytes"] or 0),
-                        index_bytes=int(row["index_bytes"] or 0),
-                        total_bytes=int(row["total_bytes"] or 0),
-                    )
-                )
+        with bind.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                database_bytes, tables = _collect_postgres_tables(connection)
+            else:
+                database_bytes, tables = _collect_sqlite_tables(connection)
     except Exception as exc:  # noqa: BLE001
         issues.append(f"Не удалось собрать обзор БД: {exc}")
     tables.sort(key=lambda item: (item.total_bytes, item.row_count, item.table_name), reverse=True)
@@ -562,10 +687,57 @@ def collect_database_overview() -> DiagnosticsDatabaseOverviewOut:
         table_count=len(tables),
         total_rows=sum(item.row_count for item in tables),
         tables=tables,
-        issues=issues,
+        issues=[*issues, *_database_table_issues(tables)],
+        collected_at=utc_now(),
     )
 
 
+class DatabaseOverviewCache:
+    """
+    Keeps the last database overview for `diagnostics_database_overview_ttl_seconds`
+    so repeated summary calls share one snapshot; concurrent callers wait for
+    a single collection instead of starting their own. A failed collection
+    is returned but not cached.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entry: tuple[float, DiagnosticsDatabaseOverviewOut] | None = None
+
+    def get(self, loader, *, refresh: bool = False) -> DiagnosticsDatabaseOverviewOut:
+        with self._lock:
+            if not refresh and self._entry is not None and self._entry[0] > time.monotonic():
+                return self._entry[1]
+            overview = loader()
+            ttl = settings.diagnostics_database_overview_ttl_seconds
+            failed = not overview.tables and bool(overview.issues)
+            self._entry = (time.monotonic() + ttl, overview) if ttl > 0 and not failed else None
+            return overview
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+database_overview_cache = DatabaseOverviewCache()
+
+
+def get_database_overview(refresh: bool = False) -> DiagnosticsDatabaseOverviewOut:
+    return database_overview_cache.get(collect_database_overview, refresh=refresh)
+
+
+def count_database_table_rows(table_name: str, bind=None) -> DiagnosticsDatabaseTableCountOut:
+    """Exact COUNT(*) for one table of the overview, run only on demand."""
+    bind = bind if bind is not None else engine
+    with bind.connect() as connection:
+        known_tables = set(inspect(connection).get_table_names(schema="public" if connection.dialect.name == "postgresql" else None))
+        if table_name not in known_tables or table_name == "alembic_version":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Table not found")
+        quoted_table = table_name.replace('"', '""')
+        row_count = int(connection.execute(text(f'SELECT COUNT(*) FROM "{quoted_table}"')).scalar_one())
+    return DiagnosticsDatabaseTableCountOut(table_name=table_name, row_count=row_count, counted_at=utc_now())
+
+
 def build_runtime_topology(
     services: list[DiagnosticsServiceOut],
     processes: list[DiagnosticsProcessOut] | None = None,
@@ -1072,45 +1244,53 @@ def build_log_entry(source: str, path: Path, line_number: int, text: str, observ
     )
 
 
-def load_log_entries_from_file(source: str, path: Path) -> list[DiagnosticsLogEntryOut]:
-    file_mtime = datetime.fromtimestamp(path.stat().st_mtime, UTC)
-    trim_log_file(path)
+def build_unreadable_log_entry(source: str, path: Path, exc: OSError) -> DiagnosticsLogEntryOut:
     try:
-        file_lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    except OSError as exc:
-        entry_id = build_entry_id(source, path, 0, str(exc))
-        return [
-            DiagnosticsLogEntryOut(
-                id=entry_id,
-                entry_id=entry_id,
-                source=source,
-                severity="warning",
-                signature="log_file_unreadable",
-                category="filesystem",
-                summary="Не удалось прочитать лог-файл.",
-                normalized_message="Лог-файл недоступен для чтения.",
-                raw_message=str(exc),
-                observed_at=file_mtime,
-                file_path=str(path),
-                line_number=0,
-                is_low_signal=False,
-                can_delete=False,
-                possible_causes=["Файл занят другим процессом или недоступен по правам."],
-                suggested_actions=["Проверьте существование файла и права доступа к нему."],
-                suggested_commands=build_command_groups("generic_error", source),
-            )
-        ]
+        observed_at = datetime.fromtimestamp(path.stat().st_mtime, UTC)
+    except OSError:
+        observed_at = utc_now()
+    entry_id = build_entry_id(source, path, 0, str(exc))
+    return DiagnosticsLogEntryOut(
+        id=entry_id,
+        entry_id=entry_id,
+        source=source,
+        severity="warning",
+        signature="log_file_unreadable",
+        category="filesystem",
+        summary="Не удалось прочитать лог-файл.",
+        normalized_message="Лог-файл недоступен для чтения.",
+        raw_message=str(exc),
+        observed_at=observed_at,
+        file_path=str(path),
+        line_number=0,
+        is_low_signal=False,
+        can_delete=False,
+        possible_causes=["Файл занят другим процессом или недоступен по правам."],
+        suggested_actions=["Проверьте существование файла и права доступа к нему."],
+        suggested_commands=build_command_groups("generic_error", source),
+    )
 
-    trimmed_lines = file_lines[-MAX_LINES_PER_FILE:]
-    line_offset = len(file_lines) - len(trimmed_lines)
-    entries: list[DiagnosticsLogEntryOut] = []
-    for index, line in enumerate(trimmed_lines):
-        text = line.strip()
-        if not text:
-            continue
-        line_number = line_offset + index + 1
-        entries.append(build_log_entry(source, path, line_number, text, parse_observed_at(text, file_mtime), True))
-    return entries
+
+def index_log_line(source: str, path: Path, line_number: int, text: str, file_mtime: datetime) -> DiagnosticsLogEntryOut:
+    return build_log_entry(source, path, line_number, text, parse_observed_at(text, file_mtime), True)
+
+
+@lru_cache
+def get_log_index() -> DiagnosticsLogIndex:
+    return DiagnosticsLogIndex(
+        settings.resolved_diagnostics_log_index_path,
+        index_log_line,
+        max_lines_per_file=MAX_LINES_PER_FILE,
+    )
+
+
+def sync_log_index() -> list[DiagnosticsLogEntryOut]:
+    """
+    Index lines appended to the runtime log files since the last sync and
+    return entries for the files that could not be read.
+    """
+    files = [(source, path) for source in LOG_SOURCES for path in get_log_candidates(source)]
+    return [build_unreadable_log_entry(source, path, exc) for source, path, exc in get_log_index().sync(files)]
 
 
 def build_host_log_entries(services: Iterable[DiagnosticsServiceOut], ports: Iterable[DiagnosticsPortOut], processes: Iterable[DiagnosticsProcessOut]) -> list[DiagnosticsLogEntryOut]:
@@ -1168,17 +1348,13 @@ def build_host_log_entries(services: Iterable[DiagnosticsServiceOut], ports: Ite
     return entries
 
 
-def collect_all_log_entries(include_low_signal: bool = False) -> list[DiagnosticsLogEntryOut]:
+def collect_live_log_entries() -> list[DiagnosticsLogEntryOut]:
+    """Entries that are not read from log files: host checks and unreadable files."""
     processes = collect_processes()
     ports = collect_listening_ports(processes)
     services = collect_services(ports, processes)
     entries = build_host_log_entries(services, ports, processes)
-    for source in ("server", "postgres", "backend", "frontend"):
-        for path in get_log_candidates(source):
-            entries.extend(load_log_entries_from_file(source, path))
-    if not include_low_signal:
-        entries = [entry for entry in entries if not entry.is_low_signal]
-    entries = [entry for entry in entries if entry.severity in {"warning", "critical"}]
+    entries.extend(sync_log_index())
     entries.sort(key=lambda item: item.observed_at or datetime.fromtimestamp(0, UTC), reverse=True)
     return entries
 
@@ -1188,7 +1364,7 @@ def get_diagnostics_summary() -> DiagnosticsSummaryOut:
     processes = collect_processes()
     ports = collect_listening_ports(processes)
     services = collect_services(ports, processes)
-    database_overview = collect_database_overview()
+    database_overview = get_database_overview()
     runtime_topology = build_runtime_topology(services, processes, database_overview)
     return DiagnosticsSummaryOut(
         app_version=read_version(),
@@ -1220,30 +1396,41 @@ def get_diagnostics_processes() -> list[DiagnosticsProcessOut]:
 
 def get_diagnostics_logs(source: str | None = None, severity: str | None = None, q: str | None = None, include_low_signal: bool = False, date_from: datetime | None = None, date_to: datetime | None = None, page: int = 1, page_size: int = 50) -> DiagnosticsLogsPageOut:
     ensure_runtime_log_retention()
-    entries = collect_all_log_entries(include_low_signal=include_low_signal)
-    if source:
-        entries = [entry for entry in entries if entry.source == source]
-    if severity:
-        entries = [entry for entry in entries if entry.severity == severity]
-    if q:
-        query = q.lower()
-        entries = [
-            entry for entry in entries
-            if query in entry.raw_message.lower()
-            or query in entry.summary.lower()
-            or (entry.normalized_message and query in entry.normalized_message.lower())
-            or any(query in item.lower() for item in entry.possible_causes)
-            or any(query in item.lower() for item in entry.suggested_actions)
-            or any(query in command.lower() for group in entry.suggested_commands for command in group.commands)
-        ]
-    if date_from:
-        entries = [entry for entry in entries if entry.observed_at and entry.observed_at >= date_from]
-    if date_to:
-        entries = [entry for entry in entries if entry.observed_at and entry.observed_at <= date_to]
-    total = len(entries)
+    entry_filter = LogEntryFilter(source=source, severity=severity, q=q, include_low_signal=include_low_signal, date_from=date_from, date_to=date_to)
+    # Live entries are stamped with the current time and so lead the list;
+    # the page continues into the indexed file entries after them.
+    live_entries = [entry for entry in collect_live_log_entries() if entry_filter.matches(entry)]
+    log_index = get_log_index()
+    cursor = log_index.last_seq()
     start = max(0, (page - 1) * page_size)
-    end = start + page_size
-    return DiagnosticsLogsPageOut(items=entries[start:end], page=page, page_size=page_size, total=total)
+    items = live_entries[start:start + page_size]
+    indexed_total, indexed_items = log_index.query(
+        entry_filter,
+        offset=max(0, start - len(live_entries)),
+        limit=page_size - len(items),
+    )
+    return DiagnosticsLogsPageOut(
+        items=[*items, *indexed_items],
+        page=page,
+        page_size=page_size,
+        total=len(live_entries) + indexed_total,
+        cursor=cursor,
+    )
+
+
+def tail_diagnostics_logs(after: int | None = None, source: str | None = None, severity: str | None = None, include_low_signal: bool = False, limit: int = 200) -> DiagnosticsLogTailOut:
+    """
+    File entries indexed after cursor `after`, oldest first. Without a cursor
+    only the current one is returned, so a client can start following the
+    tail without replaying the backlog.
+    """
+    log_index = get_log_index()
+    sync_log_index()
+    if after is None:
+        return DiagnosticsLogTailOut(cursor=log_index.last_seq(), items=[])
+    entry_filter = LogEntryFilter(source=source, severity=severity, include_low_signal=include_low_signal)
+    cursor, items = log_index.tail(entry_filter, after=after, limit=limit)
+    return DiagnosticsLogTailOut(cursor=cursor, items=items)
 
 
 def delete_diagnostics_logs(entry_ids: list[str]) -> DiagnosticsDeleteLogsOut:
@@ -1283,6 +1470,7 @@ def delete_diagnostics_logs(entry_ids: list[str]) -> DiagnosticsDeleteLogsOut:
             delete_indexes.add(matched_index)
         if delete_indexes:
             path.write_text("".join(line for index, line in enumerate(lines) if index not in delete_indexes), encoding="utf-8")
+            get_log_index().forget(path)
             trim_log_file(path)
             deleted_count += len(delete_indexes)
 
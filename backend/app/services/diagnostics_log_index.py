@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from app.schemas.diagnostics import DiagnosticsLogEntryOut
+
+# Bump when the stored payload or the classification rules change: an index
+# with another version is dropped and rebuilt from the log files.
+INDEX_SCHEMA_VERSION = 1
+HEAD_FINGERPRINT_BYTES = 256
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS log_files (
+        path TEXT PRIMARY KEY,
+        source TEXT NOT NULL,
+        inode INTEGER NOT NULL,
+        head_size INTEGER NOT NULL,
+        head_digest TEXT NOT NULL,
+        offset INTEGER NOT NULL,
+        line_count INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS log_entries (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL,
+        source TEXT NOT NULL,
+        line_number INTEGER NOT NULL,
+        severity TEXT NOT NULL,
+        is_low_signal INTEGER NOT NULL,
+        sort_at REAL NOT NULL,
+        search_text TEXT NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_log_entries_path_line ON log_entries (path, line_number)",
+    "CREATE INDEX IF NOT EXISTS ix_log_entries_sort ON log_entries (sort_at DESC, seq DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_log_entries_source_severity ON log_entries (source, severity, sort_at)",
+)
+
+# Only these severities are listed; lower ones stay in the index unused.
+REPORTED_SEVERITIES = ("warning", "critical")
+
+EntryBuilder = Callable[[str, Path, int, str, datetime], DiagnosticsLogEntryOut]
+
+
+@dataclass(frozen=True)
+class LogEntryFilter:
+    source: str | None = None
+    severity: str | None = None
+    q: str | None = None
+    include_low_signal: bool = False
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+
+    def matches(self, entry: DiagnosticsLogEntryOut) -> bool:
+        if entry.severity not in REPORTED_SEVERITIES:
+            return False
+        if not self.include_low_signal and entry.is_low_signal:
+            return False
+        if self.source and entry.source != self.source:
+            return False
+        if self.severity and entry.severity != self.severity:
+            return False
+        if self.q and self.q.lower() not in search_text(entry):
+            return False
+        if self.date_from and not (entry.observed_at and entry.observed_at >= self.date_from):
+            return False
+        if self.date_to and not (entry.observed_at and entry.observed_at <= self.date_to):
+            return False
+        return True
+
+    def where(self) -> tuple[str, list]:
+        clauses: list[str] = [f"severity IN ({', '.join('?' for _ in REPORTED_SEVERITIES)})"]
+        params: list = list(REPORTED_SEVERITIES)
+        if not self.include_low_signal:
+            clauses.append("is_low_signal = 0")
+        if self.source:
+            clauses.append("source = ?")
+            params.append(self.source)
+        if self.severity:
+            clauses.append("severity = ?")
+            params.append(self.severity)
+        if self.q:
+            # Lower-cased in Python: SQLite's lower() only folds ASCII.
+            clauses.append("instr(search_text, ?) > 0")
+            params.append(self.q.lower())
+        if self.date_from:
+            clauses.append("sort_at >= ?")
+            params.append(self.date_from.timestamp())
+        if self.date_to:
+            clauses.append("sort_at > 0 AND sort_at <= ?")
+            params.append(self.date_to.timestamp())
+        return " WHERE " + " AND ".join(clauses), params
+
+
+def search_text(entry: DiagnosticsLogEntryOut) -> str:
+    parts = [entry.raw_message, entry.summary, entry.normalized_message or ""]
+    parts.extend(entry.possible_causes)
+    parts.extend(entry.suggested_actions)
+    parts.extend(command for group in entry.suggested_commands for command in group.commands)
+    return "\n".join(parts).lower()
+
+
+def _head_digest(head: bytes) -> str:
+    return hashlib.sha1(head).hexdigest()
+
+
+class DiagnosticsLogIndex:
+    """
+    On-disk index of classified log lines. Every tracked file remembers the
+    byte offset and line count reached so far, so a sync only reads and
+    classifies lines appended since the previous one. A file that shrank, was
+    replaced (other inode) or rewritten (other leading bytes) is re-indexed
+    from scratch. Only the newest `max_lines_per_file` lines of a file are
+    kept, and `seq` grows monotonically so it doubles as a tail cursor.
+    """
+
+    def __init__(self, path: Path, build_entry: EntryBuilder, *, max_lines_per_file: int):
+        self.path = path
+        self.build_entry = build_entry
+        self.max_lines_per_file = max_lines_per_file
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            try:
+                if not self._ready:
+                    self._prepare(connection)
+                yield connection
+            finally:
+                connection.close()
+
+    def _prepare(self, connection: sqlite3.Connection) -> None:
+        connection.execute("PRAGMA journal_mode=WAL")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_SCHEMA_VERSION:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DROP TABLE IF EXISTS log_entries")
+            connection.execute("DROP TABLE IF EXISTS log_files")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version={INDEX_SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        self._ready = True
+
+    def sync(self, files: Iterable[tuple[str, Path]]) -> list[tuple[str, Path, OSError]]:
+        """
+        Bring the index up to date with `files` ((source, path) pairs) and
+        drop everything indexed for files no longer listed. Returns the files
+        that could not be read.
+        """
+        files = list(files)
+        failures: list[tuple[str, Path, OSError]] = []
+        with self._connection() as connection:
+            for source, path in files:
+                try:
+                    self._sync_file(connection, source, path)
+                except OSError as exc:
+                    failures.append((source, path, exc))
+            self._drop_untracked(connection, {str(path) for _source, path in files})
+        return failures
+
+    def forget(self, path: Path) -> None:
+        """Drop a file from the index, e.g. after rewriting it in place."""
+        if not self.path.exists():
+            return
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM log_entries WHERE path = ?", (str(path),))
+            connection.execute("DELETE FROM log_files WHERE path = ?", (str(path),))
+            connection.execute("COMMIT")
+
+    def _drop_untracked(self, connection: sqlite3.Connection, tracked: set[str]) -> None:
+        stale = [row["path"] for row in connection.execute("SELECT path FROM log_files") if row["path"] not in tracked]
+        if not stale:
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        for path in stale:
+            connection.execute("DELETE FROM log_entries WHERE path = ?", (path,))
+            connection.execute("DELETE FROM log_files WHERE path = ?", (path,))
+        connection.execute("COMMIT")
+
+    def _sync_file(self, connection: sqlite3.Connection, source: str, path: Path) -> None:
+        key = str(path)
+        stat = path.stat()
+        known = connection.execute("SELECT * FROM log_files WHERE path = ?", (key,)).fetchone()
+        if known is not None and known["inode"] == stat.st_ino and known["offset"] == stat.st_size:
+            return
+
+        with path.open("rb") as handle:
+            head = handle.read(HEAD_FINGERPRINT_BYTES)
+            rewritten = (
+                known is None
+                or known["inode"] != stat.st_ino
+                or stat.st_size < known["offset"]
+                or _head_digest(head[: known["head_size"]]) != known["head_digest"]
+            )
+            offset = 0 if rewritten else known["offset"]
+            line_count = 0 if rewritten else known["line_count"]
+            handle.seek(offset)
+            chunk = handle.read()
+
+        # Only complete lines are indexed; a partially written last line is
+        # picked up by the sync that sees its newline.
+        complete = chunk[: chunk.rfind(b"\n") + 1]
+        lines = complete.split(b"\n")[:-1]
+        observed_fallback = datetime.fromtimestamp(stat.st_mtime, UTC)
+        first_kept = max(0, len(lines) - self.max_lines_per_file)
+        rows = []
+        for index in range(first_kept, len(lines)):
+            text = lines[index].decode("utf-8", errors="ignore").strip()
+            if not text:
+                continue
+            entry = self.build_entry(source, path, line_count + index + 1, text, observed_fallback)
+            rows.append(
+                (
+                    key,
+                    source,
+                    entry.line_number,
+                    entry.severity,
+                    int(entry.is_low_signal),
+                    entry.observed_at.timestamp() if entry.observed_at else 0.0,
+                    search_text(entry),
+                    entry.model_dump_json(),
+                )
+            )
+        line_count += len(lines)
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            current = connection.execute("SELECT offset, inode FROM log_files WHERE path = ?", (key,)).fetchone()
+            if not rewritten and (current is None or current["offset"] != offset or current["inode"] != stat.st_ino):
+                # Another worker synced this file in the meantime.
+                connection.execute("ROLLBACK")
+                return
+            if rewritten:
+                connection.execute("DELETE FROM log_entries WHERE path = ?", (key,))
+            connection.executemany(
+                """
+                INSERT INTO log_entries (path, source, line_number, severity, is_low_signal, sort_at, search_text, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            connection.execute(
+                "DELETE FROM log_entries WHERE path = ? AND line_number <= ?",
+                (key, line_count - self.max_lines_per_file),
+            )
+            head_size = len(head) if rewritten else known["head_size"]
+            connection.execute(
+                """
+                INSERT INTO log_files (path, source, inode, head_size, head_digest, offset, line_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    source = excluded.source,
+                    inode = excluded.inode,
+                    head_size = excluded.head_size,
+                    head_digest = excluded.head_digest,
+                    offset = excluded.offset,
+                    line_count = excluded.line_count
+                """,
+                (
+                    key,
+                    source,
+                    stat.st_ino,
+                    head_size,
+                    _head_digest(head[:head_size]) if rewritten else known["head_digest"],
+                    offset + len(complete),
+                    line_count,
+                ),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def query(self, entry_filter: LogEntryFilter, *, offset: int, limit: int) -> tuple[int, list[DiagnosticsLogEntryOut]]:
+        """Count matching entries and return one page, newest first."""
+        where, params = entry_filter.where()
+        with self._connection() as connection:
+            connection.execute("BEGIN")
+            total = connection.execute(f"SELECT count(*) FROM log_entries{where}", params).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT payload FROM log_entries{where} ORDER BY sort_at DESC, seq DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+            connection.execute("COMMIT")
+        return total, [DiagnosticsLogEntryOut.model_validate_json(row["payload"]) for row in rows]
+
+    def tail(self, entry_filter: LogEntryFilter, *, after: int, limit: int) -> tuple[int, list[DiagnosticsLogEntryOut]]:
+        """
+        Entries indexed after cursor `after`, oldest first, and the cursor to
+        continue from.
+        """
+        where, params = entry_filter.where()
+        where = f"{where} AND seq > ?"
+        with self._connection() as connection:
+            connection.execute("BEGIN")
+            rows = connection.execute(
+                f"SELECT seq, payload FROM log_entries{where} ORDER BY seq ASC LIMIT ?",
+                [*params, after, limit],
+            ).fetchall()
+            if len(rows) < limit:
+                # Nothing else matches up to the newest entry: skip past it
+                # so filtered-out lines are not scanned again.
+                cursor = max(after, self._last_seq(connection))
+            else:
+                cursor = rows[-1]["seq"]
+            connection.execute("COMMIT")
+        return cursor, [DiagnosticsLogEntryOut.model_validate_json(row["payload"]) for row in rows]
+
+    def last_seq(self) -> int:
+        with self._connection() as connection:
+            return self._last_seq(connection)
+
+    @staticmethod
+    def _last_seq(connection: sqlite3.Connection) -> int:
+        row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'log_entries'").fetchone()
+        return row["seq"] if row else 0
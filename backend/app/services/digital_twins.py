@@ -3,11 +3,11 @@ from __future__ import annotations
 from collections import defaultdict
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import selectinload
 
 from app.models.assemblies import Assembly
-from app.models.core import Cabinet, EquipmentType
+from app.models.core import Cabinet, EquipmentType, Manufacturer
 from app.models.digital_twins import DigitalTwinDocument as DigitalTwinDocumentModel
 from app.models.operations import AssemblyItem, CabinetItem
 from app.schemas.digital_twins import (
@@ -28,6 +28,8 @@ DEFAULT_WALLS = [
     DigitalTwinWall(id="top", name="Верхняя панель"),
 ]
 CABINET_INPUT_NODE_ID = "cabinet-input"
+# Bump when the sync rules change so stored watermarks force one re-sync.
+SYNC_ENGINE_VERSION = 1
 
 
 def default_document() -> DigitalTwinDocument:
@@ -115,20 +117,11 @@ def stable_item_id(scope: str, equipment_item_id: int) -> str:
     return f"{scope}-source-{equipment_item_id}"
 
 
-def _next_sort_order(items: list[DigitalTwinItem], placement_mode: str, wall_id: str | None, rail_id: str | None) -> int:
-    same_bucket = [
-        item.sort_order
-        for item in items
-        if item.placement_mode == placement_mode and item.wall_id == wall_id and item.rail_id == rail_id
-    ]
-    return max(same_bucket, default=-1) + 1
-
-
 def operation_item_to_twin_item(
     scope: str,
     operation_item: CabinetItem | AssemblyItem,
     existing: DigitalTwinItem | None,
-    current_items: list[DigitalTwinItem],
+    next_unplaced_sort_order: int,
 ) -> DigitalTwinItem:
     equipment = operation_item.equipment_type
     if not equipment:
@@ -137,7 +130,7 @@ def operation_item_to_twin_item(
     preserved = existing.model_dump() if existing else {}
     sort_order = preserved.get("sort_order")
     if sort_order is None:
-        sort_order = _next_sort_order(current_items, "unplaced", None, None)
+        sort_order = next_unplaced_sort_order
 
     return DigitalTwinItem(
         id=existing.id if existing else stable_item_id(scope, operation_item.id),
@@ -247,33 +240,39 @@ def sync_document_with_operation_items(
     scope: str,
     operation_items: list[CabinetItem | AssemblyItem],
 ) -> DigitalTwinDocument:
-    by_source_key = {
-        (item.equipment_item_source, item.equipment_item_id): item
-        for item in document.items
-        if item.item_kind == "source-backed" and item.equipment_item_source and item.equipment_item_id
-    }
+    """
+    Merge operation items into the document keyed by `(source, item id)`.
+    Positions are looked up in a dict, so the merge is linear in the number
+    of twin and operation items.
+    """
+    by_source_key: dict[tuple[str, int], DigitalTwinItem] = {}
+    position_by_key: dict[tuple[str, int], int] = {}
     next_items: list[DigitalTwinItem] = []
     seen_keys: set[tuple[str, int]] = set()
+    next_unplaced_sort_order = 0
 
     for item in document.items:
-        if item.item_kind == "manual":
-            next_items.append(item)
-        else:
+        if item.item_kind != "manual":
             item.source_status = "out_of_operation"
-            next_items.append(item)
+        if item.item_kind == "source-backed" and item.equipment_item_source and item.equipment_item_id:
+            key = (item.equipment_item_source, item.equipment_item_id)
+            by_source_key[key] = item
+            position_by_key.setdefault(key, len(next_items))
+        if item.placement_mode == "unplaced" and item.wall_id is None and item.rail_id is None:
+            next_unplaced_sort_order = max(next_unplaced_sort_order, item.sort_order + 1)
+        next_items.append(item)
 
     for operation_item in operation_items:
         key = (scope, operation_item.id)
-        existing = by_source_key.get(key)
-        next_item = operation_item_to_twin_item(scope, operation_item, existing, next_items)
-        replaced = False
-        for index, current in enumerate(next_items):
-            if current.item_kind == "source-backed" and current.equipment_item_source == scope and current.equipment_item_id == operation_item.id:
-                next_items[index] = next_item
-                replaced = True
-                break
-        if not replaced:
+        next_item = operation_item_to_twin_item(scope, operation_item, by_source_key.get(key), next_unplaced_sort_order)
+        position = position_by_key.get(key)
+        if position is None:
+            position_by_key[key] = len(next_items)
             next_items.append(next_item)
+        else:
+            next_items[position] = next_item
+        if next_item.placement_mode == "unplaced" and next_item.wall_id is None and next_item.rail_id is None:
+            next_unplaced_sort_order = max(next_unplaced_sort_order, next_item.sort_order + 1)
         seen_keys.add(key)
 
     for item in next_items:
@@ -304,7 +303,55 @@ def get_digital_twin_or_404(db, scope: str, source_id: int) -> DigitalTwinDocume
     return item
 
 
+def compute_source_watermark(db, scope: str, source_item) -> dict:
+    """
+    Fingerprint of everything a twin is synced from, read with one aggregate
+    query: the container row, its operation items (live count and id sum,
+    latest change, row versions) and their equipment types and manufacturers.
+    """
+    if scope == "cabinet":
+        model, parent_column = CabinetItem, CabinetItem.cabinet_id
+    else:
+        model, parent_column = AssemblyItem, AssemblyItem.assembly_id
+    is_live = model.is_deleted == False
+    row = db.execute(
+        select(
+            func.coalesce(func.sum(case((is_live, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_live, model.id), else_=0)), 0),
+            func.coalesce(func.sum(model.row_version), 0),
+            func.max(model.updated_at),
+            func.max(EquipmentType.updated_at),
+            func.max(Manufacturer.updated_at),
+        )
+        .select_from(model)
+        .join(EquipmentType, model.equipment_type_id == EquipmentType.id)
+        .outerjoin(Manufacturer, EquipmentType.manufacturer_id == Manufacturer.id)
+        .where(parent_column == source_item.id)
+    ).one()
+    items_count, items_id_sum, row_versions, items_changed, types_changed, manufacturers_changed = row
+    return {
+        "engine": SYNC_ENGINE_VERSION,
+        "container_updated_at": _isoformat(source_item.updated_at),
+        "items": int(items_count),
+        "items_id_sum": int(items_id_sum),
+        "items_row_versions": int(row_versions),
+        "items_updated_at": _isoformat(items_changed),
+        "equipment_types_updated_at": _isoformat(types_changed),
+        "manufacturers_updated_at": _isoformat(manufacturers_changed),
+    }
+
+
+def _isoformat(value) -> str | None:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
 def ensure_digital_twin(db, scope: str, source_id: int, user_id: int | None = None) -> DigitalTwinDocumentModel:
+    """
+    Create or refresh the twin of a cabinet/assembly. The stored source
+    watermark short-circuits the common case where nothing changed since
+    the last sync; otherwise the document is re-synced and written only if
+    the result actually differs.
+    """
     source_item = _get_scope_container(db, scope, source_id)
     source_context = build_source_context(scope, source_item)
     model = db.scalar(
@@ -314,19 +361,28 @@ def ensure_digital_twin(db, scope: str, source_id: int, user_id: int | None = No
             DigitalTwinDocumentModel.is_deleted == False,
         )
     )
+    watermark = compute_source_watermark(db, scope, source_item)
+    if model and model.source_watermark == watermark:
+        return model
+
     document = normalize_document(model.document_json if model else None)
     document = sync_document_with_operation_items(document, scope, load_operation_items(db, scope, source_id))
+    document_json = document.model_dump(by_alias=True)
     if model:
-        model.source_context = source_context
-        model.document_json = document.model_dump(by_alias=True)
-        model.updated_by_id = user_id
+        if model.document_json != document_json or model.source_context != source_context:
+            model.source_context = source_context
+            model.document_json = document_json
+            model.updated_by_id = user_id
+        model.source_watermark = watermark
         return model
 
     model = DigitalTwinDocumentModel(
         scope=scope,
         source_id=source_id,
         source_context=source_context,
-        document_json=document.model_dump(by_alias=True),
+        document_json=document_json,
+        source_watermark=watermark,
+        is_deleted=False,
         created_by_id=user_id,
         updated_by_id=user_id,
     )
@@ -1,11 +1,43 @@
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.orm import selectinload
 
 from app.models.operations import CabinetItem
 from app.models.io import IOSignal, SignalType
 
 
+def io_signal_counts(equipment) -> dict[SignalType, int]:
+    return {
+        SignalType.AI: equipment.ai_count or 0,
+        SignalType.DI: equipment.di_count or 0,
+        SignalType.AO: equipment.ao_count or 0,
+        SignalType.DO: equipment.do_count or 0,
+    }
+
+
+def create_io_signals_for_new_items(db, equipment, equipment_in_operation_ids: list[int]) -> int:
+    """
+    Generate the full AI/DI/AO/DO channel set for freshly inserted cabinet
+    items of one channel-forming type with a single multi-row INSERT. The
+    items must not have signals yet; use
+    `ensure_io_signals_for_equipment_in_operation` to reconcile existing ones.
+    """
+    rows = [
+        {
+            "equipment_in_operation_id": item_id,
+            "signal_type": signal_type,
+            "channel_index": index,
+            "is_deleted": False,
+        }
+        for item_id in equipment_in_operation_ids
+        for signal_type, count in io_signal_counts(equipment).items()
+        for index in range(1, count + 1)
+    ]
+    if rows:
+        db.execute(insert(IOSignal.__table__), rows)
+    return len(rows)
+
+
 def ensure_io_signals_for_equipment_in_operation(
     db, equipment_in_operation_id: int, prune: bool = False
 ) -> dict:
@@ -21,12 +53,7 @@ def ensure_io_signals_for_equipment_in_operation(
     if not equipment or not equipment.is_channel_forming:
         raise ValueError("Equipment type is not channel-forming")
 
-    counts = {
-        SignalType.AI: equipment.ai_count,
-        SignalType.DI: equipment.di_count,
-        SignalType.AO: equipment.ao_count,
-        SignalType.DO: equipment.do_count,
-    }
+    counts = io_signal_counts(equipment)
 
     existing = db.scalars(
         select(IOSignal).where(IOSignal.equipment_in_operation_id == equipment_in_operation_id)
@@ -2,18 +2,32 @@ from __future__ import annotations
 
 import csv
 import ipaddress
+import threading
 from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import datetime
 from io import StringIO
+from weakref import WeakKeyDictionary
 
 from fastapi import HTTPException
-from sqlalchemy import Select, func, or_, select
+from sqlalchemy import Select, case, func, insert, literal, or_, select, union_all, update
 from sqlalchemy.orm import selectinload
 
-from app.core.log_retention import enforce_table_row_limit
+from app.core import hierarchy
 from app.models.core import Cabinet, EquipmentType, Location, Manufacturer
 from app.models.assemblies import Assembly
-from app.models.ipam import EquipmentNetworkInterface, IPAddress, IPAddressAuditLog, Subnet
+from app.models.ipam import (
+    ADDRESS_BLOCK_SIZE,
+    OCCUPIED_STATUSES,
+    EquipmentNetworkInterface,
+    IPAddress,
+    IPAddressAuditLog,
+    Subnet,
+    SubnetAddressBlock,
+    add_to_address_block,
+    lock_address_blocks,
+)
 from app.models.operations import AssemblyItem, CabinetItem
 from app.schemas.common import Pagination
 from app.schemas.ipam import (
@@ -28,24 +42,16 @@ from app.schemas.ipam import (
     SubnetCalculatorCreate,
     SubnetOut,
 )
+from app.services.location_paths import load_location_context
 
 SERVICE_STATUSES = {"network", "broadcast", "gateway"}
+GRID_WINDOW_SIZE = 4096
 DEFAULT_SOURCE = "manual"
 EQUIPMENT_SOURCES = {"cabinet", "assembly"}
 
 
-def build_location_full_path(location_id: int | None, locations_map: dict[int, Location]) -> str | None:
-    if not location_id or location_id not in locations_map:
-        return None
-    parts: list[str] = []
-    current_id: int | None = location_id
-    seen: set[int] = set()
-    while current_id and current_id in locations_map and current_id not in seen:
-        location = locations_map[current_id]
-        parts.append(location.name)
-        seen.add(current_id)
-        current_id = location.parent_id
-    return " / ".join(reversed(parts))
+class AddressClaimConflict(Exception):
+    """A concurrent caller claimed one of the offsets picked by the allocator."""
 
 
 def parse_network_ports(network_ports: list[dict] | None) -> list[dict]:
@@ -62,6 +68,54 @@ def parse_network_ports(network_ports: list[dict] | None) -> list[dict]:
     return result
 
 
+def network_interface_specs(network_ports: list[dict] | None) -> list[tuple[str, str, int]]:
+    """
+    `(interface name, port type, interface index)` for every port an
+    equipment type declares.
+    """
+    specs: list[tuple[str, str, int]] = []
+    for port in parse_network_ports(network_ports):
+        port_type = port["type"]
+        count = port["count"]
+        for index in range(1, count + 1):
+            interface_name = f"{port_type} Port {index}" if count > 1 else port_type
+            specs.append((interface_name, port_type, index))
+    return specs
+
+
+def create_network_interfaces_for_new_items(
+    db,
+    equipment_type: EquipmentType,
+    equipment_source: str,
+    item_ids: list[int],
+) -> int:
+    """
+    Insert the interfaces of freshly created equipment items of one type with
+    a single multi-row INSERT, matching what `sync_equipment_network_interfaces`
+    would create for each of them.
+    """
+    specs = network_interface_specs(equipment_type.network_ports)
+    rows = [
+        {
+            "equipment_instance_id": item_id if equipment_source == "cabinet" else None,
+            "equipment_item_source": equipment_source,
+            "equipment_item_id": item_id,
+            "interface_name": interface_name,
+            "interface_index": interface_index,
+            "interface_type": port_type,
+            "connector_spec": port_type,
+            "is_management": False,
+            "is_active": True,
+            "is_deleted": False,
+        }
+        for item_id in item_ids
+        for interface_name, port_type, interface_index in specs
+    ]
+    if rows:
+        db.execute(insert(EquipmentNetworkInterface.__table__), rows)
+    return len(rows)
+
+
 def equipment_has_network_interfaces(equipment_type: EquipmentType | None) -> bool:
     if not equipment_type or equipment_type.is_deleted:
         return False
@@ -136,70 +190,106 @@ def ensure_eligible_equipment_item(db, equipment_source: str, equipment_item_id:
     return item
 
 
-def sync_equipment_network_interfaces(db, equipment_item, equipment_source: str | None = None) -> list[EquipmentNetworkInterface]:
-    if equipment_source is None:
-        equipment_source = "assembly" if isinstance(equipment_item, AssemblyItem) else "cabinet"
-    item_id = equipment_item.id
-    cabinet_item_id = equipment_item.id if equipment_source == "cabinet" else None
-    ports = parse_network_ports(equipment_item.equipment_type.network_ports if equipment_item.equipment_type else None)
-    existing = db.scalars(
-        select(EquipmentNetworkInterface).where(
-            EquipmentNetworkInterface.equipment_item_source == equipment_source,
-            EquipmentNetworkInterface.equipment_item_id == item_id,
-        )
-    ).all()
-    if not existing and cabinet_item_id is not None:
-        existing = db.scalars(
-            select(EquipmentNetworkInterface).where(EquipmentNetworkInterface.equipment_instance_id == cabinet_item_id)
+ITEM_MODELS = {"cabinet": CabinetItem, "assembly": AssemblyItem}
+
+
+def sync_network_interfaces_for_items(db, equipment_source: str, item_ids: Iterable[int]) -> None:
+    """
+    Bring the interfaces of many items of one source in line with their
+    equipment types' `network_ports`: missing ones are inserted in one
+    statement, matching ones revived, stale ones deactivated. Called from
+    the write paths (item creation, type changes), never from reads.
+    """
+    item_ids = sorted(set(item_ids))
+    if not item_ids:
+        return
+    model = ITEM_MODELS[equipment_source]
+    ports_by_item = dict(
+        db.execute(
+            select(model.id, EquipmentType.network_ports)
+            .join(EquipmentType, model.equipment_type_id == EquipmentType.id)
+            .where(model.id.in_(item_ids))
         ).all()
-    existing_map = {(item.interface_type, item.interface_index): item for item in existing}
-    valid_pairs: set[tuple[str, int]] = set()
-    for port in ports:
-        port_type = port["type"]
-        count = port["count"]
-        for index in range(1, count + 1):
-            interface_index = index if count > 1 else 1
+    )
+    owner = [
+        (EquipmentNetworkInterface.equipment_item_source == equipment_source)
+        & EquipmentNetworkInterface.equipment_item_id.in_(item_ids)
+    ]
+    if equipment_source == "cabinet":
+        # Interfaces created before the universal source/item columns.
+        owner.append(
+            EquipmentNetworkInterface.equipment_item_source.is_(None)
+            & EquipmentNetworkInterface.equipment_instance_id.in_(item_ids)
+        )
+    existing: dict[tuple[int, str | None, int | None], EquipmentNetworkInterface] = {}
+    by_item: dict[int, list[EquipmentNetworkInterface]] = {}
+    for interface in db.scalars(select(EquipmentNetworkInterface).where(or_(*owner))).all():
+        item_id = interface.equipment_item_id if interface.equipment_item_source else interface.equipment_instance_id
+        existing.setdefault((item_id, interface.interface_type, interface.interface_index), interface)
+        by_item.setdefault(item_id, []).append(interface)
+
+    new_rows: list[dict] = []
+    for item_id, network_ports in ports_by_item.items():
+        cabinet_item_id = item_id if equipment_source == "cabinet" else None
+        valid_pairs: set[tuple[str, int]] = set()
+        for interface_name, port_type, interface_index in network_interface_specs(network_ports):
             valid_pairs.add((port_type, interface_index))
-            item = existing_map.get((port_type, interface_index))
-            interface_name = f"{port_type} Port {index}" if count > 1 else port_type
-            if item:
-                item.equipment_instance_id = cabinet_item_id
-                item.equipment_item_source = equipment_source
-                item.equipment_item_id = item_id
-                item.interface_name = interface_name
-                item.interface_type = port_type
-                item.interface_index = interface_index
-                item.connector_spec = port_type
-                item.is_active = True
-                item.is_deleted = False
-                item.deleted_at = None
-                item.deleted_by_id = None
-            else:
-                db.add(
-                    EquipmentNetworkInterface(
-                        equipment_instance_id=cabinet_item_id,
-                        equipment_item_source=equipment_source,
-                        equipment_item_id=item_id,
-                        interface_name=interface_name,
-                        interface_index=interface_index,
-                        interface_type=port_type,
-                        connector_spec=port_type,
-                        is_active=True,
-                    )
+            interface = existing.get((item_id, port_type, interface_index))
+            if interface is None:
+                new_rows.append(
+                    {
+                        "equipment_instance_id": cabinet_item_id,
+                        "equipment_item_source": equipment_source,
+                        "equipment_item_id": item_id,
+                        "interface_name": interface_name,
+                        "interface_index": interface_index,
+                        "interface_type": port_type,
+                        "connector_spec": port_type,
+                        "is_management": False,
+                        "is_active": True,
+                        "is_deleted": False,
+                    }
                 )
+                continue
+            interface.equipment_instance_id = cabinet_item_id
+            interface.equipment_item_source = equipment_source
+            interface.equipment_item_id = item_id
+            interface.interface_name = interface_name
+            interface.connector_spec = port_type
+            interface.is_active = True
+            interface.is_deleted = False
+            interface.deleted_at = None
+            interface.deleted_by_id = None
+        for interface in by_item.get(item_id, []):
+            if (interface.interface_type, interface.interface_index) not in valid_pairs:
+                interface.is_active = False
+    if new_rows:
+        db.execute(insert(EquipmentNetworkInterface.__table__), new_rows)
     db.flush()
-    all_items = db.scalars(
+
+
+def sync_network_interfaces_for_equipment_type(db, equipment_type_id: int) -> None:
+    """Re-materialize interfaces of every live item after a type's ports changed."""
+    for equipment_source, model in ITEM_MODELS.items():
+        item_ids = db.scalars(
+            select(model.id).where(model.equipment_type_id == equipment_type_id, model.is_deleted == False)
+        ).all()
+        sync_network_interfaces_for_items(db, equipment_source, item_ids)
+
+
+def sync_equipment_network_interfaces(db, equipment_item, equipment_source: str | None = None) -> list[EquipmentNetworkInterface]:
+    if equipment_source is None:
+        equipment_source = "assembly" if isinstance(equipment_item, AssemblyItem) else "cabinet"
+    db.flush()
+    sync_network_interfaces_for_items(db, equipment_source, [equipment_item.id])
+    return db.scalars(
         select(EquipmentNetworkInterface)
         .where(
             EquipmentNetworkInterface.equipment_item_source == equipment_source,
-            EquipmentNetworkInterface.equipment_item_id == item_id,
+            EquipmentNetworkInterface.equipment_item_id == equipment_item.id,
         )
         .order_by(EquipmentNetworkInterface.interface_type, EquipmentNetworkInterface.interface_index)
     ).all()
-    for item in all_items:
-        if (item.interface_type, item.interface_index) not in valid_pairs:
-            item.is_active = False
-    return all_items
 
 
 def validate_subnet_cidr(cidr: str) -> tuple[ipaddress.IPv4Network, int]:
@@ -226,6 +316,13 @@ def get_subnet_network(subnet: Subnet) -> ipaddress.IPv4Network:
     return ipaddress.ip_network(subnet.cidr, strict=True)
 
 
+def network_broadcast_offsets(network: ipaddress.IPv4Network) -> tuple[int, ...]:
+    """Offsets of the network and broadcast addresses; /31 and /32 have none (RFC 3021)."""
+    if network.prefixlen >= 31:
+        return ()
+    return (0, network.num_addresses - 1)
+
+
 def subnet_to_out(subnet: Subnet) -> SubnetOut:
     return SubnetOut(
         id=subnet.id,
@@ -268,18 +365,28 @@ def interface_to_out(item: EquipmentNetworkInterface) -> EquipmentNetworkInterfa
     )
 
 
-def ensure_service_address_records(db, subnet: Subnet) -> None:
+def service_address_records(subnet: Subnet) -> dict[int, tuple[str, str]]:
+    """Offset -> (status, IP) of the system records a subnet should carry."""
     network = get_subnet_network(subnet)
-    records = {
-        0: ("network", str(network.network_address)),
-        network.num_addresses - 1: ("broadcast", str(network.broadcast_address)),
-    }
+    records: dict[int, tuple[str, str]] = {}
+    if network_broadcast_offsets(network):
+        records[0] = ("network", str(network.network_address))
+        records[network.num_addresses - 1] = ("broadcast", str(network.broadcast_address))
     if subnet.gateway_ip:
         gateway_ip = validate_ip_in_subnet(subnet.gateway_ip, network)
         records[int(gateway_ip) - int(network.network_address)] = ("gateway", str(gateway_ip))
+    return records
+
+
+def ensure_service_address_records(db, subnet: Subnet) -> None:
+    records = service_address_records(subnet)
+    if not records:
+        return
     existing = {
         record.ip_offset: record
-        for record in db.scalars(select(IPAddress).where(IPAddress.subnet_id == subnet.id)).all()
+        for record in db.scalars(
+            select(IPAddress).where(IPAddress.subnet_id == subnet.id, IPAddress.ip_offset.in_(records))
+        ).all()
     }
     for offset, (status, ip_address) in records.items():
         record = existing.get(offset)
@@ -356,24 +463,65 @@ def address_record_to_out(
     )
 
 
+def get_address_details_out(db, subnet: Subnet, offset: int) -> IPAddressDetailsOut:
+    network = get_subnet_network(subnet)
+    if offset < 0 or offset >= network.num_addresses:
+        raise HTTPException(status_code=404, detail="Address not found")
+    record = get_ip_record_for_offset(db, subnet, offset)
+    if record and record.is_deleted:
+        record = None
+    interface_name = record.equipment_interface.interface_name if record and record.equipment_interface else None
+    return address_record_to_out(subnet, record, offset, interface_name)
+
+
+def _block_counts_query(subnet_id: int) -> Select:
+    return select(
+        *[func.coalesce(func.sum(getattr(SubnetAddressBlock, status)), 0).label(status) for status in OCCUPIED_STATUSES]
+    ).where(SubnetAddressBlock.subnet_id == subnet_id)
+
+
 def get_summary_counts(db, subnet: Subnet) -> AddressSummaryOut:
+    """
+    Status totals of a subnet, read from the `subnet_address_blocks`
+    occupancy counters rather than from the address records themselves.
+    """
     network = get_subnet_network(subnet)
-    counts = Counter(
-        db.scalars(select(IPAddress.status).where(IPAddress.subnet_id == subnet.id, IPAddress.is_deleted == False)).all()
-    )
-    non_free = sum(counts.values())
+    counts = dict(db.execute(_block_counts_query(subnet.id)).one()._mapping)
     return AddressSummaryOut(
         total=network.num_addresses,
-        free=max(network.num_addresses - non_free, 0),
-        used=counts.get("used", 0),
-        reserved=counts.get("reserved", 0),
-        service=counts.get("service", 0),
-        gateway=counts.get("gateway", 0),
-        broadcast=counts.get("broadcast", 0),
-        network=counts.get("network", 0),
+        free=max(network.num_addresses - sum(counts.values()), 0),
+        **counts,
     )
 
 
+def build_heatmap_aggregates(db, subnet: Subnet) -> list[HeatmapAggregateOut]:
+    """
+    One aggregate per 256-address block. Blocks without a counters row have
+    never held an occupied address and are reported as entirely free.
+    """
+    network = get_subnet_network(subnet)
+    blocks = {
+        block.block_index: block
+        for block in db.scalars(select(SubnetAddressBlock).where(SubnetAddressBlock.subnet_id == subnet.id)).all()
+    }
+    aggregates: list[HeatmapAggregateOut] = []
+    for block_start in range(0, network.num_addresses, ADDRESS_BLOCK_SIZE):
+        block_end = min(block_start + ADDRESS_BLOCK_SIZE - 1, network.num_addresses - 1)
+        block = blocks.get(block_start // ADDRESS_BLOCK_SIZE)
+        counts = {status: getattr(block, status) if block else 0 for status in OCCUPIED_STATUSES}
+        block_network = ipaddress.ip_network(f"{network.network_address + block_start}/24", strict=False)
+        aggregates.append(
+            HeatmapAggregateOut(
+                block_cidr=str(block_network),
+                offset_start=block_start,
+                offset_end=block_end,
+                free=block_end - block_start + 1 - sum(counts.values()),
+                **counts,
+            )
+        )
+    return aggregates
+
+
 def build_address_grid_response(
     db,
     subnet: Subnet,
@@ -384,10 +532,28 @@ def build_address_grid_response(
     page: int = 1,
     page_size: int = 100,
     sort: str | None = None,
+    window_start: int = 0,
 ) -> AddressGridResponse:
-    ensure_service_address_records(db, subnet)
+    """
+    Grid mode renders the offsets `[window_start, window_start + 4096)` and
+    only loads the records inside that window; list mode pages over stored
+    records in SQL; heatmap mode (for subnets larger than a /24) is answered
+    from the occupancy counters alone.
+    """
     network = get_subnet_network(subnet)
     summary = get_summary_counts(db, subnet)
+    expected = Counter(status for status, _ip_address in service_address_records(subnet).values())
+    if any(getattr(summary, status) < count for status, count in expected.items()):
+        # Subnets created before service records were written on create/update.
+        ensure_service_address_records(db, subnet)
+        summary = get_summary_counts(db, subnet)
+    if mode == "heatmap" and subnet.prefix < 24:
+        return AddressGridResponse(
+            subnet=subnet_to_out(subnet),
+            summary=summary,
+            mode=mode,
+            aggregates=build_heatmap_aggregates(db, subnet),
+        )
     query = (
         select(IPAddress)
         .options(selectinload(IPAddress.equipment_interface), selectinload(IPAddress.subnet))
@@ -400,39 +566,16 @@ def build_address_grid_response(
     if not include_service:
         query = query.where(IPAddress.status.not_in(tuple(SERVICE_STATUSES)))
     query = query.order_by(IPAddress.ip_offset.desc() if sort == "-ip_address" else IPAddress.ip_offset.asc())
-    records = db.scalars(query).all()
-    interface_map = {record.id: (record.equipment_interface.interface_name if record.equipment_interface else None) for record in records}
-    if mode == "heatmap" and subnet.prefix == 16:
-        records_by_offset = {record.ip_offset: record for record in records}
-        aggregates: list[HeatmapAggregateOut] = []
-        for block_start in range(0, network.num_addresses, 256):
-            block_end = min(block_start + 255, network.num_addresses - 1)
-            counter = Counter()
-            for offset in range(block_start, block_end + 1):
-                record = records_by_offset.get(offset)
-                counter[record.status if record else "free"] += 1
-            block_network = ipaddress.ip_network(f"{network.network_address + block_start}/24", strict=False)
-            aggregates.append(
-                HeatmapAggregateOut(
-                    block_cidr=str(block_network),
-                    offset_start=block_start,
-                    offset_end=block_end,
-                    free=counter.get("free", 0),
-                    used=counter.get("used", 0),
-                    reserved=counter.get("reserved", 0),
-                    service=counter.get("service", 0),
-                    gateway=counter.get("gateway", 0),
-                    broadcast=counter.get("broadcast", 0),
-                    network=counter.get("network", 0),
-                )
-            )
-        return AddressGridResponse(subnet=subnet_to_out(subnet), summary=summary, mode=mode, aggregates=aggregates)
+
+    def interface_name(record: IPAddress | None) -> str | None:
+        return record.equipment_interface.interface_name if record and record.equipment_interface else None
+
     if mode == "list":
-        total = len(records)
+        total = db.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
         start = max((page - 1) * page_size, 0)
         items = [
-            address_record_to_out(subnet, record, record.ip_offset, interface_map.get(record.id))
-            for record in records[start : start + page_size]
+            address_record_to_out(subnet, record, record.ip_offset, interface_name(record))
+            for record in db.scalars(query.offset(start).limit(page_size)).all()
         ]
         return AddressGridResponse(
             subnet=subnet_to_out(subnet),
@@ -441,20 +584,30 @@ def build_address_grid_response(
             items=items,
             pagination=Pagination(items=[], page=page, page_size=page_size, total=total),
         )
-    items: list[IPAddressDetailsOut] = []
     if q:
-        items = [address_record_to_out(subnet, record, record.ip_offset, interface_map.get(record.id)) for record in records]
-    else:
-        records_by_offset = {record.ip_offset: record for record in records}
-        max_offsets = 256 if subnet.prefix == 24 else 4096 if subnet.prefix == 20 else network.num_addresses
-        for offset in range(max_offsets):
-            record = records_by_offset.get(offset)
-            inferred_status = record.status if record else "free"
-            if status and inferred_status != status:
-                continue
-            if not include_service and inferred_status in SERVICE_STATUSES:
-                continue
-            items.append(address_record_to_out(subnet, record, offset, interface_map.get(record.id) if record else None))
+        items = [
+            address_record_to_out(subnet, record, record.ip_offset, interface_name(record))
+            for record in db.scalars(query).all()
+        ]
+        return AddressGridResponse(subnet=subnet_to_out(subnet), summary=summary, mode=mode, items=items)
+
+    window_start = min(max(window_start, 0), network.num_addresses)
+    window_end = min(window_start + GRID_WINDOW_SIZE, network.num_addresses)
+    records_by_offset = {
+        record.ip_offset: record
+        for record in db.scalars(
+            query.where(IPAddress.ip_offset >= window_start, IPAddress.ip_offset < window_end)
+        ).all()
+    }
+    items: list[IPAddressDetailsOut] = []
+    for offset in range(window_start, window_end):
+        record = records_by_offset.get(offset)
+        inferred_status = record.status if record else "free"
+        if status and inferred_status != status:
+            continue
+        if not include_service and inferred_status in SERVICE_STATUSES:
+            continue
+        items.append(address_record_to_out(subnet, record, offset, interface_name(record)))
     return AddressGridResponse(subnet=subnet_to_out(subnet), summary=summary, mode=mode, items=items)
 
 
@@ -508,7 +661,6 @@ def audit_ip_address_change(
         )
     )
     db.flush()
-    enforce_table_row_limit(db, IPAddressAuditLog)
 
 
 def get_or_create_ip_record(db, subnet: Subnet, offset: int, status: str) -> IPAddress:
@@ -615,227 +767,473 @@ def release_ip_record(db, subnet: Subnet, offset: int, actor_user_id: int | None
     return apply_assignment_to_record(db, subnet, offset, actor_user_id=actor_user_id, status="free", action="release")
 
 
-def list_eligible_equipment(
+def find_free_offsets(db, subnet: Subnet, count: int, *, contiguous: bool = False) -> list[int]:
+    """
+    First `count` free offsets of a subnet (or the first run of `count`
+    consecutive ones). Full blocks are skipped using the occupancy counters
+    and blocks without a counters row are known to be empty, so address
+    records are only read for partially occupied blocks.
+    """
+    network = get_subnet_network(subnet)
+    excluded = network_broadcast_offsets(network)
+    occupied_by_block = {
+        block.block_index: block.occupied
+        for block in db.scalars(select(SubnetAddressBlock).where(SubnetAddressBlock.subnet_id == subnet.id)).all()
+    }
+    found: list[int] = []
+    for block_start in range(0, network.num_addresses, ADDRESS_BLOCK_SIZE):
+        block_end = min(block_start + ADDRESS_BLOCK_SIZE, network.num_addresses)
+        occupied_count = occupied_by_block.get(block_start // ADDRESS_BLOCK_SIZE, 0)
+        if occupied_count >= block_end - block_start:
+            if contiguous:
+                found = []
+            continue
+        occupied: set[int] = set()
+        if occupied_count:
+            occupied = set(
+                db.scalars(
+                    select(IPAddress.ip_offset).where(
+                        IPAddress.subnet_id == subnet.id,
+                        IPAddress.ip_offset >= block_start,
+                        IPAddress.ip_offset < block_end,
+                        IPAddress.is_deleted == False,
+                        IPAddress.status.in_(OCCUPIED_STATUSES),
+                    )
+                ).all()
+            )
+        for offset in range(block_start, block_end):
+            if offset in occupied or offset in excluded:
+                if contiguous:
+                    found = []
+                continue
+            found.append(offset)
+            if len(found) == count:
+                return found
+    raise HTTPException(status_code=409, detail="Not enough free addresses in subnet")
+
+
+def allocate_addresses(
     db,
+    subnet: Subnet,
+    count: int,
     *,
-    q: str | None = None,
-    cabinet_id: int | None = None,
-    manufacturer_id: int | None = None,
-    equipment_type_id: int | None = None,
-    location_id: int | None = None,
-    has_network_interfaces: bool = True,
-    installed_only: bool = True,
-) -> list[dict]:
-    cabinet_query: Select = (
-        select(CabinetItem)
-        .join(Cabinet, CabinetItem.cabinet_id == Cabinet.id)
-        .join(EquipmentType, CabinetItem.equipment_type_id == EquipmentType.id)
-        .outerjoin(Manufacturer, EquipmentType.manufacturer_id == Manufacturer.id)
-        .options(
-            selectinload(CabinetItem.equipment_type).selectinload(EquipmentType.manufacturer),
-            selectinload(CabinetItem.cabinet),
+    actor_user_id: int | None,
+    contiguous: bool = False,
+    reserve: bool = False,
+    hostname: str | None = None,
+    comment: str | None = None,
+) -> list[IPAddressDetailsOut]:
+    """
+    Pick free offsets and, with `reserve`, mark them reserved in the current
+    transaction. Reserving allocators on one subnet queue up behind the
+    block lock; a race with a single-address assign that does not take it
+    surfaces as `IntegrityError` (new record) or `AddressClaimConflict`
+    (revived record) and the caller retries in a fresh transaction.
+    """
+    if reserve:
+        lock_address_blocks(db.connection(), subnet.id)
+    offsets = find_free_offsets(db, subnet, count, contiguous=contiguous)
+    if not reserve:
+        return [address_record_to_out(subnet, None, offset) for offset in offsets]
+
+    network = get_subnet_network(subnet)
+    existing = {
+        record.ip_offset: record
+        for record in db.scalars(
+            select(IPAddress).where(IPAddress.subnet_id == subnet.id, IPAddress.ip_offset.in_(offsets))
+        ).all()
+    }
+    claimed_values = {
+        "status": "reserved",
+        "hostname": hostname,
+        "dns_name": None,
+        "comment": comment,
+        "mac_address": None,
+        "equipment_instance_id": None,
+        "equipment_item_source": None,
+        "equipment_item_id": None,
+        "equipment_interface_id": None,
+        "is_primary": True,
+        "is_deleted": False,
+        "deleted_at": None,
+    }
+    records: list[IPAddress] = []
+    befores: dict[int, dict] = {}
+    for offset in offsets:
+        record = existing.get(offset)
+        if record is None:
+            record = IPAddress(
+                subnet_id=subnet.id,
+                ip_address=str(network.network_address + offset),
+                ip_offset=offset,
+                source=DEFAULT_SOURCE,
+                **claimed_values,
+            )
+            db.add(record)
+            records.append(record)
+            continue
+        # Conditional update: only a record that is still free may be claimed.
+        claimed = db.execute(
+            update(IPAddress)
+            .where(IPAddress.id == record.id, or_(IPAddress.status == "free", IPAddress.is_deleted == True))
+            .values(**claimed_values, row_version=IPAddress.row_version + 1)
+            .execution_options(synchronize_session=False)
         )
-        .where(CabinetItem.is_deleted == False, EquipmentType.is_deleted == False)
+        if claimed.rowcount != 1:
+            raise AddressClaimConflict(offset)
+        befores[offset] = {"status": "free", "hostname": record.hostname}
+        add_to_address_block(db.connection(), subnet.id, offset, "reserved", 1)
+        db.refresh(record)
+        records.append(record)
+    db.flush()
+    for record in records:
+        audit_ip_address_change(
+            db,
+            actor_user_id=actor_user_id,
+            action="allocate",
+            subnet_id=subnet.id,
+            ip_address=record.ip_address,
+            ip_address_id=record.id,
+            before=befores.get(record.ip_offset),
+            after=record,
+            payload_json={"status": "reserved", "count": count, "contiguous": contiguous},
+        )
+    return [address_record_to_out(subnet, record, record.ip_offset) for record in records]
+
+
+def _eligible_item_keys(
+    model,
+    container_model,
+    container_column,
+    *,
+    q: str | None,
+    cabinet_id: int | None,
+    manufacturer_id: int | None,
+    equipment_type_id: int | None,
+    location_id: int | None,
+    has_network_interfaces: bool,
+    installed_only: bool,
+) -> Select:
+    equipment_source = "cabinet" if model is CabinetItem else "assembly"
+    query = (
+        select(literal(equipment_source).label("equipment_source"), model.id.label("item_id"))
+        .join(container_model, container_column == container_model.id)
+        .join(EquipmentType, model.equipment_type_id == EquipmentType.id)
+        .outerjoin(Manufacturer, EquipmentType.manufacturer_id == Manufacturer.id)
+        .where(model.is_deleted == False, EquipmentType.is_deleted == False)
     )
     if installed_only:
-        cabinet_query = cabinet_query.where(CabinetItem.cabinet_id.is_not(None))
-    if cabinet_id:
-        cabinet_query = cabinet_query.where(CabinetItem.cabinet_id == cabinet_id)
+        query = query.where(container_column.is_not(None))
+    if cabinet_id and model is CabinetItem:
+        query = query.where(container_column == cabinet_id)
     if manufacturer_id:
-        cabinet_query = cabinet_query.where(EquipmentType.manufacturer_id == manufacturer_id)
+        query = query.where(EquipmentType.manufacturer_id == manufacturer_id)
     if equipment_type_id:
-        cabinet_query = cabinet_query.where(CabinetItem.equipment_type_id == equipment_type_id)
+        query = query.where(model.equipment_type_id == equipment_type_id)
     if location_id:
-        cabinet_query = cabinet_query.where(CabinetItem.cabinet.has(location_id=location_id))
+        query = query.where(container_model.location_id == location_id)
     if q:
-        cabinet_query = cabinet_query.where(
+        query = query.where(
             or_(
                 EquipmentType.name.ilike(f"%{q}%"),
                 Manufacturer.name.ilike(f"%{q}%"),
-                Cabinet.name.ilike(f"%{q}%"),
+                container_model.name.ilike(f"%{q}%"),
             )
         )
-    assembly_query: Select = (
-        select(AssemblyItem)
-        .join(Assembly, AssemblyItem.assembly_id == Assembly.id)
-        .join(EquipmentType, AssemblyItem.equipment_type_id == EquipmentType.id)
-        .outerjoin(Manufacturer, EquipmentType.manufacturer_id == Manufacturer.id)
-        .options(
-            selectinload(AssemblyItem.equipment_type).selectinload(EquipmentType.manufacturer),
-            selectinload(AssemblyItem.assembly),
+    if has_network_interfaces:
+        query = query.where(
+            select(EquipmentNetworkInterface.id)
+            .where(
+                EquipmentNetworkInterface.equipment_item_source == equipment_source,
+                EquipmentNetworkInterface.equipment_item_id == model.id,
+                EquipmentNetworkInterface.is_active == True,
+                EquipmentNetworkInterface.is_deleted == False,
+            )
+            .exists()
         )
-        .where(AssemblyItem.is_deleted == False, EquipmentType.is_deleted == False)
+    return query
+
+
+def search_eligible_equipment(
+    db,
+    *,
+    q: str | None = None,
+    cabinet_id: int | None = None,
+    manufacturer_id: int | None = None,
+    equipment_type_id: int | None = None,
+    location_id: int | None = None,
+    has_network_interfaces: bool = True,
+    installed_only: bool = True,
+    page: int | None = None,
+    page_size: int = 100,
+) -> tuple[int, list[dict]]:
+    """
+    Read-only eligible-equipment listing: `(total, page of items)`.
+
+    Filtering, ordering (cabinet items first, newest first) and paging run
+    on a UNION of item keys; the page is then hydrated with one query per
+    source plus one each for interfaces, linked IPs and location paths.
+    Interfaces are expected to be materialized on write (see
+    `sync_network_interfaces_for_items`). Without `page` every match is returned.
+    """
+    filters = {
+        "q": q,
+        "cabinet_id": cabinet_id,
+        "manufacturer_id": manufacturer_id,
+        "equipment_type_id": equipment_type_id,
+        "location_id": location_id,
+        "has_network_interfaces": has_network_interfaces,
+        "installed_only": installed_only,
+    }
+    keys = union_all(
+        _eligible_item_keys(CabinetItem, Cabinet, CabinetItem.cabinet_id, **filters),
+        _eligible_item_keys(AssemblyItem, Assembly, AssemblyItem.assembly_id, **filters),
+    ).subquery()
+    total = db.scalar(select(func.count()).select_from(keys)) or 0
+    page_query = select(keys.c.equipment_source, keys.c.item_id).order_by(
+        case((keys.c.equipment_source == "cabinet", 0), else_=1), keys.c.item_id.desc()
     )
-    if installed_only:
-        assembly_query = assembly_query.where(AssemblyItem.assembly_id.is_not(None))
-    if manufacturer_id:
-        assembly_query = assembly_query.where(EquipmentType.manufacturer_id == manufacturer_id)
-    if equipment_type_id:
-        assembly_query = assembly_query.where(AssemblyItem.equipment_type_id == equipment_type_id)
-    if location_id:
-        assembly_query = assembly_query.where(AssemblyItem.assembly.has(location_id=location_id))
-    if q:
-        assembly_query = assembly_query.where(
-            or_(
-                EquipmentType.name.ilike(f"%{q}%"),
-                Manufacturer.name.ilike(f"%{q}%"),
-                Assembly.name.ilike(f"%{q}%"),
+    if page is not None:
+        page_query = page_query.offset(max(page - 1, 0) * page_size).limit(page_size)
+    page_keys = db.execute(page_query).all()
+    ids_by_source: dict[str, list[int]] = {"cabinet": [], "assembly": []}
+    for equipment_source, item_id in page_keys:
+        ids_by_source[equipment_source].append(item_id)
+
+    items_by_key: dict[tuple[str, int], CabinetItem | AssemblyItem] = {}
+    if ids_by_source["cabinet"]:
+        for item in db.scalars(
+            select(CabinetItem)
+            .options(
+                selectinload(CabinetItem.equipment_type).selectinload(EquipmentType.manufacturer),
+                selectinload(CabinetItem.cabinet),
             )
-        )
-    cabinet_items = db.scalars(cabinet_query.order_by(CabinetItem.id.desc())).all()
-    assembly_items = db.scalars(assembly_query.order_by(AssemblyItem.id.desc())).all()
-    locations = db.scalars(select(Location)).all()
-    locations_map = {loc.id: loc for loc in locations}
+            .where(CabinetItem.id.in_(ids_by_source["cabinet"]))
+        ).all():
+            items_by_key[("cabinet", item.id)] = item
+    if ids_by_source["assembly"]:
+        for item in db.scalars(
+            select(AssemblyItem)
+            .options(
+                selectinload(AssemblyItem.equipment_type).selectinload(EquipmentType.manufacturer),
+                selectinload(AssemblyItem.assembly),
+            )
+            .where(AssemblyItem.id.in_(ids_by_source["assembly"]))
+        ).all():
+            items_by_key[("assembly", item.id)] = item
+
+    owners = [
+        (EquipmentNetworkInterface.equipment_item_source == equipment_source)
+        & EquipmentNetworkInterface.equipment_item_id.in_(item_ids)
+        for equipment_source, item_ids in ids_by_source.items()
+        if item_ids
+    ]
+    interfaces_by_key: dict[tuple[str, int], list[EquipmentNetworkInterfaceOut]] = {}
+    ips_by_key: dict[tuple[str, int], list[str]] = {}
+    if owners:
+        for interface in db.scalars(
+            select(EquipmentNetworkInterface)
+            .where(
+                or_(*owners),
+                EquipmentNetworkInterface.is_active == True,
+                EquipmentNetworkInterface.is_deleted == False,
+            )
+            .order_by(EquipmentNetworkInterface.interface_type, EquipmentNetworkInterface.interface_index)
+        ).all():
+            key = (interface.equipment_item_source, interface.equipment_item_id)
+            interfaces_by_key.setdefault(key, []).append(interface_to_out(interface))
+        ip_owners = [
+            (IPAddress.equipment_item_source == equipment_source) & IPAddress.equipment_item_id.in_(item_ids)
+            for equipment_source, item_ids in ids_by_source.items()
+            if item_ids
+        ]
+        for equipment_source, item_id, ip_address in db.execute(
+            select(IPAddress.equipment_item_source, IPAddress.equipment_item_id, IPAddress.ip_address)
+            .where(or_(*ip_owners), IPAddress.is_deleted == False, IPAddress.status == "used")
+            .order_by(IPAddress.is_primary.desc(), IPAddress.created_at.asc())
+        ).all():
+            ips_by_key.setdefault((equipment_source, item_id), []).append(ip_address)
+
+    def container_of(equipment_source: str, item):
+        return item.cabinet if equipment_source == "cabinet" else item.assembly
+
+    location_context = load_location_context(
+        db,
+        [
+            container_of(equipment_source, item).location_id
+            for (equipment_source, _item_id), item in items_by_key.items()
+            if container_of(equipment_source, item)
+        ],
+    )
     result: list[dict] = []
-    for item in cabinet_items:
-        if has_network_interfaces and not equipment_has_network_interfaces(item.equipment_type):
-            continue
-        if not item.cabinet:
-            continue
-        interfaces = sync_equipment_network_interfaces(db, item, "cabinet")
-        if has_network_interfaces and not interfaces:
+    for equipment_source, item_id in page_keys:
+        item = items_by_key.get((equipment_source, item_id))
+        container = container_of(equipment_source, item) if item else None
+        if container is None:
             continue
-        current_ip_links_count = db.scalar(
-            select(func.count(IPAddress.id)).where(
-                IPAddress.equipment_item_source == "cabinet",
-                IPAddress.equipment_item_id == item.id,
-                IPAddress.is_deleted == False,
-                IPAddress.status == "used",
-            )
-        ) or 0
+        interfaces = interfaces_by_key.get((equipment_source, item_id), [])
+        linked_ip_addresses = ips_by_key.get((equipment_source, item_id), [])
+        is_cabinet = equipment_source == "cabinet"
         result.append(
             {
-                "equipment_source": "cabinet",
+                "equipment_source": equipment_source,
                 "equipment_item_id": item.id,
-                "equipment_instance_id": item.id,
-                "display_name": f"{item.equipment_type_name or item.equipment_type.name} / {item.cabinet.name}",
-                "source": "cabinet",
-                "cabinet_id": item.cabinet_id,
-                "cabinet_name": item.cabinet.name,
-                "assembly_id": None,
-                "assembly_name": None,
-                "location": build_location_full_path(item.cabinet.location_id, locations_map),
+                "equipment_instance_id": item.id if is_cabinet else None,
+                "display_name": f"{item.equipment_type_name} / {container.name}",
+                "source": equipment_source,
+                "cabinet_id": item.cabinet_id if is_cabinet else None,
+                "cabinet_name": container.name if is_cabinet else None,
+                "assembly_id": None if is_cabinet else item.assembly_id,
+                "assembly_name": None if is_cabinet else container.name,
+                "location_id": container.location_id,
+                "location": location_context.full_path_by_id.get(container.location_id),
                 "manufacturer_id": item.equipment_type.manufacturer_id if item.equipment_type else None,
                 "manufacturer_name": item.manufacturer_name,
                 "equipment_type_id": item.equipment_type_id,
-                "equipment_type_name": item.equipment_type_name or item.equipment_type.name,
+                "equipment_type_name": item.equipment_type_name,
                 "inventory_number": item.equipment_type.nomenclature_number if item.equipment_type else None,
-                "serial": item.cabinet.factory_number if item.cabinet else None,
-                "tag": item.cabinet.nomenclature_number if item.cabinet else None,
-                "has_network_interfaces": True,
-                "current_ip_links_count": current_ip_links_count,
-                "network_interfaces": [interface_to_out(interface) for interface in interfaces if interface.is_active],
+                "serial": container.factory_number,
+                "tag": container.nomenclature_number,
+                "has_network_interfaces": bool(interfaces),
+                "current_ip_links_count": len(linked_ip_addresses),
+                "linked_ip_addresses": linked_ip_addresses,
+                "network_interfaces": interfaces,
             }
         )
-    for item in assembly_items:
-        if has_network_interfaces and not equipment_has_network_interfaces(item.equipment_type):
-            continue
-        if not item.assembly:
-            continue
-        interfaces = sync_equipment_network_interfaces(db, item, "assembly")
-        if has_network_interfaces and not interfaces:
+    return total, result
+
+
+def list_eligible_equipment(db, **filters) -> list[dict]:
+    return search_eligible_equipment(db, **filters)[1]
+
+
+@dataclass(frozen=True)
+class HostEquipmentTreeIndex:
+    """
+    Everything needed to render any level of the host-equipment tree:
+    locations ordered by name under their parent, leaves per location, and
+    the set of locations worth showing (their subtree holds equipment or
+    matches the search).
+    """
+
+    labels: dict[int, str]
+    children_by_parent: dict[int | None, list[int]]
+    equipment_by_location: dict[int, list[HostEquipmentTreeLeaf]]
+    visible: frozenset[int]
+
+
+HOST_TREE_TABLES = (Location, Cabinet, Assembly, CabinetItem, AssemblyItem, EquipmentType, Manufacturer, EquipmentNetworkInterface)
+_host_tree_cache: WeakKeyDictionary = WeakKeyDictionary()
+_host_tree_cache_lock = threading.Lock()
+
+
+def host_equipment_data_version(db) -> tuple:
+    """
+    Row count, `row_version` sum and latest `updated_at` of every table the
+    tree is built from, read in one statement. Any insert, update, soft or
+    hard delete changes it, including ones made by other worker processes:
+    the `row_version` sum also moves for updates committed by a transaction
+    that started before the latest `updated_at`.
+    """
+    columns = []
+    for model in HOST_TREE_TABLES:
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+        columns.append(select(func.coalesce(func.sum(model.row_version), 0)).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    return tuple(db.execute(select(*columns)).one())
+
+
+def build_host_equipment_tree_index(db, q: str | None = None) -> HostEquipmentTreeIndex:
+    locations = db.execute(select(Location.id, Location.name, Location.parent_id)).all()
+    labels = {location.id: location.name for location in locations}
+    parent_by_id = {location.id: location.parent_id for location in locations}
+    children_by_parent: dict[int | None, list[int]] = {}
+    for location in sorted(locations, key=lambda location: location.name.lower()):
+        children_by_parent.setdefault(location.parent_id, []).append(location.id)
+
+    equipment_by_location: dict[int, list[HostEquipmentTreeLeaf]] = {}
+    for item in list_eligible_equipment(db, q=q, has_network_interfaces=True, installed_only=True):
+        if item["location_id"] not in labels:
             continue
-        current_ip_links_count = db.scalar(
-            select(func.count(IPAddress.id)).where(
-                IPAddress.equipment_item_source == "assembly",
-                IPAddress.equipment_item_id == item.id,
-                IPAddress.is_deleted == False,
-                IPAddress.status == "used",
+        equipment_by_location.setdefault(item["location_id"], []).append(
+            HostEquipmentTreeLeaf(
+                value=f"{item['equipment_source']}:{item['equipment_item_id']}",
+                label=item["display_name"],
+                equipment_source=item["equipment_source"],
+                equipment_item_id=item["equipment_item_id"],
+                equipment_instance_id=item.get("equipment_instance_id"),
+                location_full_path=item.get("location"),
+                container_name=item.get("cabinet_name") or item.get("assembly_name"),
+                manufacturer_name=item.get("manufacturer_name"),
+                equipment_type_name=item["equipment_type_name"],
+                network_interfaces=item["network_interfaces"],
             )
-        ) or 0
-        result.append(
-            {
-                "equipment_source": "assembly",
-                "equipment_item_id": item.id,
-                "equipment_instance_id": None,
-                "display_name": f"{item.equipment_type_name or item.equipment_type.name} / {item.assembly.name}",
-                "source": "assembly",
-                "cabinet_id": None,
-                "cabinet_name": None,
-                "assembly_id": item.assembly_id,
-                "assembly_name": item.assembly.name,
-                "location": build_location_full_path(item.assembly.location_id, locations_map),
-                "manufacturer_id": item.equipment_type.manufacturer_id if item.equipment_type else None,
-                "manufacturer_name": item.manufacturer_name,
-                "equipment_type_id": item.equipment_type_id,
-                "equipment_type_name": item.equipment_type_name or item.equipment_type.name,
-                "inventory_number": item.equipment_type.nomenclature_number if item.equipment_type else None,
-                "serial": item.assembly.factory_number if item.assembly else None,
-                "tag": item.assembly.nomenclature_number if item.assembly else None,
-                "has_network_interfaces": True,
-                "current_ip_links_count": current_ip_links_count,
-                "network_interfaces": [interface_to_out(interface) for interface in interfaces if interface.is_active],
-            }
         )
-    return result
+    for leaves in equipment_by_location.values():
+        leaves.sort(key=lambda leaf: leaf.label.lower())
 
+    seeds = set(equipment_by_location)
+    normalized_query = (q or "").strip().lower()
+    if normalized_query:
+        paths = hierarchy.full_paths(db, Location)
+        seeds.update(location_id for location_id, path in paths.items() if normalized_query in path.lower())
+    visible: set[int] = set()
+    for location_id in seeds:
+        current: int | None = location_id
+        while current is not None and current in labels and current not in visible:
+            visible.add(current)
+            current = parent_by_id[current]
+    return HostEquipmentTreeIndex(
+        labels=labels,
+        children_by_parent=children_by_parent,
+        equipment_by_location=equipment_by_location,
+        visible=frozenset(visible),
+    )
 
-def build_host_equipment_tree(db, q: str | None = None) -> list[HostEquipmentTreeNode]:
-    locations = db.scalars(select(Location)).all()
-    locations_map = {loc.id: loc for loc in locations}
-    children_by_parent: dict[int | None, list[Location]] = {}
-    for location in locations:
-        children_by_parent.setdefault(location.parent_id, []).append(location)
 
-    eligible_items = list_eligible_equipment(db, q=q, has_network_interfaces=True, installed_only=True)
-    normalized_query = (q or "").strip().lower()
-    equipment_by_location: dict[int, list[HostEquipmentTreeLeaf]] = {}
-    for item in eligible_items:
-        source = item["equipment_source"]
-        item_id = item["equipment_item_id"]
-        value = f"{source}:{item_id}"
-        container_name = item.get("cabinet_name") or item.get("assembly_name")
-        leaf = HostEquipmentTreeLeaf(
-            value=value,
-            label=item["display_name"],
-            equipment_source=source,
-            equipment_item_id=item_id,
-            equipment_instance_id=item.get("equipment_instance_id"),
-            location_full_path=item.get("location"),
-            container_name=container_name,
-            manufacturer_name=item.get("manufacturer_name"),
-            equipment_type_name=item["equipment_type_name"],
-            network_interfaces=item["network_interfaces"],
-        )
-        location_path = item.get("location")
-        location_id = None
-        if location_path:
-            for loc in locations:
-                if build_location_full_path(loc.id, locations_map) == location_path:
-                    location_id = loc.id
-                    break
-        if location_id is None:
-            continue
-        equipment_by_location.setdefault(location_id, []).append(leaf)
+def get_host_equipment_tree_index(db, q: str | None = None) -> HostEquipmentTreeIndex:
+    """The unfiltered index is cached per engine until the data version changes."""
+    if q and q.strip():
+        return build_host_equipment_tree_index(db, q)
+    bind = db.get_bind()
+    version = host_equipment_data_version(db)
+    with _host_tree_cache_lock:
+        cached = _host_tree_cache.get(bind)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = build_host_equipment_tree_index(db)
+    with _host_tree_cache_lock:
+        _host_tree_cache[bind] = (version, index)
+    return index
 
-    def build_node(location: Location) -> HostEquipmentTreeNode | None:
-        child_nodes = [
-            node
-            for child in sorted(children_by_parent.get(location.id, []), key=lambda item: item.name.lower())
-            if (node := build_node(child)) is not None
-        ]
-        equipment = sorted(
-            equipment_by_location.get(location.id, []),
-            key=lambda item: item.label.lower(),
-        )
-        if normalized_query:
-            location_match = normalized_query in (build_location_full_path(location.id, locations_map) or location.name).lower()
-            if not location_match and not child_nodes and not equipment:
-                return None
-        elif not child_nodes and not equipment:
-            return None
+
+def build_host_equipment_tree(
+    db,
+    q: str | None = None,
+    parent_id: int | None = None,
+    lazy: bool = False,
+) -> list[HostEquipmentTreeNode]:
+    """
+    Location tree of eligible equipment. With `lazy`, only the children of
+    `parent_id` (roots when None) are returned, each with its own equipment
+    and `has_children` but without descendants.
+    """
+    index = get_host_equipment_tree_index(db, q)
+
+    def visible_children(location_id: int | None) -> list[int]:
+        return [child for child in index.children_by_parent.get(location_id, []) if child in index.visible]
+
+    def build_node(location_id: int) -> HostEquipmentTreeNode:
+        children = visible_children(location_id)
         return HostEquipmentTreeNode(
-            value=f"location:{location.id}",
-            label=location.name,
-            children=child_nodes,
-            equipment=equipment,
+            value=f"location:{location_id}",
+            label=index.labels[location_id],
+            has_children=bool(children),
+            children=[] if lazy else [build_node(child) for child in children],
+            equipment=index.equipment_by_location.get(location_id, []),
         )
 
-    return [
-        node
-        for location in sorted(children_by_parent.get(None, []), key=lambda item: item.name.lower())
-        if (node := build_node(location)) is not None
-    ]
+    return [build_node(location_id) for location_id in visible_children(parent_id)]
 
 
 def create_subnet_from_calculator_payload(db, payload: SubnetCalculatorCreate) -> tuple[ipaddress.IPv4Network, int, dict]:
@@ -861,7 +1259,14 @@ def build_cabinet_item_ipam_summary(db, item_id: int) -> CabinetItemIPAMSummaryO
     try:
         ensure_eligible_equipment_item(db, "cabinet", item_id)
         eligible = True
-        network_interfaces_count = len(sync_equipment_network_interfaces(db, item, "cabinet"))
+        network_interfaces_count = db.scalar(
+            select(func.count(EquipmentNetworkInterface.id)).where(
+                EquipmentNetworkInterface.equipment_item_source == "cabinet",
+                EquipmentNetworkInterface.equipment_item_id == item_id,
+                EquipmentNetworkInterface.is_active == True,
+                EquipmentNetworkInterface.is_deleted == False,
+            )
+        ) or 0
     except HTTPException:
         eligible = False
     linked_records = db.scalars(
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import copy
+import typing
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import update
+
+from app.core.audit import add_audit_log
+from app.schemas.common import DocumentPatch, DocumentPatchOut, JsonPatchOperation
+
+_MISSING = object()
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Split an RFC 6901 JSON pointer into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise HTTPException(status_code=422, detail=f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, pointer: str, *, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise HTTPException(status_code=422, detail=f"Invalid array index in '{pointer}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise HTTPException(status_code=422, detail=f"Array index out of range in '{pointer}'")
+    return index
+
+
+def _child_key(container, token: str, pointer: str):
+    if isinstance(container, list):
+        return _list_index(container, token, pointer)
+    if isinstance(container, dict):
+        if token not in container:
+            raise HTTPException(status_code=422, detail=f"Path '{pointer}' does not exist")
+        return token
+    raise HTTPException(status_code=422, detail=f"Path '{pointer}' does not exist")
+
+
+class _CopyOnWritePatch:
+    """
+    Applies operations to a JSON document without mutating it: every container
+    on a written path is shallow-copied once, the rest of the tree is shared
+    with the original. The cost of a patch is therefore proportional to the
+    depth and width of the touched paths rather than to the document size.
+    """
+
+    def __init__(self, document: Any):
+        self.document = document
+        self._owned: set[int] = set()
+
+    def _own(self, container):
+        if id(container) in self._owned:
+            return container
+        owned = list(container) if isinstance(container, list) else dict(container)
+        self._owned.add(id(owned))
+        return owned
+
+    def writable(self, tokens: list[str], pointer: str):
+        """Return the (owned) container addressed by `tokens`."""
+        if not isinstance(self.document, (dict, list)):
+            raise HTTPException(status_code=422, detail=f"Path '{pointer}' does not exist")
+        self.document = node = self._own(self.document)
+        for token in tokens:
+            key = _child_key(node, token, pointer)
+            child = node[key]
+            if not isinstance(child, (dict, list)):
+                raise HTTPException(status_code=422, detail=f"Path '{pointer}' does not exist")
+            node[key] = child = self._own(child)
+            node = child
+        return node
+
+    def get(self, tokens: list[str], pointer: str):
+        node = self.document
+        for token in tokens:
+            node = node[_child_key(node, token, pointer)]
+        return node
+
+    def add(self, tokens: list[str], value, pointer: str) -> None:
+        if not tokens:
+            self.document = value
+            return
+        parent = self.writable(tokens[:-1], pointer)
+        if isinstance(parent, list):
+            parent.insert(_list_index(parent, tokens[-1], pointer, allow_end=True), value)
+        else:
+            parent[tokens[-1]] = value
+
+    def remove(self, tokens: list[str], pointer: str):
+        if not tokens:
+            raise HTTPException(status_code=422, detail="Cannot remove the document root")
+        parent = self.writable(tokens[:-1], pointer)
+        return parent.pop(_child_key(parent, tokens[-1], pointer))
+
+    def replace(self, tokens: list[str], value, pointer: str) -> None:
+        if not tokens:
+            self.document = value
+            return
+        parent = self.writable(tokens[:-1], pointer)
+        parent[_child_key(parent, tokens[-1], pointer)] = value
+
+
+def _operation_value(operation: JsonPatchOperation):
+    if "value" not in operation.model_fields_set:
+        raise HTTPException(status_code=422, detail=f"'{operation.op}' operation requires a value")
+    return operation.value
+
+
+def _removal_touches(tokens: list[str], parent) -> list[str] | None:
+    """
+    Subtree to re-validate after removing `tokens`: a dropped element of a
+    top-level list leaves nothing to check, anything else re-checks the
+    top-level field itself or the container the value was removed from.
+    """
+    if len(tokens) == 1:
+        return tokens
+    if len(tokens) == 2 and isinstance(parent, list):
+        return None
+    return tokens[:-1]
+
+
+def _field_by_key(schema: type[BaseModel], key: str):
+    for name, field in schema.model_fields.items():
+        if (field.alias or name) == key:
+            return field
+    return None
+
+
+def _validation_detail(pointer: str, exc: ValidationError) -> list[dict]:
+    return [
+        {**error, "loc": [pointer, *error["loc"]]}
+        for error in exc.errors(include_url=False, include_context=False, include_input=False)
+    ]
+
+
+def _validate_subtree(patch: _CopyOnWritePatch, schema: type[BaseModel], tokens: list[str]) -> None:
+    """
+    Re-validate the smallest schema-typed subtree containing `tokens` (the
+    whole document, one top-level field or one element of a top-level list)
+    and store its normalized dump back into the patched document.
+    """
+    if not tokens:
+        try:
+            patch.document = schema.model_validate(patch.document).model_dump(by_alias=True)
+        except ValidationError as exc:
+            raise HTTPException(status_code=422, detail=_validation_detail("", exc)) from exc
+        return
+    if not isinstance(patch.document, dict):
+        raise HTTPException(status_code=422, detail="Document must be an object")
+
+    key = tokens[0]
+    field = _field_by_key(schema, key)
+    if field is None:
+        raise HTTPException(status_code=422, detail=f"Unknown document field '{key}'")
+    value = patch.document.get(key, _MISSING)
+    if value is _MISSING:
+        if field.is_required():
+            raise HTTPException(status_code=422, detail=f"Document field '{key}' is required")
+        return
+
+    annotation = field.annotation
+    pointer = f"/{key}"
+    if typing.get_origin(annotation) is list and len(tokens) > 1 and isinstance(value, list):
+        adapter = TypeAdapter(typing.get_args(annotation)[0])
+        container = patch.writable([key], pointer)
+        # "-" only reaches here from an append, which landed on the last slot.
+        slot = len(container) - 1 if tokens[1] == "-" else _list_index(container, tokens[1], f"{pointer}/{tokens[1]}")
+        pointer = f"{pointer}/{slot}"
+    else:
+        adapter = TypeAdapter(annotation)
+        container = patch.writable([], pointer)
+        slot = key
+    try:
+        container[slot] = adapter.dump_python(adapter.validate_python(container[slot]), by_alias=True)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=_validation_detail(pointer, exc)) from exc
+
+
+def apply_json_patch(document: Any, operations: list[JsonPatchOperation], schema: type[BaseModel]) -> Any:
+    """
+    Apply RFC 6902 `operations` to `document` and return the patched copy;
+    `document` itself is left untouched. Each operation is validated against
+    `schema` right after it is applied, but only for the subtree it touched,
+    so later operations that shift array indices cannot hide an invalid edit.
+    """
+    patch = _CopyOnWritePatch(document)
+    for operation in operations:
+        tokens = parse_pointer(operation.path)
+        touched: list[list[str]] = []
+        if operation.op == "add":
+            patch.add(tokens, _operation_value(operation), operation.path)
+            touched.append(tokens)
+        elif operation.op == "replace":
+            patch.replace(tokens, _operation_value(operation), operation.path)
+            touched.append(tokens)
+        elif operation.op == "remove":
+            parent = patch.get(tokens[:-1], operation.path) if tokens else None
+            patch.remove(tokens, operation.path)
+            if (removal := _removal_touches(tokens, parent)) is not None:
+                touched.append(removal)
+        elif operation.op in ("move", "copy"):
+            if operation.from_ is None:
+                raise HTTPException(status_code=422, detail=f"'{operation.op}' operation requires 'from'")
+            source = parse_pointer(operation.from_)
+            if operation.op == "move":
+                if tokens[: len(source)] == source and tokens != source:
+                    raise HTTPException(status_code=422, detail="Cannot move a value into one of its children")
+                parent = patch.get(source[:-1], operation.from_) if source else None
+                value = patch.remove(source, operation.from_)
+                if (removal := _removal_touches(source, parent)) is not None:
+                    touched.append(removal)
+            else:
+                value = copy.deepcopy(patch.get(source, operation.from_))
+            patch.add(tokens, value, operation.path)
+            touched.append(tokens)
+        elif operation.op == "test":
+            try:
+                current = patch.get(tokens, operation.path)
+            except HTTPException:
+                current = _MISSING
+            if current != _operation_value(operation):
+                raise HTTPException(status_code=409, detail=f"Test failed at '{operation.path}'")
+        for path in touched:
+            _validate_subtree(patch, schema, path)
+    return patch.document
+
+
+def patch_document_row(
+    db,
+    item,
+    payload: DocumentPatch,
+    schema: type[BaseModel],
+    *,
+    actor_id: int,
+    entity: str,
+    extra_values: dict | None = None,
+    prepare_values: Callable[[dict], dict] | None = None,
+) -> DocumentPatchOut:
+    """
+    Apply a JSON Patch to `item.document_json` under optimistic concurrency:
+    the write is a single UPDATE guarded by the `row_version` the client last
+    saw, so a concurrent save turns into 409 instead of a lost update. The
+    audit entry records the operations rather than the full before/after
+    documents. `prepare_values` may turn the validated document into the
+    column values to write (by default just `document_json`).
+    """
+    if item.row_version != payload.row_version:
+        raise HTTPException(status_code=409, detail="Document was modified by another request")
+    document = apply_json_patch(item.document_json or {}, payload.operations, schema)
+    values = prepare_values(document) if prepare_values is not None else {"document_json": document}
+
+    model = type(item)
+    row = db.execute(
+        update(model)
+        .where(model.id == item.id, model.row_version == payload.row_version)
+        .values(
+            **values,
+            updated_by_id=actor_id,
+            row_version=model.row_version + 1,
+            **(extra_values or {}),
+        )
+        .returning(model.row_version, model.updated_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=409, detail="Document was modified by another request")
+
+    add_audit_log(
+        db,
+        actor_id=actor_id,
+        action="UPDATE",
+        entity=entity,
+        entity_id=item.id,
+        meta={
+            "row_version": row.row_version,
+            "json_patch": [operation.model_dump(by_alias=True, exclude_unset=True) for operation in payload.operations],
+        },
+    )
+    return DocumentPatchOut(id=item.id, row_version=row.row_version, updated_at=row.updated_at)
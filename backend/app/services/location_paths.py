@@ -5,7 +5,9 @@ from typing import Callable, Iterable, TypeVar
 
 from sqlalchemy import select
 
+from app.core import hierarchy
 from app.models.core import Location
+from app.models.hierarchy import LocationClosure
 
 T = TypeVar("T")
 
@@ -17,25 +19,15 @@ class LocationContext:
     children_by_parent: dict[int | None, list[int]]
 
 
-def build_location_full_path(location_id: int | None, locations_map: dict[int, Location]) -> str | None:
-    if not location_id or location_id not in locations_map:
-        return None
-    parts: list[str] = []
-    current_id: int | None = location_id
-    seen: set[int] = set()
-    while current_id and current_id in locations_map and current_id not in seen:
-        location = locations_map[current_id]
-        parts.append(location.name)
-        seen.add(current_id)
-        current_id = location.parent_id
-    return " / ".join(reversed(parts))
-
-
-def build_location_context(locations: Iterable[Location]) -> LocationContext:
+def build_location_context(db, locations: Iterable[Location], *, whole_tree: bool = False) -> LocationContext:
+    """
+    Index `locations` by id and parent; full paths come from one closure-table
+    lookup (for every location when `whole_tree`, saving the id list).
+    """
     locations_map = {location.id: location for location in locations}
+    paths = hierarchy.full_paths(db, Location, None if whole_tree else locations_map)
     full_path_by_id = {
-        location_id: build_location_full_path(location_id, locations_map) or location.name
-        for location_id, location in locations_map.items()
+        location_id: paths.get(location_id, location.name) for location_id, location in locations_map.items()
     }
     children_by_parent: dict[int | None, list[int]] = {}
     for location in locations_map.values():
@@ -50,22 +42,15 @@ def build_location_context(locations: Iterable[Location]) -> LocationContext:
 def load_location_context(db, location_ids: Iterable[int | None] | None = None) -> LocationContext:
     normalized_ids = {location_id for location_id in (location_ids or []) if location_id}
     if not normalized_ids:
-        return build_location_context(db.scalars(select(Location)).all())
-
-    pending_ids = set(normalized_ids)
-    locations_map: dict[int, Location] = {}
-
-    while pending_ids:
-        batch = db.scalars(select(Location).where(Location.id.in_(pending_ids))).all()
-        pending_ids = set()
-        for location in batch:
-            if location.id in locations_map:
-                continue
-            locations_map[location.id] = location
-            if location.parent_id and location.parent_id not in locations_map:
-                pending_ids.add(location.parent_id)
-
-    return build_location_context(locations_map.values())
+        return build_location_context(db, db.scalars(select(Location)).all(), whole_tree=True)
+
+    locations = db.scalars(
+        select(Location)
+        .join(LocationClosure, LocationClosure.ancestor_id == Location.id)
+        .where(LocationClosure.descendant_id.in_(normalized_ids))
+        .distinct()
+    ).all()
+    return build_location_context(db, locations)
 
 
 def attach_location_full_path(
@@ -1,6 +1,14 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from uuid import uuid4
@@ -17,29 +25,142 @@ def ensure_pid_storage_dirs() -> None:
     settings.resolved_pid_images_dir.mkdir(parents=True, exist_ok=True)
 
 
-def diagram_path(process_id: int) -> Path:
+def diagram_path(process_id: int, *, gzipped: bool | None = None) -> Path:
     settings = get_settings()
-    return settings.resolved_pid_diagrams_dir / f"{process_id}.json"
+    if gzipped is None:
+        gzipped = settings.pid_diagrams_gzip
+    suffix = ".json.gz" if gzipped else ".json"
+    return settings.resolved_pid_diagrams_dir / f"{process_id}{suffix}"
 
 
-def load_diagram(process_id: int) -> dict | None:
-    ensure_pid_storage_dirs()
-    path = diagram_path(process_id)
-    if not path.exists():
-        return None
-    with path.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+@dataclass(frozen=True)
+class StoredDiagram:
+    """
+    A diagram file as served: compact JSON `body`, its gzip encoding when the
+    file is stored precompressed, and a strong ETag over the JSON bytes.
+    `path`, `mtime_ns` and `size` identify the file version it was read from.
+    """
+
+    path: Path
+    mtime_ns: int
+    size: int
+    etag: str
+    body: bytes
+    gzip_body: bytes | None
+
+
+class PidDiagramCache:
+    """
+    Process-local process id -> `StoredDiagram` cache. An entry is reused
+    while the file's mtime and size are unchanged, so serving an unchanged
+    diagram costs one stat call. Bounded by `pid_diagram_cache_max_size`
+    (least recently used entries are evicted first).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, StoredDiagram] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, process_id: int, path: Path, stat: os.stat_result) -> StoredDiagram | None:
+        with self._lock:
+            entry = self._entries.get(process_id)
+            if entry is None or (entry.path, entry.mtime_ns, entry.size) != (path, stat.st_mtime_ns, stat.st_size):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(process_id)
+            self.hits += 1
+            return entry
+
+    def put(self, process_id: int, entry: StoredDiagram) -> None:
+        with self._lock:
+            self._entries[process_id] = entry
+            self._entries.move_to_end(process_id)
+            while len(self._entries) > max(get_settings().pid_diagram_cache_max_size, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+diagram_cache = PidDiagramCache()
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _compact_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _stored_diagram(path: Path, stat: os.stat_result, raw: bytes) -> StoredDiagram:
+    gzipped = path.suffix == ".gz"
+    body = gzip.decompress(raw) if gzipped else raw
+    return StoredDiagram(
+        path=path,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        etag=_etag(body),
+        body=body,
+        gzip_body=raw if gzipped else None,
+    )
+
+
+def _existing_diagram_files(process_id: int) -> Iterator[tuple[Path, os.stat_result]]:
+    # The configured format first; the other one covers files written before
+    # the setting changed (or pretty-printed files from older versions).
+    preferred = get_settings().pid_diagrams_gzip
+    for gzipped in (preferred, not preferred):
+        path = diagram_path(process_id, gzipped=gzipped)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        yield path, stat
+
+
+def load_diagram_entry(process_id: int) -> StoredDiagram | None:
+    for path, stat in _existing_diagram_files(process_id):
+        entry = diagram_cache.get(process_id, path, stat)
+        if entry is not None:
+            return entry
+        raw = path.read_bytes()
+        if path.suffix != ".gz":
+            # Files from older versions are pretty-printed and were never
+            # validated on write; normalize them once here. Raises ValueError.
+            raw = _compact_json(PidDiagramPayload.model_validate_json(raw).model_dump(mode="json"))
+        try:
+            entry = _stored_diagram(path, stat, raw)
+        except (OSError, EOFError, zlib.error):
+            # Truncated or corrupt .json.gz: use the other file if there is
+            # one, otherwise the diagram is treated as missing.
+            continue
+        diagram_cache.put(process_id, entry)
+        return entry
+    return None
 
 
 def save_diagram_atomic(process_id: int, payload: PidDiagramPayload) -> None:
+    """
+    Write the diagram as compact JSON (gzip-compressed when
+    `pid_diagrams_gzip` is set) through a temp file + rename, drop the file in
+    the other format, and prime the cache with the bytes just written.
+    """
     settings = get_settings()
     ensure_pid_storage_dirs()
-    target = diagram_path(process_id)
-    data = payload.model_dump(mode="json")
-    with NamedTemporaryFile("w", encoding="utf-8", delete=False, dir=settings.resolved_pid_diagrams_dir) as tmp:
-        json.dump(data, tmp, ensure_ascii=False, indent=2)
+    gzipped = settings.pid_diagrams_gzip
+    target = diagram_path(process_id, gzipped=gzipped)
+    body = _compact_json(payload.model_dump(mode="json"))
+    raw = gzip.compress(body, compresslevel=6, mtime=0) if gzipped else body
+    with NamedTemporaryFile("wb", delete=False, dir=settings.resolved_pid_diagrams_dir) as tmp:
+        tmp.write(raw)
         temp_name = tmp.name
     Path(temp_name).replace(target)
+    diagram_path(process_id, gzipped=not gzipped).unlink(missing_ok=True)
+    diagram_cache.put(process_id, _stored_diagram(target, target.stat(), raw))
 
 
 def save_image(file: UploadFile) -> tuple[str, str]:
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.models.maintenance import (
+    MntIncident,
+    MntOperatingTime,
+    MntReliabilityMonthly,
+    incident_reliability_filter,
+    month_of,
+    next_month,
+    recount_reliability_month,
+    repair_seconds,
+)
+
+
+@dataclass
+class ReliabilityTotals:
+    operating_hours: float = 0.0
+    operating_days: int = 0
+    incident_count: int = 0
+    downtime_hours: float = 0.0
+    repair_count: int = 0
+    repair_seconds: float = 0.0
+
+    def add(self, other: ReliabilityTotals) -> None:
+        self.operating_hours += other.operating_hours
+        self.operating_days += other.operating_days
+        self.incident_count += other.incident_count
+        self.downtime_hours += other.downtime_hours
+        self.repair_count += other.repair_count
+        self.repair_seconds += other.repair_seconds
+
+
+@dataclass(frozen=True)
+class _RangeSplit:
+    """
+    A [start, end) day range cut into whole months served by the rollup table
+    and up to two partial-month edges read from the base tables.
+    """
+
+    first_full_month: date | None
+    end_full_month: date | None
+    edges: tuple[tuple[date | None, date | None], ...]
+
+    @property
+    def has_full_months(self) -> bool:
+        return (
+            self.first_full_month is None
+            or self.end_full_month is None
+            or self.first_full_month < self.end_full_month
+        )
+
+
+def _split_range(date_from: date | None, date_to: date | None) -> _RangeSplit:
+    end = date_to + timedelta(days=1) if date_to else None
+    first_full = None if date_from is None else (date_from if date_from.day == 1 else next_month(month_of(date_from)))
+    end_full = None if end is None else month_of(end)
+    if first_full is not None and end_full is not None and first_full >= end_full:
+        return _RangeSplit(first_full, end_full, ((date_from, end),))
+    edges = []
+    if date_from is not None and date_from < first_full:
+        edges.append((date_from, first_full))
+    if end is not None and end_full < end:
+        edges.append((end_full, end))
+    return _RangeSplit(first_full, end_full, tuple(edges))
+
+
+def _day_start(value: date) -> datetime:
+    return datetime(value.year, value.month, value.day, tzinfo=UTC)
+
+
+def _incident_edge_rows(db, start: date | None, end: date | None, cabinet_id: int | None):
+    query = select(
+        MntIncident.cabinet_id,
+        MntIncident.occurred_at,
+        MntIncident.repair_started_at,
+        MntIncident.resolved_at,
+        MntIncident.downtime_hours,
+    ).where(*incident_reliability_filter(_day_start(start), _day_start(end)))
+    if cabinet_id:
+        query = query.where(MntIncident.cabinet_id == cabinet_id)
+    return db.execute(query).all()
+
+
+def _edge_totals(db, start: date, end: date, cabinet_id: int | None) -> dict[int, ReliabilityTotals]:
+    totals: dict[int, ReliabilityTotals] = defaultdict(ReliabilityTotals)
+    for row in _incident_edge_rows(db, start, end, cabinet_id):
+        bucket = totals[row.cabinet_id]
+        bucket.incident_count += 1
+        bucket.downtime_hours += float(row.downtime_hours or 0)
+        seconds = repair_seconds(row.repair_started_at, row.resolved_at)
+        if seconds is not None:
+            bucket.repair_count += 1
+            bucket.repair_seconds += seconds
+    operating = (
+        select(
+            MntOperatingTime.cabinet_id,
+            func.count(MntOperatingTime.id),
+            func.coalesce(func.sum(MntOperatingTime.operating_hours), 0),
+        )
+        .where(MntOperatingTime.recorded_date >= start, MntOperatingTime.recorded_date < end)
+        .group_by(MntOperatingTime.cabinet_id)
+    )
+    if cabinet_id:
+        operating = operating.where(MntOperatingTime.cabinet_id == cabinet_id)
+    for row_cabinet_id, days, hours in db.execute(operating).all():
+        totals[row_cabinet_id].operating_days += int(days)
+        totals[row_cabinet_id].operating_hours += float(hours or 0)
+    return totals
+
+
+def _monthly_filter(split: _RangeSplit, cabinet_id: int | None) -> list:
+    clauses = []
+    if cabinet_id:
+        clauses.append(MntReliabilityMonthly.cabinet_id == cabinet_id)
+    if split.first_full_month is not None:
+        clauses.append(MntReliabilityMonthly.month >= split.first_full_month)
+    if split.end_full_month is not None:
+        clauses.append(MntReliabilityMonthly.month < split.end_full_month)
+    return clauses
+
+
+def reliability_totals(
+    db,
+    *,
+    cabinet_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> dict[int, ReliabilityTotals]:
+    """
+    Per-cabinet reliability inputs for the inclusive day range: whole months
+    come from `mnt_reliability_monthly`, partial edge months from the base
+    tables, so the cost no longer grows with the length of the window.
+    """
+    split = _split_range(date_from, date_to)
+    totals: dict[int, ReliabilityTotals] = defaultdict(ReliabilityTotals)
+    if split.has_full_months:
+        monthly = MntReliabilityMonthly
+        rows = db.execute(
+            select(
+                monthly.cabinet_id,
+                func.sum(monthly.operating_hours),
+                func.sum(monthly.operating_days),
+                func.sum(monthly.incident_count),
+                func.sum(monthly.downtime_hours),
+                func.sum(monthly.repair_count),
+                func.sum(monthly.repair_seconds),
+            )
+            .where(*_monthly_filter(split, cabinet_id))
+            .group_by(monthly.cabinet_id)
+        ).all()
+        for row in rows:
+            totals[row[0]].add(
+                ReliabilityTotals(
+                    operating_hours=float(row[1] or 0),
+                    operating_days=int(row[2] or 0),
+                    incident_count=int(row[3] or 0),
+                    downtime_hours=float(row[4] or 0),
+                    repair_count=int(row[5] or 0),
+                    repair_seconds=float(row[6] or 0),
+                )
+            )
+    for start, end in split.edges:
+        for edge_cabinet_id, edge in _edge_totals(db, start, end, cabinet_id).items():
+            totals[edge_cabinet_id].add(edge)
+    return {key: value for key, value in totals.items() if value.incident_count or value.operating_days}
+
+
+def monthly_incident_counts(
+    db,
+    *,
+    cabinet_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> dict[date, int]:
+    """Incident count per UTC month of the inclusive day range, months without incidents omitted."""
+    split = _split_range(date_from, date_to)
+    counts: dict[date, int] = defaultdict(int)
+    if split.has_full_months:
+        monthly = MntReliabilityMonthly
+        for month, count in db.execute(
+            select(monthly.month, func.sum(monthly.incident_count))
+            .where(*_monthly_filter(split, cabinet_id))
+            .group_by(monthly.month)
+        ).all():
+            counts[month] += int(count or 0)
+    for start, end in split.edges:
+        for row in _incident_edge_rows(db, start, end, cabinet_id):
+            counts[month_of(row.occurred_at)] += 1
+    return {month: counts[month] for month in sorted(counts) if counts[month]}
+
+
+def rebuild_reliability_rollups(db, *, cabinet_id: int | None = None) -> int:
+    """
+    Recompute every bucket (of one cabinet) from the base tables; the repair
+    path for writes that bypassed the ORM. Returns the number of buckets.
+    """
+    incidents = select(MntIncident.cabinet_id, MntIncident.occurred_at).where(MntIncident.is_deleted == False)
+    operating = select(MntOperatingTime.cabinet_id, MntOperatingTime.recorded_date)
+    stale = delete(MntReliabilityMonthly)
+    if cabinet_id:
+        incidents = incidents.where(MntIncident.cabinet_id == cabinet_id)
+        operating = operating.where(MntOperatingTime.cabinet_id == cabinet_id)
+        stale = stale.where(MntReliabilityMonthly.cabinet_id == cabinet_id)
+    buckets = {
+        (row_cabinet_id, month_of(moment))
+        for query in (incidents, operating)
+        for row_cabinet_id, moment in db.execute(query).all()
+    }
+    db.execute(stale)
+    connection = db.connection()
+    for bucket_cabinet_id, month in sorted(buckets):
+        recount_reliability_month(connection, bucket_cabinet_id, month)
+    return len(buckets)
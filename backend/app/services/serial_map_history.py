@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from app.models.serial_map import SerialMapDocument, SerialMapHistoryEntry
+
+HISTORY_LIMIT = 100
+KEYFRAME_INTERVAL = 20
+KEYED_COLLECTIONS = ("nodes", "edges")
+
+
+def empty_history() -> dict:
+    return {"past": [], "future": []}
+
+
+def snapshot_of(document: dict | None) -> dict:
+    document = document or {}
+    return {
+        "nodes": document.get("nodes") or [],
+        "edges": document.get("edges") or [],
+        "viewport": document.get("viewport") or {"x": 0, "y": 0, "zoom": 1},
+    }
+
+
+def _diff_collection(before: list[dict], after: list[dict]) -> dict | None:
+    before_by_id = {entry["id"]: entry for entry in before}
+    after_ids = [entry["id"] for entry in after]
+    changes: dict = {}
+    upserts = [entry for entry in after if before_by_id.get(entry["id"]) != entry]
+    kept = set(after_ids)
+    removed = [entry_id for entry_id in before_by_id if entry_id not in kept]
+    if upserts:
+        changes["set"] = upserts
+    if removed:
+        changes["remove"] = removed
+    if _apply_collection(before, changes) != after:
+        changes["order"] = after_ids
+    return changes or None
+
+
+def _apply_collection(entries: list[dict], changes: dict) -> list[dict]:
+    by_id = {entry["id"]: entry for entry in entries}
+    for entry_id in changes.get("remove", ()):
+        by_id.pop(entry_id, None)
+    for entry in changes.get("set", ()):
+        by_id[entry["id"]] = entry
+    order = changes.get("order")
+    if order is not None:
+        return [by_id[entry_id] for entry_id in order]
+    return list(by_id.values())
+
+
+def diff_snapshots(before: dict, after: dict) -> dict:
+    """
+    Keyed delta turning snapshot `before` into `after`: nodes and edges are
+    diffed by id (changed or added entries, removed ids, and the id order only
+    when it cannot be inferred), the viewport is stored only if it moved.
+    """
+    delta: dict = {}
+    for key in KEYED_COLLECTIONS:
+        changes = _diff_collection(before[key], after[key])
+        if changes:
+            delta[key] = changes
+    if before["viewport"] != after["viewport"]:
+        delta["viewport"] = after["viewport"]
+    return delta
+
+
+def apply_delta(snapshot: dict, delta: dict) -> dict:
+    result = dict(snapshot)
+    for key in KEYED_COLLECTIONS:
+        if key in delta:
+            result[key] = _apply_collection(snapshot[key], delta[key])
+    if "viewport" in delta:
+        result["viewport"] = delta["viewport"]
+    return result
+
+
+def _replay(entries: list[SerialMapHistoryEntry]) -> list[tuple[int, dict]]:
+    states: list[tuple[int, dict]] = []
+    state: dict | None = None
+    for entry in entries:
+        state = entry.payload if entry.is_keyframe else apply_delta(state, entry.payload)
+        states.append((entry.seq, state))
+    return states
+
+
+def load_history_state(db, document_id: int, seq: int) -> dict:
+    """Materialize the snapshot stored at `seq` from its nearest keyframe."""
+    keyframe_seq = (
+        select(func.max(SerialMapHistoryEntry.seq))
+        .where(
+            SerialMapHistoryEntry.document_id == document_id,
+            SerialMapHistoryEntry.is_keyframe == True,
+            SerialMapHistoryEntry.seq <= seq,
+        )
+        .scalar_subquery()
+    )
+    entries = db.scalars(
+        select(SerialMapHistoryEntry)
+        .where(
+            SerialMapHistoryEntry.document_id == document_id,
+            SerialMapHistoryEntry.seq >= keyframe_seq,
+            SerialMapHistoryEntry.seq <= seq,
+        )
+        .order_by(SerialMapHistoryEntry.seq.asc())
+    ).all()
+    if not entries or entries[-1].seq != seq:
+        raise HTTPException(status_code=409, detail="History entry not found")
+    return _replay(entries)[-1][1]
+
+
+def _append_entry(db, document_id: int, seq: int, payload: dict, *, is_keyframe: bool, actor_id: int | None) -> None:
+    db.add(
+        SerialMapHistoryEntry(
+            document_id=document_id,
+            seq=seq,
+            is_keyframe=is_keyframe,
+            payload=payload,
+            created_by_id=actor_id,
+        )
+    )
+
+
+def _prune(db, document_id: int, newest_seq: int) -> None:
+    """Keep the newest HISTORY_LIMIT entries, rebasing the oldest kept one to a keyframe."""
+    oldest_kept = newest_seq - HISTORY_LIMIT + 1
+    if oldest_kept <= 1:
+        return
+    first = db.scalar(
+        select(SerialMapHistoryEntry).where(
+            SerialMapHistoryEntry.document_id == document_id,
+            SerialMapHistoryEntry.seq == oldest_kept,
+        )
+    )
+    if first is not None and not first.is_keyframe:
+        first.payload = load_history_state(db, document_id, oldest_kept)
+        first.is_keyframe = True
+    db.execute(
+        delete(SerialMapHistoryEntry).where(
+            SerialMapHistoryEntry.document_id == document_id,
+            SerialMapHistoryEntry.seq < oldest_kept,
+        )
+    )
+
+
+def record_history_entry(
+    db,
+    document_id: int,
+    cursor: int | None,
+    previous_document: dict | None,
+    document: dict,
+    actor_id: int | None,
+) -> int:
+    """
+    Append the snapshot of `document` after `cursor`, dropping any redo
+    entries past it, and return the new cursor. `previous_document` is what
+    the row held before the save (None for a new document); it seeds a
+    keyframe for documents without history yet and is the base of the delta.
+    The document row itself is left to the caller so guarded writes stay
+    possible; the caller must hold its row lock (`SELECT ... FOR UPDATE`),
+    otherwise two concurrent saves would append the same seq.
+    """
+    snapshot = snapshot_of(document)
+    if cursor is None:
+        if previous_document is None:
+            _append_entry(db, document_id, 1, snapshot, is_keyframe=True, actor_id=actor_id)
+            db.flush()
+            return 1
+        _append_entry(db, document_id, 1, snapshot_of(previous_document), is_keyframe=True, actor_id=actor_id)
+        db.flush()
+        cursor = 1
+
+    delta = diff_snapshots(snapshot_of(previous_document), snapshot)
+    if not delta:
+        return cursor
+    db.execute(
+        delete(SerialMapHistoryEntry).where(
+            SerialMapHistoryEntry.document_id == document_id,
+            SerialMapHistoryEntry.seq > cursor,
+        )
+    )
+    last_keyframe = db.scalar(
+        select(func.max(SerialMapHistoryEntry.seq)).where(
+            SerialMapHistoryEntry.document_id == document_id,
+            SerialMapHistoryEntry.is_keyframe == True,
+        )
+    ) or 0
+    seq = cursor + 1
+    if seq - last_keyframe >= KEYFRAME_INTERVAL:
+        _append_entry(db, document_id, seq, snapshot, is_keyframe=True, actor_id=actor_id)
+    else:
+        _append_entry(db, document_id, seq, delta, is_keyframe=False, actor_id=actor_id)
+    db.flush()
+    _prune(db, document_id, seq)
+    return seq
+
+
+def seed_embedded_history(db, item: SerialMapDocument, actor_id: int | None = None) -> None:
+    """
+    Move the snapshots embedded in `item.document_json["history"]` into the
+    store as keyframes around the current state and strip them from the
+    document. Documents that already have stored history are left alone.
+    """
+    document = item.document_json or {}
+    history = document.get("history") or {}
+    if item.history_cursor is not None:
+        return
+    future = [snapshot_of(entry) for entry in history.get("future") or []][: HISTORY_LIMIT - 1]
+    room = HISTORY_LIMIT - 1 - len(future)
+    past = [snapshot_of(entry) for entry in history.get("past") or []][-room:] if room else []
+    for seq, state in enumerate([*past, snapshot_of(document), *future], start=1):
+        _append_entry(db, item.id, seq, state, is_keyframe=True, actor_id=actor_id)
+    item.history_cursor = len(past) + 1
+    item.document_json = {**document, "history": empty_history()}
+    db.flush()
+
+
+def build_history(db, item: SerialMapDocument) -> dict:
+    """Materialize the stored chain as `{past, future}` snapshots around the cursor."""
+    if item.history_cursor is None:
+        return empty_history()
+    entries = db.scalars(
+        select(SerialMapHistoryEntry)
+        .where(SerialMapHistoryEntry.document_id == item.id)
+        .order_by(SerialMapHistoryEntry.seq.asc())
+    ).all()
+    states = _replay(entries)
+    return {
+        "past": [state for seq, state in states if seq < item.history_cursor],
+        "future": [state for seq, state in states if seq > item.history_cursor],
+    }
+
+
+def step_history(db, item: SerialMapDocument, step: int) -> SerialMapDocument:
+    """Move the cursor by `step` (-1 undo, +1 redo) and restore that snapshot."""
+    if item.history_cursor is None:
+        raise HTTPException(status_code=409, detail="Nothing to undo" if step < 0 else "Nothing to redo")
+    target = item.history_cursor + step
+    exists = db.scalar(
+        select(SerialMapHistoryEntry.id).where(
+            SerialMapHistoryEntry.document_id == item.id,
+            SerialMapHistoryEntry.seq == target,
+        )
+    )
+    if exists is None:
+        raise HTTPException(status_code=409, detail="Nothing to undo" if step < 0 else "Nothing to redo")
+    item.document_json = {
+        **(item.document_json or {}),
+        **load_history_state(db, item.id, target),
+        "updatedAt": datetime.utcnow().isoformat(),
+        "history": empty_history(),
+    }
+    item.history_cursor = target
+    return item
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.models.serial_map import SERIAL_MAP_SCHEMA_VERSION, SerialMapDocument
+from app.schemas.serial_map import LegacySerialMapProjectDocument, SerialMapDocumentData
+from app.services.serial_map_history import empty_history, seed_embedded_history
+
+MIGRATION_BATCH_SIZE = 200
+
+
+@dataclass(frozen=True)
+class MigrationBatch:
+    batch: int
+    documents: int
+    created: int
+    last_id: int
+    elapsed_seconds: float
+
+
+def empty_document() -> dict:
+    return {
+        "version": 2,
+        "updatedAt": datetime.utcnow().isoformat(),
+        "viewport": {"x": 0, "y": 0, "zoom": 1},
+        "nodes": [],
+        "edges": [],
+        "history": empty_history(),
+    }
+
+
+def normalize_legacy_scheme(raw_scheme: dict | None) -> dict:
+    if not isinstance(raw_scheme, dict):
+        return empty_document()
+    return {
+        "version": 2,
+        "updatedAt": datetime.utcnow().isoformat(),
+        "viewport": raw_scheme.get("viewport") or {"x": 0, "y": 0, "zoom": 1},
+        "nodes": raw_scheme.get("nodes") or [],
+        "edges": raw_scheme.get("edges") or [],
+        "history": raw_scheme.get("history") or empty_history(),
+    }
+
+
+def document_from_json(value: dict | None) -> SerialMapDocumentData:
+    raw = value or {}
+    if isinstance(raw, dict) and raw.get("version") == 2 and "nodes" in raw and "edges" in raw:
+        return SerialMapDocumentData.model_validate(raw)
+    legacy = LegacySerialMapProjectDocument.model_validate(raw)
+    active_scheme = next((scheme for scheme in legacy.schemes if scheme.id == legacy.activeSchemeId), legacy.schemes[0] if legacy.schemes else None)
+    return SerialMapDocumentData.model_validate(normalize_legacy_scheme(active_scheme.model_dump() if active_scheme else None))
+
+
+def upgrade_serial_map_document(db, item: SerialMapDocument) -> list[SerialMapDocument]:
+    """
+    Bring one stored document to the current schema: a legacy multi-scheme
+    project keeps its active scheme and every other scheme becomes a
+    separate document. Embedded undo snapshots move to the history store.
+    Returns the documents created from extra schemes.
+    """
+    raw = item.document_json or {}
+    clones: list[SerialMapDocument] = []
+    if isinstance(raw, dict) and "schemes" in raw:
+        legacy = LegacySerialMapProjectDocument.model_validate(raw)
+        schemes = legacy.schemes or []
+        active_scheme = next(
+            (scheme for scheme in schemes if scheme.id == legacy.activeSchemeId), schemes[0] if schemes else None
+        )
+        item.document_json = normalize_legacy_scheme(active_scheme.model_dump() if active_scheme else None)
+        item.source_context = {
+            **(item.source_context or {}),
+            "legacy_project_id": legacy.projectId,
+            **({"legacy_scheme_id": active_scheme.id} if len(schemes) > 1 else {}),
+            "migrated_from_multi_scheme": len(schemes) > 1,
+        }
+        for index, scheme in enumerate(schemes if len(schemes) > 1 else []):
+            if scheme.id == active_scheme.id:
+                continue
+            clones.append(
+                SerialMapDocument(
+                    name=f"{item.name} / {scheme.name or f'Схема {index + 1}'}",
+                    description=scheme.description or item.description,
+                    scope=item.scope,
+                    location_id=item.location_id,
+                    source_context={
+                        **(item.source_context or {}),
+                        "legacy_project_id": legacy.projectId,
+                        "legacy_scheme_id": scheme.id,
+                        "migrated_from_document_id": item.id,
+                    },
+                    document_json=normalize_legacy_scheme(scheme.model_dump()),
+                    created_by_id=item.created_by_id,
+                    updated_by_id=item.updated_by_id,
+                    is_deleted=False,
+                )
+            )
+        db.add_all(clones)
+        db.flush()
+    for document in (item, *clones):
+        seed_embedded_history(db, document)
+        document.schema_version = SERIAL_MAP_SCHEMA_VERSION
+    return clones
+
+
+def ensure_current_document(db, item: SerialMapDocument) -> bool:
+    """
+    Read-path guard: current documents cost one integer comparison; a
+    straggler written by an older instance is upgraded in place. Returns
+    whether anything was written.
+    """
+    if item.schema_version >= SERIAL_MAP_SCHEMA_VERSION:
+        return False
+    upgrade_serial_map_document(db, item)
+    db.flush()
+    return True
+
+
+def migrate_serial_map_documents(
+    db,
+    *,
+    batch_size: int = MIGRATION_BATCH_SIZE,
+    after_id: int = 0,
+    on_batch: Callable[[MigrationBatch], None] | None = None,
+) -> int:
+    """
+    Upgrade every outdated document in id order, committing after each batch.
+    Progress lives in the rows themselves (`schema_version`), so an
+    interrupted run resumes where it stopped; `after_id` only skips ahead.
+    Returns the number of documents upgraded.
+    """
+    total = 0
+    batch = 0
+    while True:
+        started = time.perf_counter()
+        items = db.scalars(
+            select(SerialMapDocument)
+            .where(SerialMapDocument.schema_version < SERIAL_MAP_SCHEMA_VERSION, SerialMapDocument.id > after_id)
+            .order_by(SerialMapDocument.id.asc())
+            .limit(batch_size)
+        ).all()
+        if not items:
+            return total
+        created = sum(len(upgrade_serial_map_document(db, item)) for item in items)
+        db.commit()
+        batch += 1
+        total += len(items)
+        after_id = items[-1].id
+        if on_batch is not None:
+            on_batch(
+                MigrationBatch(
+                    batch=batch,
+                    documents=len(items),
+                    created=created,
+                    last_id=after_id,
+                    elapsed_seconds=round(time.perf_counter() - started, 3),
+                )
+            )
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import codecs
 import csv
 import json
 from datetime import date, datetime
-from io import BytesIO, StringIO, TextIOWrapper
-from typing import Any, Iterable, Sequence
+from io import TextIOWrapper
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Iterable, Iterator, Sequence
 
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
 from openpyxl import Workbook, load_workbook
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_YIELD_PER = 1000
+EXPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+
 
 def normalize_header(value: Any) -> str:
     return str(value or "").strip().lower()
@@ -25,55 +32,93 @@ def detect_upload_format(file: UploadFile) -> str:
     raise HTTPException(status_code=400, detail="Unsupported file format")
 
 
-def read_tabular_rows(file: UploadFile, file_format: str | None = None) -> tuple[list[str], list[list[Any]]]:
+def iter_tabular_rows(file: UploadFile, file_format: str | None = None) -> tuple[list[str], Iterator[list[Any]]]:
+    """
+    Header row plus a lazy iterator over the remaining rows. XLSX is opened in
+    read-only mode and CSV is read line by line, so large uploads are never
+    held in memory as a whole.
+    """
     effective_format = file_format or detect_upload_format(file)
     if effective_format == "xlsx":
-        workbook = load_workbook(file.file, data_only=True)
+        workbook = load_workbook(file.file, read_only=True, data_only=True)
         sheet = workbook["DATA"] if "DATA" in workbook.sheetnames else workbook.active
-        rows = list(sheet.iter_rows(values_only=True))
+        rows = sheet.iter_rows(values_only=True)
     else:
         text_stream = TextIOWrapper(file.file, encoding="utf-8-sig")
-        reader = csv.reader(text_stream)
-        rows = list(reader)
-    if not rows:
-        return [], []
-    headers = [str(value).strip() if value is not None else "" for value in rows[0]]
-    return headers, [list(row) if row is not None else [] for row in rows[1:]]
+        rows = csv.reader(text_stream)
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    headers = [str(value).strip() if value is not None else "" for value in first]
+    return headers, (list(row) if row is not None else [] for row in rows)
+
+
+def read_tabular_rows(file: UploadFile, file_format: str | None = None) -> tuple[list[str], list[list[Any]]]:
+    headers, rows = iter_tabular_rows(file, file_format)
+    return headers, list(rows)
+
+
+def stream_export_rows(db, query, *, yield_per: int = EXPORT_YIELD_PER):
+    """
+    Iterate an ORM export query in `yield_per` batches over a server-side
+    cursor instead of materializing the whole table with `.all()`.
+    """
+    return db.scalars(query.execution_options(yield_per=yield_per))
 
 
-def build_workbook_buffer(
+def write_workbook(
+    target: BinaryIO,
     headers: Sequence[str],
     rows: Iterable[Sequence[Any]],
     *,
     readme_lines: Sequence[str] | None = None,
-) -> BytesIO:
-    workbook = Workbook()
+) -> None:
+    workbook = Workbook(write_only=True)
     if readme_lines:
-        workbook.active.title = "README"
-        readme = workbook.active
+        readme = workbook.create_sheet("README")
         for line in readme_lines:
             readme.append([line])
-        sheet = workbook.create_sheet("DATA")
-    else:
-        sheet = workbook.active
-        sheet.title = "DATA"
+    sheet = workbook.create_sheet("DATA")
     sheet.append(list(headers))
     for row in rows:
         sheet.append([serialize_cell(value) for value in row])
-    buffer = BytesIO()
-    workbook.save(buffer)
-    buffer.seek(0)
-    return buffer
+    workbook.save(target)
 
 
-def build_csv_buffer(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> StringIO:
-    buffer = StringIO()
-    writer = csv.writer(buffer)
+def write_csv(target: BinaryIO, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    writer = csv.writer(codecs.getwriter("utf-8")(target))
     writer.writerow(list(headers))
     for row in rows:
         writer.writerow([serialize_cell(value) for value in row])
-    buffer.seek(0)
-    return buffer
+
+
+def _iter_spooled_file(spool: SpooledTemporaryFile) -> Iterator[bytes]:
+    try:
+        while chunk := spool.read(EXPORT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        spool.close()
+
+
+def _spooled_response(write, *, media_type: str, filename: str) -> StreamingResponse:
+    """
+    Render the export into a temp file that rolls over to disk past
+    `EXPORT_SPOOL_MAX_BYTES`, then stream it back in chunks. Rendering happens
+    before the response is returned, so the DB session is not needed once
+    streaming starts.
+    """
+    spool = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    try:
+        write(spool)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return StreamingResponse(
+        _iter_spooled_file(spool),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 def build_export_response(
@@ -85,18 +130,16 @@ def build_export_response(
     readme_lines: Sequence[str] | None = None,
 ) -> StreamingResponse:
     if file_format == "csv":
-        buffer = build_csv_buffer(headers, rows)
-        return StreamingResponse(
-            buffer,
+        return _spooled_response(
+            lambda target: write_csv(target, headers, rows),
             media_type="text/csv",
-            headers={"Content-Disposition": f'attachment; filename="{filename_prefix}.csv"'},
+            filename=f"{filename_prefix}.csv",
         )
 
-    buffer = build_workbook_buffer(headers, rows, readme_lines=readme_lines)
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f'attachment; filename="{filename_prefix}.xlsx"'},
+    return _spooled_response(
+        lambda target: write_workbook(target, headers, rows, readme_lines=readme_lines),
+        media_type=XLSX_MEDIA_TYPE,
+        filename=f"{filename_prefix}.xlsx",
     )
 
 
@@ -106,11 +149,10 @@ def build_template_response(
     headers: Sequence[str],
     readme_lines: Sequence[str],
 ) -> StreamingResponse:
-    buffer = build_workbook_buffer(headers, [], readme_lines=readme_lines)
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f'attachment; filename="{filename_prefix}.xlsx"'},
+    return _spooled_response(
+        lambda target: write_workbook(target, headers, [], readme_lines=readme_lines),
+        media_type=XLSX_MEDIA_TYPE,
+        filename=f"{filename_prefix}.xlsx",
     )
 
 
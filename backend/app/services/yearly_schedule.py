@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import islice
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.core import Personnel, PersonnelYearlyScheduleAssignment
+
+UPSERT_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class ScheduleRange:
+    personnel_id: int
+    from_date: date
+    to_date: date
+    status: str
+
+    def days(self) -> Iterable[date]:
+        current = self.from_date
+        while current <= self.to_date:
+            yield current
+            current += timedelta(days=1)
+
+
+def ensure_active_personnel(db, personnel_ids: Iterable[int]) -> None:
+    """Resolve every referenced employee with one query; 404 if any is missing or deleted."""
+    wanted = set(personnel_ids)
+    if not wanted:
+        return
+    found = set(
+        db.scalars(select(Personnel.id).where(Personnel.id.in_(wanted), Personnel.is_deleted == False)).all()
+    )
+    if wanted - found:
+        raise HTTPException(status_code=404, detail="Personnel not found")
+
+
+def _upsert(connection):
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    return dialect.insert(PersonnelYearlyScheduleAssignment.__table__)
+
+
+def expand_schedule_ranges(ranges: Iterable[ScheduleRange]) -> dict[tuple[int, date], str]:
+    """
+    Day-level statuses for `ranges` keyed by (personnel_id, work_date); later
+    ranges win on overlap, as they did when each day was written in turn.
+    """
+    statuses: dict[tuple[int, date], str] = {}
+    for item in ranges:
+        for work_date in item.days():
+            statuses[(item.personnel_id, work_date)] = item.status
+    return statuses
+
+
+def upsert_schedule_statuses(db, year: int, statuses: dict[tuple[int, date], str]) -> None:
+    """
+    Write the day statuses with one INSERT ... ON CONFLICT DO UPDATE per chunk
+    of UPSERT_CHUNK_SIZE days: new days are inserted, existing ones (also
+    soft-deleted) get the new status and are revived. Bypasses the ORM, so
+    callers return what they wrote instead of reloading it.
+    """
+    table = PersonnelYearlyScheduleAssignment.__table__
+    connection = db.connection()
+    entries = iter(statuses.items())
+    while chunk := list(islice(entries, UPSERT_CHUNK_SIZE)):
+        statement = _upsert(connection).values(
+            [
+                {
+                    "personnel_id": personnel_id,
+                    "year": year,
+                    "work_date": work_date,
+                    "status": status,
+                    "is_deleted": False,
+                }
+                for (personnel_id, work_date), status in chunk
+            ]
+        )
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.personnel_id, table.c.work_date],
+                set_={
+                    "year": statement.excluded.year,
+                    "status": statement.excluded.status,
+                    "is_deleted": False,
+                    "deleted_at": None,
+                    "deleted_by_id": None,
+                    "updated_at": func.now(),
+                    "row_version": table.c.row_version + 1,
+                },
+            )
+        )
+
+
+def apply_schedule_ranges(db, year: int, ranges: list[ScheduleRange]) -> dict[tuple[int, date], str]:
+    """Expand `ranges` in memory and upsert them in bulk; returns the written day statuses."""
+    statuses = expand_schedule_ranges(ranges)
+    upsert_schedule_statuses(db, year, statuses)
+    return statuses
+
+
+def schedule_ranges_meta(year: int, ranges: list[ScheduleRange], statuses: dict) -> dict:
+    """Audit meta summarizing one range edit request instead of an entry per day."""
+    return {
+        "year": year,
+        "days": len(statuses),
+        "ranges": [
+            {
+                "personnel_id": item.personnel_id,
+                "from_date": item.from_date.isoformat(),
+                "to_date": item.to_date.isoformat(),
+                "status": item.status,
+            }
+            for item in ranges
+        ],
+    }
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, or_, select, text
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+load_dotenv(BASE_DIR / ".env")
+
+from app.core.query import RU_ALPHABET, apply_alphabet_filter, apply_search
+from app.db.session import engine
+
+TABLE_NAME = "search_index_benchmark"
+
+metadata = MetaData()
+benchmark_table = Table(
+    TABLE_NAME,
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+)
+
+
+def _execution_ms(conn, statement, repeat: int) -> float:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    timings = []
+    for _ in range(repeat):
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}")).scalar()
+        timings.append(float(plan[0]["Execution Time"]))
+    return sorted(timings)[len(timings) // 2]
+
+
+def _queries(q: str) -> dict[str, object]:
+    count_query = select(func.count()).select_from(benchmark_table)
+    return {
+        "search (ILIKE %q%)": apply_search(count_query, q, [benchmark_table.c.name]),
+        "alphabet (66 x LIKE)": count_query.where(
+            or_(*[benchmark_table.c.name.like(f"{letter}%") for letter in RU_ALPHABET])
+        ),
+        "alphabet (initial letter)": apply_alphabet_filter(count_query, benchmark_table.c.name, "ru"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare list search latency with and without search indexes.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--query", default="а1b")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("Search index benchmark requires PostgreSQL.")
+        return 1
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAME}"))
+        metadata.create_all(conn)
+        conn.execute(
+            text(
+                f"""
+                INSERT INTO {TABLE_NAME} (id, name)
+                SELECT n,
+                       substr('АБВГДЕЖЗИКЛМНОПРСТУФABCDEFGHKLMNPRSTUVWXYZ', 1 + (n % 42), 1)
+                       || ' ' || md5(n::text) || ' а' || (n % 997)::text
+                FROM generate_series(1, :rows) AS n
+                """
+            ),
+            {"rows": args.rows},
+        )
+        conn.execute(text(f"ANALYZE {TABLE_NAME}"))
+
+    try:
+        with engine.begin() as conn:
+            baseline = {name: _execution_ms(conn, query, args.repeat) for name, query in _queries(args.query).items()}
+            conn.execute(text(f"CREATE INDEX ix_{TABLE_NAME}_name_trgm ON {TABLE_NAME} USING gin (name gin_trgm_ops)"))
+            conn.execute(text(f"CREATE INDEX ix_{TABLE_NAME}_name_initial ON {TABLE_NAME} (substr(name, 1, 1))"))
+            conn.execute(text(f"ANALYZE {TABLE_NAME}"))
+            indexed = {name: _execution_ms(conn, query, args.repeat) for name, query in _queries(args.query).items()}
+
+        print(f"Rows: {args.rows}, query: {args.query!r}, median of {args.repeat} runs")
+        print(f"{'query':<28}{'no index, ms':>16}{'indexed, ms':>16}{'speedup':>10}")
+        for name, before in baseline.items():
+            after = indexed[name]
+            speedup = before / after if after else float("inf")
+            print(f"{name:<28}{before:>16.2f}{after:>16.2f}{speedup:>9.1f}x")
+        return 0
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE_NAME}"))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+load_dotenv(BASE_DIR / ".env")
+
+from app.db.session import SessionLocal
+from app.models.core import Cabinet, EquipmentType, Manufacturer
+from app.models.operations import CabinetItem
+from app.routers.movements import create_unique_cabinet_items
+from app.services.io_signals import ensure_io_signals_for_equipment_in_operation
+from app.services.ipam import sync_equipment_network_interfaces
+
+
+def _per_unit_loop(db, cabinet_id: int, equipment: EquipmentType, quantity: int) -> None:
+    for _ in range(quantity):
+        item = CabinetItem(cabinet_id=cabinet_id, equipment_type_id=equipment.id, quantity=1, is_deleted=False)
+        db.add(item)
+        db.flush()
+        ensure_io_signals_for_equipment_in_operation(db, item.id)
+        sync_equipment_network_interfaces(db, item, "cabinet")
+    db.flush()
+
+
+def _bulk(db, cabinet_id: int, equipment: EquipmentType, quantity: int) -> None:
+    create_unique_cabinet_items(db, cabinet_id, equipment, quantity)
+    db.flush()
+
+
+def _run(strategy, quantity: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            manufacturer = Manufacturer(name="Benchmark vendor", country="RU", is_deleted=False)
+            db.add(manufacturer)
+            db.flush()
+            equipment = EquipmentType(
+                name="Benchmark IO module",
+                nomenclature_number="BENCH-IO-16",
+                manufacturer_id=manufacturer.id,
+                is_channel_forming=True,
+                ai_count=8,
+                di_count=16,
+                ao_count=4,
+                do_count=8,
+                network_ports=[{"type": "RJ45", "count": 2}],
+                is_deleted=False,
+            )
+            cabinet = Cabinet(name="Benchmark cabinet", is_deleted=False)
+            db.add_all([equipment, cabinet])
+            db.flush()
+            started = time.perf_counter()
+            strategy(db, cabinet.id, equipment, quantity)
+            timings.append(time.perf_counter() - started)
+        finally:
+            db.rollback()
+            db.close()
+    return sorted(timings)[len(timings) // 2]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare per-unit and bulk creation of unique cabinet items. Every run is rolled back."
+    )
+    parser.add_argument("--quantity", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    loop = _run(_per_unit_loop, args.quantity, args.repeat)
+    bulk = _run(_bulk, args.quantity, args.repeat)
+    print(f"Units: {args.quantity} channel-forming modules (36 signals, 2 ports each), median of {args.repeat} runs")
+    print(f"{'per-unit loop, ms':>20}{'bulk, ms':>12}{'speedup':>10}")
+    print(f"{loop * 1000:>20.1f}{bulk * 1000:>12.1f}{loop / bulk if bulk else float('inf'):>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
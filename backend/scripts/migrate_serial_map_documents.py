@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+load_dotenv(BASE_DIR / ".env")
+
+from app.db.session import SessionLocal
+from app.services.serial_map_migration import MIGRATION_BATCH_SIZE, MigrationBatch, migrate_serial_map_documents
+
+
+def _report(batch: MigrationBatch) -> None:
+    print(
+        f"batch {batch.batch}: {batch.documents} documents upgraded, {batch.created} split off, "
+        f"last id {batch.last_id}, {batch.elapsed_seconds * 1000:.1f} ms",
+        flush=True,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Upgrade serial map documents stored in an older schema. Each batch is committed on its own, "
+            "so an interrupted run can simply be started again."
+        )
+    )
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    parser.add_argument("--after-id", type=int, default=0, help="Skip documents with ids up to this one")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = migrate_serial_map_documents(db, batch_size=args.batch_size, after_id=args.after_id, on_batch=_report)
+        print(f"Serial map documents upgraded: {total}")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+load_dotenv(BASE_DIR / ".env")
+
+from app.core.log_retention import run_log_retention
+from app.db.session import SessionLocal
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        results = run_log_retention(db)
+        db.commit()
+        for result in results:
+            print("Log retention:", result)
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
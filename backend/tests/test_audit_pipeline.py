@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import audit
+from app.core.config import get_settings
+from app.db.base import Base
+from app.models.audit import AuditLog
+from app.models.security import RoleDefinition, User, UserRole
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session(monkeypatch):
+    monkeypatch.setattr(get_settings(), "audit_pipeline_enabled", True)
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [RoleDefinition.__table__, User.__table__, AuditLog.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    db.add(RoleDefinition(key=UserRole.admin.value, label="Administrator", is_system=True))
+    db.add(User(id=1, username="admin", password_hash="x", role=UserRole.admin.value))
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+
+
+def test_pipeline_writes_queued_entries_in_one_insert_at_commit(db_session):
+    statements: list[str] = []
+    bind = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        for entity_id in range(3):
+            audit.add_audit_log(db_session, actor_id=1, action="CREATE", entity="cabinets", entity_id=entity_id)
+        assert statements == []
+        db_session.commit()
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    assert sum(1 for statement in statements if statement.startswith("INSERT INTO audit_logs")) == 1
+    assert [log.entity_id for log in db_session.scalars(select(AuditLog).order_by(AuditLog.id))] == [0, 1, 2]
+
+
+def test_pipeline_drops_queued_entries_on_rollback(db_session):
+    audit.add_audit_log(db_session, actor_id=1, action="DELETE", entity="cabinets", entity_id=7)
+    db_session.rollback()
+    db_session.commit()
+
+    assert db_session.scalars(select(AuditLog)).all() == []
@@ -91,14 +91,12 @@ def make_client(db_session, monkeypatch):
 
     app.dependency_overrides[get_db] = _get_db
     monkeypatch.setattr(auth_router, "add_audit_log", lambda *args, **kwargs: None)
-    monkeypatch.setattr(auth_router, "enforce_table_row_limit", lambda *args, **kwargs: None)
     return TestClient(app)
 
 
 def test_login_creates_last_seen_and_session_token(db_session, admin_user, monkeypatch):
     monkeypatch.setattr(auth_router, "verify_password", lambda plain, hashed: True)
     monkeypatch.setattr(auth_router, "add_audit_log", lambda *args, **kwargs: None)
-    monkeypatch.setattr(auth_router, "enforce_table_row_limit", lambda *args, **kwargs: None)
 
     request = SimpleNamespace(
         client=SimpleNamespace(host="127.0.0.1"),
@@ -160,3 +158,35 @@ def test_heartbeat_refreshes_online_status_and_logout_removes_it(db_session, adm
     after_logout = client.get("/sessions/online", headers=headers)
     assert after_logout.status_code == 200
     assert after_logout.json() == []
+
+
+def test_current_user_is_served_from_principal_cache_until_logout(db_session, admin_user, monkeypatch):
+    from sqlalchemy import event
+
+    from app.core.dependencies import principal_cache
+
+    client = make_client(db_session, monkeypatch)
+    session = UserSession(user_id=admin_user.id, session_token_hash="pending", last_seen_at=datetime.utcnow())
+    db_session.add(session)
+    db_session.commit()
+    token = create_access_token(admin_user.username, admin_user.id, admin_user.role, session.id)
+    session.session_token_hash = hash_token(token)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/auth/heartbeat", headers=headers).status_code == 200
+
+    statements: list[str] = []
+    bind = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        hits_before = principal_cache.stats()["hits"]
+        assert client.post("/auth/heartbeat", headers=headers).status_code == 200
+        assert principal_cache.stats()["hits"] == hits_before + 1
+        assert not any("FROM users" in statement for statement in statements)
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert principal_cache.get(bind, hash_token(token)) is None
@@ -0,0 +1,207 @@
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.audit import AuditLog
+from app.models.core import Cabinet, EquipmentType, Manufacturer, Warehouse
+from app.models.io import IOSignal
+from app.models.operations import CabinetItem, WarehouseItem
+from app.models.security import User
+from app.routers import entity_import_export as import_router
+from app.schemas.import_export import ImportReport
+from app.services.bulk_import import ImportChunk, iter_row_chunks, run_bulk_import
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def catalog(db_session):
+    user = User(username="admin", password_hash="x", role="admin", is_deleted=False)
+    manufacturer = Manufacturer(name="Vendor", country="RU", is_deleted=False)
+    db_session.add_all([user, manufacturer])
+    db_session.flush()
+    plain = {"is_channel_forming": False, "is_network": False, "has_serial_interfaces": False, "is_deleted": False}
+    relay = EquipmentType(name="Relay", nomenclature_number="R-1", manufacturer_id=manufacturer.id, **plain)
+    fuse = EquipmentType(name="Fuse", nomenclature_number="F-1", manufacturer_id=manufacturer.id, **plain)
+    module = EquipmentType(
+        name="AI module",
+        nomenclature_number="AI-8",
+        manufacturer_id=manufacturer.id,
+        is_channel_forming=True,
+        ai_count=2,
+        is_network=False,
+        has_serial_interfaces=False,
+        is_deleted=False,
+    )
+    warehouse = Warehouse(name="Main", is_deleted=False)
+    cabinet = Cabinet(name="Cab 1", is_deleted=False)
+    db_session.add_all([relay, fuse, module, warehouse, cabinet])
+    db_session.flush()
+    db_session.add_all(
+        [
+            WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=relay.id, quantity=1, is_deleted=False),
+            WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=fuse.id, quantity=7, is_deleted=True),
+        ]
+    )
+    db_session.commit()
+    return {"user": user, "relay": relay, "fuse": fuse, "module": module, "warehouse": warehouse, "cabinet": cabinet}
+
+
+def _upload(content: str) -> UploadFile:
+    return UploadFile(file=BytesIO(content.encode("utf-8")), filename="items.csv")
+
+
+def test_iter_row_chunks_skips_blank_rows_and_keeps_row_numbers():
+    rows = [["a"], [""], ["b"], ["c"], [None]]
+
+    chunks = list(iter_row_chunks(["name"], rows, chunk_size=2))
+
+    assert chunks == [[(2, {"name": "a"}), (4, {"name": "b"})], [(5, {"name": "c"})]]
+
+
+def test_warehouse_import_bulk_writes_and_audits_once(db_session, catalog):
+    content = "\n".join(
+        [
+            "warehouse_name,equipment_type_nomenclature_number,quantity,is_accounted",
+            "Main,R-1,5,",
+            "Main,F-1,3,false",
+            "Main,AI-8,2,",
+            "Main,AI-8,4,",
+            "Nowhere,R-1,1,",
+        ]
+    )
+
+    preview = import_router.import_warehouse_items(_upload(content), "csv", True, db_session, catalog["user"])
+    assert (preview.total_rows, preview.created, preview.updated, preview.skipped_duplicates) == (5, 1, 1, 2)
+    assert db_session.scalar(select(AuditLog.id)) is None
+
+    report = import_router.import_warehouse_items(_upload(content), "csv", False, db_session, catalog["user"])
+
+    assert (report.created, report.updated, report.skipped_duplicates) == (1, 1, 2)
+    assert [issue.row for issue in report.errors] == [6]
+    assert report.rows_per_second is not None
+    items = {
+        item.equipment_type_id: item
+        for item in db_session.scalars(select(WarehouseItem).execution_options(populate_existing=True))
+    }
+    assert items[catalog["module"].id].quantity == 2
+    assert (items[catalog["fuse"].id].quantity, items[catalog["fuse"].id].is_accounted) == (3, False)
+    assert items[catalog["fuse"].id].is_deleted is False
+    assert items[catalog["fuse"].id].row_version == 2
+    assert items[catalog["relay"].id].quantity == 1
+    audits = db_session.scalars(select(AuditLog)).all()
+    assert [(entry.action, entry.entity, entry.meta["created"]) for entry in audits] == [("IMPORT", "warehouse_items", 1)]
+
+
+def test_cabinet_import_generates_io_signals_for_channel_forming_rows(db_session, catalog):
+    content = "\n".join(
+        [
+            "cabinet_name,equipment_type_nomenclature_number,quantity",
+            "Cab 1,AI-8,3",
+            "Cab 1,R-1,4",
+        ]
+    )
+
+    report = import_router.import_cabinet_items(_upload(content), "csv", False, db_session, catalog["user"])
+
+    assert report.created == 2
+    items = {item.equipment_type_id: item for item in db_session.scalars(select(CabinetItem))}
+    assert items[catalog["module"].id].quantity == 1
+    assert items[catalog["relay"].id].quantity == 4
+    signals = db_session.scalars(select(IOSignal)).all()
+    assert {signal.equipment_in_operation_id for signal in signals} == {items[catalog["module"].id].id}
+    assert len(signals) == 2
+
+
+def test_warehouse_import_reports_negative_quantity_as_row_error(db_session, catalog):
+    content = "warehouse_name,equipment_type_nomenclature_number,quantity\nMain,AI-8,-2\nMain,F-1,3"
+
+    report = import_router.import_warehouse_items(_upload(content), "csv", False, db_session, catalog["user"])
+
+    assert (report.created, report.updated) == (0, 1)
+    assert [(issue.row, issue.message) for issue in report.errors] == [(2, "quantity must be >= 0")]
+    assert db_session.scalar(select(WarehouseItem.id).where(WarehouseItem.equipment_type_id == catalog["module"].id)) is None
+
+
+def test_cabinet_import_reports_negative_quantity_as_row_error(db_session, catalog):
+    content = "cabinet_name,equipment_type_nomenclature_number,quantity\nCab 1,R-1,-4\nCab 1,F-1,2"
+
+    report = import_router.import_cabinet_items(_upload(content), "csv", False, db_session, catalog["user"])
+
+    assert report.created == 1
+    assert [(issue.row, issue.message) for issue in report.errors] == [(2, "quantity must be >= 0")]
+    assert db_session.scalars(select(CabinetItem.equipment_type_id)).all() == [catalog["fuse"].id]
+
+
+def test_cabinet_import_generates_io_signals_only_for_inserted_items(db_session, catalog):
+    existing = CabinetItem(
+        cabinet_id=catalog["cabinet"].id, equipment_type_id=catalog["module"].id, quantity=1, is_deleted=True
+    )
+    db_session.add(existing)
+    db_session.commit()
+
+    report = import_router.import_cabinet_items(
+        _upload("cabinet_name,equipment_type_nomenclature_number,quantity\nCab 1,AI-8,1"),
+        "csv",
+        False,
+        db_session,
+        catalog["user"],
+    )
+
+    assert report.created == 1
+    inserted_id = db_session.scalar(select(CabinetItem.id).where(CabinetItem.is_deleted == False))
+    signals = db_session.scalars(select(IOSignal)).all()
+    assert {signal.equipment_in_operation_id for signal in signals} == {inserted_id}
+    assert inserted_id != existing.id
+    assert len(signals) == 2
+
+
+def test_bulk_import_rolls_back_every_chunk_when_a_later_one_fails(db_session, catalog):
+    def parse_chunk(_db, chunk, _report):
+        if chunk[0][1]["name"] == "broken":
+            raise RuntimeError("parser failed")
+        return ImportChunk(inserts=[{"name": values["name"], "is_deleted": False} for _row, values in chunk])
+
+    with pytest.raises(RuntimeError):
+        run_bulk_import(
+            db_session,
+            file=_upload("name\nNorth\nbroken"),
+            file_format="csv",
+            required_headers=["name"],
+            model=Warehouse,
+            entity="warehouses",
+            actor_id=catalog["user"].id,
+            parse_chunk=parse_chunk,
+            report=ImportReport(total_rows=0, created=0, skipped_duplicates=0, errors=[], warnings=[]),
+            dry_run=False,
+            chunk_size=1,
+        )
+
+    assert db_session.scalars(select(Warehouse.name)).all() == ["Main"]
+    assert db_session.scalar(select(AuditLog.id)) is None
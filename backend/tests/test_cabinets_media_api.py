@@ -12,6 +12,7 @@ from sqlalchemy.pool import StaticPool
 from app.core.dependencies import get_current_user, get_db
 from app.db.base import Base
 from app.models.core import Cabinet, Location
+from app.models.hierarchy import LocationClosure
 from app.models.security import AccessSpace, RoleDefinition, RoleSpacePermission, User, UserRole
 from app.routers import cabinets as cabinets_router
 
@@ -38,6 +39,7 @@ def db_session():
             RoleSpacePermission.__table__,
             User.__table__,
             Location.__table__,
+            LocationClosure.__table__,
             Cabinet.__table__,
         ],
     )
@@ -10,11 +10,15 @@ from sqlalchemy.pool import StaticPool
 from app.core.dependencies import get_current_user, get_db
 from app.db.base import Base
 from app.models.core import Cabinet, EquipmentCategory, EquipmentType, Manufacturer, Warehouse
+from app.models.io import IOSignal
+from app.models.ipam import EquipmentNetworkInterface
 from app.models.movements import EquipmentMovement
 from app.models.operations import CabinetItem, WarehouseItem
+from app.models.dashboard import DashboardAggregate
 from app.models.security import RoleDefinition, User, UserRole
 from app.routers import dashboard as dashboard_router
 from app.routers import movements as movements_router
+from app.services.dashboard_aggregates import OVERVIEW_KEY, compute_dashboard_payload
 
 
 @compiles(JSONB, "sqlite")
@@ -127,6 +131,47 @@ def test_dashboard_overview_groups_warehouse_items_by_root_category(client, db_s
     assert {"name": "Без категории", "qty": 4} in donuts
 
 
+def test_dashboard_overview_snapshot_follows_movements_and_price_edits(client, db_session):
+    manufacturer, _root, child_a, _child_b, warehouse, cabinet = seed_base_catalog(db_session)
+    plc = create_equipment_type(db_session, manufacturer.id, "PLC", "N-1", child_a.id)
+    cable = create_equipment_type(db_session, manufacturer.id, "Cable", "N-2", None)
+    plc.is_channel_forming = True
+    plc.ai_count = 4
+    plc.meta_data = {"unit_price_rub": 100}
+    db_session.add_all(
+        [
+            WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=plc.id, quantity=5, is_deleted=False),
+            WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=cable.id, quantity=10, is_deleted=False),
+        ]
+    )
+    db_session.commit()
+
+    first = client.get("/dashboard/overview").json()
+    assert first["kpis"]["total_warehouse_value_rub"] == 500
+    assert first["computed_at"] is not None
+    revision = db_session.get(DashboardAggregate, OVERVIEW_KEY).revision
+
+    response = client.post(
+        "/movements/",
+        json={"movement_type": "writeoff", "from_warehouse_id": warehouse.id, "equipment_type_id": cable.id, "quantity": 3},
+    )
+    assert response.status_code == 200
+    db_session.add(CabinetItem(cabinet_id=cabinet.id, equipment_type_id=plc.id, quantity=1, is_deleted=False))
+    plc.meta_data = {"unit_price_rub": 250}
+    db_session.commit()
+
+    snapshot = db_session.get(DashboardAggregate, OVERVIEW_KEY, populate_existing=True)
+    assert snapshot.is_stale is False
+    assert snapshot.revision == revision + 2
+    assert snapshot.payload == compute_dashboard_payload(db_session)
+
+    kpis = client.get("/dashboard/overview").json()["kpis"]
+    assert kpis["total_plc_in_cabinets"] == 1
+    assert kpis["ai_total"] == 4
+    assert kpis["total_warehouse_value_rub"] == 1250
+    assert {"name": "Без категории", "qty": 7} in client.get("/dashboard/overview").json()["donuts"]["by_category"]
+
+
 def test_movements_batch_creates_all_rows_in_single_request(client, db_session):
     manufacturer, _root, child_a, child_b, _warehouse, cabinet = seed_base_catalog(db_session)
     equipment_a = create_equipment_type(db_session, manufacturer.id, "EQ-1", "N-1", child_a.id)
@@ -179,3 +224,201 @@ def test_movements_batch_rolls_back_when_any_item_is_invalid(client, db_session)
     assert response.status_code == 404
     assert db_session.scalars(select(CabinetItem)).all() == []
     assert db_session.scalars(select(EquipmentMovement)).all() == []
+
+
+def test_movements_batch_goods_receipt_upserts_stock_and_patches_snapshot(client, db_session):
+    manufacturer, _root, child_a, child_b, warehouse, _cabinet = seed_base_catalog(db_session)
+    equipment_a = create_equipment_type(db_session, manufacturer.id, "EQ-1", "N-1", child_a.id)
+    equipment_b = create_equipment_type(db_session, manufacturer.id, "EQ-2", "N-2", child_b.id)
+    equipment_a.meta_data = {"unit_price_rub": 10}
+    db_session.add(WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=equipment_a.id, quantity=4, is_deleted=False))
+    db_session.commit()
+    assert client.get("/dashboard/overview").status_code == 200
+
+    response = client.post(
+        "/movements/batch",
+        json={
+            "movement_type": "inbound",
+            "to_warehouse_id": warehouse.id,
+            "items": [
+                {"equipment_type_id": equipment_a.id, "quantity": 2},
+                {"equipment_type_id": equipment_b.id, "quantity": 5},
+                {"equipment_type_id": equipment_a.id, "quantity": 1, "reference": "INV-2"},
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    assert float(response.headers["X-Lines-Per-Second"]) > 0
+    assert [(row["equipment_type_id"], row["quantity"], row["reference"]) for row in response.json()] == [
+        (equipment_a.id, 2, None),
+        (equipment_b.id, 5, None),
+        (equipment_a.id, 1, "INV-2"),
+    ]
+    items = db_session.scalars(
+        select(WarehouseItem).order_by(WarehouseItem.equipment_type_id).execution_options(populate_existing=True)
+    ).all()
+    assert [(item.equipment_type_id, item.quantity, item.row_version) for item in items] == [
+        (equipment_a.id, 7, 2),
+        (equipment_b.id, 5, 1),
+    ]
+    snapshot = db_session.get(DashboardAggregate, OVERVIEW_KEY, populate_existing=True)
+    assert snapshot.is_stale is False
+    assert snapshot.payload == compute_dashboard_payload(db_session)
+
+
+def test_movements_batch_accounting_flag_change_bumps_row_version(client, db_session):
+    manufacturer, _root, child_a, _child_b, warehouse, _cabinet = seed_base_catalog(db_session)
+    equipment = create_equipment_type(db_session, manufacturer.id, "EQ-1", "N-1", child_a.id)
+    db_session.add(WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=equipment.id, quantity=4, is_deleted=False))
+    db_session.commit()
+
+    response = client.post(
+        "/movements/batch",
+        json={
+            "movement_type": "to_warehouse",
+            "to_warehouse_id": warehouse.id,
+            "is_accounted": False,
+            "items": [{"equipment_type_id": equipment.id, "quantity": 2}],
+        },
+    )
+
+    assert response.status_code == 200
+    item = db_session.scalar(select(WarehouseItem).execution_options(populate_existing=True))
+    assert (item.quantity, item.is_accounted, item.row_version) == (6, False, 3)
+
+
+def test_movements_batch_rejects_net_shortage(client, db_session):
+    manufacturer, _root, child_a, _child_b, warehouse, _cabinet = seed_base_catalog(db_session)
+    equipment = create_equipment_type(db_session, manufacturer.id, "EQ-1", "N-1", child_a.id)
+    db_session.add(WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=equipment.id, quantity=3, is_deleted=False))
+    db_session.commit()
+
+    response = client.post(
+        "/movements/batch",
+        json={
+            "movement_type": "writeoff",
+            "from_warehouse_id": warehouse.id,
+            "items": [
+                {"equipment_type_id": equipment.id, "quantity": 2},
+                {"equipment_type_id": equipment.id, "quantity": 2},
+            ],
+        },
+    )
+
+    assert response.status_code == 409
+    item = db_session.scalar(select(WarehouseItem).execution_options(populate_existing=True))
+    assert item.quantity == 3
+    assert db_session.scalars(select(EquipmentMovement)).all() == []
+
+
+def test_movements_batch_rejects_same_warehouse_transfer_over_stock(client, db_session):
+    manufacturer, _root, child_a, _child_b, warehouse, _cabinet = seed_base_catalog(db_session)
+    equipment = create_equipment_type(db_session, manufacturer.id, "EQ-1", "N-1", child_a.id)
+    db_session.add(WarehouseItem(warehouse_id=warehouse.id, equipment_type_id=equipment.id, quantity=3, is_deleted=False))
+    db_session.commit()
+
+    response = client.post(
+        "/movements/batch",
+        json={
+            "movement_type": "transfer",
+            "from_warehouse_id": warehouse.id,
+            "to_warehouse_id": warehouse.id,
+            "items": [{"equipment_type_id": equipment.id, "quantity": 5}],
+        },
+    )
+
+    assert response.status_code == 409
+    item = db_session.scalar(select(WarehouseItem).execution_options(populate_existing=True))
+    assert item.quantity == 3
+    assert db_session.scalars(select(EquipmentMovement)).all() == []
+
+
+def test_direct_to_cabinet_creates_unique_units_with_signals_and_interfaces(client, db_session):
+    manufacturer, _root, child_a, _child_b, _warehouse, cabinet = seed_base_catalog(db_session)
+    module = create_equipment_type(db_session, manufacturer.id, "IO", "N-1", child_a.id)
+    module.is_channel_forming = True
+    module.ai_count = 2
+    module.do_count = 1
+    module.network_ports = [{"type": "RJ45", "count": 2}]
+    db_session.commit()
+    assert client.get("/dashboard/overview").status_code == 200
+
+    response = client.post(
+        "/movements/",
+        json={"movement_type": "direct_to_cabinet", "to_cabinet_id": cabinet.id, "equipment_type_id": module.id, "quantity": 3},
+    )
+
+    assert response.status_code == 200
+    items = db_session.scalars(select(CabinetItem).order_by(CabinetItem.id)).all()
+    assert [item.quantity for item in items] == [1, 1, 1]
+    signals = db_session.scalars(select(IOSignal)).all()
+    assert len(signals) == 9
+    assert {(signal.signal_type.value, signal.channel_index) for signal in signals if signal.equipment_in_operation_id == items[0].id} == {
+        ("AI", 1),
+        ("AI", 2),
+        ("DO", 1),
+    }
+    interfaces = db_session.scalars(select(EquipmentNetworkInterface).order_by(EquipmentNetworkInterface.id)).all()
+    assert [(item.equipment_instance_id, item.interface_name) for item in interfaces[:2]] == [
+        (items[0].id, "RJ45 Port 1"),
+        (items[0].id, "RJ45 Port 2"),
+    ]
+    assert len(interfaces) == 6
+    snapshot = db_session.get(DashboardAggregate, OVERVIEW_KEY, populate_existing=True)
+    assert snapshot.payload["plc_in_cabinets"] == 3
+    assert snapshot.payload == compute_dashboard_payload(db_session)
+
+
+def test_movements_cursor_paging_walks_forward_and_back_with_null_sort_values(client, db_session, admin_user):
+    from app.models.movements import MovementType
+
+    manufacturer, _root, child_a, _child_b, _warehouse, cabinet = seed_base_catalog(db_session)
+    equipment = create_equipment_type(db_session, manufacturer.id, "EQ-1", "N-1", child_a.id)
+    references = ["B", None, "A", "B", None, "C", "A"]
+    db_session.add_all(
+        [
+            EquipmentMovement(
+                movement_type=MovementType.direct_to_cabinet,
+                equipment_type_id=equipment.id,
+                quantity=1,
+                to_cabinet_id=cabinet.id,
+                reference=reference,
+                performed_by_id=admin_user.id,
+            )
+            for reference in references
+        ]
+    )
+    db_session.commit()
+    expected = [
+        movement.id
+        for movement in sorted(
+            db_session.scalars(select(EquipmentMovement)).all(),
+            key=lambda movement: (movement.reference is None, movement.reference or "", movement.id),
+        )
+    ]
+
+    pages = []
+    params = {"paging": "cursor", "page_size": 3, "sort": "reference", "total_mode": "exact"}
+    response = client.get("/movements/", params=params)
+    while True:
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body)
+        if not body["next_cursor"]:
+            break
+        response = client.get("/movements/", params={**params, "cursor": body["next_cursor"]})
+
+    assert [item["id"] for page in pages for item in page["items"]] == expected
+    assert pages[0]["total"] == len(references)
+    assert pages[0]["prev_cursor"] is None
+
+    back = client.get("/movements/", params={**params, "cursor": pages[-1]["prev_cursor"]}).json()
+    assert [item["id"] for item in back["items"]] == [item["id"] for item in pages[-2]["items"]]
+
+    descending = client.get("/movements/", params={"paging": "cursor", "page_size": 4})
+    assert [item["id"] for item in descending.json()["items"]] == sorted(expected, reverse=True)[:4]
+    assert descending.json()["total"] is None
+
+    stale = client.get("/movements/", params={"sort": "comment", "cursor": pages[0]["next_cursor"]})
+    assert stale.status_code == 400
@@ -4,6 +4,8 @@ from types import SimpleNamespace
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
 
 from app.core.dependencies import get_current_user
 from app.core.versioning import read_version
@@ -271,3 +273,182 @@ def test_collect_services_accepts_container_peer_runtime(monkeypatch):
     assert "listener_missing" not in service_map["frontend"].issues
     assert service_map["postgres"].status == "healthy"
     assert "listener_missing" not in service_map["postgres"].issues
+
+
+def make_log_index(tmp_path: Path, parsed: list[int] | None = None) -> diagnostics_service.DiagnosticsLogIndex:
+    def build_entry(source, path, line_number, text, file_mtime):
+        if parsed is not None:
+            parsed.append(line_number)
+        return diagnostics_service.index_log_line(source, path, line_number, text, file_mtime)
+
+    return diagnostics_service.DiagnosticsLogIndex(tmp_path / "index" / "logs.sqlite3", build_entry, max_lines_per_file=3)
+
+
+def test_log_index_parses_only_appended_lines_and_reindexes_rewritten_files(tmp_path: Path):
+    log_file = tmp_path / "backend.log"
+    log_file.write_text("2026-03-21 10:00:00 Traceback one\n2026-03-21 10:00:01 connection refused\n", encoding="utf-8")
+    parsed: list[int] = []
+    log_index = make_log_index(tmp_path, parsed)
+
+    log_index.sync([("backend", log_file)])
+    log_index.sync([("backend", log_file)])
+    assert parsed == [1, 2]
+
+    with log_file.open("a", encoding="utf-8") as handle:
+        handle.write("2026-03-21 10:00:02 ValueError: bad\n\n2026-03-21 10:00:03 TypeError: partial")
+    log_index.sync([("backend", log_file)])
+    assert parsed == [1, 2, 3]
+
+    total, items = log_index.query(diagnostics_service.LogEntryFilter(), offset=0, limit=10)
+    assert total == 2
+    assert [item.line_number for item in items] == [3, 2]
+
+    with log_file.open("a", encoding="utf-8") as handle:
+        handle.write("\n")
+    log_index.sync([("backend", log_file)])
+    total, items = log_index.query(diagnostics_service.LogEntryFilter(), offset=0, limit=10)
+    assert [item.line_number for item in items] == [5, 3]
+
+    log_file.write_text("2026-03-21 11:00:00 Exception after rotation\n", encoding="utf-8")
+    log_index.sync([("backend", log_file)])
+    total, items = log_index.query(diagnostics_service.LogEntryFilter(severity="critical", q="ROTATION"), offset=0, limit=10)
+    assert (total, items[0].line_number, items[0].raw_message) == (1, 1, "2026-03-21 11:00:00 Exception after rotation")
+
+    log_index.sync([])
+    assert log_index.query(diagnostics_service.LogEntryFilter(), offset=0, limit=10) == (0, [])
+
+
+def test_log_index_tail_returns_entries_after_cursor(tmp_path: Path):
+    log_file = tmp_path / "server.log"
+    log_file.write_text("2026-03-21 10:00:00 Traceback old\n", encoding="utf-8")
+    log_index = make_log_index(tmp_path)
+    log_index.sync([("server", log_file)])
+    cursor = log_index.last_seq()
+
+    with log_file.open("a", encoding="utf-8") as handle:
+        handle.write("2026-03-21 10:00:05 address already in use\n2026-03-21 10:00:06 RuntimeError: new\n")
+    log_index.sync([("server", log_file)])
+
+    next_cursor, items = log_index.tail(diagnostics_service.LogEntryFilter(q="already"), after=cursor, limit=10)
+    assert [item.signature for item in items] == ["port_in_use"]
+    assert next_cursor == log_index.last_seq()
+    assert log_index.tail(diagnostics_service.LogEntryFilter(), after=next_cursor, limit=10) == (next_cursor, [])
+
+
+def test_diagnostics_logs_page_continues_from_live_into_indexed_entries(tmp_path: Path, monkeypatch):
+    log_file = tmp_path / "backend.log"
+    log_file.write_text("".join(f"2026-03-21 10:00:0{index} Traceback {index}\n" for index in range(3)), encoding="utf-8")
+    log_index = make_log_index(tmp_path)
+    monkeypatch.setattr(diagnostics_service, "get_log_index", lambda: log_index)
+    monkeypatch.setattr(diagnostics_service, "ensure_runtime_log_retention", lambda: None)
+    monkeypatch.setattr(diagnostics_service, "get_log_candidates", lambda source: [log_file] if source == "backend" else [])
+    unreadable = diagnostics_service.build_unreadable_log_entry("server", tmp_path / "missing.log", OSError("denied"))
+    monkeypatch.setattr(
+        diagnostics_service,
+        "collect_live_log_entries",
+        lambda: [unreadable, *diagnostics_service.sync_log_index()],
+    )
+
+    first = diagnostics_service.get_diagnostics_logs(page=1, page_size=2)
+    second = diagnostics_service.get_diagnostics_logs(page=2, page_size=2)
+
+    assert first.total == second.total == 4
+    assert [item.line_number for item in first.items] == [0, 3]
+    assert [item.line_number for item in second.items] == [2, 1]
+    assert first.cursor == log_index.last_seq()
+    assert diagnostics_service.get_diagnostics_logs(source="backend", q="traceback 1", page=1, page_size=5).total == 1
+
+
+def test_diagnostics_logs_list_only_warning_and_critical_entries(tmp_path: Path, monkeypatch):
+    log_file = tmp_path / "backend.log"
+    log_file.write_text("2026-03-21 10:00:00 Traceback kept\n2026-03-21 10:00:01 Traceback demoted\n", encoding="utf-8")
+
+    def build_entry(source, path, line_number, text, file_mtime):
+        entry = diagnostics_service.index_log_line(source, path, line_number, text, file_mtime)
+        return entry.model_copy(update={"severity": "error"}) if "demoted" in text else entry
+
+    log_index = diagnostics_service.DiagnosticsLogIndex(tmp_path / "index" / "logs.sqlite3", build_entry, max_lines_per_file=3)
+    monkeypatch.setattr(diagnostics_service, "get_log_index", lambda: log_index)
+    monkeypatch.setattr(diagnostics_service, "ensure_runtime_log_retention", lambda: None)
+    monkeypatch.setattr(diagnostics_service, "get_log_candidates", lambda source: [log_file] if source == "backend" else [])
+    unreadable = diagnostics_service.build_unreadable_log_entry("server", tmp_path / "missing.log", OSError("denied"))
+    probe_failed = unreadable.model_copy(update={"id": "probe", "entry_id": "probe", "severity": "error"})
+    monkeypatch.setattr(
+        diagnostics_service,
+        "collect_live_log_entries",
+        lambda: [probe_failed, unreadable, *diagnostics_service.sync_log_index()],
+    )
+
+    page = diagnostics_service.get_diagnostics_logs(page=1, page_size=10)
+
+    assert page.total == 2
+    assert [(item.entry_id, item.line_number) for item in page.items][0] == (unreadable.entry_id, 0)
+    assert [(item.line_number, item.severity) for item in page.items][1] == (1, "critical")
+    assert diagnostics_service.get_diagnostics_logs(severity="error", page=1, page_size=10).total == 0
+
+
+def test_logs_tail_endpoint_waits_for_new_entries(monkeypatch):
+    calls: list[int | None] = []
+
+    def fake_tail(after=None, **_filters):
+        calls.append(after)
+        if after is None:
+            return diagnostics_service.DiagnosticsLogTailOut(cursor=7, items=[])
+        items = [] if len(calls) < 3 else [diagnostics_service.build_unreadable_log_entry("server", Path("x.log"), OSError("gone"))]
+        return diagnostics_service.DiagnosticsLogTailOut(cursor=after + 1, items=items)
+
+    monkeypatch.setattr(diagnostics_router, "tail_diagnostics_logs", fake_tail)
+    monkeypatch.setattr(diagnostics_router, "TAIL_POLL_SECONDS", 0)
+    client = TestClient(make_app(UserRole.admin))
+
+    assert client.get("/api/v1/admin/diagnostics/logs/tail").json() == {"cursor": 7, "items": []}
+    payload = client.get("/api/v1/admin/diagnostics/logs/tail", params={"after": 7, "wait_seconds": 5}).json()
+    assert calls == [None, 7, 8]
+    assert payload["cursor"] == 9
+    assert [item["signature"] for item in payload["items"]] == ["log_file_unreadable"]
+
+
+def test_database_overview_uses_sqlite_statistics_and_counts_on_demand():
+    engine = create_engine("sqlite+pysqlite:///:memory:", poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE io_signals (id INTEGER PRIMARY KEY, tag TEXT)")
+        connection.exec_driver_sql("CREATE INDEX ix_io_signals_tag ON io_signals (tag)")
+        connection.exec_driver_sql("CREATE TABLE audit_logs (id INTEGER PRIMARY KEY)")
+        connection.exec_driver_sql("INSERT INTO io_signals (tag) VALUES ('a'), ('b'), ('c')")
+        connection.exec_driver_sql("INSERT INTO audit_logs (id) VALUES (1)")
+        connection.exec_driver_sql("ANALYZE io_signals")
+        connection.exec_driver_sql("INSERT INTO io_signals (tag) VALUES ('d')")
+
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda _c, _cur, statement, *_args: statements.append(statement))
+    overview = diagnostics_service.collect_database_overview(engine)
+    tables = {table.table_name: table for table in overview.tables}
+
+    assert (tables["io_signals"].row_count, tables["io_signals"].row_count_is_estimate) == (3, True)
+    assert (tables["audit_logs"].row_count, tables["audit_logs"].row_count_is_estimate) == (1, False)
+    assert not any("io_signals" in statement and "COUNT" in statement.upper() for statement in statements)
+    assert overview.collected_at is not None and overview.issues == []
+
+    exact = diagnostics_service.count_database_table_rows("io_signals", engine)
+    assert exact.row_count == 4
+    try:
+        diagnostics_service.count_database_table_rows('io_signals" --', engine)
+        assert False, "Expected HTTPException"
+    except Exception as exc:  # noqa: BLE001
+        assert getattr(exc, "status_code", None) == 404
+
+
+def test_database_overview_cache_reuses_snapshot_until_refresh(monkeypatch):
+    calls: list[int] = []
+
+    def loader():
+        calls.append(1)
+        return DiagnosticsDatabaseOverviewOut(database_name="db", host="h", port=1, user="u", tables=[], issues=[])
+
+    cache = diagnostics_service.DatabaseOverviewCache()
+    monkeypatch.setattr(diagnostics_service.settings, "diagnostics_database_overview_ttl_seconds", 300)
+
+    first = cache.get(loader)
+    assert cache.get(loader) is first
+    assert cache.get(loader, refresh=True) is not first
+    assert len(calls) == 2
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.core import Cabinet, EquipmentType, Manufacturer
+from app.models.operations import CabinetItem
+from app.services.digital_twins import ensure_digital_twin, stable_item_id
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def cabinet(db_session):
+    manufacturer = Manufacturer(name="Vendor", country="RU", is_deleted=False)
+    db_session.add(manufacturer)
+    db_session.flush()
+    equipment = EquipmentType(
+        name="PLC",
+        nomenclature_number="PLC-1",
+        manufacturer_id=manufacturer.id,
+        is_channel_forming=False,
+        is_network=False,
+        has_serial_interfaces=False,
+        is_deleted=False,
+    )
+    cabinet = Cabinet(name="Cab 1", is_deleted=False)
+    db_session.add_all([equipment, cabinet])
+    db_session.flush()
+    db_session.add(CabinetItem(cabinet_id=cabinet.id, equipment_type_id=equipment.id, quantity=1, is_deleted=False))
+    db_session.commit()
+    return cabinet, equipment
+
+
+def _count_writes(db_session):
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith(("UPDATE", "INSERT")):
+            statements.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", record)
+    return statements
+
+
+def test_ensure_skips_unchanged_sources_and_resyncs_after_item_changes(db_session, cabinet):
+    cabinet, equipment = cabinet
+    twin = ensure_digital_twin(db_session, "cabinet", cabinet.id)
+    db_session.commit()
+    assert twin.source_watermark["items"] == 1
+    version = twin.row_version
+
+    writes = _count_writes(db_session)
+    assert ensure_digital_twin(db_session, "cabinet", cabinet.id) is twin
+    db_session.commit()
+    assert writes == []
+    assert twin.row_version == version
+
+    item = CabinetItem(cabinet_id=cabinet.id, equipment_type_id=equipment.id, quantity=2, is_deleted=False)
+    db_session.add(item)
+    db_session.commit()
+
+    ensure_digital_twin(db_session, "cabinet", cabinet.id)
+    db_session.commit()
+    assert twin.source_watermark["items"] == 2
+    assert stable_item_id("cabinet", item.id) in {entry["id"] for entry in twin.document_json["items"]}
+
@@ -0,0 +1,128 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import hierarchy
+from app.db.base import Base
+from app.models.core import Location, MainEquipment
+from app.models.hierarchy import LocationClosure, MainEquipmentClosure
+from app.models.security import User
+from app.routers import main_equipment as main_equipment_router
+from app.services.location_paths import load_location_context
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [
+        User.__table__,
+        Location.__table__,
+        LocationClosure.__table__,
+        MainEquipment.__table__,
+        MainEquipmentClosure.__table__,
+    ]
+    Base.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine, tables=list(reversed(tables)))
+
+
+def _closure_rows(db, closure) -> set[tuple[int, int, int]]:
+    return set(db.execute(select(closure.ancestor_id, closure.descendant_id, closure.depth)).all())
+
+
+def _build_plant(db) -> dict[str, Location]:
+    plant = Location(name="Plant")
+    db.add(plant)
+    db.flush()
+    shop = Location(name="Shop", parent_id=plant.id)
+    db.add(shop)
+    db.flush()
+    line = Location(name="Line", parent=shop)
+    other = Location(name="Other")
+    db.add_all([line, other])
+    db.commit()
+    return {"plant": plant, "shop": shop, "line": line, "other": other}
+
+
+def test_closure_is_maintained_on_insert(db_session):
+    nodes = _build_plant(db_session)
+    plant, shop, line = nodes["plant"], nodes["shop"], nodes["line"]
+
+    assert [item.name for item in hierarchy.ancestors(db_session, Location, line.id)] == ["Plant", "Shop"]
+    assert [item.name for item in hierarchy.descendants(db_session, Location, plant.id)] == ["Shop", "Line"]
+    assert hierarchy.subtree_ids(db_session, Location, shop.id) == [shop.id, line.id]
+    assert hierarchy.node_depth(db_session, Location, line.id) == 3
+    assert hierarchy.full_paths(db_session, Location, [line.id, nodes["other"].id, None]) == {
+        line.id: "Plant / Shop / Line",
+        nodes["other"].id: "Other",
+    }
+
+
+def test_path_renderers_read_the_closure_table(db_session):
+    nodes = _build_plant(db_session)
+    line, other = nodes["line"], nodes["other"]
+
+    context = load_location_context(db_session)
+    assert context.full_path_by_id[line.id] == "Plant / Shop / Line"
+    assert load_location_context(db_session, [line.id]).full_path_by_id == {
+        nodes["plant"].id: "Plant",
+        nodes["shop"].id: "Plant / Shop",
+        line.id: "Plant / Shop / Line",
+    }
+
+    hierarchy.attach_full_paths(db_session, Location, [line, other])
+    assert (line.full_path, other.full_path) == ("Plant / Shop / Line", "Other")
+
+
+def test_closure_follows_moves_and_matches_rebuild(db_session):
+    nodes = _build_plant(db_session)
+    nodes["shop"].parent_id = nodes["other"].id
+    db_session.commit()
+
+    assert hierarchy.full_path(db_session, Location, nodes["line"].id) == "Other / Shop / Line"
+    assert hierarchy.subtree_ids(db_session, Location, nodes["plant"].id) == [nodes["plant"].id]
+    assert hierarchy.is_in_subtree(db_session, Location, nodes["line"].id, nodes["other"].id)
+
+    maintained = _closure_rows(db_session, LocationClosure)
+    hierarchy.rebuild_closure(db_session, Location)
+    assert _closure_rows(db_session, LocationClosure) == maintained
+
+
+def test_hard_delete_detaches_children(db_session):
+    nodes = _build_plant(db_session)
+    db_session.delete(nodes["shop"])
+    db_session.commit()
+
+    assert hierarchy.full_path(db_session, Location, nodes["line"].id) == "Line"
+    assert hierarchy.subtree_ids(db_session, Location, nodes["plant"].id) == [nodes["plant"].id]
+
+
+def test_main_equipment_parent_cycle_is_rejected(db_session):
+    root = MainEquipment(name="Root", level=1, code="1", is_deleted=False)
+    db_session.add(root)
+    db_session.flush()
+    child = MainEquipment(name="Child", level=2, code="1.1", parent_id=root.id, is_deleted=False)
+    db_session.add(child)
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        main_equipment_router.resolve_parent(db_session, child.id, node_id=root.id)
+
+    assert exc.value.detail == "Parent cycle detected"
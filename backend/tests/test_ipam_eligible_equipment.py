@@ -0,0 +1,188 @@
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.assemblies import Assembly
+from app.models.core import Cabinet, EquipmentType, Location, Manufacturer
+from app.models.ipam import EquipmentNetworkInterface, IPAddress, Subnet
+from app.routers.movements import create_unique_assembly_items, create_unique_cabinet_items
+from app.services.ipam import (
+    build_host_equipment_tree,
+    get_host_equipment_tree_index,
+    search_eligible_equipment,
+    sync_network_interfaces_for_equipment_type,
+)
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def plant(db_session):
+    site = Location(name="Site", is_deleted=False)
+    db_session.add(site)
+    db_session.flush()
+    hall = Location(name="Hall", parent_id=site.id, is_deleted=False)
+    manufacturer = Manufacturer(name="Vendor", country="RU", is_deleted=False)
+    db_session.add_all([hall, manufacturer])
+    db_session.flush()
+    flags = {"is_channel_forming": False, "has_serial_interfaces": False, "is_deleted": False}
+    switch = EquipmentType(
+        name="Switch",
+        nomenclature_number="SW-8",
+        manufacturer_id=manufacturer.id,
+        is_network=True,
+        network_ports=[{"type": "RJ45", "count": 2}],
+        **flags,
+    )
+    router = EquipmentType(
+        name="Router",
+        nomenclature_number="RT-1",
+        manufacturer_id=manufacturer.id,
+        is_network=True,
+        network_ports=[{"type": "SFP", "count": 1}],
+        **flags,
+    )
+    cabinet = Cabinet(name="Cab A", location_id=hall.id, is_deleted=False)
+    assembly = Assembly(name="Rack B", location_id=site.id, is_deleted=False)
+    db_session.add_all([switch, router, cabinet, assembly])
+    db_session.flush()
+    switches = create_unique_cabinet_items(db_session, cabinet.id, switch, 3)
+    routers = create_unique_assembly_items(db_session, assembly.id, router, 1)
+    subnet = Subnet(cidr="10.1.0.0/24", prefix=24, network_address="10.1.0.0", is_deleted=False)
+    db_session.add(subnet)
+    db_session.flush()
+    db_session.add_all(
+        [
+            IPAddress(
+                subnet_id=subnet.id,
+                ip_address=f"10.1.0.{offset}",
+                ip_offset=offset,
+                status="used",
+                is_primary=offset == 11,
+                equipment_item_source="cabinet",
+                equipment_item_id=switches[0],
+                is_deleted=False,
+            )
+            for offset in (10, 11)
+        ]
+    )
+    db_session.commit()
+    return {"switch": switch, "switches": switches, "routers": routers}
+
+
+def _search_with_statements(db, **kwargs):
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        return search_eligible_equipment(db, **kwargs), statements
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+
+def test_eligible_equipment_is_read_only_and_uses_a_fixed_number_of_queries(db_session, plant):
+    (total, items), statements = _search_with_statements(db_session, page=1, page_size=50)
+
+    assert total == 4
+    assert not any(statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")) for statement in statements)
+    assert [(item["equipment_source"], item["equipment_item_id"]) for item in items] == [
+        ("cabinet", plant["switches"][2]),
+        ("cabinet", plant["switches"][1]),
+        ("cabinet", plant["switches"][0]),
+        ("assembly", plant["routers"][0]),
+    ]
+    first_switch = items[2]
+    assert [interface.interface_name for interface in first_switch["network_interfaces"]] == ["RJ45 Port 1", "RJ45 Port 2"]
+    assert (first_switch["current_ip_links_count"], first_switch["linked_ip_addresses"]) == (2, ["10.1.0.11", "10.1.0.10"])
+    assert (first_switch["location"], items[3]["location"]) == ("Site / Hall", "Site")
+
+    cabinet_id = db_session.scalar(select(Cabinet.id))
+    create_unique_cabinet_items(db_session, cabinet_id, plant["switch"], 20)
+    db_session.commit()
+    (total, _items), more_statements = _search_with_statements(db_session, page=1, page_size=50)
+    assert total == 24
+    assert len(more_statements) == len(statements)
+
+
+def test_eligible_equipment_pages_and_searches(db_session, plant):
+    total, page = search_eligible_equipment(db_session, page=2, page_size=2)
+    assert total == 4
+    assert [item["equipment_item_id"] for item in page] == [plant["switches"][0], plant["routers"][0]]
+
+    total, found = search_eligible_equipment(db_session, q="rack")
+    assert (total, [item["equipment_source"] for item in found]) == (1, ["assembly"])
+
+
+def test_port_changes_are_materialized_on_type_update(db_session, plant):
+    plant["switch"].network_ports = [{"type": "RJ45", "count": 1}, {"type": "SFP", "count": 1}]
+    db_session.flush()
+    sync_network_interfaces_for_equipment_type(db_session, plant["switch"].id)
+    db_session.commit()
+
+    active = db_session.scalars(
+        select(EquipmentNetworkInterface.interface_name).where(
+            EquipmentNetworkInterface.equipment_item_id == plant["switches"][0],
+            EquipmentNetworkInterface.equipment_item_source == "cabinet",
+            EquipmentNetworkInterface.is_active == True,
+        )
+    ).all()
+    assert sorted(active) == ["RJ45", "SFP"]
+    assert db_session.scalar(select(func.count(EquipmentNetworkInterface.id))) == 3 * 3 + 1
+
+
+def test_host_tree_groups_by_location_and_expands_lazily(db_session, plant):
+    tree = build_host_equipment_tree(db_session)
+    assert [(node.label, node.has_children) for node in tree] == [("Site", True)]
+    assert [leaf.equipment_source for leaf in tree[0].equipment] == ["assembly"]
+    assert [(child.label, len(child.equipment)) for child in tree[0].children] == [("Hall", 3)]
+    assert get_host_equipment_tree_index(db_session) is get_host_equipment_tree_index(db_session)
+
+    site_id = int(tree[0].value.split(":")[1])
+    roots = build_host_equipment_tree(db_session, lazy=True)
+    assert (roots[0].children, roots[0].has_children) == ([], True)
+    level = build_host_equipment_tree(db_session, parent_id=site_id, lazy=True)
+    assert [(node.label, node.has_children, len(node.equipment)) for node in level] == [("Hall", False, 3)]
+
+    cached = get_host_equipment_tree_index(db_session)
+    db_session.add(Location(name="Empty", parent_id=site_id, is_deleted=False))
+    db_session.commit()
+    assert get_host_equipment_tree_index(db_session) is not cached
+    assert [node.label for node in build_host_equipment_tree(db_session, q="empty")[0].children] == ["Empty"]
+
+
+def test_host_tree_cache_sees_updates_that_keep_the_latest_updated_at(db_session, plant):
+    cached = get_host_equipment_tree_index(db_session)
+    hall = db_session.scalar(select(Location).where(Location.name == "Hall"))
+    # A transaction that began earlier stamps an updated_at no newer than the current maximum.
+    hall.updated_at = hall.updated_at
+    hall.name = "Hall B"
+    db_session.commit()
+
+    assert get_host_equipment_tree_index(db_session) is not cached
+    assert [child.label for child in build_host_equipment_tree(db_session)[0].children] == ["Hall B"]
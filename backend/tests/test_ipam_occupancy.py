@@ -0,0 +1,198 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.ipam import IPAddress, Subnet, SubnetAddressBlock, recount_address_block
+from app.models.security import User
+from app.routers.ipam import allocate_subnet_addresses
+from app.schemas.ipam import AddressAllocationRequest
+from app.services import ipam as ipam_service
+from app.services.ipam import (
+    allocate_addresses,
+    apply_assignment_to_record,
+    build_address_grid_response,
+    ensure_service_address_records,
+    get_address_details_out,
+    get_summary_counts,
+    release_ip_record,
+)
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def subnet(db_session):
+    subnet = Subnet(
+        cidr="10.20.0.0/16",
+        prefix=16,
+        network_address="10.20.0.0",
+        gateway_ip="10.20.0.1",
+        is_active=True,
+        is_deleted=False,
+    )
+    db_session.add(subnet)
+    db_session.flush()
+    ensure_service_address_records(db_session, subnet)
+    db_session.commit()
+    return subnet
+
+
+def _blocks(db):
+    return {
+        block.block_index: (block.used, block.reserved, block.gateway, block.broadcast, block.network)
+        for block in db.scalars(select(SubnetAddressBlock).execution_options(populate_existing=True))
+    }
+
+
+def test_block_counters_follow_reserve_release_and_soft_delete(db_session, subnet):
+    for offset in (10, 11, 300, 65000):
+        apply_assignment_to_record(db_session, subnet, offset, actor_user_id=None, status="reserved", action="reserve")
+    release_ip_record(db_session, subnet, 11, actor_user_id=None)
+    record = db_session.scalar(select(IPAddress).where(IPAddress.ip_offset == 300))
+    record.is_deleted = True
+    db_session.commit()
+
+    assert _blocks(db_session) == {
+        0: (0, 1, 1, 0, 1),
+        1: (0, 0, 0, 0, 0),
+        253: (0, 1, 0, 0, 0),
+        255: (0, 0, 0, 1, 0),
+    }
+    summary = get_summary_counts(db_session, subnet)
+    assert (summary.total, summary.free, summary.reserved, summary.network) == (65536, 65531, 2, 1)
+
+    counted = _blocks(db_session)
+    for block_index in counted:
+        recount_address_block(db_session.connection(), subnet.id, block_index)
+    assert _blocks(db_session) == counted
+
+
+def test_heatmap_and_grid_window_are_built_without_every_offset(db_session, subnet):
+    apply_assignment_to_record(db_session, subnet, 4100, actor_user_id=None, status="reserved", action="reserve")
+    db_session.commit()
+
+    heatmap = build_address_grid_response(db_session, subnet, mode="heatmap")
+    assert len(heatmap.aggregates) == 256
+    assert (heatmap.aggregates[0].free, heatmap.aggregates[0].gateway) == (254, 1)
+    assert (heatmap.aggregates[16].block_cidr, heatmap.aggregates[16].reserved) == ("10.20.16.0/24", 1)
+    assert heatmap.aggregates[17].free == 256
+
+    grid = build_address_grid_response(db_session, subnet, mode="grid", window_start=4096)
+    assert len(grid.items) == 4096
+    assert (grid.items[0].ip_address, grid.items[4].status) == ("10.20.16.0", "reserved")
+
+    details = get_address_details_out(db_session, subnet, 4100)
+    assert (details.ip_address, details.status) == ("10.20.16.4", "reserved")
+    assert get_address_details_out(db_session, subnet, 4101).status == "free"
+
+
+def test_allocator_skips_occupied_offsets_and_finds_contiguous_runs(db_session, subnet):
+    for offset in (2, 3, 5):
+        apply_assignment_to_record(db_session, subnet, offset, actor_user_id=None, status="reserved", action="reserve")
+    release_ip_record(db_session, subnet, 3, actor_user_id=None)
+
+    free = allocate_addresses(db_session, subnet, 3, actor_user_id=None)
+    assert [item.ip_offset for item in free] == [3, 4, 6]
+    run = allocate_addresses(db_session, subnet, 4, actor_user_id=None, contiguous=True, reserve=True)
+    assert [item.ip_offset for item in run] == [6, 7, 8, 9]
+    released = db_session.scalar(select(IPAddress).where(IPAddress.ip_offset == 3))
+    version_before_claim = released.row_version
+    revived = allocate_addresses(db_session, subnet, 1, actor_user_id=None, reserve=True)
+    assert [(item.ip_offset, item.status) for item in revived] == [(3, "reserved")]
+    assert released.row_version == version_before_claim + 1
+    assert get_summary_counts(db_session, subnet).reserved == 7
+
+
+def test_grid_seeds_service_records_only_while_they_are_missing(db_session, monkeypatch):
+    point_to_point = Subnet(cidr="10.40.0.0/31", prefix=31, network_address="10.40.0.0", is_active=True, is_deleted=False)
+    legacy = Subnet(cidr="10.50.0.0/24", prefix=24, network_address="10.50.0.0", is_active=True, is_deleted=False)
+    db_session.add_all([point_to_point, legacy])
+    db_session.flush()
+    seeded: list[int] = []
+    ensure = ipam_service.ensure_service_address_records
+    monkeypatch.setattr(
+        ipam_service,
+        "ensure_service_address_records",
+        lambda db, subnet: seeded.append(subnet.id) or ensure(db, subnet),
+    )
+
+    for _ in range(2):
+        build_address_grid_response(db_session, point_to_point, mode="grid")
+        build_address_grid_response(db_session, legacy, mode="grid")
+
+    assert seeded == [legacy.id]
+    assert get_summary_counts(db_session, point_to_point).free == 2
+
+
+@pytest.mark.parametrize("cidr,prefix,expected", [("10.40.0.0/31", 31, [0, 1]), ("10.40.0.5/32", 32, [0])])
+def test_allocator_uses_every_address_of_point_to_point_and_host_subnets(db_session, cidr, prefix, expected):
+    subnet = Subnet(cidr=cidr, prefix=prefix, network_address=cidr.split("/")[0], is_active=True, is_deleted=False)
+    db_session.add(subnet)
+    db_session.flush()
+
+    free = allocate_addresses(db_session, subnet, len(expected), actor_user_id=None)
+
+    assert [item.ip_offset for item in free] == expected
+
+
+def test_parallel_allocations_on_one_subnet_never_collide(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'ipam.db'}",
+        connect_args={"check_same_thread": False, "timeout": 60},
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    with Session() as db:
+        user = User(username="allocator", password_hash="x", role="admin", is_deleted=False)
+        subnet = Subnet(cidr="10.30.0.0/22", prefix=22, network_address="10.30.0.0", is_deleted=False)
+        db.add_all([user, subnet])
+        db.flush()
+        ensure_service_address_records(db, subnet)
+        db.commit()
+        user_id, subnet_id = user.id, subnet.id
+
+    def allocate(_):
+        with Session() as db:
+            return [
+                item.ip_offset
+                for item in allocate_subnet_addresses(
+                    subnet_id, AddressAllocationRequest(count=8, reserve=True), db, db.get(User, user_id)
+                ).items
+            ]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        allocations = list(pool.map(allocate, range(32)))
+
+    offsets = [offset for allocation in allocations for offset in allocation]
+    assert len(offsets) == len(set(offsets)) == 256
+    assert min(offsets) == 1
+    with Session() as db:
+        subnet = db.get(Subnet, subnet_id)
+        assert get_summary_counts(db, subnet).reserved == 256
+        assert db.scalar(select(func.count()).where(IPAddress.status == "reserved")) == 256
+    engine.dispose()
@@ -0,0 +1,120 @@
+import copy
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.audit import AuditLog
+from app.models.network_topology import NetworkTopologyDocument
+from app.models.security import User
+from app.schemas.common import DocumentPatch, JsonPatchOperation
+from app.schemas.network_topology import TopologyDocument
+from app.services.json_patch import apply_json_patch, patch_document_row
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+def _node(node_id: str, **overrides) -> dict:
+    node = {"id": node_id, "name": node_id.upper(), "type": "switch", "x": 0, "y": 0, "layer": "access", "status": "healthy"}
+    return {**node, **overrides}
+
+
+def _document() -> dict:
+    return TopologyDocument.model_validate(
+        {
+            "nodes": [_node("a"), _node("b"), _node("c")],
+            "edges": [{"id": "e1", "from": "a", "to": "b", "style": "ethernet", "status": "healthy"}],
+        }
+    ).model_dump(by_alias=True)
+
+
+def _ops(*operations: dict) -> list[JsonPatchOperation]:
+    return [JsonPatchOperation.model_validate(operation) for operation in operations]
+
+
+def test_apply_json_patch_leaves_original_untouched_and_shares_untouched_subtrees():
+    document = _document()
+    snapshot = copy.deepcopy(document)
+
+    patched = apply_json_patch(
+        document,
+        _ops(
+            {"op": "replace", "path": "/nodes/1/x", "value": 120.5},
+            {"op": "add", "path": "/nodes/-", "value": _node("d")},
+            {"op": "move", "from": "/nodes/0", "path": "/nodes/3"},
+            {"op": "test", "path": "/edges/0/from", "value": "a"},
+        ),
+        TopologyDocument,
+    )
+
+    assert document == snapshot
+    assert [node["id"] for node in patched["nodes"]] == ["b", "c", "d", "a"]
+    assert patched["nodes"][0]["x"] == 120.5
+    assert patched["nodes"][2]["interfaces"] == []
+    assert patched["edges"] is document["edges"]
+    assert patched["nodes"][1] is document["nodes"][2]
+
+
+def test_apply_json_patch_validates_each_touched_subtree():
+    with pytest.raises(HTTPException) as invalid:
+        apply_json_patch(
+            _document(),
+            _ops(
+                {"op": "replace", "path": "/nodes/2/status", "value": "on fire"},
+                {"op": "remove", "path": "/nodes/0"},
+            ),
+            TopologyDocument,
+        )
+    assert invalid.value.status_code == 422
+    assert invalid.value.detail[0]["loc"][:2] == ["/nodes/2", "status"]
+
+    with pytest.raises(HTTPException) as failed_test:
+        apply_json_patch(_document(), _ops({"op": "test", "path": "/nodes/0/name", "value": "Z"}), TopologyDocument)
+    assert failed_test.value.status_code == 409
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+def test_patch_document_row_bumps_version_and_rejects_stale_writes(db_session):
+    user = User(username="admin", password_hash="x", role="admin", is_deleted=False)
+    topology = NetworkTopologyDocument(name="Plant", document_json=_document(), is_deleted=False)
+    db_session.add_all([user, topology])
+    db_session.commit()
+    patch = DocumentPatch(row_version=1, operations=_ops({"op": "replace", "path": "/nodes/0/name", "value": "Core"}))
+
+    result = patch_document_row(
+        db_session, topology, patch, TopologyDocument, actor_id=user.id, entity="network_topologies"
+    )
+    db_session.commit()
+
+    assert result.row_version == 2
+    stored = db_session.scalar(select(NetworkTopologyDocument).execution_options(populate_existing=True))
+    assert (stored.row_version, stored.document_json["nodes"][0]["name"]) == (2, "Core")
+    audit = db_session.scalar(select(AuditLog))
+    assert audit.meta["json_patch"] == [{"op": "replace", "path": "/nodes/0/name", "value": "Core"}]
+
+    with pytest.raises(HTTPException) as stale:
+        patch_document_row(db_session, stored, patch, TopologyDocument, actor_id=user.id, entity="network_topologies")
+    assert stale.value.status_code == 409
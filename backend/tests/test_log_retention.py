@@ -0,0 +1,103 @@
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import log_retention
+from app.core.config import get_settings
+from app.core.dependencies import get_current_user, get_db
+from app.db.base import Base
+from app.models.audit import AuditLog
+from app.models.security import RoleDefinition, User, UserRole
+from app.models.sessions import UserSession
+from app.routers import diagnostics as diagnostics_router
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=list(log_retention.LOG_TABLES.values()) + [User.__table__, RoleDefinition.__table__])
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    db.add(RoleDefinition(key=UserRole.admin.value, label="Administrator", is_system=True))
+    db.add(User(id=1, username="admin", password_hash="x", role=UserRole.admin.value))
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_month_helpers_build_partition_names():
+    assert log_retention.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert log_retention.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert log_retention.partition_name("audit_logs", date(2026, 3, 1)) == "audit_logs_p202603"
+
+
+def test_plain_table_fallback_prunes_by_age(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "user_sessions_retention_days", 30)
+    now = datetime(2026, 10, 16, tzinfo=UTC)
+    db_session.add_all(
+        [
+            UserSession(user_id=1, session_token_hash="old", started_at=now - timedelta(days=45)),
+            UserSession(user_id=1, session_token_hash="fresh", started_at=now - timedelta(days=5)),
+            AuditLog(actor_id=1, action="LOGIN", entity="users", created_at=now - timedelta(days=45)),
+        ]
+    )
+    db_session.commit()
+
+    results = {result.table_name: result for result in log_retention.run_log_retention(db_session, now=now)}
+    db_session.commit()
+
+    assert results["user_sessions"].partitioned is False
+    assert results["user_sessions"].deleted_rows == 1
+    assert results["audit_logs"].deleted_rows == 0
+    assert db_session.scalars(select(UserSession.session_token_hash)).all() == ["fresh"]
+
+
+def test_plain_table_fallback_keeps_the_newest_rows_under_the_row_cap(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "log_retention_fallback_max_rows", 3)
+    db_session.add_all([UserSession(user_id=1, session_token_hash=f"token-{index}") for index in range(5)])
+    db_session.commit()
+
+    results = {result.table_name: result for result in log_retention.run_log_retention(db_session)}
+    db_session.commit()
+
+    assert results["user_sessions"].deleted_rows == 2
+    assert db_session.scalars(select(UserSession.session_token_hash).order_by(UserSession.id)).all() == [
+        "token-2",
+        "token-3",
+        "token-4",
+    ]
+
+
+def test_log_retention_endpoint_reports_plain_tables(db_session):
+    app = FastAPI()
+    app.include_router(diagnostics_router.router, prefix="/diagnostics")
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user] = lambda: db_session.get(User, 1)
+    db_session.add(AuditLog(actor_id=1, action="LOGIN", entity="users"))
+    db_session.commit()
+
+    response = TestClient(app).get("/diagnostics/log-retention")
+
+    assert response.status_code == 200
+    tables = {item["table_name"]: item for item in response.json()}
+    assert tables["audit_logs"]["partitioned"] is False
+    assert tables["audit_logs"]["total_rows"] == 1
+    assert tables["user_sessions"]["time_column"] == "started_at"
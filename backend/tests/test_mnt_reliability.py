@@ -0,0 +1,166 @@
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.core import Cabinet, EquipmentType, Manufacturer
+from app.models.maintenance import MntIncident, MntIncidentComponent, MntOperatingTime, MntReliabilityMonthly
+from app.models.operations import CabinetItem
+from app.models.security import User
+from app.routers.mnt_reliability import failure_trend, reliability_summary, top_failures
+from app.services.reliability import rebuild_reliability_rollups
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def plant(db_session):
+    user = User(username="engineer", password_hash="x", role="admin", is_deleted=False)
+    first = Cabinet(name="Cab A", is_deleted=False)
+    second = Cabinet(name="Cab B", is_deleted=False)
+    db_session.add_all([user, first, second])
+    db_session.commit()
+    return {"user": user, "first": first, "second": second}
+
+
+def _incident(plant, cabinet, occurred_at: datetime, *, repair_hours: float | None = None, downtime: float = 0) -> MntIncident:
+    return MntIncident(
+        cabinet_id=cabinet.id,
+        occurred_at=occurred_at,
+        detected_at=occurred_at,
+        repair_started_at=occurred_at if repair_hours is not None else None,
+        resolved_at=occurred_at + timedelta(hours=repair_hours) if repair_hours is not None else None,
+        downtime_hours=downtime,
+        title="Failure",
+        status="open",
+        reported_by_id=plant["user"].id,
+        is_deleted=False,
+    )
+
+
+def _operating(plant, cabinet, day: date, hours: float) -> MntOperatingTime:
+    return MntOperatingTime(cabinet_id=cabinet.id, recorded_date=day, operating_hours=hours, recorded_by_id=plant["user"].id)
+
+
+def _buckets(db_session) -> dict:
+    return {
+        (row.cabinet_id, row.month): (row.incident_count, float(row.operating_hours), row.repair_count)
+        for row in db_session.scalars(select(MntReliabilityMonthly).execution_options(populate_existing=True))
+    }
+
+
+def test_rollups_follow_incident_and_operating_time_changes(db_session, plant):
+    first = plant["first"]
+    incident = _incident(plant, first, datetime(2026, 1, 20, 8, tzinfo=UTC), repair_hours=2)
+    db_session.add_all([incident, _operating(plant, first, date(2026, 1, 20), 20)])
+    db_session.commit()
+    assert _buckets(db_session) == {(first.id, date(2026, 1, 1)): (1, 20.0, 1)}
+
+    incident.occurred_at = datetime(2026, 2, 3, 8, tzinfo=UTC)
+    db_session.commit()
+    assert _buckets(db_session) == {
+        (first.id, date(2026, 1, 1)): (0, 20.0, 0),
+        (first.id, date(2026, 2, 1)): (1, 0.0, 1),
+    }
+
+    incident.is_deleted = True
+    db_session.commit()
+    assert _buckets(db_session) == {(first.id, date(2026, 1, 1)): (0, 20.0, 0)}
+
+    db_session.delete(db_session.scalar(select(MntOperatingTime)))
+    db_session.commit()
+    assert _buckets(db_session) == {}
+
+
+def test_summary_combines_monthly_buckets_with_partial_month_edges(db_session, plant):
+    first, second = plant["first"], plant["second"]
+    db_session.add_all(
+        [
+            _incident(plant, first, datetime(2025, 12, 30, 10, tzinfo=UTC), repair_hours=10),
+            _incident(plant, first, datetime(2026, 1, 15, 10, tzinfo=UTC), repair_hours=1, downtime=1.5),
+            _incident(plant, first, datetime(2026, 2, 10, 10, tzinfo=UTC), repair_hours=3, downtime=0.5),
+            _incident(plant, first, datetime(2026, 3, 20, 10, tzinfo=UTC)),
+            _incident(plant, second, datetime(2026, 2, 27, 23, tzinfo=UTC), repair_hours=4),
+            _operating(plant, first, date(2025, 12, 31), 24),
+            _operating(plant, first, date(2026, 1, 1), 24),
+            _operating(plant, first, date(2026, 2, 10), 24),
+            _operating(plant, first, date(2026, 3, 5), 24),
+            _operating(plant, first, date(2026, 3, 25), 24),
+            _operating(plant, second, date(2026, 2, 28), 12),
+        ]
+    )
+    db_session.commit()
+
+    summary = reliability_summary(date_from=date(2025, 12, 31), date_to=date(2026, 3, 10), db=db_session, user=None)
+    by_cabinet = {item.cabinet_id: item for item in summary}
+
+    assert (by_cabinet[first.id].total_incidents, by_cabinet[first.id].total_operating_hours) == (2, 96.0)
+    assert by_cabinet[first.id].total_downtime_hours == 2.0
+    assert by_cabinet[first.id].mttr_hours == 2.0
+    assert by_cabinet[first.id].mtbf_hours == 48.0
+    assert by_cabinet[first.id].cabinet_name == "Cab A"
+    assert (by_cabinet[second.id].total_incidents, by_cabinet[second.id].mttr_hours) == (1, 4.0)
+
+    within_month = reliability_summary(cabinet_id=first.id, date_from=date(2026, 3, 1), date_to=date(2026, 3, 19), db=db_session, user=None)
+    assert [(item.total_incidents, item.total_operating_hours) for item in within_month] == [(0, 24.0)]
+
+    trend = failure_trend(date_from=date(2026, 1, 10), date_to=None, db=db_session, user=None)
+    assert [(point.period, point.incident_count) for point in trend] == [("2026-01", 1), ("2026-02", 2), ("2026-03", 1)]
+
+    before = _buckets(db_session)
+    db_session.query(MntReliabilityMonthly).delete()
+    assert rebuild_reliability_rollups(db_session) == len(before)
+    assert _buckets(db_session) == before
+
+
+def test_top_failures_includes_the_whole_last_day(db_session, plant):
+    manufacturer = Manufacturer(name="Vendor", country="RU", is_deleted=False)
+    db_session.add(manufacturer)
+    db_session.flush()
+    relay = EquipmentType(
+        name="Relay",
+        nomenclature_number="R-1",
+        manufacturer_id=manufacturer.id,
+        is_channel_forming=False,
+        is_network=False,
+        has_serial_interfaces=False,
+        is_deleted=False,
+    )
+    db_session.add(relay)
+    db_session.flush()
+    item = CabinetItem(cabinet_id=plant["first"].id, equipment_type_id=relay.id, quantity=1, is_deleted=False)
+    incident = _incident(plant, plant["first"], datetime(2026, 3, 20, 10, tzinfo=UTC))
+    db_session.add_all([item, incident])
+    db_session.flush()
+    db_session.add(MntIncidentComponent(incident_id=incident.id, cabinet_item_id=item.id, equipment_type_id=relay.id))
+    db_session.commit()
+
+    same_day = top_failures(date_from=date(2026, 3, 20), date_to=date(2026, 3, 20), db=db_session, user=None)
+    assert [(failure.equipment_type_name, failure.incident_count) for failure in same_day] == [("Relay", 1)]
+    assert top_failures(date_from=None, date_to=date(2026, 3, 19), db=db_session, user=None) == []
+    trend = failure_trend(date_from=date(2026, 3, 20), date_to=date(2026, 3, 20), db=db_session, user=None)
+    assert [(point.period, point.incident_count) for point in trend] == [("2026-03", 1)]
@@ -1,6 +1,9 @@
 from datetime import date, timedelta
 
-from app.models.core import PersonnelScheduleTemplate
+from sqlalchemy import select
+
+from app.routers import personnel as personnel_router
+from app.models.core import PersonnelScheduleTemplate, PersonnelYearlyScheduleAssignment
 
 
 def test_personnel_read_access(viewer_client, db_session):
@@ -177,3 +180,81 @@ def test_yearly_schedule_write_access_forbidden(viewer_client, admin_client):
         },
     )
     assert response.status_code == 403
+
+
+def test_yearly_schedule_range_edits_upsert_in_bulk(admin_client, db_session, monkeypatch):
+    audit_entries = []
+    monkeypatch.setattr(personnel_router, "add_audit_log", lambda *args, **kwargs: audit_entries.append(kwargs))
+    personnel_id = admin_client.post(
+        "/personnel/",
+        json={"first_name": "Oleg", "last_name": "Petrov", "position": "Engineer"},
+    ).json()["id"]
+    first = admin_client.patch(
+        "/personnel/schedules/yearly/statuses",
+        json={
+            "year": 2026,
+            "operations": [
+                {"personnel_id": personnel_id, "from_date": "2026-03-01", "to_date": "2026-03-10", "status": "МО"},
+            ],
+        },
+    )
+    assert first.status_code == 200
+    revived = db_session.scalar(
+        select(PersonnelYearlyScheduleAssignment).where(
+            PersonnelYearlyScheduleAssignment.work_date == date(2026, 3, 5)
+        )
+    )
+    revived.is_deleted = True
+    db_session.commit()
+
+    response = admin_client.patch(
+        "/personnel/schedules/yearly/statuses",
+        json={
+            "year": 2026,
+            "operations": [
+                {"personnel_id": personnel_id, "from_date": "2026-03-05", "to_date": "2026-03-15", "status": "ДВ"},
+                {"personnel_id": personnel_id, "from_date": "2026-03-14", "to_date": "2026-03-14", "status": "Я"},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 11
+
+    db_session.expire_all()
+    rows = db_session.scalars(
+        select(PersonnelYearlyScheduleAssignment).order_by(PersonnelYearlyScheduleAssignment.work_date)
+    ).all()
+    statuses = {row.work_date.day: row.status for row in rows}
+    assert len(rows) == 15
+    assert [statuses[day] for day in (4, 5, 13, 14, 15)] == ["МО", "ДВ", "ДВ", "Я", "ДВ"]
+    assert all(not row.is_deleted for row in rows)
+
+    schedule_audits = [entry for entry in audit_entries if entry["entity"] == "personnel_yearly_schedule_assignments"]
+    assert len(schedule_audits) == 2
+    assert schedule_audits[-1]["meta"]["days"] == 11
+
+
+def test_yearly_schedule_team_month_fill(admin_client, db_session):
+    personnel_ids = [
+        admin_client.post(
+            "/personnel/",
+            json={"first_name": f"Name{index}", "last_name": "Team", "position": "Operator"},
+        ).json()["id"]
+        for index in range(3)
+    ]
+    response = admin_client.patch(
+        "/personnel/schedules/yearly/month-fill/team",
+        json={"year": 2026, "month": 1, "status": "Я", "personnel_ids": personnel_ids},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 3 * 28
+
+    summary = admin_client.get("/personnel/schedules/yearly/summary?year=2026").json()
+    assert summary["global"]["Я"] == 3 * 28
+    assert summary["employees"][str(personnel_ids[0])]["months"]["1"]["Я"] == 28
+
+    missing = admin_client.patch(
+        "/personnel/schedules/yearly/month-fill/team",
+        json={"year": 2026, "month": 1, "status": "Я", "personnel_ids": [personnel_ids[0], 999999]},
+    )
+    assert missing.status_code == 404
@@ -0,0 +1,106 @@
+import gzip
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.core.config import get_settings
+from app.routers.pid import _diagram_response
+from app.schemas.pid import PidDiagramPayload
+from app.services import pid_storage
+from app.services.pid_storage import diagram_cache, diagram_path, load_diagram_entry, save_diagram_atomic
+
+
+@pytest.fixture()
+def storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "pid_storage_root", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "pid_diagrams_gzip", True)
+    diagram_cache.clear()
+    yield tmp_path
+    diagram_cache.clear()
+
+
+def _payload(label: str = "Дробилка") -> PidDiagramPayload:
+    return PidDiagramPayload.model_validate(
+        {
+            "processId": 7,
+            "updatedAt": "2026-03-30T10:00:00Z",
+            "viewport": {"x": 0, "y": 0, "zoom": 1},
+            "nodes": [
+                {
+                    "id": "node-1",
+                    "type": "equipment",
+                    "category": "main",
+                    "symbolKey": "1.1",
+                    "label": label,
+                    "position": {"x": 1, "y": 2},
+                }
+            ],
+        }
+    )
+
+
+def _request(**headers: str) -> Request:
+    raw = [(key.replace("_", "-").encode(), value.encode()) for key, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_saved_diagram_is_compact_gzip_and_served_from_cache(storage, monkeypatch):
+    save_diagram_atomic(7, _payload())
+
+    stored_file = diagram_path(7)
+    assert stored_file.name == "7.json.gz"
+    body = gzip.decompress(stored_file.read_bytes())
+    assert b"\n" not in body and "Дробилка".encode() in body
+
+    monkeypatch.setattr(pid_storage.Path, "read_bytes", lambda _self: pytest.fail("unchanged file was re-read"))
+    first = load_diagram_entry(7)
+    assert load_diagram_entry(7) is first
+    assert first.body == body
+
+
+def test_legacy_pretty_file_is_compacted_and_replaced_on_save(storage):
+    legacy = diagram_path(7, gzipped=False)
+    legacy.parent.mkdir(parents=True, exist_ok=True)
+    legacy.write_text(json.dumps(_payload().model_dump(mode="json"), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    entry = load_diagram_entry(7)
+    assert entry.gzip_body is None
+    assert json.loads(entry.body)["nodes"][0]["label"] == "Дробилка"
+
+    save_diagram_atomic(7, _payload("Грохот"))
+    assert not legacy.exists()
+    changed = load_diagram_entry(7)
+    assert changed.etag != entry.etag
+
+
+@pytest.mark.parametrize("damage", [lambda raw: raw[: len(raw) // 2], lambda raw: b"not gzip"])
+def test_corrupt_gzip_file_falls_back_to_the_plain_file_or_reads_as_missing(storage, damage):
+    save_diagram_atomic(7, _payload())
+    stored_file = diagram_path(7)
+    stored_file.write_bytes(damage(stored_file.read_bytes()))
+    diagram_cache.clear()
+
+    assert load_diagram_entry(7) is None
+
+    legacy = diagram_path(7, gzipped=False)
+    legacy.write_text(json.dumps(_payload("Грохот").model_dump(mode="json")), encoding="utf-8")
+    entry = load_diagram_entry(7)
+    assert (entry.path, json.loads(entry.body)["nodes"][0]["label"]) == (legacy, "Грохот")
+
+
+def test_diagram_response_honours_if_none_match_and_accept_encoding(storage):
+    save_diagram_atomic(7, _payload())
+    stored = load_diagram_entry(7)
+
+    not_modified = _diagram_response(_request(if_none_match=f'W/{stored.etag}, "other"'), stored)
+    assert (not_modified.status_code, not_modified.body) == (304, b"")
+    assert not_modified.headers["etag"] == stored.etag
+
+    compressed = _diagram_response(_request(accept_encoding="br, gzip"), stored)
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == stored.body
+
+    plain = _diagram_response(_request(accept_encoding="gzip;q=0"), stored)
+    assert "content-encoding" not in plain.headers
+    assert plain.body == stored.body
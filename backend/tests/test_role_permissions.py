@@ -2,8 +2,6 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.core.dependencies import get_current_user, get_db
-from app.core.log_retention import enforce_table_row_limit
-from app.models.sessions import UserSession
 from app.routers import role_permissions as role_permissions_router
 
 
@@ -64,17 +62,47 @@ def test_can_create_custom_role_and_update_matrix(db_session, users):
     assert dispatcher_permission["can_admin"] is False
 
 
-def test_log_retention_hard_deletes_old_rows(db_session, users):
-    db_session.add_all(
-        [
-            UserSession(user_id=users["admin"].id, session_token_hash=f"token-{index}")
-            for index in range(1002)
-        ]
+def test_permission_cache_serves_checks_from_memory_until_matrix_changes(db_session, users):
+    from sqlalchemy import event
+
+    from app.core.access import has_space_access, permission_cache
+
+    client = TestClient(make_app(db_session, users["admin"]))
+    viewer = users["viewer"]
+    assert has_space_access(db_session, viewer, "overview", "read") is True
+
+    statements: list[str] = []
+    bind = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        hits_before = permission_cache.stats()["hits"]
+        assert has_space_access(db_session, viewer, "overview", "write") is False
+        assert has_space_access(db_session, viewer, "admin_users", "read") is False
+        assert permission_cache.stats()["hits"] == hits_before + 2
+        assert statements == []
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    version_before = permission_cache.stats()["version"]
+    update_response = client.put(
+        "/api/v1/admin/role-permissions",
+        json={
+            "permissions": [
+                {
+                    "role": "viewer",
+                    "space_key": "overview",
+                    "can_read": True,
+                    "can_write": True,
+                    "can_admin": False,
+                }
+            ]
+        },
     )
-    db_session.flush()
-    enforce_table_row_limit(db_session, UserSession, max_rows=1000)
-    db_session.commit()
+    assert update_response.status_code == 200
+    assert permission_cache.stats()["version"] == version_before + 1
+    assert has_space_access(db_session, viewer, "overview", "write") is True
 
-    sessions = db_session.query(UserSession).order_by(UserSession.id.asc()).all()
-    assert len(sessions) == 1000
-    assert sessions[0].session_token_hash == "token-2"
+    stats_response = client.get("/api/v1/admin/role-permissions/cache")
+    assert stats_response.status_code == 200
+    assert stats_response.json()["enabled"] is True
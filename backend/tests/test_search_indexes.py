@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex
+
+from app.core.query import apply_alphabet_filter, apply_search
+from app.db.base import Base
+from app.models.security import RoleDefinition, User, UserRole
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine, tables=[RoleDefinition.__table__, User.__table__])
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    db.add(RoleDefinition(key=UserRole.viewer.value, label="Viewer", is_system=True))
+    for index, username in enumerate(["Алексей", "ёжик", "admin", "Boris", "42-operator"], start=1):
+        db.add(User(id=index, username=username, password_hash="x", role=UserRole.viewer.value))
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine, tables=[User.__table__, RoleDefinition.__table__])
+
+
+def _usernames(db, query) -> list[str]:
+    return sorted(db.scalars(query).all())
+
+
+def test_alphabet_filter_matches_initial_letter(db_session):
+    base = select(User.username)
+
+    assert _usernames(db_session, apply_alphabet_filter(base, User.username, "ru")) == ["Алексей", "ёжик"]
+    assert _usernames(db_session, apply_alphabet_filter(base, User.username, "en")) == ["Boris", "admin"]
+    assert len(_usernames(db_session, apply_alphabet_filter(base, User.username, "xx"))) == 5
+
+
+def test_search_falls_back_to_like_on_sqlite(db_session):
+    query = apply_search(select(User.username), "oper", [User.username])
+
+    assert _usernames(db_session, query) == ["42-operator"]
+
+
+def test_search_indexes_are_declared_for_postgres():
+    indexes = {index.name: index for index in User.__table__.indexes}
+
+    trigram_ddl = str(CreateIndex(indexes["ix_users_username_trgm"]).compile(dialect=postgresql.dialect()))
+    initial_ddl = str(CreateIndex(indexes["ix_users_username_initial"]).compile(dialect=postgresql.dialect()))
+
+    assert "USING gin (username gin_trgm_ops)" in trigram_ddl
+    assert "substr(users.username, 1, 1)" in initial_ddl or "substr(username, 1, 1)" in initial_ddl
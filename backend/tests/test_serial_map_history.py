@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.security import User
+from app.models.serial_map import SerialMapDocument, SerialMapHistoryEntry
+from app.routers import serial_map_documents as router
+from app.schemas.serial_map import SerialMapDocumentCreate, SerialMapDocumentUpdate
+from app.services import serial_map_history
+from app.services.serial_map_history import apply_delta, diff_snapshots
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def user(db_session):
+    user = User(username="admin", password_hash="x", role="admin", is_deleted=False)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _node(node_id: str, x: float = 0) -> dict:
+    return {"id": node_id, "kind": "master", "name": node_id, "protocol": "Modbus RTU", "baudRate": 9600, "position": {"x": x, "y": 0}}
+
+
+def _document(*nodes: dict, history: dict | None = None) -> dict:
+    return {
+        "version": 2,
+        "updatedAt": "2026-10-16T00:00:00",
+        "nodes": list(nodes),
+        "edges": [],
+        "history": history or {"past": [], "future": []},
+    }
+
+
+def test_diff_snapshots_round_trips_keyed_changes():
+    before = {"nodes": [_node("a"), _node("b"), _node("c")], "edges": [], "viewport": {"x": 0, "y": 0, "zoom": 1}}
+    after = {"nodes": [_node("c"), _node("a", x=5), _node("d")], "edges": [], "viewport": {"x": 0, "y": 0, "zoom": 1}}
+
+    delta = diff_snapshots(before, after)
+
+    assert [node["id"] for node in delta["nodes"]["set"]] == ["a", "d"]
+    assert delta["nodes"]["remove"] == ["b"]
+    assert "viewport" not in delta and "edges" not in delta
+    assert apply_delta(before, delta) == after
+
+
+def test_saves_build_a_bounded_delta_chain_with_undo_and_redo(db_session, user, monkeypatch):
+    monkeypatch.setattr(serial_map_history, "HISTORY_LIMIT", 10)
+    monkeypatch.setattr(serial_map_history, "KEYFRAME_INTERVAL", 4)
+    created = router.create_serial_map_document(
+        SerialMapDocumentCreate.model_validate(
+            {"name": "Map", "document": _document(_node("a"), history={"past": [{"nodes": []}], "future": []})}
+        ),
+        db_session,
+        user,
+    )
+    assert created.document.history.past == []
+    # SQLite stores the "false" server default verbatim.
+    db_session.execute(update(SerialMapDocument).values(is_deleted=False))
+    for step in range(1, 15):
+        router.update_serial_map_document(
+            created.id,
+            SerialMapDocumentUpdate.model_validate({"document": _document(_node("a", x=step))}),
+            db_session,
+            user,
+        )
+
+    entries = db_session.scalars(select(SerialMapHistoryEntry).order_by(SerialMapHistoryEntry.seq)).all()
+    assert [entry.seq for entry in entries] == list(range(6, 16))
+    assert entries[0].is_keyframe
+    assert sum(entry.is_keyframe for entry in entries) < len(entries)
+    assert "history" not in entries[-1].payload
+
+    listed = router.list_serial_map_documents(1, 50, None, None, None, None, db_session, user)
+    assert listed.items[0].document.history.past == []
+    full = router.get_serial_map_document(created.id, True, db_session, user)
+    assert [snapshot.nodes[0].position["x"] for snapshot in full.document.history.past] == list(range(5, 14))
+
+    undone = router.undo_serial_map_document(created.id, False, db_session, user)
+    assert undone.document.nodes[0].position["x"] == 13
+    redone = router.redo_serial_map_document(created.id, True, db_session, user)
+    assert redone.document.nodes[0].position["x"] == 14
+    assert redone.document.history.future == []
+    with pytest.raises(Exception) as nothing_to_redo:
+        router.redo_serial_map_document(created.id, False, db_session, user)
+    assert nothing_to_redo.value.status_code == 409
+
+    router.undo_serial_map_document(created.id, False, db_session, user)
+    router.update_serial_map_document(
+        created.id,
+        SerialMapDocumentUpdate.model_validate({"document": _document(_node("b"))}),
+        db_session,
+        user,
+    )
+    assert db_session.scalar(select(func.max(SerialMapHistoryEntry.seq))) == 15
+    assert router.get_serial_map_document(created.id, True, db_session, user).document.history.future == []
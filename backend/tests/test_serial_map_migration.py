@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.serial_map import SerialMapDocument, SerialMapHistoryEntry
+from app.services.serial_map_migration import ensure_current_document, migrate_serial_map_documents
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kw):
+    return "JSON"
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(engine)
+
+
+def _scheme(scheme_id: str, *node_ids: str, past: int = 0) -> dict:
+    nodes = [
+        {"id": node_id, "kind": "slave", "name": node_id, "protocol": "RS-485", "baudRate": 9600, "position": {"x": 0, "y": 0}}
+        for node_id in node_ids
+    ]
+    return {
+        "id": scheme_id,
+        "name": f"Scheme {scheme_id}",
+        "nodes": nodes,
+        "edges": [],
+        "history": {"past": [{"nodes": [], "edges": []} for _ in range(past)], "future": []},
+    }
+
+
+def _legacy(*schemes: dict) -> dict:
+    return {"projectId": "p-1", "version": 1, "updatedAt": "2024-01-01", "activeSchemeId": "s2", "schemes": list(schemes)}
+
+
+def test_batch_migration_upgrades_legacy_documents_once(db_session):
+    db_session.add_all(
+        [
+            SerialMapDocument(name="Plant", document_json=_legacy(_scheme("s1", "a"), _scheme("s2", "b", past=2)), is_deleted=False),
+            SerialMapDocument(name="Single", document_json=_legacy(_scheme("s2", "c")), is_deleted=False),
+            SerialMapDocument(name="Current", document_json={"version": 2, "updatedAt": "x", "nodes": [], "edges": []}, schema_version=2, is_deleted=False),
+        ]
+    )
+    db_session.commit()
+    batches = []
+
+    upgraded = migrate_serial_map_documents(db_session, batch_size=1, on_batch=batches.append)
+
+    assert upgraded == 2
+    assert [(batch.documents, batch.created) for batch in batches] == [(1, 1), (1, 0)]
+    documents = {item.name: item for item in db_session.scalars(select(SerialMapDocument))}
+    assert {item.schema_version for item in documents.values()} == {2}
+    plant = documents["Plant"]
+    assert [node["id"] for node in plant.document_json["nodes"]] == ["b"]
+    assert plant.document_json["history"] == {"past": [], "future": []}
+    assert (plant.history_cursor, plant.source_context["migrated_from_multi_scheme"]) == (3, True)
+    split = documents["Plant / Scheme s1"]
+    assert split.source_context["migrated_from_document_id"] == plant.id
+    assert db_session.scalar(
+        select(SerialMapHistoryEntry.payload).where(SerialMapHistoryEntry.document_id == split.id)
+    )["nodes"][0]["id"] == "a"
+    assert migrate_serial_map_documents(db_session) == 0
+
+
+def test_read_path_check_does_no_work_for_current_documents(db_session):
+    item = SerialMapDocument(name="Current", document_json={"version": 2, "updatedAt": "x", "nodes": [], "edges": []}, schema_version=2, is_deleted=False)
+    db_session.add(item)
+    db_session.commit()
+    db_session.refresh(item)
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert ensure_current_document(db_session, item) is False
+    assert statements == []
@@ -0,0 +1,50 @@
+from io import BytesIO
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+from app.services import tabular_import_export
+from app.services.tabular_import_export import build_export_response
+
+
+def _export_client(file_format: str, row_count: int, readme_lines=None) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/export")
+    def export():
+        return build_export_response(
+            filename_prefix="items",
+            file_format=file_format,
+            headers=["name", "quantity", "meta"],
+            rows=([f"Шкаф {index}", index, {"n": index}] for index in range(row_count)),
+            readme_lines=readme_lines,
+        )
+
+    return TestClient(app)
+
+
+def test_csv_export_streams_generator_rows(monkeypatch):
+    monkeypatch.setattr(tabular_import_export, "EXPORT_SPOOL_MAX_BYTES", 1024)
+    monkeypatch.setattr(tabular_import_export, "EXPORT_CHUNK_SIZE", 256)
+
+    response = _export_client("csv", 500).get("/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="items.csv"'
+    lines = response.content.decode("utf-8").splitlines()
+    assert lines[0] == "name,quantity,meta"
+    assert lines[1] == 'Шкаф 0,0,"{""n"": 0}"'
+    assert len(lines) == 501
+
+
+def test_xlsx_export_uses_readme_and_data_sheets():
+    response = _export_client("xlsx", 3, readme_lines=["Items export"]).get("/export")
+
+    assert response.status_code == 200
+    workbook = load_workbook(BytesIO(response.content))
+    assert workbook.sheetnames == ["README", "DATA"]
+    assert workbook["README"]["A1"].value == "Items export"
+    rows = list(workbook["DATA"].iter_rows(values_only=True))
+    assert rows[0] == ("name", "quantity", "meta")
+    assert rows[3] == ("Шкаф 2", 2, '{"n": 2}')
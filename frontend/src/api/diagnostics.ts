@@ -74,9 +74,22 @@ export type DiagnosticsService = {
 export type DiagnosticsDatabaseTable = {
   table_name: string;
   row_count: number;
+  row_count_is_estimate: boolean;
   table_bytes: number;
   index_bytes: number;
   total_bytes: number;
+  dead_rows: number | null;
+  seq_scans: number | null;
+  index_scans: number | null;
+  unused_indexes: string[];
+  last_autovacuum: string | null;
+  last_autoanalyze: string | null;
+};
+
+export type DiagnosticsDatabaseTableCount = {
+  table_name: string;
+  row_count: number;
+  counted_at: string;
 };
 
 export type DiagnosticsDatabaseOverview = {
@@ -89,6 +102,7 @@ export type DiagnosticsDatabaseOverview = {
   total_rows: number;
   tables: DiagnosticsDatabaseTable[];
   issues: string[];
+  collected_at: string | null;
 };
 
 export type DiagnosticsRuntimeTopology = {
@@ -159,7 +173,12 @@ export type DiagnosticsLogEntry = {
   suggested_commands: DiagnosticsCommandGroup[];
 };
 
-export type DiagnosticsLogsPage = Pagination<DiagnosticsLogEntry>;
+export type DiagnosticsLogsPage = Pagination<DiagnosticsLogEntry> & { cursor: number | null };
+
+export type DiagnosticsLogTail = {
+  cursor: number;
+  items: DiagnosticsLogEntry[];
+};
 
 export type DiagnosticsDeleteLogsResult = {
   deleted_count: number;
@@ -176,6 +195,10 @@ export async function getDiagnosticsSummary() {
   return apiFetch<DiagnosticsSummary>("/admin/diagnostics/summary");
 }
 
+export async function countDiagnosticsTableRows(tableName: string) {
+  return apiFetch<DiagnosticsDatabaseTableCount>(`/admin/diagnostics/database/tables/${encodeURIComponent(tableName)}/count`);
+}
+
 export async function getDiagnosticsProcesses() {
   return apiFetch<DiagnosticsProcess[]>("/admin/diagnostics/processes");
 }
@@ -203,6 +226,26 @@ export async function getDiagnosticsLogs(params: {
   return apiFetch<DiagnosticsLogsPage>(`/admin/diagnostics/logs${qs}`);
 }
 
+export async function tailDiagnosticsLogs(
+  params: {
+    after: number;
+    source?: DiagnosticsSource | "";
+    severity?: DiagnosticsSeverity | "";
+    include_low_signal?: boolean;
+    wait_seconds?: number;
+  },
+  signal?: AbortSignal
+) {
+  const qs = buildQuery({
+    after: params.after,
+    source: params.source || undefined,
+    severity: params.severity || undefined,
+    include_low_signal: params.include_low_signal ? "true" : undefined,
+    wait_seconds: params.wait_seconds
+  });
+  return apiFetch<DiagnosticsLogTail>(`/admin/diagnostics/logs/tail${qs}`, { signal });
+}
+
 export async function deleteDiagnosticsLogs(entryIds: string[]) {
   return apiFetch<DiagnosticsDeleteLogsResult>("/admin/diagnostics/logs/delete", {
     method: "POST",
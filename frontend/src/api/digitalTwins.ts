@@ -1,4 +1,5 @@
 import { apiFetch } from "./client";
+import type { DocumentPatch, DocumentPatchResult } from "./entities";
 
 export type DigitalTwinScope = "cabinet" | "assembly";
 export type TwinMountType = "din-rail" | "wall" | "other";
@@ -119,6 +120,7 @@ export type DigitalTwinRecord = {
   document: DigitalTwinDocument;
   created_by_id?: number | null;
   updated_by_id?: number | null;
+  row_version: number;
   created_at: string;
   updated_at: string;
   is_deleted: boolean;
@@ -147,3 +149,10 @@ export function updateDigitalTwin(id: number, payload: { source_context?: Record
     body: JSON.stringify(payload),
   });
 }
+
+export function patchDigitalTwinDocument(id: number, payload: DocumentPatch) {
+  return apiFetch<DocumentPatchResult>(`/digital-twins/${id}/document`, {
+    method: "PATCH",
+    body: JSON.stringify(payload),
+  });
+}
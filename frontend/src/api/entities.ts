@@ -7,6 +7,22 @@ export type Pagination<T> = {
   total: number;
 };
 
+export type JsonPatchOperation =
+  | { op: "add" | "replace" | "test"; path: string; value: unknown }
+  | { op: "remove"; path: string }
+  | { op: "move" | "copy"; from: string; path: string };
+
+export type DocumentPatch = {
+  row_version: number;
+  operations: JsonPatchOperation[];
+};
+
+export type DocumentPatchResult = {
+  id: number;
+  row_version: number;
+  updated_at: string;
+};
+
 export function buildQuery(params: Record<string, string | number | boolean | undefined | null>) {
   const search = new URLSearchParams();
   Object.entries(params).forEach(([key, value]) => {
@@ -175,6 +175,19 @@ export function reserveAddress(
   });
 }
 
+export function allocateAddresses(
+  subnetId: number,
+  payload: { count?: number; contiguous?: boolean; reserve?: boolean; hostname?: string; comment?: string }
+) {
+  return apiFetch<{ subnet_id: number; reserved: boolean; items: IPAddressDetails[] }>(
+    `/ipam/subnets/${subnetId}/allocate`,
+    {
+      method: "POST",
+      body: JSON.stringify(payload)
+    }
+  );
+}
+
 export function releaseAddress(subnetId: number, offset: number) {
   return apiFetch<IPAddressDetails>(`/ipam/subnets/${subnetId}/addresses/${offset}/release`, {
     method: "POST"
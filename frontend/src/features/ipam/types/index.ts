@@ -147,6 +147,7 @@ export type HostEquipmentTreeLeaf = {
 export type HostEquipmentTreeNode = {
   value: string;
   label: string;
+  has_children?: boolean;
   children: HostEquipmentTreeNode[];
   equipment: HostEquipmentTreeLeaf[];
 };
@@ -1,5 +1,5 @@
 import { apiFetch } from "../../api/client";
-import { buildQuery, type Pagination } from "../../api/entities";
+import { buildQuery, type DocumentPatch, type DocumentPatchResult, type Pagination } from "../../api/entities";
 import type { NetworkTopologyDocumentRecord, NetworkTopologyEligibleEquipment, TopologyDocument } from "./types";
 
 export function listNetworkTopologies(params: Record<string, string | number | boolean | undefined>) {
@@ -41,6 +41,13 @@ export function updateNetworkTopology(
   });
 }
 
+export function patchNetworkTopologyDocument(id: number, payload: DocumentPatch) {
+  return apiFetch<DocumentPatchResult>(`/network-topologies/${id}/document`, {
+    method: "PATCH",
+    body: JSON.stringify(payload),
+  });
+}
+
 export function deleteNetworkTopology(id: number) {
   return apiFetch<{ status: string }>(`/network-topologies/${id}`, {
     method: "DELETE",
@@ -94,6 +94,7 @@ export type NetworkTopologyDocumentRecord = {
   document: TopologyDocument;
   created_by_id?: number | null;
   updated_by_id?: number | null;
+  row_version: number;
   created_at: string;
   updated_at: string;
   is_deleted: boolean;
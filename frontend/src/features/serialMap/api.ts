@@ -1,13 +1,13 @@
 import { apiFetch } from "../../api/client";
-import { buildQuery, type Pagination } from "../../api/entities";
+import { buildQuery, type DocumentPatch, type DocumentPatchResult, type Pagination } from "../../api/entities";
 import type { SerialMapDocumentData, SerialMapDocumentRecord, SerialMapEligibleEquipment } from "./types";
 
 export function listSerialMapDocuments(params: Record<string, string | number | boolean | undefined>) {
   return apiFetch<Pagination<SerialMapDocumentRecord>>(`/serial-map-documents${buildQuery(params)}`);
 }
 
-export function getSerialMapDocument(id: number) {
-  return apiFetch<SerialMapDocumentRecord>(`/serial-map-documents/${id}`);
+export function getSerialMapDocument(id: number, options: { includeHistory?: boolean } = {}) {
+  return apiFetch<SerialMapDocumentRecord>(`/serial-map-documents/${id}${buildQuery({ include_history: options.includeHistory })}`);
 }
 
 export function createSerialMapDocument(payload: {
@@ -41,6 +41,21 @@ export function updateSerialMapDocument(
   });
 }
 
+export function patchSerialMapDocument(id: number, payload: DocumentPatch) {
+  return apiFetch<DocumentPatchResult>(`/serial-map-documents/${id}/document`, {
+    method: "PATCH",
+    body: JSON.stringify(payload)
+  });
+}
+
+export function undoSerialMapDocument(id: number) {
+  return apiFetch<SerialMapDocumentRecord>(`/serial-map-documents/${id}/history/undo`, { method: "POST" });
+}
+
+export function redoSerialMapDocument(id: number) {
+  return apiFetch<SerialMapDocumentRecord>(`/serial-map-documents/${id}/history/redo`, { method: "POST" });
+}
+
 export function deleteSerialMapDocument(id: number) {
   return apiFetch<void>(`/serial-map-documents/${id}`, { method: "DELETE" });
 }
@@ -43,6 +43,18 @@ export function fillYearlyScheduleMonth(
   });
 }
 
+export function fillYearlyScheduleMonthForTeam(
+  year: number,
+  personnel_ids: number[],
+  month: number,
+  status: ScheduleStatus,
+) {
+  return apiFetch<YearlyScheduleAssignment[]>("/personnel/schedules/yearly/month-fill/team", {
+    method: "PATCH",
+    body: JSON.stringify({ year, personnel_ids, month, status }),
+  });
+}
+
 export function upsertYearlyScheduleEvent(
   year: number,
   personnel_id: number,
@@ -27,6 +27,7 @@ import {
   TableRow,
   Tabs,
   TextField,
+  Tooltip as MuiTooltip,
   Typography
 } from "@mui/material";
 import { ColumnDef } from "@tanstack/react-table";
@@ -35,11 +36,13 @@ import { useTranslation } from "react-i18next";
 import { Bar, BarChart, CartesianGrid, Legend, ResponsiveContainer, Tooltip, XAxis, YAxis } from "recharts";
 
 import {
+  countDiagnosticsTableRows,
   deleteDiagnosticsLogs,
   getDiagnosticsLogs,
   getDiagnosticsProcesses,
   getDiagnosticsSummary,
   killDiagnosticsProcess,
+  tailDiagnosticsLogs,
   type DiagnosticsPort,
   type DiagnosticsProcess,
   type DiagnosticsSeverity,
@@ -57,6 +60,7 @@ import { formatDateTime as formatDateTimeValue } from "../utils/dateFormat";
 
 const pageSizeOptions = [10, 20, 50, 100];
 const refreshIntervalMs = 3_600_000;
+const tailRetryDelayMs = 5_000;
 
 const statusColorMap: Record<DiagnosticsStatus, "success" | "warning" | "error" | "default"> = {
   healthy: "success",
@@ -93,6 +97,7 @@ export default function AdminDiagnosticsPage() {
   const [logsPageSize, setLogsPageSize] = useState(20);
   const [selectedLogIds, setSelectedLogIds] = useState<string[]>([]);
   const [deleteDialogOpen, setDeleteDialogOpen] = useState(false);
+  const [exactRowCounts, setExactRowCounts] = useState<Record<string, number>>({});
 
   const summaryQuery = useQuery({
     queryKey: ["admin-diagnostics-summary"],
@@ -136,6 +141,12 @@ export default function AdminDiagnosticsPage() {
     onError: (error) => setErrorMessage(error instanceof Error ? error.message : t("pagesUi.diagnostics.errors.deleteLogs"))
   });
 
+  const countRowsMutation = useMutation({
+    mutationFn: (tableName: string) => countDiagnosticsTableRows(tableName),
+    onSuccess: (result) => setExactRowCounts((current) => ({ ...current, [result.table_name]: result.row_count })),
+    onError: (error) => setErrorMessage(error instanceof Error ? error.message : t("pagesUi.diagnostics.errors.load"))
+  });
+
   const killProcessMutation = useMutation({
     mutationFn: (pid: number) => killDiagnosticsProcess(pid),
     onSuccess: async () => {
@@ -155,6 +166,36 @@ export default function AdminDiagnosticsPage() {
     setSelectedLogIds([]);
   }, [logSource, logSeverity, logQuery, showLowSignal, dateFrom, dateTo, logsPage, logsPageSize]);
 
+  // Follow the log tail while the newest page is open and refetch it only
+  // when matching entries were appended.
+  const logsCursor = logsQuery.data?.cursor ?? null;
+  const refetchLogs = logsQuery.refetch;
+  useEffect(() => {
+    if (!canView || tab !== "logs" || logsPage !== 1 || logsCursor === null) return;
+    const controller = new AbortController();
+    let cursor = logsCursor;
+    const follow = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const tail = await tailDiagnosticsLogs(
+            { after: cursor, source: logSource, severity: logSeverity, include_low_signal: showLowSignal },
+            controller.signal
+          );
+          cursor = tail.cursor;
+          if (tail.items.length) {
+            await refetchLogs();
+            return;
+          }
+        } catch {
+          if (controller.signal.aborted) return;
+          await new Promise((resolve) => window.setTimeout(resolve, tailRetryDelayMs));
+        }
+      }
+    };
+    void follow();
+    return () => controller.abort();
+  }, [canView, tab, logsPage, logsCursor, logSource, logSeverity, showLowSignal, refetchLogs]);
+
   const serviceOptions = useMemo(
     () => (summaryQuery.data?.services || []).map((service) => ({ value: service.service, label: service.display_name })),
     [summaryQuery.data?.services]
@@ -566,16 +607,34 @@ export default function AdminDiagnosticsPage() {
                       <TableCell align="right">Таблица</TableCell>
                       <TableCell align="right">Индексы</TableCell>
                       <TableCell align="right">Всего</TableCell>
+                      <TableCell align="right">Мертвые строки</TableCell>
                     </TableRow>
                   </TableHead>
                   <TableBody>
                     {topTablesCompact.map((table) => (
                       <TableRow key={table.table_name} hover>
                         <TableCell>{table.table_name}</TableCell>
-                        <TableCell align="right">{formatInteger(table.row_count, i18n.language)}</TableCell>
+                        <TableCell align="right">
+                          {table.table_name in exactRowCounts ? (
+                            formatInteger(exactRowCounts[table.table_name], i18n.language)
+                          ) : table.row_count_is_estimate ? (
+                            <MuiTooltip title="Оценка планировщика. Нажмите, чтобы посчитать точно.">
+                              <Button
+                                size="small"
+                                onClick={() => countRowsMutation.mutate(table.table_name)}
+                                disabled={countRowsMutation.isPending && countRowsMutation.variables === table.table_name}
+                              >
+                                ≈ {formatInteger(table.row_count, i18n.language)}
+                              </Button>
+                            </MuiTooltip>
+                          ) : (
+                            formatInteger(table.row_count, i18n.language)
+                          )}
+                        </TableCell>
                         <TableCell align="right">{formatBytes(table.table_bytes)}</TableCell>
                         <TableCell align="right">{formatBytes(table.index_bytes)}</TableCell>
                         <TableCell align="right">{formatBytes(table.total_bytes)}</TableCell>
+                        <TableCell align="right">{table.dead_rows === null ? "-" : formatInteger(table.dead_rows, i18n.language)}</TableCell>
                       </TableRow>
                     ))}
                   </TableBody>
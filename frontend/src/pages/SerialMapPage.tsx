@@ -44,6 +44,7 @@ import {
 import type {
   SerialMapDataPoolEntry,
   SerialMapDocumentData,
+  SerialMapDocumentRecord,
   SerialMapEdge,
   SerialMapNode,
   SerialMapNodeKind,
@@ -290,7 +291,7 @@ export default function SerialMapPage() {
   const hasUnsavedChangesRef = useRef(false);
 
   const documentsQuery = useQuery({ queryKey: ["serial-map-documents"], queryFn: () => listSerialMapDocuments({ page: 1, page_size: 100, scope: "engineering" }) });
-  const detailQuery = useQuery({ queryKey: ["serial-map-document", activeDocumentId], queryFn: () => getSerialMapDocument(activeDocumentId as number), enabled: activeDocumentId !== null });
+  const detailQuery = useQuery({ queryKey: ["serial-map-document", activeDocumentId], queryFn: () => getSerialMapDocument(activeDocumentId as number, { includeHistory: true }), enabled: activeDocumentId !== null });
   const equipmentQuery = useQuery({ queryKey: ["serial-map-eligible-equipment"], queryFn: () => listSerialMapEligibleEquipment({}) });
 
   const allDocuments = documentsQuery.data?.items || [];
@@ -482,10 +483,14 @@ export default function SerialMapPage() {
           name: documentNameRef.current || "Карта последовательных протоколов",
           description: documentDescriptionRef.current || null,
           scope: "engineering",
-          document: documentRef.current,
+          // Undo history is kept server-side; the local stack stays in the editor.
+          document: { ...documentRef.current, history: { past: [], future: [] } },
         });
         await queryClient.invalidateQueries({ queryKey: ["serial-map-documents"] });
-        queryClient.setQueryData(["serial-map-document", activeDocumentIdRef.current], updated);
+        queryClient.setQueryData(["serial-map-document", activeDocumentIdRef.current], {
+          ...updated,
+          document: { ...updated.document, history: documentRef.current.history },
+        });
         hasUnsavedChangesRef.current = false;
         setHasUnsavedChanges(false);
         setSaveStatus("saved");
@@ -908,7 +913,10 @@ export default function SerialMapPage() {
         name: selectedDocumentName.trim() || "Карта последовательных протоколов",
         description: selectedDocumentDescription.trim() || null,
       });
-      queryClient.setQueryData(["serial-map-document", selectedDocumentId], updated);
+      queryClient.setQueryData<SerialMapDocumentRecord>(["serial-map-document", selectedDocumentId], (previous) => ({
+        ...updated,
+        document: { ...updated.document, history: previous?.document.history ?? updated.document.history },
+      }));
       queryClient.invalidateQueries({ queryKey: ["serial-map-documents"] });
       if (activeDocumentId === selectedDocumentId) {
         hydratingRef.current = true;